@@ -185,30 +185,26 @@ async def create_tasks(tasks: List[LinkedInProfileTask] = Body(...)) -> TasksCre
     
     logger.info(f"Start: processing batch of {len(tasks)} pubsub-tasks")
     
+    # Валидация и нормализация username
+    valid_tasks = []
     for task in tasks:
         try:
-            # Валидация и нормализация username
-            try:
-                username = await validate_linkedin_username(task.username)
-                task.username = username
-            except Exception as e:
-                failed[task.username] = f"Invalid username: {str(e)}"
-                continue
-                
-            # Публикуем в Pub/Sub через наш брокер
-            await broker.publish(
-                settings.pubsub_linkedin_tasks_topic,  # Топик для заданий
-                task
-            )
-            
-            successful.append(task.username)
-            logger.info(f"Published task for user: {task.username} to topic: {settings.pubsub_linkedin_tasks_topic}")
-            
+            task.username = await validate_linkedin_username(task.username)
+            valid_tasks.append(task)
         except Exception as e:
-            error_msg = f"Failed to create task: {str(e)}"
-            failed[task.username] = error_msg
-            logger.error(f"Error creating pubsub-task for {task.username}: {e}")
-    
+            failed[task.username] = f"Invalid username: {str(e)}"
+
+    # Публикуем все задания одним вызовом: клиент отправляет их пачками, подтверждения ждем вместе
+    if valid_tasks:
+        result = await broker.publish_many(settings.pubsub_linkedin_tasks_topic, valid_tasks)
+        for index, task in enumerate(valid_tasks):
+            if index in result.errors:
+                failed[task.username] = f"Failed to create task: {str(result.errors[index])}"
+                logger.error(f"Error creating pubsub-task for {task.username}: {result.errors[index]}")
+            else:
+                successful.append(task.username)
+        logger.info(f"Published {result.published} tasks to topic: {settings.pubsub_linkedin_tasks_topic}")
+
     # Формируем итоговое сообщение
     total = len(tasks)
     success_count = len(successful)
@@ -1,9 +1,11 @@
 from google.oauth2 import service_account
 import os
 
-from pydantic import SecretStr
+from pydantic import Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from message_broker import BrokerType
+
 
 class Settings(BaseSettings):
     email_serv_pass: SecretStr
@@ -14,6 +16,39 @@ class Settings(BaseSettings):
     ps_notification_sub_name: str
     ps_notification_tg_topic: str
     ps_notification_tg_sub_name: str
+    # google_pubsub; nats; in_memory - a single process, for load tests (scripts/load_generator.py)
+    ps_broker_type: BrokerType = BrokerType.GOOGLE_PUBSUB
+    # payload format of the published messages: json; msgpack; protobuf (alumni_hub notifications.proto),
+    # the consumers decode all of them
+    ps_codec: str = "json"
+    # micro-batching of the incoming notifications: a batch is sent and saved together,
+    # it is at most as large as the number of messages the broker handles at a time
+    batch_max_size: int = 100
+    batch_max_wait_sec: float = 0.05
+    # outgoing email: a pool of logged-in SMTP sessions behind a bounded send queue
+    smtp_hostname: str = 'smtp.gmail.com'
+    smtp_port: int = 465
+    smtp_use_tls: bool = True
+    smtp_validate_certs: bool = False
+    smtp_pool_size: int = 4
+    smtp_max_messages_per_connection: int = 100
+    smtp_health_check_after_sec: float = 30.0
+    smtp_queue_size: int = 1000
+    # quiet hours, local hours of the recipient (22 - 8 spans midnight, equal hours disable them):
+    # the notifications arriving then are saved at once and sent to the channels when they end,
+    # spread over quiet_hours_release_spread_sec; recipients without a timezone get them at once
+    quiet_hours_start: int = Field(default=22, ge=0, le=23)
+    quiet_hours_end: int = Field(default=8, ge=0, le=23)
+    quiet_hours_release_spread_sec: float = 1800
+    # release of the deferred notifications: batch per transaction, pause when idle, notifications/s
+    scheduler_batch_size: int = 200
+    scheduler_poll_interval_sec: float = 5.0
+    scheduler_max_rate: float = 50.0
+    # a failed notification is retried after scheduler_retry_backoff_sec, doubled every attempt
+    scheduler_max_attempts: int = 5
+    scheduler_retry_backoff_sec: float = 60.0
+    # compile the email templates again when their files change (development)
+    templates_reload: bool = False
 
     model_config = SettingsConfigDict(env_file=os.environ.get('DOTENV', 'src/notifications/.env'), env_file_encoding='utf8')
 
@@ -1,7 +1,18 @@
-from message_broker import BrokerFactory, BrokerType
+from alumni_hub.platform.notifications_pb2 import Notification
+
+from common_db.schemas import DTOGeneralNotification
+from message_broker import BrokerFactory, BrokerType, ProtobufCodec, get_codec
 from notifications.config import settings
 
-# creating an instance of the broker (google_pubsub)
-broker = BrokerFactory.create_broker(BrokerType.GOOGLE_PUBSUB,
-                                     project_id=settings.ps_project_id,
-                                     credentials=settings.ps_credentials)
+# DTOUserNotification is sent as Notification too, its proto message has the user field
+ProtobufCodec.register(DTOGeneralNotification, Notification)
+codec = get_codec(settings.ps_codec)
+
+# creating an instance of the broker (settings.ps_broker_type, google_pubsub by default)
+if settings.ps_broker_type == BrokerType.GOOGLE_PUBSUB:
+    broker = BrokerFactory.create_broker(BrokerType.GOOGLE_PUBSUB,
+                                         project_id=settings.ps_project_id,
+                                         credentials=settings.ps_credentials,
+                                         codec=codec)
+else:
+    broker = BrokerFactory.create_broker(settings.ps_broker_type, codec=codec)
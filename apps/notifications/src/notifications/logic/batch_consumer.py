@@ -0,0 +1,129 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from loguru import logger
+
+T = TypeVar('T')
+BatchProcessor = Callable[[list[T]], Awaitable[list[Exception | None]]]
+
+
+@dataclass
+class BatchConsumerMetrics:
+    """
+    Counters of a batch consumer
+
+    Attributes:
+        submitted: items passed to submit()
+        processed: items handled successfully
+        failed: items whose processing failed, the broker redelivers their messages
+        batches: processed batches
+        max_batch: the largest batch
+    """
+    submitted: int = 0
+    processed: int = 0
+    failed: int = 0
+    batches: int = 0
+    max_batch: int = 0
+
+
+class BatchConsumer(Generic[T]):
+    """
+    Micro-batching of subscription callbacks.
+
+    submit() is awaited by the subscription callback: the item is collected into a batch
+    and submit() returns when process() has handled the batch, or raises the error of the item.
+    The broker acks a message when its callback returns, so a message is acked only after its
+    batch has been processed (e.g. persisted) and redelivered otherwise.
+
+    A batch is processed at once when no other batch is in flight: it takes the items delivered
+    together. While a batch is in flight the next one collects the items arriving meanwhile,
+    and is processed when the previous one is done, when it has max_batch_size items, or after
+    max_wait. So the batches grow with the load and add no latency when the load is low.
+    A batch is never larger than the number of callbacks the broker runs at a time.
+    """
+
+    def __init__(self, process: BatchProcessor, max_batch_size: int = 100, max_wait: float = 0.05):
+        """
+        Args:
+            process: handles a batch, returns the error of every item (None when handled)
+                or raises when the whole batch failed
+            max_batch_size: items of a batch
+            max_wait: seconds the first item of a batch waits for a batch in flight at most
+        """
+        self.process = process
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.metrics = BatchConsumerMetrics()
+
+        self._batch: list[tuple[T, asyncio.Future]] = []
+        self._flush_handle: asyncio.Handle | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> None:
+        """
+        Handle an item within a batch
+
+        Args:
+            item: item to process
+
+        Raise:
+            the error of the item or of its batch
+        """
+        self.metrics.submitted += 1
+        future = asyncio.get_running_loop().create_future()
+        # the exception is retrieved here when the caller has been cancelled
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._batch.append((item, future))
+        if len(self._batch) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if self._inflight:
+                self._flush_handle = loop.call_later(self.max_wait, self._flush)
+            else:
+                # the items delivered together reach submit() within the current loop iteration
+                self._flush_handle = loop.call_soon(self._flush)
+        # a cancelled caller does not cancel the batch of the others
+        await asyncio.shield(future)
+
+    async def stop(self):
+        """Process the collected items and wait for the batches in flight"""
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        task = asyncio.create_task(self._process(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._batch_done)
+
+    def _batch_done(self, task: asyncio.Task):
+        self._inflight.discard(task)
+        if not self._inflight:
+            self._flush()
+
+    async def _process(self, batch: list[tuple[T, asyncio.Future]]):
+        self.metrics.batches += 1
+        self.metrics.max_batch = max(self.metrics.max_batch, len(batch))
+        try:
+            errors = await self.process([item for item, _ in batch])
+        except Exception as e:
+            logger.error(f"Batch of {len(batch)} items failed: {e}")
+            errors = [e] * len(batch)
+
+        for (_, future), error in zip(batch, errors):
+            if future.done():
+                continue
+            if error is None:
+                self.metrics.processed += 1
+                future.set_result(None)
+            else:
+                self.metrics.failed += 1
+                future.set_exception(error)
@@ -1,12 +1,21 @@
 from google.cloud.pubsub_v1.subscriber.message import Message
 
 from common_db.schemas.notifications import DTOGeneralNotification
+from message_broker import decode
+from notifications.config import settings
+from .batch_consumer import BatchConsumer
 from .outgoing_message import NotificationSender
 
+# notifications of the concurrently handled messages are sent and saved together
+batch_consumer: BatchConsumer[DTOGeneralNotification] = BatchConsumer(
+    NotificationSender.send_notifications,
+    max_batch_size=settings.batch_max_size,
+    max_wait=settings.batch_max_wait_sec,
+)
 
-async def message_handler(message: Message) -> None:
-    """Processing an incoming message"""
 
-    await NotificationSender.send_notification(DTOGeneralNotification.model_validate_json(message.data))
+async def message_handler(message: Message) -> None:
+    """Processing an incoming message, the broker acks it on return (after its batch has been saved)
+    and retries it on an exception"""
 
-    message.ack()
+    await batch_consumer.submit(decode(message, DTOGeneralNotification))
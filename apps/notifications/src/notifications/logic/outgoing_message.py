@@ -1,11 +1,13 @@
+import asyncio
 from datetime import datetime, UTC
 from loguru import logger
-from zoneinfo import ZoneInfo
 
-from common_db.managers import UserManager, NotificationManager
-from common_db.schemas import DTOGeneralNotification, DTOUserNotification, DTONotifiedUserProfile
+from common_db.db_abstract import db_manager
+from common_db.managers import UserManager, NotificationManager, ScheduledNotificationManager
+from common_db.schemas import DTOGeneralNotification, DTOUserNotification, DTOScheduledNotificationCreate
 from notifications.config import settings
 from notifications.loader import broker
+from notifications.logic.quiet_hours import next_send_time
 from notifications.smtp_mailing.client import email_client
 
 
@@ -51,38 +53,148 @@ class NotificationSender:
     @classmethod
     async def __send_user_notification(cls, notification: DTOUserNotification):
         """Sending notifications"""
-        # getting the current time of the user
-        user_timezone: str = notification.user.timezone
-        user_time = datetime.now(ZoneInfo(user_timezone)) if user_timezone else datetime.now(UTC)
-
-        # TODO: логика по обработке времени отправки
-
+        # the channels are independent, they are sent concurrently
+        sends = []
         if notification.user.is_tg_notify:
-            info: str = await cls.__send_tg_notification(notification)
-            logger.info(f'Message #{info} has been sent to pubsub topic notification tg')
+            sends.append(cls.__send_tg_channel(notification))
         if notification.user.is_email_notify:
-            html_kwargs = await cls.__get_html_kwargs(notification)
-            await cls.__send_email_notification(notification, html_kwargs)
+            sends.append(cls.__send_email_channel(notification))
         if notification.user.is_push_notify:
-            await cls.__send_push_notification(notification)
+            sends.append(cls.__send_push_notification(notification))
+        await asyncio.gather(*sends)
+
+    @classmethod
+    async def __send_tg_channel(cls, notification: DTOUserNotification):
+        info: str = await cls.__send_tg_notification(notification)
+        logger.info(f'Message #{info} has been sent to pubsub topic notification tg')
+
+    @classmethod
+    async def __send_email_channel(cls, notification: DTOUserNotification):
+        html_kwargs = await cls.__get_html_kwargs(notification)
+        await cls.__send_email_notification(notification, html_kwargs)
 
     @classmethod
     async def send_notification(cls, notification: DTOGeneralNotification):
-        """Sending notifications"""
-        if notification.notification_type.value.casefold().startswith('user'):
-            # getting notified user
-            try:
-                notified_user: DTONotifiedUserProfile = DTONotifiedUserProfile(
-                    **(await UserManager.get_user_by_id(user_id=notification.user_id)).model_dump())
-            except Exception as e:
-                logger.error(f"Error when receiving user data with id={notification.user_id}: {e}")
-                return  # stop processing the notification because the user has not been found.
+        """Sending a notification"""
+        error = (await cls.send_notifications([notification]))[0]
+        if error is not None:
+            raise error
+
+    @classmethod
+    async def send_notifications(cls, notifications: list[DTOGeneralNotification]) -> list[Exception | None]:
+        """Sending a batch of notifications: one query for the channels of the recipients, one for the
+        profiles of the recipients with channels, concurrent sends, one INSERT.
+
+        A notification arriving in the quiet hours of its recipient is saved at once but deferred:
+        it is sent to the channels by the scheduler (logic.scheduler) when the quiet hours end.
+        Returns the error of every notification, None when it has been handled; a notification
+        whose sending failed is not saved. Raises when the recipients could not be loaded or
+        the notifications could not be saved: then no notification of the batch is handled.
+        """
+        errors: list[Exception | None] = [None] * len(notifications)
+        prepared, unrouted = await cls.__prepare(notifications, errors)
 
-            # preparing notification
-            prepared_notification = DTOUserNotification(**notification.model_dump(), user=notified_user)
+        # deferring the notifications that arrived in the quiet hours of their recipients
+        now = datetime.now(UTC)
+        immediate, deferred, schedule = [], [], []
+        for index, notification, prepared_notification in prepared:
+            send_after = next_send_time(now, prepared_notification.user.timezone,
+                                        settings.quiet_hours_start, settings.quiet_hours_end,
+                                        settings.quiet_hours_release_spread_sec)
+            if send_after is None:
+                immediate.append((index, notification, prepared_notification))
+            else:
+                deferred.append(notification)
+                schedule.append(DTOScheduledNotificationCreate(
+                    user_id=notification.user_id,
+                    payload=notification.model_dump(mode='json', exclude_none=True, serialize_as_any=True),
+                    send_after=send_after.replace(tzinfo=None),
+                ))
 
-            # sending the prepared notification to the mailing module
-            await cls.__send_user_notification(prepared_notification)
+        sent = [notification for _, notification, _ in await cls.__deliver(immediate, errors)]
 
-            # saving the notification to the database
-            await NotificationManager.create_notification(notification_data=notification)
+        # saving the notifications to the database, the deferred ones together with their schedule;
+        # the notifications of the recipients without channels are only saved into their feed
+        if sent or deferred or unrouted:
+            async with db_manager.session() as session:
+                await ScheduledNotificationManager.schedule(schedule, session=session)
+                await NotificationManager.create_notifications(sent + deferred + unrouted, session=session)
+        return errors
+
+    @classmethod
+    async def deliver_notifications(cls, notifications: list[DTOGeneralNotification]) -> list[Exception | None]:
+        """Sending saved notifications to the channels, without the quiet hours check (released by the scheduler)
+
+        Returns the error of every notification, None when it has been sent.
+        Raises when the recipients could not be loaded.
+        """
+        errors: list[Exception | None] = [None] * len(notifications)
+        prepared, _ = await cls.__prepare(notifications, errors)
+        await cls.__deliver(prepared, errors)
+        return errors
+
+    @classmethod
+    async def __prepare(
+            cls,
+            notifications: list[DTOGeneralNotification],
+            errors: list[Exception | None],
+    ) -> tuple[list[tuple[int, DTOGeneralNotification, DTOUserNotification]], list[DTOGeneralNotification]]:
+        """Loading the recipients of the user notifications, the errors are set by the index.
+
+        Returns the notifications prepared for sending and the notifications whose recipients
+        have no channel to send them to.
+        """
+        user_notifications = [(index, notification) for index, notification in enumerate(notifications)
+                              if notification.notification_type.value.casefold().startswith('user')]
+        if not user_notifications:
+            return [], []
+
+        # resolving the channels from the routing table, the profiles are loaded only for the
+        # recipients that have a channel
+        async with db_manager.session() as session:
+            routes = await UserManager.get_notification_routes(
+                {notification.user_id for _, notification in user_notifications}, session=session)
+            users = await UserManager.get_notified_users(
+                {user_id for user_id, route in routes.items() if route.has_channels}, session=session)
+
+        # preparing notifications
+        prepared: list[tuple[int, DTOGeneralNotification, DTOUserNotification]] = []
+        unrouted: list[DTOGeneralNotification] = []
+        for index, notification in user_notifications:
+            route = routes.get(notification.user_id)
+            if route is not None and not route.has_channels:
+                unrouted.append(notification)
+                continue
+            notified_user = users.get(notification.user_id)
+            if notified_user is None:
+                # stop processing the notification because the user has not been found
+                logger.error(f"Error when receiving user data with id={notification.user_id}: not found")
+                continue
+            try:
+                # unset fields (e.g. timestamp) keep the defaults of DTOUserNotification
+                prepared.append((index, notification, DTOUserNotification(
+                    **notification.model_dump(exclude_none=True, serialize_as_any=True), user=notified_user)))
+            except Exception as e:
+                errors[index] = e
+        return prepared, unrouted
+
+    @classmethod
+    async def __deliver(
+            cls,
+            prepared: list[tuple[int, DTOGeneralNotification, DTOUserNotification]],
+            errors: list[Exception | None],
+    ) -> list[tuple[int, DTOGeneralNotification, DTOUserNotification]]:
+        """Sending the prepared notifications concurrently, returns the sent ones, the errors are set by the index"""
+        results = await asyncio.gather(
+            *(cls.__send_user_notification(prepared_notification) for _, _, prepared_notification in prepared),
+            return_exceptions=True,
+        )
+        sent = []
+        for item, result in zip(prepared, results):
+            index, notification, _ = item
+            if isinstance(result, Exception):
+                logger.error(f"Error when sending notification to user_id={notification.user_id}: {result}")
+                errors[index] = result
+            else:
+                sent.append(item)
+        return sent
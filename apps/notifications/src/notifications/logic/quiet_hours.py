@@ -0,0 +1,42 @@
+import random
+from datetime import datetime, timedelta, UTC
+from zoneinfo import ZoneInfo
+
+
+def next_send_time(
+        now: datetime,
+        timezone: str | None,
+        start_hour: int,
+        end_hour: int,
+        spread: float = 0.0,
+) -> datetime | None:
+    """
+    Release time of a notification arriving in the quiet hours of its recipient
+
+    The quiet hours are [start_hour, end_hour) of the local time of the recipient and may
+    span midnight (22 - 8). A deferred notification is released at end_hour plus a random delay
+    of up to spread seconds: the notifications deferred through the night do not burst at the top
+    of the hour.
+
+    Args:
+        now: current time, timezone-aware
+        timezone: IANA timezone of the recipient, None - unknown, the notification is not deferred
+        start_hour: beginning of the quiet hours, local hour
+        end_hour: end of the quiet hours, local hour; equal to start_hour - no quiet hours
+        spread: seconds the releases are spread over
+    Returns:
+        UTC release time, None when the notification can be sent now
+    """
+    if not timezone or start_hour == end_hour:
+        return None
+    local = now.astimezone(ZoneInfo(timezone))
+    if start_hour < end_hour:
+        quiet = start_hour <= local.hour < end_hour
+    else:
+        quiet = local.hour >= start_hour or local.hour < end_hour
+    if not quiet:
+        return None
+
+    release_date = local.date() if local.hour < end_hour else local.date() + timedelta(days=1)
+    release = datetime(release_date.year, release_date.month, release_date.day, end_hour, tzinfo=local.tzinfo)
+    return release.astimezone(UTC) + timedelta(seconds=random.uniform(0, spread))
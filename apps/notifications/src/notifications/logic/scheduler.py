@@ -0,0 +1,163 @@
+"""
+Scheduler of the deferred notifications: sends the notifications that arrived in the quiet hours
+of their recipients (see logic.quiet_hours) when the quiet hours end.
+
+Each iteration leases a batch of due notifications (FOR UPDATE SKIP LOCKED, committed at once),
+coalesces the repeated ones, sends them to the channels and marks them released (or postpones them
+with a backoff after a failed attempt) in a second short transaction: no row locks are held while
+the notifications are sent. Several schedulers can run side by side. The sends are paced to max_rate:
+a batch goes out in chunks of max_rate * PACE_TICK_SEC notifications, one chunk per tick, instead of
+a burst on SMTP and the telegram bot.
+"""
+import asyncio
+import json
+import time
+from collections import defaultdict
+
+from loguru import logger
+
+from common_db.db_abstract import db_manager
+from common_db.managers import ScheduledNotificationManager
+from common_db.schemas import DTOGeneralNotification, DTOScheduledNotificationRead
+from notifications.config import settings
+from notifications.logic.outgoing_message import NotificationSender
+
+PACE_TICK_SEC = 0.5
+
+
+def coalesce(rows: list[DTOScheduledNotificationRead]) -> list[list[DTOScheduledNotificationRead]]:
+    """
+    Groups the notifications deferred several times for the same recipient (e.g. repeated
+    invitations to a meeting): a group is sent once
+
+    Args:
+        rows: claimed notifications
+    Returns:
+        groups of the same notifications in the order of the rows
+    """
+    groups: dict[str, list[DTOScheduledNotificationRead]] = {}
+    for row in rows:
+        payload = {key: value for key, value in row.payload.items() if key != 'timestamp'}
+        groups.setdefault(json.dumps(payload, sort_keys=True), []).append(row)
+    return list(groups.values())
+
+
+class NotificationScheduler:
+    def __init__(self, batch_size: int = 200, poll_interval: float = 5.0, max_rate: float = 50.0,
+                 max_attempts: int = 5, retry_backoff: float = 60):
+        """
+        Args:
+            batch_size: notifications claimed per transaction
+            poll_interval: pause after an iteration that did not fill a batch, seconds
+            max_rate: notifications released per second at most
+            max_attempts: notifications that failed this many times are marked failed
+                and left for manual handling
+            retry_backoff: delay after the first failed attempt, doubled after every next one, seconds
+        """
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_rate = max_rate
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.chunk_size = max(1, int(max_rate * PACE_TICK_SEC))
+        # a leased batch must be sent before the lease ends, or another scheduler claims it again
+        self.lease = 2 * batch_size / max_rate + 60
+        self.released = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self) -> int:
+        """
+        Release one batch of due notifications
+
+        Returns:
+            int: number of claimed notifications
+        """
+        async with db_manager.session() as session:
+            rows = await ScheduledNotificationManager.claim_due(
+                limit=self.batch_size, lease=self.lease, session=session
+            )
+        if not rows:
+            return 0
+
+        groups = coalesce(rows)
+        errors = await self.deliver_paced(
+            [DTOGeneralNotification.model_validate(dict(group[0].payload)) for group in groups]
+        )
+
+        released_ids, failed = [], defaultdict(list)
+        for group, error in zip(groups, errors):
+            group_ids = [row.id for row in group]
+            if error is None:
+                released_ids.extend(group_ids)
+            else:
+                failed[str(error)].extend(group_ids)
+
+        async with db_manager.session() as session:
+            await ScheduledNotificationManager.mark_released(released_ids, session=session)
+            for error, notification_ids in failed.items():
+                logger.error(f"Scheduler: {len(notification_ids)} notifications failed: {error}")
+                await ScheduledNotificationManager.mark_failed(
+                    notification_ids, error, max_attempts=self.max_attempts, retry_backoff=self.retry_backoff,
+                    session=session,
+                )
+
+        self.released += len(released_ids)
+        self.coalesced += len(rows) - len(groups)
+        self.failed += len(rows) - len(released_ids)
+        return len(rows)
+
+    async def deliver_paced(self, notifications: list[DTOGeneralNotification]) -> list[Exception | None]:
+        """
+        Send notifications in chunks of chunk_size, at most max_rate notifications per second
+
+        Args:
+            notifications: notifications to send
+        Returns:
+            the error of every notification, None if it was sent
+        """
+        errors = []
+        for start in range(0, len(notifications), self.chunk_size):
+            chunk = notifications[start:start + self.chunk_size]
+            started = time.monotonic()
+            errors.extend(await NotificationSender.deliver_notifications(chunk))
+            pause = len(chunk) / self.max_rate - (time.monotonic() - started)
+            if pause > 0:
+                await asyncio.sleep(pause)
+        return errors
+
+    async def run(self):
+        while True:
+            try:
+                claimed = await self.run_once()
+            except Exception as e:
+                logger.exception(f"Scheduler iteration failed: {e}")
+                claimed = 0
+            # the sends are paced by run_once, a full batch means there is a backlog, no pause then
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="notification-scheduler")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info(f"Scheduler stopped: {self.released} released ({self.coalesced} coalesced), "
+                    f"{self.failed} failed")
+
+
+scheduler = NotificationScheduler(
+    batch_size=settings.scheduler_batch_size,
+    poll_interval=settings.scheduler_poll_interval_sec,
+    max_rate=settings.scheduler_max_rate,
+    max_attempts=settings.scheduler_max_attempts,
+    retry_backoff=settings.scheduler_retry_backoff_sec,
+)
@@ -7,7 +7,9 @@ from loguru import logger
 
 from notifications.config import settings
 from notifications.loader import broker
-from notifications.logic.incoming_message import message_handler
+from notifications.logic.incoming_message import batch_consumer, message_handler
+from notifications.logic.scheduler import scheduler
+from notifications.smtp_mailing.client import email_client
 from notifications.utils.logging import setup_logger, setup_logging_middleware, setup_exception_handlers
 
 # Setup logger
@@ -18,10 +20,14 @@ setup_logger()
 async def lifespan(app: FastAPI):
     # Subscribe to the topic on startup
     asyncio.create_task(broker.subscribe(settings.ps_notification_sub_name, message_handler))
+    await scheduler.start()
     logger.info("Service started, message subscription activated")
     yield
     # Add cleanup code on shutdown
     logger.info("Service is shutting down")
+    await batch_consumer.stop()
+    await scheduler.stop()
+    await email_client.close()
 
 
 app = FastAPI(title='Notification service', lifespan=lifespan)
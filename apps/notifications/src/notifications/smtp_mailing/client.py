@@ -1,16 +1,81 @@
-import os
-import aiosmtplib
+import asyncio
 from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from pathlib import Path
+
+from loguru import logger
 
 from notifications.config import settings
+from notifications.smtp_mailing.pool import SmtpConnectionPool
+from notifications.smtp_mailing.template_engine import TemplateEngine
+
+TEMPLATES_DIR = Path(__file__).parent / 'templates'
 
 
 class AsyncSmtpClient:
-    def __init__(self):
-        self.hostname = 'smtp.gmail.com'
-        self.port = 465
-        self.username = settings.email_serv_sender.get_secret_value()
-        self.password = settings.email_serv_pass.get_secret_value()
+    """
+    Email client.
+
+    The messages are put into a bounded send queue, a send waits while the queue is full.
+    The workers of the queue send the messages over the logged-in sessions of the pool.
+    """
+
+    def __init__(self, pool: SmtpConnectionPool, templates: TemplateEngine, queue_size: int = 1000):
+        """
+        Args:
+            pool: pool of the SMTP sessions, one queue worker per session
+            templates: compiled HTML templates
+            queue_size: messages waiting to be sent at most
+        """
+        self.pool = pool
+        self.templates = templates
+        self.username = pool.username
+        self.queue_size = queue_size
+        # created on the first send: the queue belongs to the running loop
+        self._queue: asyncio.Queue[tuple[MIMEMultipart, asyncio.Future]] | None = None
+        self._workers: list[asyncio.Task] = []
+
+    async def send(self, message: MIMEMultipart) -> None:
+        """
+        Puts a message into the send queue and waits until it has been sent
+
+        Args:
+            message: email message
+        Raise:
+            aiosmtplib.SMTPException or ConnectionError when the message has not been sent
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.pool.size)]
+        future = asyncio.get_running_loop().create_future()
+        # the exception is retrieved here when the caller has been cancelled
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        await self._queue.put((message, future))
+        await future
+
+    async def close(self):
+        """Sends the queued messages, stops the workers and closes the sessions"""
+        if self._queue is not None:
+            await self._queue.join()
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._queue, self._workers = None, []
+        await self.pool.close()
+
+    async def _worker(self):
+        while True:
+            message, future = await self._queue.get()
+            try:
+                await self.pool.send(message)
+                if not future.done():
+                    future.set_result(None)
+            except Exception as e:
+                logger.error(f"Email to {message['To']} has not been sent: {e}")
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
 
     @staticmethod
     def send_email_decorator(func):
@@ -33,11 +98,9 @@ class AsyncSmtpClient:
 
             # Устанавливаем содержимое тела сообщения (текст и HTML)
             if isinstance(body, str) and "<!DOCTYPE html>" in body:  # Проверяем наличие HTML-контента
-                from email.mime.text import MIMEText
                 html_message = MIMEText(body, 'html')
                 message.attach(html_message)
             else:
-                from email.mime.text import MIMEText
                 body_message = MIMEText(body, 'plain')  # 'plain' для текстового сообщения
                 message.attach(body_message)
 
@@ -45,11 +108,8 @@ class AsyncSmtpClient:
             if attachment:
                 message.attach(attachment)
 
-            # Подключаемся и отправляем сообщение
-            async with aiosmtplib.SMTP(hostname=self.hostname, port=self.port, timeout=10, use_tls=True,
-                                       validate_certs=False) as smtp:
-                await smtp.login(self.username, self.password)
-                await smtp.send_message(message)
+            # Отправляем через очередь и пул открытых сессий
+            await self.send(message)
 
         return wrapper
 
@@ -58,26 +118,54 @@ class AsyncSmtpClient:
         return body
 
     @send_email_decorator
-    async def send_html_email(self, recipient, subject, template_name, **kwargs):
+    async def send_html_email(self, recipient, subject, template_name, locale=None, **kwargs):
         """
         Отправляет электронное письмо с HTML-содержимым, загруженным из шаблона.
         :param recipient: Адрес электронной почты получателя.
         :param subject: Тема письма.
         :param template_name: Имя файла шаблона (например, 'verify_email.html').
+        :param locale: Локаль получателя, выбирает вариант шаблона (например, 'verify_email.ru.html').
         :param kwargs: Переменные для подстановки в шаблон.
         :return: HTML-код письма.
         """
-        template_path = os.path.join('src', 'smtp_mailing', 'templates', template_name)
-        try:
-            with open(template_path, "r", encoding="utf-8") as html_file:
-                html_body = html_file.read()
-                # Заменяем переменные в шаблоне
-                for key, value in kwargs.items():
-                    html_body = html_body.replace(f'{{{{ {key} }}}}', value)
-        except FileNotFoundError:
-            print(f"Error: HTML template file '{template_name}' not found.")
-            return
-        return html_body
-
-
-email_client = AsyncSmtpClient()
+        return self.templates.render(template_name, locale, **kwargs)
+
+    async def send_html_emails(self, recipients: dict[str, dict], subject, template_name, locale=None,
+                               **shared) -> list[Exception | None]:
+        """
+        Sends a template to many recipients: the shared variables are substituted once,
+        the messages are sent concurrently through the send queue
+
+        Args:
+            recipients: variables of the template of every recipient address
+            subject: subject of the emails
+            template_name: file name of the template (e.g. 'verify_email.html')
+            locale: locale of the recipients
+            shared: variables of the template common for all the recipients
+        Returns:
+            the error of every recipient (None when sent), in the order of the recipients
+        Raise:
+            TemplateNotFoundError, TemplateError - nothing has been sent
+        """
+        bodies = self.templates.render_many(template_name, recipients.values(), locale, **shared)
+        return await asyncio.gather(
+            *(self.send_text_email(recipient, subject, body) for recipient, body in zip(recipients, bodies)),
+            return_exceptions=True,
+        )
+
+
+email_client = AsyncSmtpClient(
+    SmtpConnectionPool(
+        hostname=settings.smtp_hostname,
+        port=settings.smtp_port,
+        username=settings.email_serv_sender.get_secret_value(),
+        password=settings.email_serv_pass.get_secret_value(),
+        use_tls=settings.smtp_use_tls,
+        validate_certs=settings.smtp_validate_certs,
+        size=settings.smtp_pool_size,
+        max_messages_per_connection=settings.smtp_max_messages_per_connection,
+        health_check_after=settings.smtp_health_check_after_sec,
+    ),
+    TemplateEngine(TEMPLATES_DIR, reload=settings.templates_reload),
+    queue_size=settings.smtp_queue_size,
+)
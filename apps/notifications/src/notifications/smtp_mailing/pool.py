@@ -0,0 +1,176 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from email.message import Message
+
+import aiosmtplib
+from loguru import logger
+
+# errors of a session the server has closed, the message is sent again over a new session
+_DISCONNECT_ERRORS = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, ConnectionError)
+
+
+@dataclass
+class SmtpPoolMetrics:
+    """
+    Counters of an SMTP connection pool
+
+    Attributes:
+        connects: sessions opened (connect, TLS handshake and login)
+        reconnects: sends repeated over a new session after the server had closed the pooled one
+        health_checks: NOOPs sent to sessions idle for health_check_after
+        sent: messages accepted by the server
+        failed: messages the server did not accept
+    """
+    connects: int = 0
+    reconnects: int = 0
+    health_checks: int = 0
+    sent: int = 0
+    failed: int = 0
+
+
+@dataclass
+class _Session:
+    smtp: aiosmtplib.SMTP
+    sent: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class SmtpConnectionPool:
+    """
+    Pool of logged-in SMTP sessions.
+
+    A session is opened (TLS handshake and login) on demand, at most size at a time, and is
+    reused by the following messages. A session idle for more than health_check_after seconds
+    is checked with NOOP before the reuse: servers drop idle sessions. A message whose session
+    turns out to be closed by the server is sent once more over a new session. After
+    max_messages_per_connection messages a session is closed and replaced, servers limit
+    the messages of a session.
+    """
+
+    def __init__(
+            self,
+            hostname: str,
+            port: int,
+            username: str | None = None,
+            password: str | None = None,
+            use_tls: bool = True,
+            validate_certs: bool = True,
+            size: int = 4,
+            max_messages_per_connection: int = 100,
+            health_check_after: float = 30.0,
+            timeout: float = 10.0,
+    ):
+        """
+        Args:
+            hostname: SMTP server
+            port: SMTP port
+            username: login of the sessions, None - no login
+            password: password of the login
+            use_tls: implicit TLS (port 465)
+            validate_certs: validate the certificate of the server
+            size: sessions open at a time
+            max_messages_per_connection: messages of a session before it is replaced
+            health_check_after: seconds of idling after which a session is checked before the reuse
+            timeout: seconds of a connect or a command
+        """
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.validate_certs = validate_certs
+        self.size = size
+        self.max_messages_per_connection = max_messages_per_connection
+        self.health_check_after = health_check_after
+        self.timeout = timeout
+        self.metrics = SmtpPoolMetrics()
+
+        # the last used session is reused first, the others may expire
+        self._idle: list[_Session] = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def send(self, message: Message) -> None:
+        """Send a message over a pooled session
+
+        Args:
+            message: email message with the sender and the recipients in its headers
+        Raise:
+            aiosmtplib.SMTPException or ConnectionError when the server did not accept the message
+        """
+        async with self._slots:
+            session = await self._checkout()
+            try:
+                await session.smtp.send_message(message)
+            except _DISCONNECT_ERRORS as e:
+                logger.warning(f"SMTP session closed by the server, reconnecting: {e}")
+                await self._discard(session)
+                self.metrics.reconnects += 1
+                session = None
+                try:
+                    session = await self._connect()
+                    await session.smtp.send_message(message)
+                except Exception:
+                    self.metrics.failed += 1
+                    if session is not None:
+                        await self._discard(session)
+                    raise
+            except Exception:
+                # the state of the session after a rejected message is unknown
+                self.metrics.failed += 1
+                await self._discard(session)
+                raise
+
+            self.metrics.sent += 1
+            session.sent += 1
+            session.last_used = time.monotonic()
+            if session.sent >= self.max_messages_per_connection:
+                await self._discard(session)
+            else:
+                self._idle.append(session)
+
+    async def close(self):
+        """Close the idle sessions"""
+        sessions, self._idle = self._idle, []
+        for session in sessions:
+            await self._discard(session)
+
+    async def _checkout(self) -> _Session:
+        while self._idle:
+            session = self._idle.pop()
+            if not session.smtp.is_connected:
+                continue
+            if time.monotonic() - session.last_used < self.health_check_after:
+                return session
+            self.metrics.health_checks += 1
+            try:
+                await session.smtp.noop()
+                return session
+            except Exception:
+                await self._discard(session)
+        return await self._connect()
+
+    async def _connect(self) -> _Session:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            timeout=self.timeout,
+            use_tls=self.use_tls,
+            validate_certs=self.validate_certs,
+        )
+        await smtp.connect()
+        try:
+            if self.username:
+                await smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self.metrics.connects += 1
+        return _Session(smtp=smtp)
+
+    @staticmethod
+    async def _discard(session: _Session):
+        try:
+            await session.smtp.quit()
+        except Exception:
+            session.smtp.close()
@@ -0,0 +1,230 @@
+import html
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+# {{ name }} or {{ name|safe }}; |safe inserts the value without escaping
+_PLACEHOLDER = re.compile(r'\{\{\s*(\w+)\s*(\|\s*safe\s*)?\}\}')
+_AUTOESCAPE_SUFFIXES = {'.html', '.htm', '.xml'}
+
+
+class TemplateError(ValueError):
+    """Invalid template or missing template variables"""
+
+
+class TemplateNotFoundError(LookupError):
+    """There is no template with this name"""
+
+
+@dataclass(frozen=True, slots=True)
+class _Field:
+    name: str
+    escape: bool
+
+
+class CompiledTemplate:
+    """
+    Template split once into literal text and variables.
+
+    Rendering joins the literals with the values of the variables, the template text is not
+    searched again. bind() substitutes the variables shared by many recipients once, so
+    render_many() only inserts the per-recipient values.
+    """
+
+    def __init__(self, name: str, parts: tuple[str | _Field, ...]):
+        self.name = name
+        self.parts = parts
+        self.variables = frozenset(part.name for part in parts if isinstance(part, _Field))
+
+    @classmethod
+    def compile(cls, name: str, source: str, autoescape: bool) -> 'CompiledTemplate':
+        """
+        Args:
+            name: name of the template, for the errors
+            source: text of the template
+            autoescape: HTML-escape the values of the variables (except |safe ones)
+        Returns:
+            compiled template
+        Raise:
+            TemplateError when the template has a malformed placeholder
+        """
+        parts: list[str | _Field] = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            parts.append(source[position:match.start()])
+            parts.append(_Field(match.group(1), autoescape and not match.group(2)))
+            position = match.end()
+        parts.append(source[position:])
+        for literal in parts[::2]:
+            if '{{' in literal or '}}' in literal:
+                raise TemplateError(f'Template "{name}" has a malformed placeholder near "{literal.strip()[:40]}"')
+        return cls(name, tuple(part for part in parts if part != ''))
+
+    def render(self, context: Mapping[str, Any]) -> str:
+        """
+        Args:
+            context: values of the variables
+        Returns:
+            rendered text
+        Raise:
+            TemplateError when a variable of the template is missing in the context
+        """
+        try:
+            return ''.join(
+                part if isinstance(part, str)
+                else html.escape(str(context[part.name])) if part.escape
+                else str(context[part.name])
+                for part in self.parts
+            )
+        except KeyError as e:
+            raise TemplateError(f'Template "{self.name}" misses the variable {e}') from None
+
+    def bind(self, context: Mapping[str, Any]) -> 'CompiledTemplate':
+        """
+        Substitutes the variables present in the context
+
+        Args:
+            context: values of a part of the variables
+        Returns:
+            template with the remaining variables only
+        """
+        parts: list[str | _Field] = []
+        for part in self.parts:
+            if isinstance(part, _Field) and part.name in context:
+                value = str(context[part.name])
+                part = html.escape(value) if part.escape else value
+            if isinstance(part, str) and parts and isinstance(parts[-1], str):
+                parts[-1] += part
+            else:
+                parts.append(part)
+        return CompiledTemplate(self.name, tuple(parts))
+
+    def render_many(self, contexts: Iterable[Mapping[str, Any]], shared: Mapping[str, Any] | None = None) -> list[str]:
+        """
+        Renders the template for many recipients
+
+        Args:
+            contexts: values of the variables of every recipient
+            shared: values of the variables common for all the recipients, substituted once
+        Returns:
+            rendered texts in the order of the contexts
+        Raise:
+            TemplateError when a variable is missing
+        """
+        template = self.bind(shared) if shared else self
+        return [template.render(context) for context in contexts]
+
+
+class TemplateEngine:
+    """
+    Compiled templates of a directory.
+
+    All the templates are compiled when the engine is created, so a broken template fails the start
+    of the service rather than a send. A locale variant of a template is a file with the locale before
+    the suffix: verify_email.ru.html is the "ru" variant of verify_email.html. The values are
+    HTML-escaped in .html/.htm/.xml templates. With reload=True (development) a changed or a new
+    file is compiled again on the next use.
+    """
+
+    def __init__(self, directory: Path, reload: bool = False):
+        """
+        Args:
+            directory: directory of the templates
+            reload: check the files for changes on every use
+        """
+        self.directory = directory
+        self.reload = reload
+        self._templates: dict[tuple[str, str | None], tuple[CompiledTemplate, float]] = {}
+        self.load()
+
+    def load(self):
+        """Compiles all the templates of the directory"""
+        templates = {}
+        for path in sorted(self.directory.rglob('*')):
+            if path.is_file():
+                templates[self._key(path)] = self._compile(path)
+        self._templates = templates
+
+    def get(self, name: str, locale: str | None = None) -> CompiledTemplate:
+        """
+        Finds a template: the variant of the locale ("pt_BR"), of its language ("pt"), the default one
+
+        Args:
+            name: file name of the default variant (e.g. 'verify_email.html')
+            locale: locale of the recipient
+        Returns:
+            compiled template
+        Raise:
+            TemplateNotFoundError when there is no such template
+        """
+        candidates = [(name, None)]
+        if locale:
+            language = locale.replace('-', '_').split('_')[0]
+            candidates[:0] = [(name, locale.replace('-', '_')), (name, language)]
+        if self.reload:
+            self._reload(candidates)
+        for key in candidates:
+            if key in self._templates:
+                return self._templates[key][0]
+        raise TemplateNotFoundError(f'There is no template "{name}" in {self.directory}')
+
+    def render(self, name: str, locale: str | None = None, /, **context: Any) -> str:
+        """
+        Args:
+            name: file name of the template
+            locale: locale of the recipient
+            context: values of the variables
+        Returns:
+            rendered text
+        Raise:
+            TemplateNotFoundError, TemplateError
+        """
+        return self.get(name, locale).render(context)
+
+    def render_many(self, name: str, contexts: Iterable[Mapping[str, Any]], locale: str | None = None, /,
+                    **shared: Any) -> list[str]:
+        """
+        Renders a template for many recipients of the same locale
+
+        Args:
+            name: file name of the template
+            contexts: values of the variables of every recipient
+            locale: locale of the recipients
+            shared: values of the variables common for all the recipients
+        Returns:
+            rendered texts in the order of the contexts
+        Raise:
+            TemplateNotFoundError, TemplateError
+        """
+        return self.get(name, locale).render_many(contexts, shared)
+
+    def _key(self, path: Path) -> tuple[str, str | None]:
+        relative = path.relative_to(self.directory)
+        # verify_email.ru.html -> ("verify_email.html", "ru")
+        stem, _, locale = relative.stem.rpartition('.')
+        if not stem:
+            return relative.as_posix(), None
+        return relative.with_name(stem + relative.suffix).as_posix(), locale
+
+    def _path(self, key: tuple[str, str | None]) -> Path:
+        name, locale = key
+        path = self.directory / name
+        return path if locale is None else path.with_name(f'{path.stem}.{locale}{path.suffix}')
+
+    def _compile(self, path: Path) -> tuple[CompiledTemplate, float]:
+        autoescape = path.suffix.lower() in _AUTOESCAPE_SUFFIXES
+        template = CompiledTemplate.compile(path.relative_to(self.directory).as_posix(),
+                                            path.read_text(encoding='utf-8'), autoescape)
+        return template, path.stat().st_mtime
+
+    def _reload(self, keys: list[tuple[str, str | None]]):
+        for key in keys:
+            path = self._path(key)
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                self._templates.pop(key, None)
+                continue
+            if key not in self._templates or self._templates[key][1] != mtime:
+                self._templates[key] = self._compile(path)
@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+from notifications.logic.batch_consumer import BatchConsumer
+
+
+@pytest.mark.asyncio
+async def test_batch_consumer_groups_items_and_reports_errors():
+    batches = []
+
+    async def process(items: list[int]) -> list[Exception | None]:
+        batches.append(items)
+        return [ValueError(item) if item == 3 else None for item in items]
+
+    consumer = BatchConsumer(process, max_batch_size=4, max_wait=0.01)
+    results = await asyncio.gather(*(consumer.submit(item) for item in range(6)), return_exceptions=True)
+
+    assert batches == [[0, 1, 2, 3], [4, 5]]
+    assert [isinstance(result, ValueError) for result in results] == [False, False, False, True, False, False]
+    assert consumer.metrics.processed == 5 and consumer.metrics.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_consumer_fails_the_whole_batch():
+    async def process(items: list[int]) -> list[Exception | None]:
+        raise RuntimeError("insert failed")
+
+    consumer = BatchConsumer(process, max_wait=0.01)
+    results = await asyncio.gather(consumer.submit(1), consumer.submit(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,34 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from common_db.enums.notifications import ENotificationType
+from common_db.schemas import DTOGeneralNotification, DTONotificationRoute
+from notifications.logic import outgoing_message
+from notifications.logic.outgoing_message import NotificationSender
+
+
+@pytest.mark.asyncio
+async def test_notifications_of_recipients_without_channels_are_only_saved(mocker):
+    routes = {
+        7: DTONotificationRoute(user_id=7, email='feed@example.com'),
+        8: DTONotificationRoute(user_id=8, email='blocked@example.com', is_tg_notify=True, is_tg_bot_blocked=True),
+    }
+    user_manager = mocker.patch.object(outgoing_message, 'UserManager')
+    user_manager.get_notification_routes = AsyncMock(return_value=routes)
+    user_manager.get_notified_users = AsyncMock(return_value={})
+    notification_manager = mocker.patch.object(outgoing_message, 'NotificationManager')
+    notification_manager.create_notifications = AsyncMock()
+    scheduled_manager = mocker.patch.object(outgoing_message, 'ScheduledNotificationManager')
+    scheduled_manager.schedule = AsyncMock()
+    mocker.patch.object(outgoing_message, 'db_manager', MagicMock())
+    notifications = [DTOGeneralNotification(notification_type=ENotificationType.user_test, user_id=user_id)
+                     for user_id in routes]
+
+    errors = await NotificationSender.send_notifications(notifications)
+
+    assert errors == [None, None]
+    # no profiles are loaded and nothing is sent, the notifications go to the feed
+    assert user_manager.get_notified_users.await_args.args[0] == set()
+    assert notification_manager.create_notifications.await_args.args[0] == notifications
+    assert scheduled_manager.schedule.await_args.args[0] == []
@@ -0,0 +1,59 @@
+import time
+from datetime import datetime, UTC
+
+import pytest
+
+from common_db.schemas import DTOScheduledNotificationRead
+from notifications.logic.outgoing_message import NotificationSender
+from notifications.logic.quiet_hours import next_send_time
+from notifications.logic.scheduler import NotificationScheduler, coalesce
+
+
+def test_notification_in_quiet_hours_is_deferred_to_their_end():
+    # 23:30 in Moscow (UTC+3)
+    now = datetime(2025, 3, 1, 20, 30, tzinfo=UTC)
+
+    assert next_send_time(now, 'Europe/Moscow', 22, 8) == datetime(2025, 3, 2, 5, 0, tzinfo=UTC)
+    assert next_send_time(now, 'Europe/London', 22, 8) is None
+    assert next_send_time(now, None, 22, 8) is None
+    assert next_send_time(now, 'Europe/Moscow', 8, 8) is None
+
+
+def test_release_is_spread_after_the_end_of_quiet_hours():
+    now = datetime(2025, 3, 2, 1, 0, tzinfo=UTC)  # 04:00 in Moscow
+
+    send_after = next_send_time(now, 'Europe/Moscow', 22, 8, spread=600)
+    assert datetime(2025, 3, 2, 5, 0, tzinfo=UTC) <= send_after <= datetime(2025, 3, 2, 5, 10, tzinfo=UTC)
+
+
+def test_coalesce_groups_repeated_notifications_of_a_user():
+    def row(row_id: int, user_id: int, meeting_id: int) -> DTOScheduledNotificationRead:
+        return DTOScheduledNotificationRead(
+            id=row_id, created_at=datetime(2025, 3, 1), updated_at=datetime(2025, 3, 1), user_id=user_id,
+            send_after=datetime(2025, 3, 2, 5),
+            payload={'notification_type': 'meeting_invitation', 'user_id': user_id,
+                     'params': {'meeting_id': meeting_id}, 'timestamp': f'2025-03-01T2{row_id}:00:00Z'},
+        )
+
+    groups = coalesce([row(1, 7, 100), row(2, 7, 100), row(3, 8, 100), row(4, 7, 101)])
+    assert [[item.id for item in group] for group in groups] == [[1, 2], [3], [4]]
+
+
+@pytest.mark.asyncio
+async def test_release_is_paced_to_max_rate(monkeypatch):
+    chunks = []
+
+    async def deliver_notifications(notifications):
+        chunks.append(len(notifications))
+        return [None] * len(notifications)
+
+    monkeypatch.setattr(NotificationSender, 'deliver_notifications', deliver_notifications)
+    scheduler = NotificationScheduler(batch_size=1200, max_rate=1000)
+
+    started = time.monotonic()
+    errors = await scheduler.deliver_paced(list(range(1200)))
+
+    # chunks of max_rate * PACE_TICK_SEC, 1200 notifications at 1000/s take 1.2 s
+    assert chunks == [500, 500, 200]
+    assert errors == [None] * 1200
+    assert time.monotonic() - started >= 1.1
@@ -0,0 +1,55 @@
+from email.mime.text import MIMEText
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from notifications.smtp_mailing.pool import SmtpConnectionPool
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.recipients = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.recipients.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=8025)
+    controller.start()
+    yield handler
+    controller.stop()
+
+
+def message(recipient: str) -> MIMEText:
+    body = MIMEText("text", "plain")
+    body["From"] = "sender@example.com"
+    body["To"] = recipient
+    return body
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_sessions_within_the_quota(smtp_server):
+    pool = SmtpConnectionPool("127.0.0.1", 8025, use_tls=False, size=1, max_messages_per_connection=2)
+    for index in range(5):
+        await pool.send(message(f"user{index}@example.com"))
+    await pool.close()
+
+    assert smtp_server.recipients == [f"user{index}@example.com" for index in range(5)]
+    assert pool.metrics.connects == 3 and pool.metrics.sent == 5
+
+
+@pytest.mark.asyncio
+async def test_pool_replaces_a_dropped_session(smtp_server):
+    pool = SmtpConnectionPool("127.0.0.1", 8025, use_tls=False, size=1)
+    await pool.send(message("first@example.com"))
+    # the idle session is dropped
+    pool._idle[0].smtp.transport.abort()
+    await pool.send(message("second@example.com"))
+    await pool.close()
+
+    assert smtp_server.recipients == ["first@example.com", "second@example.com"]
+    assert pool.metrics.connects == 2 and pool.metrics.failed == 0
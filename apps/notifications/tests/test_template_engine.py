@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from notifications.smtp_mailing.template_engine import TemplateEngine, TemplateError, TemplateNotFoundError
+
+
+@pytest.fixture
+def templates(tmp_path):
+    (tmp_path / 'invite.html').write_text('<p>Hi {{ name }}, join {{ meeting }} {{ footer|safe }}</p>')
+    (tmp_path / 'invite.ru.html').write_text('<p>Привет, {{ name }}</p>')
+    (tmp_path / 'invite.txt').write_text('Hi {{ name }}')
+    return tmp_path
+
+
+def test_render_escapes_html_values(templates):
+    engine = TemplateEngine(templates)
+
+    assert engine.render('invite.html', name='<b>Ann</b>', meeting='A & B', footer='<i>bye</i>') == \
+        '<p>Hi &lt;b&gt;Ann&lt;/b&gt;, join A &amp; B <i>bye</i></p>'
+    assert engine.render('invite.txt', name='<b>Ann</b>') == 'Hi <b>Ann</b>'
+    with pytest.raises(TemplateError):
+        engine.render('invite.html', name='Ann')
+
+
+def test_locale_variants_fall_back_to_the_language_and_the_default(templates):
+    engine = TemplateEngine(templates)
+
+    assert engine.render('invite.html', 'ru_RU', name='Аня') == '<p>Привет, Аня</p>'
+    assert engine.render('invite.html', 'de', name='Ann', meeting='m', footer='') == '<p>Hi Ann, join m </p>'
+    with pytest.raises(TemplateNotFoundError):
+        engine.get('missing.html')
+
+
+def test_render_many_substitutes_shared_values_once(templates):
+    engine = TemplateEngine(templates)
+
+    bodies = engine.render_many('invite.html', [{'name': 'Ann'}, {'name': 'Bob'}], meeting='Sync', footer='')
+    assert bodies == ['<p>Hi Ann, join Sync </p>', '<p>Hi Bob, join Sync </p>']
+
+
+def test_reload_picks_up_changed_files(templates):
+    engine = TemplateEngine(templates, reload=True)
+    assert engine.render('invite.txt', name='Ann') == 'Hi Ann'
+
+    path = templates / 'invite.txt'
+    path.write_text('Hello {{ name }}')
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 1))
+    assert engine.render('invite.txt', name='Ann') == 'Hello Ann'
+
+
+def test_malformed_placeholder_fails_at_load(tmp_path):
+    (tmp_path / 'broken.html').write_text('<p>{{ name </p>')
+    with pytest.raises(TemplateError):
+        TemplateEngine(tmp_path)
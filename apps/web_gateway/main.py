@@ -4,17 +4,27 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Depends
 from fastapi.responses import HTMLResponse
+from fastapi.staticfiles import StaticFiles
 
 
 from fastapi.middleware.cors import CORSMiddleware
 
+from common_db.db_abstract import db_manager
+from common_db.profiling import ServerTimingMiddleware, install_profiler
+
 from web_gateway.auth.router import router as auth_router
 from web_gateway.auth.security import authorize
 from web_gateway.enums.router import router as enum_router
+from web_gateway.events.router import event_listener, router as events_router
+from web_gateway.forms.forms_manager import FormsManager
 from web_gateway.forms.router import router as forms_router
 from web_gateway.media_storage.router import router as mds_router
+from web_gateway.media_storage.s3_proxy import avatar_uploader
+from web_gateway.meetings.meeting_manager import MeetingManager
 from web_gateway.meetings.router import router as meetings_router
 from web_gateway.notifications.router import router as notifications_router
+from web_gateway.outbox_relay import create_outbox_relay
+from web_gateway.responses import SchemaJSONResponse
 from web_gateway.users.router import router as users_router
 from web_gateway.feedbacks.router import router as feedbacks_router
 from web_gateway.communities_companies_domains.router import router as communities_companies_domains_router
@@ -30,14 +40,37 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    if settings.db_query_profiling:
+        install_profiler(db_manager.engine)
+        logging.getLogger("common_db.profiling").setLevel(logging.DEBUG)
+    notification_sender = MeetingManager.notification_sender()
+    await notification_sender.start()
+    # the relay can also run as a separate deployment: python -m web_gateway.outbox_relay
+    outbox_relay = create_outbox_relay() if settings.emitter_settings.outbox_relay_in_process else None
+    if outbox_relay:
+        await outbox_relay.start()
+    await event_listener.start()
     print("Service started")
     yield
+    await event_listener.stop()
+    if outbox_relay:
+        await outbox_relay.stop()
+    await FormsManager.matching_dispatcher().stop()
+    # publish the buffered notifications before the worker exits
+    await notification_sender.stop()
+    await avatar_uploader.close()
 
 
 production_env = settings.environment == "production"
 docs_path = None if production_env else "/docs"
 redoc_path = None if production_env else "/redoc"
-app = FastAPI(title="Community platform", lifespan=lifespan, docs_url=docs_path, redoc_url=redoc_path)
+app = FastAPI(
+    title="Community platform",
+    lifespan=lifespan,
+    docs_url=docs_path,
+    redoc_url=redoc_path,
+    default_response_class=SchemaJSONResponse,
+)
 
 
 # ToDo(evseev.dmsr) уточнить, что тут нужно
@@ -55,6 +88,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# DB statements count and time per request in the Server-Timing header
+if not production_env:
+    app.add_middleware(ServerTimingMiddleware, engine=db_manager.engine)
+
+# uploads of the local media storage (development), GCS serves them in the other environments
+if settings.media_storage_backend == "local":
+    os.makedirs(settings.media_storage_local_path, exist_ok=True)
+    app.mount(
+        settings.media_storage_local_base_url,
+        StaticFiles(directory=settings.media_storage_local_path),
+        name="media",
+    )
+
 app.include_router(auth_router)
 app.include_router(forms_router)
 app.include_router(users_router, dependencies=[Depends(authorize)])
@@ -65,6 +111,7 @@ app.include_router(enum_router, dependencies=[Depends(authorize)])
 app.include_router(feedbacks_router, dependencies=[Depends(authorize)])
 app.include_router(communities_companies_domains_router, dependencies=[Depends(authorize)])
 app.include_router(referrals_router, dependencies=[Depends(authorize)])
+app.include_router(events_router, dependencies=[Depends(authorize)])
 
 
 @app.get("/", response_class=HTMLResponse)
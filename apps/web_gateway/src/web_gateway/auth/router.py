@@ -21,9 +21,10 @@ from .security import (
     validate_telegram_miniapp,
     TOKEN_EXPIRY_SECONDS,
 )
+from web_gateway.responses import SchemaRoute
 
 
-router = APIRouter(tags=["Simple authentication and authorization"], prefix="/auth")
+router = APIRouter(tags=["Simple authentication and authorization"], prefix="/auth", route_class=SchemaRoute)
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -1,9 +1,9 @@
-from datetime import timedelta, datetime
+from datetime import timedelta, datetime, UTC
 from web_gateway.settings import settings
-from typing import Annotated
+from typing import Annotated, Any
 
 from pydantic import BaseModel
-from fastapi import Depends, HTTPException, Cookie
+from fastapi import Depends, HTTPException, Cookie, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 import jwt
 import logging
@@ -11,6 +11,8 @@ from aiogram.utils.web_app import safe_parse_webapp_init_data, WebAppInitData
 from aiogram.utils.auth_widget import check_integrity
 import secrets
 
+from .token_cache import TokenCache
+
 
 logger = logging.getLogger(__name__)
 ACCESS_SECRET_KEY = settings.access_secret_file
@@ -19,7 +21,9 @@ BOT_TOKEN = settings.bot_token_file
 ALGORITHM = "HS256"
 TOKEN_EXPIRY_SECONDS = 3600  # 1 hour
 
-ADMIN_TELEGRAM_IDS = [453529592]
+ADMIN_TELEGRAM_IDS: set[int] = settings.auth.admin_telegram_ids
+
+token_cache = TokenCache(maxsize=settings.auth.token_cache_size, ttl=settings.auth.token_cache_ttl_sec)
 
 
 def check_autorization(telegram_id: int) -> bool:
@@ -57,12 +61,21 @@ def decode_token(token):
     return token_data
 
 
+def decode_token_cached(token: str) -> dict[str, Any]:
+    """Decode the token, the claims of a token verified recently are taken from the cache"""
+    token_data = token_cache.get(token)
+    if token_data is None:
+        token_data = decode_token(token)
+        token_cache.put(token, token_data)
+    return token_data
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
-        expire = datetime.now() + expires_delta
+        expire = datetime.now(UTC) + expires_delta
     else:
-        expire = datetime.now() + timedelta(seconds=TOKEN_EXPIRY_SECONDS)
+        expire = datetime.now(UTC) + timedelta(seconds=TOKEN_EXPIRY_SECONDS)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, ACCESS_SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -95,19 +108,27 @@ def validate_telegram_miniapp(init_string) -> WebAppInitData | bool:
         return False
 
 
-async def get_user_roles(token: Annotated[str, Depends(get_access_token)]) -> list[str]:
-    token_data = decode_token(token)
+async def get_token_claims(request: Request, token: Annotated[str, Depends(get_access_token)]) -> dict[str, Any]:
+    """
+    Claims of the request's access token. The token is decoded once per request,
+    the claims are kept in request.state for the other dependencies and handlers.
+    """
+    token_data = getattr(request.state, "token_claims", None)
+    if token_data is None:
+        token_data = decode_token_cached(token)
+        request.state.token_claims = token_data
+    return token_data
+
+
+async def get_user_roles(token_data: Annotated[dict[str, Any], Depends(get_token_claims)]) -> list[str]:
     return token_data.get("roles", [])
 
 
-async def current_user_id(token: Annotated[str, Depends(get_access_token)]) -> int:
-    token_data = decode_token(token)
+async def current_user_id(token_data: Annotated[dict[str, Any], Depends(get_token_claims)]) -> int:
     return int(token_data.get("user_id"))
 
 
-async def owner_or_admin(user_id: int, token: Annotated[str, Depends(get_access_token)]) -> int:
-    token_data = decode_token(token)
-
+async def owner_or_admin(user_id: int, token_data: Annotated[dict[str, Any], Depends(get_token_claims)]) -> int:
     if "admin" in token_data.get("roles", []):
         return user_id
     if user_id == token_data.get("user_id"):
@@ -116,7 +137,5 @@ async def owner_or_admin(user_id: int, token: Annotated[str, Depends(get_access_
     raise HTTPException(status_code=403)
 
 
-async def authorize(token: Annotated[str, Depends(get_access_token)]):
-    token_data = decode_token(token)
-
+async def authorize(token_data: Annotated[dict[str, Any], Depends(get_token_claims)]):
     check_autorization(token_data.get("telegram_id"))
@@ -0,0 +1,58 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class TokenCache:
+    """
+    LRU cache of verified access tokens: token digest -> claims.
+
+    A hit skips the signature verification of a token that was already verified.
+    An entry lives at most ttl seconds and never longer than the "exp" claim of the token,
+    so an expired token is never served from the cache. Tokens themselves are not stored,
+    only their sha256 digests.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # digest -> (claims, wall clock time the entry expires at)
+        self._entries: OrderedDict[bytes, tuple[dict[str, Any], float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+        claims, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[digest]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return claims
+
+    def put(self, token: str, claims: dict[str, Any]):
+        expires_at = time.time() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        digest = self._digest(token)
+        self._entries[digest] = (claims, expires_at)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -17,8 +17,12 @@ from common_db.schemas.communities_companies_domains import (
 )
 from web_gateway import auth
 from web_gateway.communities_companies_domains.manager import CommunityCompanyManager
+from web_gateway.response_cache import ResponseCache, cached_response
+from web_gateway.responses import SchemaRoute
 
-router = APIRouter(prefix="/community_companies", tags=["Community companies"])
+router = APIRouter(prefix="/community_companies", tags=["Community companies"], route_class=SchemaRoute)
+# company and service catalogs, the same for all users
+community_companies_cache = ResponseCache(name="community_companies", ttl=300)
 
 
 @router.get(
@@ -61,6 +65,7 @@ async def get_integration_docs():
     name="get_community_company",
     response_model=DTOCommunityCompanyRead
 )
+@cached_response(community_companies_cache, max_age=60)
 async def get_curr_community_company(
     company_label: str,
     user_id: Annotated[int, Depends(auth.current_user_id)],
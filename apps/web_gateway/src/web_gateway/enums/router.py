@@ -1,6 +1,7 @@
 from .schemas import EnumValues
 from .enum_manager import EnumManger
 from fastapi import APIRouter, HTTPException
+from web_gateway.response_cache import ResponseCache, cached_response
 from common_db.enums.users import (
     EInterestsArea,
     EExpertiseArea,
@@ -25,10 +26,11 @@ from common_db.enums.forms import (
     EFormProjectProjectState,
     EFormProjectUserRole,
 )
+from web_gateway.responses import SchemaRoute
 
 
 
-router = APIRouter(tags=["Enums"], prefix="/enums")
+router = APIRouter(tags=["Enums"], prefix="/enums", route_class=SchemaRoute)
 types = [
     EInterestsArea,
     EExpertiseArea,
@@ -52,10 +54,14 @@ types = [
     EFormProjectUserRole,
 ]
 path_to_type = {
-    str(c.__class__.__name__): c for c in types
+    c.__name__: c for c in types
 }
+# enums change only with a deployment
+enums_cache = ResponseCache(name="enums")
+
 
 @router.get("/{type}", response_model=EnumValues, summary="Returns possible values of enum class")
+@cached_response(enums_cache, max_age=3600)
 async def get_list_of_values(
         type: str
 ) -> EnumValues:
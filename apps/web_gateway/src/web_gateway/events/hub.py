@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class UserEvent:
+    """
+    A change of a user's data. frame is the Server-Sent Events frame,
+    encoded once and shared by all the connections of the user.
+    """
+    id: int
+    user_id: int
+    frame: bytes
+
+    @classmethod
+    def create(cls, id: int, user_id: int, type: str, data: dict) -> "UserEvent":
+        frame = f"id: {id}\nevent: {type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+        return cls(id=id, user_id=user_id, frame=frame.encode())
+
+    @classmethod
+    def from_notify(cls, payload: str) -> "UserEvent":
+        """Event of a user_events NOTIFY payload, see common_db.functions.user_events"""
+        data = json.loads(payload)
+        return cls.create(
+            id=data["id"],
+            user_id=data["user_id"],
+            type=data["type"],
+            data={"type": data["type"], "id": data["object_id"], "op": data["op"]},
+        )
+
+
+# tells the client that events may have been lost: refetch the state with the REST API
+RESET_FRAME = b"event: reset\ndata: {}\n\n"
+
+
+class Subscription:
+    """A connection of a user: a bounded queue of frames"""
+    __slots__ = ("user_id", "queue", "overflowed")
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+
+@dataclass
+class EventHubMetrics:
+    """
+    Counters of an event hub
+
+    Attributes:
+        connections: open subscriptions
+        events: events published into the hub
+        delivered: frames put into the connection queues
+        overflowed: connections closed because the client did not read its events
+        resets: subscriptions that could not be replayed from Last-Event-ID
+    """
+    connections: int = 0
+    events: int = 0
+    delivered: int = 0
+    overflowed: int = 0
+    resets: int = 0
+
+
+class EventHub:
+    """
+    Fan-out of user events to the connections of the users.
+
+    Every connection has a bounded queue: a client that does not read its events is
+    disconnected instead of buffering without limit, it reconnects with Last-Event-ID.
+    The last replay_size events of a user are kept for the replay (for max_replay_users
+    most recently active users), a reconnect that can not be replayed gets a reset event.
+    """
+
+    def __init__(
+            self,
+            queue_size: int = 64,
+            replay_size: int = 32,
+            max_replay_users: int = 100_000,
+            max_connections: int = 10_000,
+    ):
+        self.queue_size = queue_size
+        self.replay_size = replay_size
+        self.max_replay_users = max_replay_users
+        self.max_connections = max_connections
+        self.metrics = EventHubMetrics()
+
+        self._subscriptions: dict[int, set[Subscription]] = {}
+        # user -> (the last events, the greatest id evicted from them)
+        self._replay: OrderedDict[int, tuple[deque[UserEvent], int]] = OrderedDict()
+        # events with ids up to the floor may be missing in the replay of any user,
+        # None - no event was received since the start or since a gap in the source
+        self._floor: int | None = None
+        self._gap = True
+
+    def subscribe(self, user_id: int, last_event_id: int | None = None) -> Subscription:
+        """
+        Open a connection of a user. The queue starts with the events after last_event_id,
+        or with a reset event if they can not be replayed.
+
+        Raise:
+            OverflowError if the hub has max_connections connections
+        """
+        if self.metrics.connections >= self.max_connections:
+            raise OverflowError("Too many connections")
+        subscription = Subscription(user_id, self.queue_size)
+        if last_event_id is not None:
+            replay = self._replay_after(user_id, last_event_id)
+            if replay is None or len(replay) > self.queue_size:
+                self.metrics.resets += 1
+                subscription.queue.put_nowait(RESET_FRAME)
+            else:
+                for event in replay:
+                    subscription.queue.put_nowait(event.frame)
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        self.metrics.connections += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.user_id]
+        self.metrics.connections -= 1
+
+    def publish(self, event: UserEvent):
+        self.metrics.events += 1
+        if self._gap:
+            self._gap = False
+            self._floor = max(self._floor or 0, event.id - 1)
+        self._remember(event)
+
+        for subscription in list(self._subscriptions.get(event.user_id, ())):
+            try:
+                subscription.queue.put_nowait(event.frame)
+                self.metrics.delivered += 1
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self.metrics.overflowed += 1
+                self.unsubscribe(subscription)
+                logging.info("Event hub: a connection of user %s overflowed", event.user_id)
+
+    def mark_gap(self):
+        """Events could have been lost by the source (e.g. the listener reconnected)"""
+        self._gap = True
+
+    def _remember(self, event: UserEvent):
+        replay = self._replay.get(event.user_id)
+        if replay is None:
+            replay = (deque(maxlen=self.replay_size), 0)
+        events, evicted = replay
+        if len(events) == self.replay_size:
+            evicted = max(evicted, events[0].id)
+        events.append(event)
+        self._replay[event.user_id] = (events, evicted)
+        self._replay.move_to_end(event.user_id)
+        while len(self._replay) > self.max_replay_users:
+            _, (dropped, dropped_evicted) = self._replay.popitem(last=False)
+            self._floor = max(self._floor or 0, dropped_evicted, dropped[-1].id)
+
+    def _replay_after(self, user_id: int, last_event_id: int) -> list[UserEvent] | None:
+        if self._gap or self._floor is None or last_event_id < self._floor:
+            return None
+        events, evicted = self._replay.get(user_id, ((), 0))
+        if last_event_id < evicted:
+            return None
+        return [event for event in events if event.id > last_event_id]
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+
+import asyncpg
+
+from web_gateway.events.hub import EventHub, UserEvent
+
+
+class PgEventListener:
+    """
+    Feeds an event hub from a Postgres NOTIFY channel (see common_db.functions.user_events).
+
+    Uses a dedicated connection outside of the SQLAlchemy pool: LISTEN holds it for the
+    lifetime of the application. The connection is reopened when it is lost, the hub is told
+    about the gap, so the reconnecting clients are reset instead of replayed.
+    """
+
+    def __init__(self, hub: EventHub, dsn: str, channel: str, reconnect_delay: float = 1.0):
+        self.hub = hub
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"listener:{self.channel}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str):
+        try:
+            event = UserEvent.from_notify(payload)
+        except (ValueError, KeyError) as e:
+            logging.error("Listener %s: invalid payload %r: %s", self.channel, payload, e)
+            return
+        self.hub.publish(event)
+
+    async def _run(self):
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(self.channel, self._on_notify)
+                logging.info("Listener %s: listening", self.channel)
+                await closed.wait()
+                logging.warning("Listener %s: connection lost", self.channel)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error("Listener %s: %s", self.channel, e)
+            finally:
+                self.hub.mark_gap()
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.reconnect_delay)
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Annotated, AsyncIterator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import make_url
+
+from common_db.db_abstract import db_manager
+from common_db.functions import user_events_channel
+
+from web_gateway import auth
+from web_gateway.events.hub import EventHub, Subscription
+from web_gateway.events.listener import PgEventListener
+from web_gateway.responses import SchemaRoute
+from web_gateway.settings import settings
+
+router = APIRouter(tags=["Events"], prefix="/events", route_class=SchemaRoute)
+
+event_hub = EventHub(
+    queue_size=settings.events_queue_size,
+    replay_size=settings.events_replay_size,
+    max_connections=settings.events_max_connections,
+)
+event_listener = PgEventListener(
+    hub=event_hub,
+    # asyncpg takes a plain postgresql:// DSN
+    dsn=make_url(db_manager.settings.database_url_asyncpg.get_secret_value())
+    .set(drivername="postgresql")
+    .render_as_string(hide_password=False),
+    channel=user_events_channel(db_manager.settings.db_schema),
+)
+
+
+async def stream_events(subscription: Subscription, heartbeat: float) -> AsyncIterator[bytes]:
+    try:
+        # reconnection delay of EventSource, milliseconds
+        yield b"retry: 3000\n\n"
+        while not subscription.overflowed:
+            try:
+                yield await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                # keeps proxies from closing an idle connection, ignored by EventSource
+                yield b": ping\n\n"
+    finally:
+        event_hub.unsubscribe(subscription)
+
+
+@router.get("", summary="Stream of notification and meeting events")
+async def get_events(
+    user_id: Annotated[int, Depends(auth.current_user_id)],
+    last_event_id: Annotated[int | None, Header()] = None,
+    last_id: int | None = Query(None, description="Last-Event-ID for clients that can not set headers"),
+) -> StreamingResponse:
+    """
+    Server-Sent Events of the user: `notification` (a new notification) and `meeting`
+    (a meeting of the user or its responses changed), data is `{"type", "id", "op"}`.
+    A reconnecting client gets the events it missed after Last-Event-ID, or a `reset` event
+    when they are not available - then the state should be refetched.
+    """
+    try:
+        subscription = event_hub.subscribe(user_id, last_event_id if last_event_id is not None else last_id)
+    except OverflowError:
+        raise HTTPException(status_code=503, detail="Too many connections")
+    return StreamingResponse(
+        stream_events(subscription, settings.events_heartbeat_sec),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -7,9 +7,10 @@ from .feedbacks_manager import FeedbacksManager
 
 from typing import Annotated
 from web_gateway import auth
+from web_gateway.responses import SchemaRoute
 
 
-router = APIRouter(tags=["Feedbacks"], prefix="/feedback")
+router = APIRouter(tags=["Feedbacks"], prefix="/feedback", route_class=SchemaRoute)
 
 
 @router.post("/meeting/{meeting_id}", response_model=MeetingFeedbackRead, summary="Create a new feedback about meeting with second user")
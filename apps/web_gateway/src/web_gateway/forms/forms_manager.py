@@ -4,10 +4,13 @@ from common_db.schemas.matching import SUPPORTED_INTENTS, MatchingResultRead, Ma
 from common_db.models import ORMForm, ORMUserProfile, ORMMatchingResult
 from message_broker.factory import BrokerFactory, BrokerType
 from message_broker.broker import MessageBroker
+from web_gateway.forms.matching_dispatcher import MatchingDispatcher
+from web_gateway.forms.matching_results import MatchingResultWaiter
+from web_gateway.responses import SchemaJSONResponse
 from web_gateway.settings import settings
 
 from fastapi import HTTPException
-from fastapi.responses import HTMLResponse
+from google.oauth2 import service_account
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -21,19 +24,43 @@ class FormsManager:
     Класс для управления анкетами пользователей.
     """
 
-    broker = BrokerFactory.create_broker(BrokerType.GOOGLE_PUBSUB, project_id=..., credentials=...)
-    
     __matching_message_broker: MessageBroker = None
+    __matching_dispatcher: MatchingDispatcher = None
+    __matching_result_waiter: MatchingResultWaiter = None
 
     @classmethod
     async def matching_message_broker(cls) -> MessageBroker:
         if not cls.__matching_message_broker:
             cls.__matching_message_broker = BrokerFactory.create_broker(
                 BrokerType.GOOGLE_PUBSUB, 
-                project_id=settings.emitter_settings.matching_requests_google_pubsub_project_id,
-                credentials=settings.google_application_credentials
+                project_id=str(settings.emitter_settings.matching_requests_google_pubsub_project_id),
+                credentials=service_account.Credentials.from_service_account_file(
+                    settings.google_application_credentials
+                ),
+                # requests of a user are matched in the order they were sent
+                enable_message_ordering=True,
             )
         return cls.__matching_message_broker
+
+    @classmethod
+    def matching_dispatcher(cls) -> MatchingDispatcher:
+        if not cls.__matching_dispatcher:
+            cls.__matching_dispatcher = MatchingDispatcher(
+                get_broker=cls.matching_message_broker,
+                topic=settings.emitter_settings.matching_requests_google_pubsub_topic,
+                coalesce_window=settings.matching_requests.coalesce_window_sec,
+                max_batch_size=settings.matching_requests.max_batch_size,
+                max_latency=settings.matching_requests.max_latency_sec,
+            )
+        return cls.__matching_dispatcher
+
+    @classmethod
+    def matching_result_waiter(cls) -> MatchingResultWaiter:
+        if not cls.__matching_result_waiter:
+            cls.__matching_result_waiter = MatchingResultWaiter(
+                poll_interval=settings.matching_requests.result_poll_interval_sec
+            )
+        return cls.__matching_result_waiter
     
     @classmethod
     async def check_user_exists(cls, session: AsyncSession, user_id: int):
@@ -86,7 +113,27 @@ class FormsManager:
     @classmethod
     async def send_match(
         cls, session: AsyncSession, user_id: int, form_id: int, intent: EFormIntentType
-    ) -> MatchingResultRead:
+    ) -> MatchingResultRead | SchemaJSONResponse:
+        """
+        Return the latest matching result of the form, or request a new matching
+        when there is no result or it is older than matching_delay_sec
+
+        Args:
+            session: database session
+            user_id: owner of the form
+            form_id: form ID
+            intent: intent of the form
+
+        Returns:
+            MatchingResultRead: the latest result
+            SchemaJSONResponse: 202, the matching is requested; the result is awaited
+                with wait_match_result(after=requested_at)
+
+        Raise:
+            HTTPException 404 if the user or the form is not found
+            HTTPException 400 if the intent is not supported
+            HTTPException 503 if the request was not published
+        """
         await cls.check_user_exists(session, user_id)
         await cls.check_form_exists(session, form_id)
         
@@ -101,7 +148,9 @@ class FormsManager:
             .limit(1)
         )
         matching_result_orm = matching_result_request.scalar_one_or_none()
-        if matching_result_orm is None or (matching_result_orm.updated_at - datetime.now()).total_seconds() >= settings.matching_requests.matching_delay_sec:
+        # timestamps of ObjectTable are naive UTC
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        if matching_result_orm is None or (now - matching_result_orm.updated_at).total_seconds() >= settings.matching_requests.matching_delay_sec:
             
             message = MatchingRequest(
                 user_id=user_id,
@@ -110,8 +159,37 @@ class FormsManager:
                 n=settings.matching_requests.requested_users_count
             )
 
-            broker = await cls.matching_message_broker()
-            broker.publish(topic=settings.emitter_settings.matching_requests_google_pubsub_topic, message=message)
-            return HTMLResponse(status_code=102, detail="Waiting for results of matching")
+            try:
+                message_id = await cls.matching_dispatcher().submit(message)
+            except Exception:
+                raise HTTPException(status_code=503, detail="Matching service is unavailable")
+            return SchemaJSONResponse(
+                status_code=202,
+                content={
+                    "detail": "Waiting for results of matching",
+                    "message_id": message_id,
+                    "requested_at": now.isoformat(),
+                },
+            )
         
         return MatchingResultRead.model_validate(matching_result_orm)
+
+    @classmethod
+    async def wait_match_result(
+        cls, user_id: int, form_id: int, after: datetime.datetime | None, timeout: float
+    ) -> MatchingResultRead | None:
+        """
+        Wait for a matching result of the form without holding a database session
+
+        Args:
+            user_id: owner of the form
+            form_id: form ID
+            after: wait for a result created after this moment, None - return the latest result
+            timeout: seconds
+
+        Returns:
+            MatchingResultRead | None: the result, None if it did not arrive within the timeout
+        """
+        if after is not None and after.tzinfo is not None:
+            after = after.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return await cls.matching_result_waiter().wait(user_id, form_id, after, timeout)
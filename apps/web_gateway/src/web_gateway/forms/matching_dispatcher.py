@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from common_db.schemas.matching import MatchingRequest
+from message_broker.broker import MessageBroker
+
+MatchingKey = tuple[int, int | None]
+
+
+@dataclass
+class MatchingDispatcherMetrics:
+    """
+    Counters of a matching dispatcher
+
+    Attributes:
+        submitted: requests passed to submit()
+        coalesced: requests answered by a pending or a recent publish of the same (user, form)
+        published: requests acknowledged by the broker
+        failed: requests whose publish failed
+        batches: flushed batches
+    """
+    submitted: int = 0
+    coalesced: int = 0
+    published: int = 0
+    failed: int = 0
+    batches: int = 0
+
+
+class MatchingDispatcher:
+    """
+    Publisher of matching requests.
+
+    submit() waits for the broker ack, so a lost request is reported to the client.
+    Requests are collected into batches (up to max_batch_size, or whatever arrived within
+    max_latency) and published concurrently, the client-side batching of the broker packs them
+    into a few RPCs. Duplicate requests of the same (user, form) are coalesced: a request
+    that is waiting for the publish, or was published less than coalesce_window seconds ago,
+    is not published again and its callers get the same message id.
+    Requests of a user are published with the user id as the ordering key.
+    """
+
+    def __init__(
+        self,
+        get_broker: Callable[[], Awaitable[MessageBroker]],
+        topic: str,
+        coalesce_window: float = 60.0,
+        max_batch_size: int = 100,
+        max_latency: float = 0.05,
+    ):
+        self.get_broker = get_broker
+        self.topic = topic
+        self.coalesce_window = coalesce_window
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.metrics = MatchingDispatcherMetrics()
+
+        self._batch: list[MatchingRequest] = []
+        self._pending: dict[MatchingKey, asyncio.Future] = {}
+        # key -> (message id, publish time), in the publish order
+        self._recent: OrderedDict[MatchingKey, tuple[str, float]] = OrderedDict()
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def submit(self, request: MatchingRequest) -> str:
+        """
+        Publish a matching request
+
+        Args:
+            request: matching request
+
+        Returns:
+            str: message id of the published request
+
+        Raise:
+            Exception if the publish failed
+        """
+        self.metrics.submitted += 1
+        key = (request.user_id, request.form_id)
+        now = time.monotonic()
+        self._expire_recent(now)
+
+        recent = self._recent.get(key)
+        if recent is not None:
+            self.metrics.coalesced += 1
+            return recent[0]
+
+        future = self._pending.get(key)
+        if future is not None:
+            self.metrics.coalesced += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            # the exception is retrieved here when every caller has been cancelled
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._pending[key] = future
+            self._batch.append(request)
+            if len(self._batch) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.max_latency, self._flush)
+
+        # a cancelled caller does not cancel the publish awaited by the others
+        return await asyncio.shield(future)
+
+    async def stop(self):
+        """Publish the collected requests and wait for the publishes in flight"""
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def _expire_recent(self, now: float):
+        while self._recent:
+            key, (_, published_at) = next(iter(self._recent.items()))
+            if now - published_at < self.coalesce_window:
+                break
+            del self._recent[key]
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        task = asyncio.create_task(self._publish(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _publish(self, batch: list[MatchingRequest]):
+        try:
+            broker = await self.get_broker()
+            results = await asyncio.gather(
+                *(broker.publish(self.topic, request, ordering_key=str(request.user_id)) for request in batch),
+                return_exceptions=True,
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+
+        self.metrics.batches += 1
+        now = time.monotonic()
+        for request, result in zip(batch, results):
+            key = (request.user_id, request.form_id)
+            future = self._pending.pop(key)
+            if isinstance(result, BaseException):
+                self.metrics.failed += 1
+                logging.error("Matching request of user %s, form %s was not published: %s",
+                              request.user_id, request.form_id, result)
+                future.set_exception(result)
+                continue
+            self.metrics.published += 1
+            self._recent[key] = (result, now)
+            future.set_result(result)
@@ -0,0 +1,91 @@
+import asyncio
+import datetime
+import logging
+
+from sqlalchemy import select, tuple_
+
+from common_db.db_abstract import db_manager
+from common_db.models import ORMMatchingResult
+from common_db.schemas.matching import MatchingResultRead
+
+MatchingKey = tuple[int, int]
+
+
+class MatchingResultWaiter:
+    """
+    Long-poll of matching results.
+
+    The results are written by the matching service. Instead of a query per waiting client,
+    a single background task looks up the latest results of all the waited (user, form)
+    pairs with one query every poll_interval seconds and wakes up the waiters.
+    The task runs only while there are waiters.
+    """
+
+    def __init__(self, poll_interval: float = 0.5):
+        self.poll_interval = poll_interval
+        # key -> [(wait for a result created after, future)]
+        self._waiters: dict[MatchingKey, list[tuple[datetime.datetime | None, asyncio.Future]]] = {}
+        self._task: asyncio.Task | None = None
+
+    async def wait(
+            self, user_id: int, form_id: int, after: datetime.datetime | None, timeout: float
+    ) -> MatchingResultRead | None:
+        """
+        Wait for a matching result of the form
+
+        Args:
+            user_id: owner of the form
+            form_id: form ID
+            after: wait for a result created after this moment (naive UTC), None - any result
+            timeout: seconds
+
+        Returns:
+            MatchingResultRead | None: the latest result, None on timeout
+        """
+        key = (user_id, form_id)
+        waiter = (after, asyncio.get_running_loop().create_future())
+        self._waiters.setdefault(key, []).append(waiter)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="matching-results")
+        try:
+            return await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters is not None:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[key]
+
+    async def _run(self):
+        while self._waiters:
+            try:
+                results = await self._fetch(list(self._waiters))
+            except Exception as e:
+                logging.error("Matching results lookup failed: %s", e)
+                results = {}
+            for key, result in results.items():
+                for after, future in self._waiters.get(key, []):
+                    if not future.done() and (after is None or result.created_at > after):
+                        future.set_result(result)
+            await asyncio.sleep(self.poll_interval)
+
+    @staticmethod
+    async def _fetch(keys: list[MatchingKey]) -> dict[MatchingKey, MatchingResultRead]:
+        async with db_manager.session() as session:
+            # the latest result per (user, form), by ix_matching_results_user_id_form_id_created_at
+            rows = await session.scalars(
+                select(ORMMatchingResult)
+                .distinct(ORMMatchingResult.user_id, ORMMatchingResult.form_id)
+                .where(tuple_(ORMMatchingResult.user_id, ORMMatchingResult.form_id).in_(keys))
+                .order_by(
+                    ORMMatchingResult.user_id,
+                    ORMMatchingResult.form_id,
+                    ORMMatchingResult.created_at.desc(),
+                )
+            )
+            return {
+                (row.user_id, row.form_id): MatchingResultRead.model_validate(row)
+                for row in rows
+            }
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends
+import datetime
+
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common_db.db_abstract import db_manager
@@ -8,9 +10,11 @@ from common_db.enums.forms import EFormIntentType
 from typing import Annotated
 import web_gateway.auth as auth
 from .forms_manager import FormsManager
+from web_gateway.responses import SchemaRoute
+from web_gateway.settings import settings
 
 
-router = APIRouter(tags=["Forms"], prefix="/forms")
+router = APIRouter(tags=["Forms"], prefix="/forms", route_class=SchemaRoute)
 
 
 @router.post("", response_model=FormRead, summary="Create a new form")
@@ -40,16 +44,47 @@ async def get_user_form(
     return await FormsManager.get_user_form(session, user_id, intent_type)
 
 
-@router.post("/match/{user_id}/{form_id}", response_model=MatchingResultRead, summary="Send form to matching")
+@router.post(
+    "/match/{user_id}/{form_id}",
+    response_model=MatchingResultRead,
+    responses={202: {"description": "Matching is requested, wait for the result with GET /forms/match/{form_id}/result"}},
+    summary="Send form to matching",
+)
 async def match_form(
         user_id: Annotated[int, Depends(auth.current_user_id)],
         form_id: int,
         intent: EFormIntentType,
         session: Annotated[AsyncSession, Depends(db_manager.get_session)]
-) -> FormRead:
+) -> MatchingResultRead:
     """
     Send form to matching service.
+    Returns the latest result, or 202 with requested_at when a new matching is requested.
     """
     async with session.begin():
         matching_result = await FormsManager.send_match(session, user_id, form_id, intent)
-        return matching_result
\ No newline at end of file
+        return matching_result
+
+
+@router.get(
+    "/match/{form_id}/result",
+    response_model=MatchingResultRead,
+    responses={204: {"description": "No result within the timeout, repeat the request"}},
+    summary="Wait for a matching result",
+)
+async def wait_match_result(
+        user_id: Annotated[int, Depends(auth.current_user_id)],
+        form_id: int,
+        after: datetime.datetime | None = Query(
+            None, description="Wait for a result created after this moment, requested_at of the matching request"
+        ),
+        timeout: float = Query(
+            settings.matching_requests.result_wait_timeout_sec, ge=0, le=60, description="Seconds to wait"
+        ),
+) -> MatchingResultRead:
+    """
+    Long-poll: responds as soon as the matching result lands, or with 204 after the timeout.
+    """
+    result = await FormsManager.wait_match_result(user_id, form_id, after, timeout)
+    if result is None:
+        return Response(status_code=204)
+    return result
\ No newline at end of file
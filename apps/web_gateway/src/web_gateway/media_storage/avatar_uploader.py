@@ -0,0 +1,90 @@
+import asyncio
+from hashlib import sha256
+
+from fastapi import HTTPException, UploadFile
+
+from .image_pipeline import ImagePipeline
+from .storage import IMediaStorage
+
+MAX_AVATAR_SIZE = 20 * 1024 * 1024  # 20 MB
+# file signature -> format of the stored original
+IMAGE_SIGNATURES: dict[bytes, str] = {
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"\xff\xd8\xff": "jpeg",
+}
+
+
+class AvatarUploader:
+    """
+    Avatar upload: the original and its webp variants are stored under <sha256 of the content>/,
+    so the same image is stored once and an upload of a stored image skips the processing.
+    The name of the original comes from the format of the content, not from the uploaded
+    file name: the same bytes always map to the same objects.
+    """
+
+    def __init__(self, storage: IMediaStorage, pipeline: ImagePipeline):
+        self.storage = storage
+        self.pipeline = pipeline
+        self._supported_extensions = ("jpg", "jpeg", "png")
+
+    def check_file_extension(self, file: UploadFile) -> str:
+        original_filename = file.filename or ""
+        name, extension = (
+            original_filename.rsplit(".", 1)
+            if "." in original_filename
+            else (original_filename, "")
+        )
+        extension = extension.lower()
+        if extension not in self._supported_extensions:
+            raise HTTPException(status_code=400, detail="Unsupported image extension")
+        return extension
+
+    @staticmethod
+    def detect_format(data: bytes) -> str:
+        """
+        Args:
+            data: original image file
+
+        Returns:
+            str: image format by the file signature, png or jpeg
+
+        Raise:
+            HTTPException 400 if the content is not a supported image
+        """
+        for signature, image_format in IMAGE_SIGNATURES.items():
+            if data.startswith(signature):
+                return image_format
+        raise HTTPException(status_code=400, detail="Invalid image")
+
+    async def upload_avatar(self, file: UploadFile) -> dict:
+        self.check_file_extension(file)
+        data = await file.read()
+        if len(data) > MAX_AVATAR_SIZE:
+            raise HTTPException(status_code=413, detail="Image is too large")
+        image_format = self.detect_format(data)
+
+        dir_name = sha256(data).hexdigest()
+        names = {"orig": f"{dir_name}/orig.{image_format}"}
+        names.update({variant: f"{dir_name}/{variant}.webp" for variant in self.pipeline.variants})
+
+        # the webp variant is uploaded last, its presence means the whole set is stored
+        if await self.storage.exists(names["webp"]):
+            return {key: self.storage.url(name) for key, name in names.items()}
+
+        try:
+            variants = await self.pipeline.process(data)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid image")
+
+        uploads = {"orig": (data, f"image/{image_format}")}
+        uploads.update({variant: (content, "image/webp") for variant, content in variants.items()})
+        first = [key for key in uploads if key != "webp"]
+        urls = dict(zip(first, await asyncio.gather(
+            *(self.storage.upload(names[key], *uploads[key]) for key in first)
+        )))
+        urls["webp"] = await self.storage.upload(names["webp"], *uploads["webp"])
+        return urls
+
+    async def close(self):
+        self.pipeline.shutdown()
+        await self.storage.close()
@@ -0,0 +1,95 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+# variant name -> the longest side in pixels, None keeps the original size
+IMAGE_VARIANTS: dict[str, int | None] = {
+    "webp": None,
+    "medium": 512,
+    "thumb": 128,
+}
+# decompression bomb guard, a 50 Mpx photo is decoded in ~200 MB
+MAX_IMAGE_PIXELS = 50_000_000
+WEBP_QUALITY = 85
+
+
+def process_image(data: bytes, variants: dict[str, int | None] = IMAGE_VARIANTS) -> dict[str, bytes]:
+    """
+    Decode an image once and encode all its webp variants.
+    Runs in a worker process: takes and returns bytes only.
+
+    Args:
+        data: original image file
+        variants: variant name -> the longest side, None keeps the original size
+
+    Returns:
+        dict[str, bytes]: variant name -> webp file
+
+    Raise:
+        ValueError if the data is not an image or the image is too large
+    """
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    try:
+        image = Image.open(BytesIO(data))
+        # Pillow only warns up to 2 * MAX_IMAGE_PIXELS, the size is checked from the header before decoding
+        if image.width * image.height > MAX_IMAGE_PIXELS:
+            raise ValueError(f"Image is too large: {image.width}x{image.height}")
+        image.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Invalid image: {e}") from e
+
+    # camera photos store the orientation in EXIF, webp variants are saved upright
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+    result = {}
+    # from the largest variant to the smallest, each one is downscaled from the previous
+    for name, size in sorted(variants.items(), key=lambda item: -(item[1] or float("inf"))):
+        if size is not None:
+            image = image.copy()
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        output = BytesIO()
+        image.save(output, "webp", quality=WEBP_QUALITY, method=4)
+        result[name] = output.getvalue()
+    return result
+
+
+class ImagePipeline:
+    """
+    Image decoding and transcoding in a process pool, off the event loop:
+    a large photo takes the CPU of a worker process, not of the request handlers.
+    """
+
+    def __init__(self, max_workers: int = 2, variants: dict[str, int | None] = IMAGE_VARIANTS):
+        self.max_workers = max_workers
+        self.variants = variants
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def process(self, data: bytes) -> dict[str, bytes]:
+        """
+        Args:
+            data: original image file
+
+        Returns:
+            dict[str, bytes]: variant name -> webp file
+
+        Raise:
+            ValueError if the data is not an image or the image is too large
+        """
+        if self._executor is None:
+            # workers are spawned: forking the multi-threaded server process may deadlock
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, process_image, data, self.variants
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
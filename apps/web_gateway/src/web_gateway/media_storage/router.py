@@ -3,22 +3,24 @@ from fastapi import (
     UploadFile,
 )
 
-from .s3_proxy import gcs_client
+from .s3_proxy import avatar_uploader
 from .schemas import AvatarData
+from web_gateway.responses import SchemaRoute
 
 
-router = APIRouter(tags=["Media data storage"], prefix="/mds")
+router = APIRouter(tags=["Media data storage"], prefix="/mds", route_class=SchemaRoute)
 
 summary = """
 Uploads avatar into S3 storage
 Supported formats are: jpeg/jpg, png
-1. Calcs hash of file, filename and timestamp of now
-2. Uploads original into <hash>/orig.<extension>
-3. Converts original file into webp format and uploads it inti <hash>/webp.webp
-4. Returns link to webp image
+1. Calcs sha256 of the file content, an already stored image is not processed again
+2. Uploads original into <hash>/orig.<format> (png or jpeg, detected from the content)
+3. Converts original file into webp variants: <hash>/webp.webp (original size),
+   <hash>/medium.webp (512px) and <hash>/thumb.webp (128px)
+4. Returns links to the original and the variants
 """
 
 
 @router.post("/upload", summary=summary)
 async def upload_avatar(file: UploadFile) -> AvatarData:
-    return await gcs_client.upload_avatar(file)
+    return await avatar_uploader.upload_avatar(file)
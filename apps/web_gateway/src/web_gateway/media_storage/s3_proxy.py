@@ -1,75 +1,16 @@
-from datetime import datetime
-from hashlib import md5
-from io import BytesIO
-
-import aiohttp
-from PIL import Image
-from fastapi import UploadFile
-from gcloud.aio.storage import Storage
-
-
 from web_gateway.settings import settings
+from .avatar_uploader import AvatarUploader
+from .image_pipeline import ImagePipeline
+from .storage import IMediaStorage, GCSMediaStorage, LocalMediaStorage
 
 
-def make_hash(file: UploadFile) -> str:
-    hash_calc = md5()
-    hash_calc.update(file.filename.encode("utf-8"))
-    timestamp = datetime.now().strftime("%Y%m%d%H%M")
-    hash_calc.update(timestamp.encode("utf-8"))
-    return hash_calc.hexdigest()
-
-
-def convert_into_webp(file: UploadFile) -> BytesIO:
-    image = Image.open(BytesIO(file.file.read()))
-    file.file.seek(0)
-    result = BytesIO()
-    image.save(result, "webp")
-    result.seek(0)
-    return result
-
-
-class GCSClient:
-    def __init__(self):
-        # User must have 'Storage Object Admin' Role at S3 storage
-        self._google_application_credentials = settings.google_application_credentials
-        self._bucket_name = settings.google_cloud_bucket
-        self._supported_extensions = ("jpg", "jpeg", "png")
-
-    def check_file_extension(self, file: UploadFile) -> str:
-        original_filename = file.filename
-        name, extension = (
-            original_filename.rsplit(".", 1)
-            if "." in original_filename
-            else (original_filename, "")
-        )
-        extension = extension.lower()
-        if extension not in self._supported_extensions:
-            raise Exception("Unsupported image extension")
-        return extension
-
-    async def upload_avatar(self, file: UploadFile) -> dict:
-        async with aiohttp.ClientSession() as session:
-            client = Storage(session=session, service_file=self._google_application_credentials)
-            extension = self.check_file_extension(file)
-            dir_name = make_hash(file)
-
-            orig_name = f"{dir_name}/orig.{extension}"
-            webp_name = f"{dir_name}/webp.webp"
-            webp_data = convert_into_webp(file)
-
-            orig_status = await client.upload(
-                self._bucket_name, orig_name, file.file.read()
-            )
-            webp_status = await client.upload(
-                self._bucket_name, webp_name, webp_data.read()
-            )
-
-            # ToDo(evseev.dmsr): Extract media links from API
-            result = {
-                "orig": f"https://storage.googleapis.com/{self._bucket_name}/{orig_status['name']}",
-                "webp": f"https://storage.googleapis.com/{self._bucket_name}/{webp_status['name']}",
-            }
-            return result
+def create_media_storage() -> IMediaStorage:
+    if settings.media_storage_backend == "local":
+        return LocalMediaStorage(settings.media_storage_local_path, settings.media_storage_local_base_url)
+    return GCSMediaStorage(settings.google_cloud_bucket, settings.google_application_credentials)
 
 
-gcs_client = GCSClient()
+avatar_uploader = AvatarUploader(
+    storage=create_media_storage(),
+    pipeline=ImagePipeline(max_workers=settings.image_pipeline_workers),
+)
@@ -4,3 +4,5 @@ from pydantic import BaseModel
 class AvatarData(BaseModel):
     orig: str
     webp: str
+    medium: str | None = None
+    thumb: str | None = None
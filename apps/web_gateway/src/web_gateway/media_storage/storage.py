@@ -0,0 +1,101 @@
+import asyncio
+from abc import abstractmethod
+from pathlib import Path
+
+import aiohttp
+
+
+class IMediaStorage:
+    @abstractmethod
+    async def upload(self, name: str, data: bytes, content_type: str) -> str:
+        """
+        Store an object
+
+        Args:
+            name: object name
+            data: object content
+            content_type: MIME type of the content
+
+        Returns:
+            str: public url of the object
+        """
+
+    @abstractmethod
+    async def exists(self, name: str) -> bool:
+        pass
+
+    @abstractmethod
+    def url(self, name: str) -> str:
+        """Public url of an object"""
+
+    async def close(self):
+        """Release connections, called on application shutdown"""
+        pass
+
+
+class GCSMediaStorage(IMediaStorage):
+    """
+    Google Cloud Storage bucket. A single HTTP session and storage client are created
+    on the first use and shared by all uploads: connections and the auth token are reused.
+    """
+
+    def __init__(self, bucket_name: str, service_file: str):
+        # User must have 'Storage Object Admin' Role at S3 storage
+        self.bucket_name = bucket_name
+        self.service_file = service_file
+        self._session: aiohttp.ClientSession | None = None
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            # the package is only needed by this backend
+            from gcloud.aio.storage import Storage
+
+            self._session = aiohttp.ClientSession()
+            self._client = Storage(session=self._session, service_file=self.service_file)
+        return self._client
+
+    async def upload(self, name: str, data: bytes, content_type: str) -> str:
+        status = await self._get_client().upload(self.bucket_name, name, data, content_type=content_type)
+        return self.url(status["name"])
+
+    async def exists(self, name: str) -> bool:
+        try:
+            await self._get_client().download_metadata(self.bucket_name, name)
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                return False
+            raise
+        return True
+
+    def url(self, name: str) -> str:
+        # ToDo(evseev.dmsr): Extract media links from API
+        return f"https://storage.googleapis.com/{self.bucket_name}/{name}"
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            await self._session.close()
+            self._client = self._session = None
+
+
+class LocalMediaStorage(IMediaStorage):
+    """Directory on the local filesystem, for development and tests"""
+
+    def __init__(self, root: str, base_url: str = "/media"):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def _write(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    async def upload(self, name: str, data: bytes, content_type: str) -> str:
+        await asyncio.to_thread(self._write, self.root / name, data)
+        return self.url(name)
+
+    async def exists(self, name: str) -> bool:
+        return await asyncio.to_thread((self.root / name).exists)
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}/{name}"
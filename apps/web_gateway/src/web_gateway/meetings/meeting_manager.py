@@ -1,25 +1,35 @@
 from collections.abc import Iterable
+from datetime import datetime
 
 from fastapi import HTTPException
+from sqlalchemy import exists, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
 
+from alumni_hub.platform import events_pb2
 from event_emitter import EmitterFactory, IProtoEmitter
 from common_db.models import ORMMeeting, ORMMeetingResponse, ORMUserProfile
 from common_db.enums.meetings import EMeetingResponseStatus, EMeetingStatus, EMeetingUserRole
 from web_gateway.settings import settings
 from .notification_event_builder import NotificationEventBuilder
-from common_db.managers import LimitsManager
+from common_db.functions.pagination import encode_cursor, decode_cursor
+from common_db.managers import LimitsManager, MeetingResponseManager, OutboxManager, UserManager
+from common_db.profiling import profiled
+from common_db.schemas import DTOOutboxEventCreate
 from common_db.schemas.meetings import (
     MeetingRequestRead,
     MeetingRequestCreate,
     MeetingRequestUpdate,
     MeetingList,
+    MeetingCompactRead,
+    MeetingCompactList,
+    MeetingResponseCounts,
     MeetingFilter,
     MeetingsUserLimits,
     MeetingRequestUpdateUserResponse,
+    MeetingResponseCreate,
 )
 
 def to_iterable(object):
@@ -36,12 +46,57 @@ class MeetingManager:
     @classmethod
     def notification_sender(cls) -> IProtoEmitter:
         if not cls.__notification_event_emitter:
+            emitter_settings = settings.emitter_settings
+            options = {}
+            if emitter_settings.meetings_notification_target == "pubsub_batching":
+                options = dict(
+                    max_queue_size=emitter_settings.meetings_notification_max_queue_size,
+                    max_batch_size=emitter_settings.meetings_notification_max_batch_size,
+                    max_latency=emitter_settings.meetings_notification_max_latency_sec,
+                )
             cls.__notification_event_emitter = EmitterFactory.create_event_emitter(
-                target=settings.emitter_settings.meetings_notification_target,
-                topic=settings.emitter_settings.meetings_google_pubsub_notification_topic,
+                target=emitter_settings.meetings_notification_target,
+                topic=emitter_settings.meetings_google_pubsub_notification_topic,
+                **options,
             )
         return cls.__notification_event_emitter
 
+    @classmethod
+    async def queue_notifications(
+        cls, session: AsyncSession, events: list[events_pb2.Event]
+    ) -> list[events_pb2.Event]:
+        """
+        Write notification events into the outbox in the transaction of the session,
+        they are published after the commit by the outbox relay.
+
+        Args:
+            session: session of the change the events describe, not committed here
+            events: notification events
+
+        Returns:
+            list[events_pb2.Event]: events to emit after the commit, when the outbox is disabled
+        """
+        if not settings.emitter_settings.meetings_notification_outbox:
+            return events
+        await OutboxManager.add_events(
+            [
+                DTOOutboxEventCreate(
+                    topic=settings.emitter_settings.meetings_google_pubsub_notification_topic,
+                    payload=event.SerializeToString(),
+                    event_type=event.event_type,
+                    recipient_id=event.recipient_id or None,
+                )
+                for event in events
+            ],
+            session=session,
+        )
+        return []
+
+    @classmethod
+    def emit_notifications(cls, events: list[events_pb2.Event]):
+        for event in events:
+            cls.notification_sender().emit(event)
+
     @classmethod
     async def is_user_in_meeting(cls, user_id, meeting: ORMMeeting):
         for response in meeting.user_responses:
@@ -56,38 +111,35 @@ class MeetingManager:
         
     @classmethod
     async def check_pendings_limit(cls, user_id: int, user_limits: MeetingsUserLimits):
-        if user_limits.available_meeting_confirmations == 0:
+        if user_limits.available_meeting_pendings == 0:
             raise HTTPException(status_code=400, detail=f"Exceeded the limit of pended meetings for user {user_id}")
     
     @classmethod
+    @profiled
     async def create_meeting(
         cls, session: AsyncSession, user_id: int, request: MeetingRequestCreate
     ) -> MeetingRequestRead:
-        organizer: ORMUserProfile | None = await session.get(
-            ORMUserProfile, user_id
+        # Organizer first, attendees without duplicates
+        attendee_ids = [attendee_id for attendee_id in dict.fromkeys(request.attendees_id) if attendee_id != user_id]
+        participant_ids = [user_id, *attendee_ids]
+
+        # Check all participants exist with a single query
+        result = await session.execute(
+            select(ORMUserProfile.id).where(ORMUserProfile.id.in_(participant_ids))
         )
-        if not organizer:
+        existing_ids = set(result.scalars().all())
+        if user_id not in existing_ids:
             raise HTTPException(status_code=404, detail="Organiser not found")
-        meeting_users = [organizer]
+        for attendee_id in attendee_ids:
+            if attendee_id not in existing_ids:
+                raise HTTPException(status_code=404, detail=f"Attendee with id {attendee_id} not found")
 
-        # Check organizer limits
-        organizer_limits = await LimitsManager.get_user_meetings_limits(session, user_id, settings.limits)
-        await cls.check_pendings_limit(request.organizer_id, organizer_limits)
-        await cls.check_confirmations_limit(request.organizer_id, organizer_limits)
-        
-        # Check attendees exist
-        for user_id in request.attendees_id:
-            user_profile: ORMUserProfile | None = await session.get(
-                ORMUserProfile, user_id
-            )
-            if not user_profile:
-                raise HTTPException(status_code=404, detail=f"Attendee with id {user_id} not found")
-            meeting_users.append(user_profile)
-    
-        # Check attendees pending limits
-        for user_id in request.attendees_id:
-            attendee_limits = await LimitsManager.get_user_meetings_limits(session, user_id, settings.limits)
-            await cls.check_pendings_limit(user_id, attendee_limits)
+        # Check organizer and attendees limits, counted for all participants at once
+        participants_limits = await LimitsManager.get_users_meetings_limits(session, participant_ids, settings.limits)
+        await cls.check_pendings_limit(user_id, participants_limits[user_id])
+        await cls.check_confirmations_limit(user_id, participants_limits[user_id])
+        for attendee_id in attendee_ids:
+            await cls.check_pendings_limit(attendee_id, participants_limits[attendee_id])
 
         # Create meeting
         meeting = ORMMeeting(
@@ -99,41 +151,46 @@ class MeetingManager:
             status=EMeetingStatus.no_answer,
         )
         
-        # Create response and update limits for users
-        for idx, user_orm in enumerate(meeting_users): 
-            role = EMeetingUserRole.organizer if idx == 0 else EMeetingUserRole.attendee
-            response_status = EMeetingResponseStatus.confirmed if idx == 0 else EMeetingResponseStatus.no_answer
-            meeting_response = ORMMeetingResponse(
-                user=user_orm,
-                role=role,
-                response=response_status
-            )
-            meeting.user_responses.append(meeting_response)
-        
         session.add(meeting)
-        
-        for user_orm in meeting_users:
-            await LimitsManager.update_user_limits(session, user_orm.id, settings.limits)
-        
-        await session.commit()
-        
-        
-        created_meeting = MeetingRequestRead.model_validate(meeting, from_attributes=True)
-        
-        # Send notification to invited users
-        for attendee_id in request.attendees_id:
-            cls.notification_sender().emit(
-                NotificationEventBuilder.build_meeting_invitation_event(
-                    inviter_id=user_id,
-                    invited_id=attendee_id,
-                    meeting_id=created_meeting.id
+        await session.flush()
+
+        # Create responses with a single multi-row INSERT and update limits of all participants
+        await MeetingResponseManager.create_meeting_responses(
+            meeting=meeting,
+            responses=[
+                MeetingResponseCreate(
+                    user_id=participant_id,
+                    role=EMeetingUserRole.organizer if idx == 0 else EMeetingUserRole.attendee,
+                    response=EMeetingResponseStatus.confirmed if idx == 0 else EMeetingResponseStatus.no_answer,
                 )
+                for idx, participant_id in enumerate(participant_ids)
+            ],
+            session=session
+        )
+
+        # Recount the counters of the participants, their existence was checked above
+        await UserManager.update_meetings_counters_bulk(session, participant_ids, settings.limits)
+
+        # Notifications to invited users are committed together with the meeting
+        pending_events = await cls.queue_notifications(session, [
+            NotificationEventBuilder.build_meeting_invitation_event(
+                inviter_id=user_id,
+                invited_id=attendee_id,
+                meeting_id=meeting.id
             )
+            for attendee_id in attendee_ids
+        ])
+
+        await session.commit()
+        cls.emit_notifications(pending_events)
+
+        created_meeting = MeetingRequestRead.model_validate(meeting, from_attributes=True)
         
         # Return the meeting with the user information and responses
         return created_meeting
 
     @classmethod
+    @profiled
     async def get_meeting(
         cls, session: AsyncSession, user_id: int, meeting_id: int
     ) -> MeetingRequestRead:
@@ -158,56 +215,123 @@ class MeetingManager:
         return MeetingRequestRead.model_validate(meeting, from_attributes=True)
 
     @classmethod
-    async def get_meetings_with_filtering(cls, session: AsyncSession, user_id: int, filter: MeetingFilter):
-        query = select(ORMMeeting).options(selectinload(ORMMeeting.user_responses))
-        query = query.join(ORMMeetingResponse).where(
-            (ORMMeetingResponse.user_id == user_id)
-        )
+    @profiled
+    async def get_meetings_with_filtering(
+        cls,
+        session: AsyncSession,
+        user_id: int,
+        filter: MeetingFilter,
+        cursor: str | None = None,
+        limit: int = 30,
+        compact: bool = False,
+    ) -> MeetingList | MeetingCompactList:
+        """
+        Get a page of user meetings ordered by (scheduled_time, id).
+
+        The user's participation and the response/role filters are an EXISTS condition,
+        so a meeting is returned once whatever number of responses match.
+
+        Args:
+            session: database session
+            user_id: user identifier
+            filter: meetings filter
+            cursor: next_cursor of the previous page
+            limit: page size
+            compact: return response counts by status instead of the responses
+
+        Returns:
+            MeetingList | MeetingCompactList: meetings of the page and the cursor of the next page
+
+        Raise:
+            HTTPException 400 if the cursor is malformed
+        """
+        # User participation with the response filters
+        user_response_conditions = [
+            ORMMeetingResponse.meeting_id == ORMMeeting.id,
+            ORMMeetingResponse.user_id == user_id,
+        ]
+        # Filter by user response for this meeting
+        if filter.user_response:
+            user_response_conditions.append(ORMMeetingResponse.response.in_(to_iterable(filter.user_response)))
+        # Filter by user role
+        if filter.user_role:
+            user_response_conditions.append(ORMMeetingResponse.role.in_(to_iterable(filter.user_role)))
+        # correlated to meetings only: the compact query joins meeting_responses for the counts
+        conditions = [exists().where(*user_response_conditions).correlate(ORMMeeting)]
 
         # Filter by date_from: Meetings scheduled after this date
         if filter.date_from:
-            query = query.where(ORMMeeting.scheduled_time >= filter.date_from)
-
+            conditions.append(ORMMeeting.scheduled_time >= filter.date_from)
         # Filter by date_to: Meetings scheduled before this date
         if filter.date_to:
-            query = query.where(ORMMeeting.scheduled_time <= filter.date_to)
-        
+            conditions.append(ORMMeeting.scheduled_time <= filter.date_to)
         # Filter by location: Possible meetings locations
         if filter.location:
-            locations = to_iterable(filter.location)
-            query = query.filter(ORMMeeting.location.in_(locations))
-        
+            conditions.append(ORMMeeting.location.in_(to_iterable(filter.location)))
         # Filter by meeting status
         if filter.meeting_status:
-            statuses = to_iterable(filter.meeting_status)
-            query = query.filter(ORMMeeting.status.in_(statuses))
-        
-        # Filter by user response for this meeting
-        if filter.user_response:
-            responses = to_iterable(filter.user_response)
-            query = query.filter(ORMMeetingResponse.response.in_(responses))
-        
-        # Filter by user role
-        if filter.user_role:
-            roles = to_iterable(filter.user_role)
-            query = query.filter(ORMMeetingResponse.role.in_(roles))
-        
-        result = await session.execute(query)
-        meetings = result.scalars().all()
-        
-        if not meetings:
-            return MeetingList(meetings=[])
+            conditions.append(ORMMeeting.status.in_(to_iterable(filter.meeting_status)))
 
-        response = MeetingList(
-            meetings=[
-                MeetingRequestRead.model_validate(meeting, from_attributes=True)
-                for meeting in meetings
+        if cursor is not None:
+            after_scheduled_time, after_id = decode_cursor(cursor, datetime, int)
+            conditions.append(
+                tuple_(ORMMeeting.scheduled_time, ORMMeeting.id) > tuple_(after_scheduled_time, after_id)
+            )
+
+        order_by = (ORMMeeting.scheduled_time, ORMMeeting.id)
+        if compact:
+            counts = {
+                status: func.count(ORMMeetingResponse.user_id).filter(ORMMeetingResponse.response == status)
+                for status in EMeetingResponseStatus
+            }
+            query = (
+                select(ORMMeeting, *counts.values())
+                .outerjoin(ORMMeetingResponse, ORMMeetingResponse.meeting_id == ORMMeeting.id)
+                .where(*conditions)
+                .group_by(ORMMeeting.id, ORMMeeting.organizer_id, ORMMeeting.match_id)
+                .order_by(*order_by)
+                .limit(limit + 1)
+            )
+            rows = (await session.execute(query)).all()
+            page, has_more = rows[:limit], len(rows) > limit
+            meetings = [
+                MeetingCompactRead(
+                    id=meeting.id,
+                    created_at=meeting.created_at,
+                    updated_at=meeting.updated_at,
+                    match_id=meeting.match_id,
+                    description=meeting.description,
+                    location=meeting.location,
+                    scheduled_time=meeting.scheduled_time,
+                    status=meeting.status,
+                    response_counts=MeetingResponseCounts(
+                        **{status.value: count for status, count in zip(counts, status_counts)}
+                    ),
+                )
+                for meeting, *status_counts in page
             ]
-        )
+            last = page[-1][0] if page else None
+            result_type = MeetingCompactList
+        else:
+            query = (
+                select(ORMMeeting)
+                .options(selectinload(ORMMeeting.user_responses))
+                .where(*conditions)
+                .order_by(*order_by)
+                .limit(limit + 1)
+            )
+            rows = (await session.execute(query)).scalars().all()
+            page, has_more = rows[:limit], len(rows) > limit
+            meetings = [MeetingRequestRead.model_validate(meeting, from_attributes=True) for meeting in page]
+            last = page[-1] if page else None
+            result_type = MeetingList
+
+        next_cursor = encode_cursor(last.scheduled_time, last.id) if has_more else None
+        # the items are validated already, the list is not validated again
+        return result_type.model_construct(meetings=meetings, next_cursor=next_cursor)
 
-        return MeetingList.model_validate(response)
-    
     @classmethod
+    @profiled
     async def update_user_meeting_response(
         cls, session: AsyncSession, meeting_id: int, user_id: int, request: MeetingRequestUpdateUserResponse
     ) -> MeetingRequestRead:
@@ -270,19 +394,21 @@ class MeetingManager:
         # Update the user's limits
         await LimitsManager.update_user_limits(session, user_id, settings.limits)
 
-        await session.commit()
-        
-        # Send notification about status change
-        cls.notification_sender().emit(
+        # Notification about status change
+        pending_events = await cls.queue_notifications(session, [
             NotificationEventBuilder.build_meeting_response_event(
                 user_id=user_id, meeting_id=meeting_id
             )
-        )
+        ])
+
+        await session.commit()
+        cls.emit_notifications(pending_events)
 
         # Return the updated meeting response
         return MeetingRequestRead.model_validate(meeting, from_attributes=True)
 
     @classmethod
+    @profiled
     async def update_meeting(
         cls,
         session: AsyncSession,
@@ -362,17 +488,18 @@ class MeetingManager:
         ).items():
             setattr(meeting, key, value)
 
-        await session.commit()
-        
-        # Send notification to other users
+        # Notifications to other users
         recipients = [r.user_id for r in meeting.user_responses if r.user_id != user_id]
-        for recipient_id in recipients:
-            cls.notification_sender().emit(
-                NotificationEventBuilder.build_meeting_update_event(
-                    updater_id=user_id,
-                    recipient_id=recipient_id,
-                    meeting_id=meeting_id
-                )
+        pending_events = await cls.queue_notifications(session, [
+            NotificationEventBuilder.build_meeting_update_event(
+                updater_id=user_id,
+                recipient_id=recipient_id,
+                meeting_id=meeting_id
             )
+            for recipient_id in recipients
+        ])
+
+        await session.commit()
+        cls.emit_notifications(pending_events)
 
         return MeetingRequestRead.model_validate(meeting, from_attributes=True)
@@ -1,5 +1,5 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common_db.db_abstract import db_manager
@@ -10,6 +10,7 @@ from common_db.schemas.meetings import (
     MeetingRequestCreate,
     MeetingRequestUpdate,
     MeetingList,
+    MeetingCompactList,
     MeetingFilter,
     MeetingsUserLimits,
     MeetingRequestUpdateUserResponse,
@@ -17,9 +18,10 @@ from common_db.schemas.meetings import (
 from common_db.managers import LimitsManager
 from web_gateway import auth
 from web_gateway.settings import settings
+from web_gateway.responses import SchemaRoute
 
 
-router = APIRouter(tags=["Meetings"], prefix="/meetings")
+router = APIRouter(tags=["Meetings"], prefix="/meetings", route_class=SchemaRoute)
 session_dependency = Depends(db_manager.get_session)
 
 
@@ -38,17 +40,23 @@ async def get_meeting(
 
 
 @router.get(
-    "", response_model=MeetingList, summary="Get all user meetings by filter"
+    "", response_model=MeetingList | MeetingCompactList, summary="Get user meetings by filter"
 )
 async def get_meeting_with_filtering(
     filter: MeetingFilter, 
     user_id: Annotated[int, Depends(auth.current_user_id)], 
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(30, ge=1, le=100, description="Page size"),
+    compact: bool = Query(False, description="Response counts by status instead of the responses"),
     session: AsyncSession = session_dependency
-) -> MeetingRequestRead:
+) -> MeetingList | MeetingCompactList:
     """
-    Fetch all user meetings with filtering.
+    Fetch a page of user meetings with filtering, ordered by scheduled time.
+    Pass next_cursor of the response to get the next page.
     """
-    return await MeetingManager.get_meetings_with_filtering(session, user_id, filter)
+    return await MeetingManager.get_meetings_with_filtering(
+        session, user_id, filter, cursor=cursor, limit=limit, compact=compact
+    )
 
 
 @router.post(
@@ -3,7 +3,7 @@ from typing import Annotated
 from common_db.db_abstract import db_manager
 from common_db.enums.notifications import ENotificationType
 from common_db.managers.notifications import NotificationManager
-from common_db.schemas.notifications import DTOUserNotificationRead
+from common_db.schemas.notifications import DTOUserNotificationPage, DTONotificationIds
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import JSONResponse
@@ -11,28 +11,45 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from web_gateway import auth
+from web_gateway.responses import SchemaRoute
 
-router = APIRouter(tags=["Notifications"], prefix="/notifications")
+router = APIRouter(tags=["Notifications"], prefix="/notifications", route_class=SchemaRoute)
 
 
-@router.get("", response_model=list[DTOUserNotificationRead])
+@router.get("", response_model=DTOUserNotificationPage)
 async def get_user_notifications(
     user_id: Annotated[int, Depends(auth.current_user_id)],
     session: Annotated[AsyncSession, Depends(db_manager.get_session)],
     is_read: bool | None = Query(None, description="Filter by read status"),
     notification_type: ENotificationType | None = Query(None, description="Filter by notification type"),
-) -> list[DTOUserNotificationRead]:
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(30, ge=1, le=100, description="Page size"),
+) -> DTOUserNotificationPage:
     """
-    Get user notifications with filtering options
+    Get a page of user notifications with filtering options, from newest to oldest.
+    Pass next_cursor of the response to get the next page.
     """
     return await NotificationManager.get_user_notifications(
         user_id=user_id,
         is_read=is_read,
         notification_type=notification_type,
+        cursor=cursor,
+        limit=limit,
         session=session
     )
 
 
+@router.get("/unread-count", response_model=int)
+async def get_unread_count(
+    user_id: Annotated[int, Depends(auth.current_user_id)],
+    session: Annotated[AsyncSession, Depends(db_manager.get_session)],
+) -> int:
+    """
+    Get the number of unread user notifications
+    """
+    return await NotificationManager.get_unread_count(user_id=user_id, session=session)
+
+
 @router.get("/types", response_model=list[str])
 async def get_notification_types() -> list[str]:
     """
@@ -71,6 +88,38 @@ async def mark_all_notifications_as_read(
     )
 
 
+@router.patch("/read")
+async def mark_notifications_as_read(
+    notification_ids: DTONotificationIds,
+    user_id: Annotated[int, Depends(auth.current_user_id)],
+    session: Annotated[AsyncSession, Depends(db_manager.get_session)],
+) -> JSONResponse:
+    """
+    Mark a set of notifications as read
+    """
+    return await NotificationManager.mark_notifications_as_read(
+        user_id=user_id,
+        notification_ids=notification_ids.notification_ids,
+        session=session
+    )
+
+
+@router.delete("")
+async def delete_notifications(
+    notification_ids: DTONotificationIds,
+    user_id: Annotated[int, Depends(auth.current_user_id)],
+    session: Annotated[AsyncSession, Depends(db_manager.get_session)],
+) -> JSONResponse:
+    """
+    Delete a set of notifications
+    """
+    return await NotificationManager.delete_notifications(
+        user_id=user_id,
+        notification_ids=notification_ids.notification_ids,
+        session=session
+    )
+
+
 @router.delete("/{notification_id}")
 async def delete_notification(
     notification_id: int,
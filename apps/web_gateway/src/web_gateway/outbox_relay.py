@@ -0,0 +1,164 @@
+"""
+Outbox relay: publishes the events written into the outbox table in the transaction
+of the change they describe (see common_db.managers.OutboxManager).
+
+Each iteration claims a batch of unsent events with FOR UPDATE SKIP LOCKED, publishes it
+and marks the events sent (or counts the failed attempt) in the same transaction.
+A failed event is retried with an exponential backoff; after max_attempts it is marked failed,
+logged at the CRITICAL level and kept for manual handling until the retention job purges it.
+Several relays (processes, instances) can run side by side: a batch locked by one relay
+is skipped by the others. Delivery is at-least-once: if a relay dies after publishing and
+before the commit, the batch is published again by the next relay.
+
+Run standalone with `python -m web_gateway.outbox_relay`; web_gateway also runs one in its lifespan.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable
+
+from alumni_hub.platform import events_pb2
+from event_emitter import EmitterFactory, IProtoEmitter
+from common_db.db_abstract import db_manager
+from common_db.managers import OutboxManager
+from common_db.schemas import DTOOutboxEventRead
+
+from web_gateway.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    def __init__(
+        self,
+        get_emitter: Callable[[str], IProtoEmitter],
+        batch_size: int = 500,
+        poll_interval: float = 0.5,
+        max_attempts: int = 10,
+        retry_backoff: float = 1,
+        max_retry_backoff: float = 300,
+    ):
+        """
+        Args:
+            get_emitter: returns the emitter of a topic
+            batch_size: events claimed per transaction
+            poll_interval: pause after an iteration that did not fill a batch, seconds
+            max_attempts: events that failed this many times are marked failed, left for manual handling
+            retry_backoff: delay before the second attempt, doubled by each failed attempt, seconds
+            max_retry_backoff: the longest delay between attempts, seconds
+        """
+        self.get_emitter = get_emitter
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.published = 0
+        self.failed = 0
+        self.dead = 0
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self) -> int:
+        """
+        Publish one batch of events
+
+        Returns:
+            int: number of claimed events
+        """
+        async with db_manager.session() as session:
+            events = await OutboxManager.claim_batch(limit=self.batch_size, session=session)
+            if not events:
+                return 0
+
+            by_topic: dict[str, list[DTOOutboxEventRead]] = defaultdict(list)
+            for event in events:
+                by_topic[event.topic].append(event)
+
+            sent_ids, failed = [], defaultdict(list)
+            for topic, topic_events in by_topic.items():
+                results = await self.get_emitter(topic).publish_many(
+                    [events_pb2.Event.FromString(event.payload) for event in topic_events]
+                )
+                for event, error in zip(topic_events, results):
+                    if error is None:
+                        sent_ids.append(event.id)
+                    else:
+                        failed[str(error)].append(event.id)
+
+            await OutboxManager.mark_sent(sent_ids, session=session)
+            dead = 0
+            for error, event_ids in failed.items():
+                logger.error("Outbox relay: %d events failed: %s", len(event_ids), error)
+                dead += await OutboxManager.mark_failed(
+                    event_ids,
+                    error,
+                    max_attempts=self.max_attempts,
+                    retry_backoff=self.retry_backoff,
+                    max_retry_backoff=self.max_retry_backoff,
+                    session=session,
+                )
+            if dead:
+                logger.critical(
+                    "Outbox relay: %d events used up %d attempts, marked failed and not retried anymore",
+                    dead, self.max_attempts,
+                )
+
+        self.published += len(sent_ids)
+        self.failed += len(events) - len(sent_ids)
+        self.dead += dead
+        return len(events)
+
+    async def run(self):
+        while True:
+            try:
+                claimed = await self.run_once()
+            except Exception:
+                logger.exception("Outbox relay iteration failed")
+                claimed = 0
+            # a full batch means there is a backlog, continue without a pause
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="outbox-relay")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info(
+            "Outbox relay stopped: %d published, %d failed attempts, %d events marked failed",
+            self.published, self.failed, self.dead,
+        )
+
+
+def create_outbox_relay() -> OutboxRelay:
+    """Relay with the emitters of web_gateway settings, an emitter per topic"""
+    emitter_settings = settings.emitter_settings
+    emitters: dict[str, IProtoEmitter] = {}
+
+    def get_emitter(topic: str) -> IProtoEmitter:
+        if topic not in emitters:
+            emitters[topic] = EmitterFactory.create_event_emitter(
+                target=emitter_settings.meetings_notification_target, topic=topic
+            )
+        return emitters[topic]
+
+    return OutboxRelay(
+        get_emitter=get_emitter,
+        batch_size=emitter_settings.outbox_relay_batch_size,
+        poll_interval=emitter_settings.outbox_relay_poll_interval_sec,
+        max_attempts=emitter_settings.outbox_relay_max_attempts,
+        retry_backoff=emitter_settings.outbox_relay_retry_backoff_sec,
+        max_retry_backoff=emitter_settings.outbox_relay_max_retry_backoff_sec,
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(create_outbox_relay().run())
@@ -17,8 +17,9 @@ from common_db.db_abstract import db_manager
 from common_db.schemas.users import DTOUserProfileRead
 from web_gateway import auth
 from web_gateway.referrals.manager import ReferralManager
+from web_gateway.responses import SchemaRoute
 
-router = APIRouter(prefix="/referrals", tags=["Referrals"])
+router = APIRouter(prefix="/referrals", tags=["Referrals"], route_class=SchemaRoute)
 
 
 
@@ -0,0 +1,157 @@
+"""
+Cache of serialized responses for reference-data routes.
+
+A cached route serializes its result once (orjson bytes) and serves the same bytes with a strong
+ETag until the entry expires or is invalidated; a request with a matching If-None-Match gets 304
+without a body. The route keeps its response_model for the OpenAPI schema.
+
+    enums_cache = ResponseCache(name="enums")
+
+    @router.get("/{type}", response_model=EnumValues)
+    @cached_response(enums_cache)
+    async def get_list_of_values(type: str) -> EnumValues: ...
+
+    enums_cache.invalidate()  # e.g. after the data changed
+"""
+import functools
+import hashlib
+import inspect
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Annotated, Any, Callable, Hashable, get_origin
+
+from fastapi import Request, Response, params
+
+from web_gateway.responses import dumps
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    expires_at: float | None
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized responses: (route, key) -> body and ETag.
+    A cache can be shared by several routes.
+
+    Invalidation is pluggable: entries expire after ttl seconds (None - never),
+    invalidate() drops a key or everything, and callables registered with on_invalidate()
+    are called after it (e.g. to propagate the invalidation to other instances).
+    """
+
+    def __init__(self, name: str, ttl: float | None = None, maxsize: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._listeners: list[Callable[[Hashable | None], None]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None or (entry.expires_at is not None and entry.expires_at <= time.monotonic()):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, content: Any) -> CachedResponse:
+        body = dumps(content)
+        entry = CachedResponse(
+            body=body,
+            etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            expires_at=None if self.ttl is None else time.monotonic() + self.ttl,
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, key: Hashable | None = None):
+        """Drop the entries of the key in all the routes of the cache, or all the entries when the key is None"""
+        if key is None:
+            self._entries.clear()
+        else:
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[1] == key]:
+                del self._entries[entry_key]
+        for listener in self._listeners:
+            listener(key)
+
+    def on_invalidate(self, listener: Callable[[Hashable | None], None]):
+        self._listeners.append(listener)
+
+
+def _is_dependency(parameter: inspect.Parameter) -> bool:
+    if isinstance(parameter.default, params.Depends):
+        return True
+    return get_origin(parameter.annotation) is Annotated and any(
+        isinstance(metadata, params.Depends) for metadata in parameter.annotation.__metadata__
+    )
+
+
+def _default_key(arguments: dict[str, Any], key_params: set[str]) -> Hashable:
+    # path and query parameters; the current user and other dependencies are not a part of the key
+    return tuple(
+        (name, value) for name, value in sorted(arguments.items())
+        if name in key_params and (value is None or isinstance(value, (str, int, float, bool, Enum)))
+    )
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # weak comparison, as required for If-None-Match
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def cached_response(
+        cache: ResponseCache,
+        key: Callable[..., Hashable] | None = None,
+        max_age: int = 0,
+):
+    """
+    Cache the serialized result of an async route
+
+    Args:
+        cache: cache of the route
+        key: builds the cache key from the route arguments, by default the scalar arguments
+            except dependencies (path and query parameters) are the key
+        max_age: Cache-Control max-age for clients, seconds; the clients revalidate with the ETag
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        key_params = {name for name, parameter in signature.parameters.items() if not _is_dependency(parameter)}
+        # the request is injected by FastAPI for the ETag check, the route does not receive it
+        request_param = inspect.Parameter("_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+        cache_control = f"private, max-age={max_age}, must-revalidate"
+
+        @functools.wraps(func)
+        async def wrapper(*args, _cache_request: Request, **kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+            cache_key = (func.__qualname__, key(**arguments) if key else _default_key(arguments, key_params))
+
+            entry = cache.get(cache_key)
+            if entry is None:
+                entry = cache.put(cache_key, await func(*args, **kwargs))
+
+            headers = {"ETag": entry.etag, "Cache-Control": cache_control}
+            if _etag_matches(_cache_request.headers.get("if-none-match"), entry.etag):
+                return Response(status_code=304, headers=headers)
+            return Response(content=entry.body, media_type="application/json", headers=headers)
+
+        wrapper.__signature__ = signature.replace(
+            parameters=[*signature.parameters.values(), request_param]
+        )
+        return wrapper
+
+    return decorator
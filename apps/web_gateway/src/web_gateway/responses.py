@@ -0,0 +1,86 @@
+"""
+JSON responses of web_gateway.
+
+SchemaJSONResponse renders bytes with pydantic-core (models) or orjson (everything else),
+enums and datetimes are handled by the serializers themselves, without jsonable_encoder
+and json.dumps.
+
+SchemaRoute skips the response_model round trip of FastAPI for routes that return an instance
+of exactly their response_model (or of one of the models of a union response_model): the model
+is validated already, FastAPI would dump it, validate the dump against the same model and
+serialize it again. Other results (dicts, lists, ORM objects, subclasses) go through the regular
+response_model validation.
+"""
+import functools
+import inspect
+import types
+from enum import Enum
+from typing import Any, Union, get_args, get_origin
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content, by_alias=True)
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class SchemaJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _model_classes(response_model: Any) -> tuple[type[BaseModel], ...]:
+    """The model of the response_model, or the models of a union of models"""
+    models = get_args(response_model) if get_origin(response_model) in (Union, types.UnionType) else (response_model,)
+    if all(isinstance(model, type) and issubclass(model, BaseModel) for model in models):
+        return models
+    return ()
+
+
+class SchemaRoute(APIRoute):
+    def __init__(self, path: str, endpoint, **kwargs):
+        self._direct_models: tuple[type[BaseModel], ...] = ()
+        if inspect.iscoroutinefunction(endpoint) and not self._has_response_parameter(endpoint):
+            endpoint = self._wrap_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+        if (
+            self.response_model_include is None
+            and self.response_model_exclude is None
+            and not self.response_model_exclude_unset
+            and not self.response_model_exclude_defaults
+            and not self.response_model_exclude_none
+        ):
+            self._direct_models = _model_classes(self.response_model)
+
+    @staticmethod
+    def _has_response_parameter(endpoint) -> bool:
+        # headers and cookies set on the injected Response are only applied by the regular path
+        return any(
+            isinstance(parameter.annotation, type) and issubclass(parameter.annotation, Response)
+            for parameter in inspect.signature(endpoint).parameters.values()
+        )
+
+    def _wrap_endpoint(self, endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            if type(result) in self._direct_models:
+                return SchemaJSONResponse(result, status_code=self.status_code or 200)
+            return result
+
+        return wrapper
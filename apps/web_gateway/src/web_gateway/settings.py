@@ -11,6 +11,21 @@ class SecretFiles(BaseModel):
 class EmitterSettings(BaseModel):
     meetings_notification_target: str
     meetings_google_pubsub_notification_topic: str
+    # buffer and batching of the 'pubsub_batching' target
+    meetings_notification_max_queue_size: int = 10_000
+    meetings_notification_max_batch_size: int = 100
+    meetings_notification_max_latency_sec: float = 0.05
+    # write notifications into the outbox table in the transaction of the change,
+    # they are published by the outbox relay (web_gateway.outbox_relay)
+    meetings_notification_outbox: bool = True
+    outbox_relay_in_process: bool = True
+    outbox_relay_batch_size: int = 500
+    outbox_relay_poll_interval_sec: float = 0.5
+    # a failed event is retried after retry_backoff * 2 ** (attempt - 1) seconds, capped,
+    # and marked failed after max_attempts
+    outbox_relay_max_attempts: int = 10
+    outbox_relay_retry_backoff_sec: float = 1
+    outbox_relay_max_retry_backoff_sec: float = 300
     matching_requests_google_pubsub_topic: str
     matching_requests_google_pubsub_project_id: int
 
@@ -19,6 +34,13 @@ class MatchingRequestsSettings(BaseModel):
     requested_users_count: int
     model_settings_preset: str
     matching_delay_sec: int
+    # see web_gateway.forms.matching_dispatcher
+    coalesce_window_sec: float = 60
+    max_batch_size: int = 100
+    max_latency_sec: float = 0.05
+    # long-poll of results, see web_gateway.forms.matching_results
+    result_poll_interval_sec: float = 0.5
+    result_wait_timeout_sec: float = 25
 
 
 class LimitsSettings(BaseModel):
@@ -26,13 +48,33 @@ class LimitsSettings(BaseModel):
     max_user_pended_meetings_count: int
 
 
+class AuthSettings(BaseModel):
+    admin_telegram_ids: set[int]
+    # cache of verified access tokens, see web_gateway.auth.token_cache
+    token_cache_size: int = 10_000
+    token_cache_ttl_sec: float = 60
+
+
 class Settings(BaseConfig):
     # ToDo(und3v3l0p3d): Move db_config into root config
     environment: str = 'dev'
     google_application_credentials: str  = './config/credentials.json'
     google_cloud_bucket: str = 'community_platform_media1'
+    # 'gcs' or 'local' (development)
+    media_storage_backend: str = 'gcs'
+    media_storage_local_path: str = './media'
+    media_storage_local_base_url: str = '/media'
+    image_pipeline_workers: int = 2
+    # Server-Sent Events, see web_gateway.events.hub
+    events_queue_size: int = 64
+    events_replay_size: int = 32
+    events_max_connections: int = 10_000
+    events_heartbeat_sec: float = 15
+    # log the statements of every @profiled manager call (common_db.profiling), debugging only
+    db_query_profiling: bool = False
     access_secret_file: FieldType[str] = './config/access_secret_file'
     bot_token_file: FieldType[str] = './config/token'
+    auth: FieldType[AuthSettings] = './public_config/auth.json'
     emitter_settings: FieldType[EmitterSettings] = './public_config/emitter_settings.json'
     limits: FieldType[LimitsSettings] = './public_config/limits.json'
     matching_requests: FieldType[MatchingRequestsSettings] = "./public_config/matching_requests.json"
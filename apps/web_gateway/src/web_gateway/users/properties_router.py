@@ -11,12 +11,18 @@ from common_db.schemas import (
 
 from fastapi import APIRouter, Depends
 
+from web_gateway.response_cache import ResponseCache, cached_response
+from web_gateway.responses import SchemaRoute
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
-router = APIRouter(tags=["User properties"], prefix="/properties")
+router = APIRouter(tags=["User properties"], prefix="/properties", route_class=SchemaRoute)
+# non-custom properties are reference data edited by admins, a stale list is served for at most ttl
+properties_cache = ResponseCache(name="properties", ttl=300)
 
 
 @router.get("/specialisations", response_model=list[DTOSpecialisationRead])
+@cached_response(properties_cache, max_age=60)
 async def get_all_specialisations(
         session: Annotated[AsyncSession, Depends(db_manager.get_session)]
 ) -> list[DTOSpecialisationRead]:
@@ -27,6 +33,7 @@ async def get_all_specialisations(
 
 
 @router.get("/interests", response_model=list[DTOInterestRead])
+@cached_response(properties_cache, max_age=60)
 async def get_all_interests(
         session: Annotated[AsyncSession, Depends(db_manager.get_session)]
 ) -> list[DTOInterestRead]:
@@ -37,6 +44,7 @@ async def get_all_interests(
 
 
 @router.get("/skills", response_model=list[DTOSkillRead])
+@cached_response(properties_cache, max_age=60)
 async def get_all_skills(
         session: Annotated[AsyncSession, Depends(db_manager.get_session)]
 ) -> list[DTOSkillRead]:
@@ -47,6 +55,7 @@ async def get_all_skills(
 
 
 @router.get("/requests_community", response_model=list[DTORequestsCommunityRead])
+@cached_response(properties_cache, max_age=60)
 async def get_all_requests_community(
         session: Annotated[AsyncSession, Depends(db_manager.get_session)]
 ) -> list[DTORequestsCommunityRead]:
@@ -57,6 +66,7 @@ async def get_all_requests_community(
 
 
 @router.get("/all", response_model=DTOAllProperties)
+@cached_response(properties_cache, max_age=60)
 async def get_all_properties(
         session: Annotated[AsyncSession, Depends(db_manager.get_session)]
 ) -> DTOAllProperties:
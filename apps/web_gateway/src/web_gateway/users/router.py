@@ -2,7 +2,13 @@ from typing import Annotated
 
 from common_db.db_abstract import db_manager
 from common_db.managers.user import UserManager
-from common_db.schemas import DTOUserProfile, DTOUserProfileRead, DTOUserProfileUpdate, DTOSearchUser
+from common_db.schemas import (
+    DTOUserProfile,
+    DTOUserProfileRead,
+    DTOUserProfileUpdate,
+    DTOSearchUser,
+    DTOSearchUserPage
+)
 from common_db.schemas.linkedin import LinkedInProfileTask
 from common_db.functions import validate_linkedin_username
 
@@ -16,8 +22,9 @@ from .properties_router import router as properties_router
 
 from loader import broker
 from web_gateway.settings import settings
+from web_gateway.responses import SchemaRoute
 
-router = APIRouter(tags=["Client profiles"], prefix="/user")
+router = APIRouter(tags=["Client profiles"], prefix="/user", route_class=SchemaRoute)
 router.include_router(properties_router)
 
 
@@ -68,14 +75,15 @@ async def create_user(
         return await UserManager.create_user(session=session, user_data=profile)
 
 
-@router.get("/search", response_model=list[DTOUserProfileRead])
+@router.get("/search", response_model=DTOSearchUserPage)
 async def search_users(
         user_id: Annotated[int, Depends(auth.current_user_id)],
         search_params: DTOSearchUser,
         session: Annotated[AsyncSession, Depends(db_manager.get_session)]
-) -> list[DTOUserProfileRead]:
+) -> DTOSearchUserPage:
     """
-    Endpoint for searching for a user using the specified optional parameters
+    Endpoint for searching for a user using the specified optional parameters.
+    Pass `next_cursor` of the response as `cursor` to get the next page.
     """
     return await UserManager.search_users(user_id=user_id, session=session, search_params=search_params)
 
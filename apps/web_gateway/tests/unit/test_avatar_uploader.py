@@ -0,0 +1,73 @@
+import asyncio
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+
+from web_gateway.media_storage import image_pipeline
+from web_gateway.media_storage.avatar_uploader import AvatarUploader
+from web_gateway.media_storage.image_pipeline import ImagePipeline, process_image
+from web_gateway.media_storage.storage import LocalMediaStorage
+
+
+def make_png(width: int, height: int) -> bytes:
+    output = BytesIO()
+    Image.new("RGB", (width, height), (200, 100, 50)).save(output, "png")
+    return output.getvalue()
+
+
+def test_process_image_makes_all_variants_from_one_decode():
+    variants = process_image(make_png(1024, 768))
+
+    sizes = {name: Image.open(BytesIO(data)).size for name, data in variants.items()}
+    assert sizes == {"webp": (1024, 768), "medium": (512, 384), "thumb": (128, 96)}
+
+
+class InlinePipeline(ImagePipeline):
+    """Processes images in the test process, where the module settings are patched"""
+
+    async def process(self, data: bytes) -> dict[str, bytes]:
+        return process_image(data, self.variants)
+
+
+def test_image_over_the_pixel_limit_is_rejected(tmp_path, monkeypatch):
+    # 1.5x the limit: Pillow itself only warns below 2x
+    monkeypatch.setattr(image_pipeline, "MAX_IMAGE_PIXELS", 10_000)
+    # process_image sets the Pillow limit too, restored after the test
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", Image.MAX_IMAGE_PIXELS)
+    data = make_png(150, 100)
+
+    with pytest.raises(ValueError, match="too large"):
+        process_image(data)
+
+    uploader = AvatarUploader(storage=LocalMediaStorage(str(tmp_path), base_url="/media"), pipeline=InlinePipeline())
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(uploader.upload_avatar(UploadFile(BytesIO(data), filename="me.png")))
+    assert exc_info.value.status_code == 400
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_avatar_upload_is_stored_once_per_content(tmp_path):
+    storage = LocalMediaStorage(str(tmp_path), base_url="/media")
+    uploader = AvatarUploader(storage=storage, pipeline=ImagePipeline(max_workers=1))
+    data = make_png(300, 200)
+
+    async def scenario():
+        try:
+            first = await uploader.upload_avatar(UploadFile(BytesIO(data), filename="me.png"))
+            # the same bytes under another extension map to the stored original
+            second = await uploader.upload_avatar(UploadFile(BytesIO(data), filename="other.jpg"))
+        finally:
+            await uploader.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == second
+    assert set(first) == {"orig", "webp", "medium", "thumb"}
+    [stored_dir] = tmp_path.iterdir()
+    assert sorted(path.name for path in stored_dir.iterdir()) == [
+        "medium.webp", "orig.png", "thumb.webp", "webp.webp"
+    ]
+    assert all((tmp_path / url.removeprefix("/media/")).exists() for url in second.values())
@@ -0,0 +1,62 @@
+import asyncio
+
+from web_gateway.events.hub import RESET_FRAME, EventHub, UserEvent
+
+
+def make_event(id: int, user_id: int = 1) -> UserEvent:
+    return UserEvent.create(id=id, user_id=user_id, type="notification", data={"id": id})
+
+
+def drain(subscription) -> list[bytes]:
+    frames = []
+    while not subscription.queue.empty():
+        frames.append(subscription.queue.get_nowait())
+    return frames
+
+
+def test_events_are_delivered_to_the_user_connections_only():
+    async def scenario():
+        hub = EventHub()
+        first, second, other = hub.subscribe(1), hub.subscribe(1), hub.subscribe(2)
+        hub.publish(make_event(1))
+        return drain(first), drain(second), drain(other)
+
+    first, second, other = asyncio.run(scenario())
+
+    assert first == second == [make_event(1).frame]
+    assert other == []
+
+
+def test_reconnect_replays_missed_events_or_resets():
+    async def scenario():
+        hub = EventHub(replay_size=3)
+        for id in range(1, 6):
+            hub.publish(make_event(id))
+        replayed = drain(hub.subscribe(1, last_event_id=3))
+        # events 1 and 2 are evicted from the replay buffer
+        evicted = drain(hub.subscribe(1, last_event_id=1))
+        hub.mark_gap()
+        hub.publish(make_event(8))
+        after_gap = drain(hub.subscribe(1, last_event_id=5))
+        return replayed, evicted, after_gap
+
+    replayed, evicted, after_gap = asyncio.run(scenario())
+
+    assert replayed == [make_event(4).frame, make_event(5).frame]
+    assert evicted == [RESET_FRAME]
+    assert after_gap == [RESET_FRAME]
+
+
+def test_slow_connection_is_closed_on_overflow():
+    async def scenario():
+        hub = EventHub(queue_size=2)
+        subscription = hub.subscribe(1)
+        for id in range(1, 4):
+            hub.publish(make_event(id))
+        return hub, subscription
+
+    hub, subscription = asyncio.run(scenario())
+
+    assert subscription.overflowed
+    assert hub.metrics.connections == 0
+    assert hub.metrics.overflowed == 1
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from common_db.schemas.matching import MatchingRequest
+from web_gateway.forms.matching_dispatcher import MatchingDispatcher
+
+
+class RecordingBroker:
+    def __init__(self, fail_users: set[int] = frozenset()):
+        self.fail_users = fail_users
+        self.published: list[tuple[str, MatchingRequest, str | None]] = []
+
+    async def publish(self, topic: str, message: MatchingRequest, ordering_key: str | None = None) -> str:
+        await asyncio.sleep(0.01)
+        if message.user_id in self.fail_users:
+            raise RuntimeError("publish failed")
+        self.published.append((topic, message, ordering_key))
+        return f"id-{len(self.published)}"
+
+
+def make_dispatcher(broker: RecordingBroker, **kwargs) -> MatchingDispatcher:
+    async def get_broker():
+        return broker
+
+    return MatchingDispatcher(get_broker=get_broker, topic="matching", max_latency=0.01, **kwargs)
+
+
+def test_duplicate_requests_are_published_once():
+    broker = RecordingBroker()
+    dispatcher = make_dispatcher(broker)
+
+    async def scenario():
+        pending = await asyncio.gather(*(
+            dispatcher.submit(MatchingRequest(user_id=1, form_id=10)) for _ in range(5)
+        ), dispatcher.submit(MatchingRequest(user_id=2, form_id=20)))
+        # within the coalesce window after the publish
+        recent = await dispatcher.submit(MatchingRequest(user_id=1, form_id=10))
+        return pending, recent
+
+    pending, recent = asyncio.run(scenario())
+
+    assert len(broker.published) == 2
+    assert set(pending[:5]) == {recent}
+    assert [ordering_key for _, _, ordering_key in broker.published] == ["1", "2"]
+    assert dispatcher.metrics.coalesced == 5
+    assert dispatcher.metrics.batches == 1
+
+
+def test_failed_publish_is_reported_and_not_coalesced():
+    broker = RecordingBroker(fail_users={1})
+    dispatcher = make_dispatcher(broker)
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await dispatcher.submit(MatchingRequest(user_id=1, form_id=10))
+        broker.fail_users = set()
+        return await dispatcher.submit(MatchingRequest(user_id=1, form_id=10))
+
+    assert asyncio.run(scenario()) == "id-1"
+    assert dispatcher.metrics.failed == 1
+    assert dispatcher.metrics.published == 1
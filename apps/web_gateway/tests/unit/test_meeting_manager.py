@@ -0,0 +1,25 @@
+import pytest
+
+from common_db.config import schema
+from common_db.enums.meetings import EMeetingResponseStatus, EMeetingUserRole
+from common_db.schemas.meetings import MeetingCompactList, MeetingFilter, MeetingList
+from web_gateway.meetings.meeting_manager import MeetingManager
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("compact, result_type", [(False, MeetingList), (True, MeetingCompactList)])
+async def test_meetings_page_query_compiles(compiling_session, compact, result_type):
+    meeting_filter = MeetingFilter(
+        user_role=EMeetingUserRole.organizer, user_response=EMeetingResponseStatus.confirmed
+    )
+
+    page = await MeetingManager.get_meetings_with_filtering(
+        compiling_session, 7, meeting_filter, limit=10, compact=compact
+    )
+
+    assert type(page) is result_type and page.meetings == [] and page.next_cursor is None
+    [statement] = compiling_session.statements
+    # the participation filter is correlated to the meetings of the outer query
+    assert f"EXISTS (SELECT * \nFROM {schema}.meeting_responses \nWHERE" in statement
+    if compact:
+        assert f"LEFT OUTER JOIN {schema}.meeting_responses" in statement
@@ -0,0 +1,75 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+
+from alumni_hub.platform import events_pb2
+from common_db.models import ORMOutboxEvent
+from web_gateway import outbox_relay
+from web_gateway.outbox_relay import OutboxRelay
+
+
+class FakeEmitter:
+    def __init__(self, fail_users: set[int] = frozenset()):
+        self.fail_users = fail_users
+        self.published: list[int] = []
+
+    async def publish_many(self, events: list[events_pb2.Event]) -> list[Exception | None]:
+        results = []
+        for event in events:
+            if event.initiator_id in self.fail_users:
+                results.append(RuntimeError("publish failed"))
+            else:
+                self.published.append(event.initiator_id)
+                results.append(None)
+        return results
+
+
+def make_event(event_id: int, topic: str = "notifications") -> ORMOutboxEvent:
+    now = datetime(2026, 1, 1)
+    return ORMOutboxEvent(
+        id=event_id,
+        topic=topic,
+        payload=events_pb2.Event(initiator_id=event_id).SerializeToString(),
+        attempts=0,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+@pytest.fixture
+def relay_session(compiling_session, monkeypatch):
+    class FakeDbManager:
+        @asynccontextmanager
+        async def session(self):
+            yield compiling_session
+
+    monkeypatch.setattr(outbox_relay, "db_manager", FakeDbManager())
+    return compiling_session
+
+
+def test_run_once_marks_sent_and_backs_off_failed_events(relay_session, caplog):
+    emitter = FakeEmitter(fail_users={2, 3})
+    relay = OutboxRelay(get_emitter=lambda topic: emitter, max_attempts=4, retry_backoff=2, max_retry_backoff=30)
+    # claimed batch, mark_sent, mark_failed: one of the failed events used up its attempts
+    relay_session.results += [[make_event(1), make_event(2), make_event(3)], [], [(datetime(2026, 1, 1),), (None,)]]
+
+    assert asyncio.run(relay.run_once()) == 3
+
+    assert emitter.published == [1]
+    claim, mark_sent, mark_failed = relay_session.statements
+    assert "FOR UPDATE SKIP LOCKED" in claim
+    assert "SET sent_at=" in mark_sent
+    assert "make_interval(secs => LEAST(" in mark_failed and "failed_at=CASE WHEN" in mark_failed
+    assert (relay.published, relay.failed, relay.dead) == (1, 2, 1)
+    assert "1 events used up 4 attempts" in caplog.text
+
+
+def test_run_once_without_pending_events(relay_session):
+    relay = OutboxRelay(get_emitter=lambda topic: FakeEmitter())
+
+    assert asyncio.run(relay.run_once()) == 0
+
+    assert len(relay_session.statements) == 1
+    assert (relay.published, relay.failed, relay.dead) == (0, 0, 0)
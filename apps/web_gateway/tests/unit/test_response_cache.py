@@ -0,0 +1,63 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from web_gateway.response_cache import ResponseCache, cached_response
+
+
+class Values(BaseModel):
+    values: list[str]
+
+
+def make_app(cache: ResponseCache, calls: list[str]) -> FastAPI:
+    app = FastAPI()
+
+    def dependency() -> int:
+        return 1
+
+    @app.get("/values/{name}", response_model=Values)
+    @cached_response(cache, max_age=60)
+    async def get_values(name: str, dependency_value: int = Depends(dependency)) -> Values:
+        calls.append(name)
+        return Values(values=[name])
+
+    @app.get("/other", response_model=Values)
+    @cached_response(cache)
+    async def get_other() -> Values:
+        calls.append("other")
+        return Values(values=["other"])
+
+    return app
+
+
+def test_cached_response_serves_etag_and_not_modified():
+    cache, calls = ResponseCache(name="test"), []
+    client = TestClient(make_app(cache, calls))
+
+    first = client.get("/values/a")
+    second = client.get("/values/a")
+    not_modified = client.get("/values/a", headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.json() == second.json() == {"values": ["a"]}
+    assert first.headers["etag"] == second.headers["etag"]
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert client.get("/other").json() == {"values": ["other"]}
+    assert calls == ["a", "other"]
+
+
+def test_cached_response_invalidation():
+    cache, calls = ResponseCache(name="test"), []
+    client = TestClient(make_app(cache, calls))
+    invalidated = []
+    cache.on_invalidate(invalidated.append)
+
+    client.get("/values/a")
+    client.get("/values/b")
+    cache.invalidate((("name", "a"),))
+    client.get("/values/a")
+    client.get("/values/b")
+    cache.invalidate()
+    client.get("/values/b")
+
+    assert calls == ["a", "b", "a", "b"]
+    assert invalidated == [(("name", "a"),), None]
@@ -0,0 +1,89 @@
+from datetime import datetime
+from enum import Enum
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from web_gateway import responses
+from web_gateway.responses import SchemaJSONResponse, SchemaRoute
+
+
+class Status(Enum):
+    active = "active"
+
+
+class Item(BaseModel):
+    id: int
+    status: Status
+    created_at: datetime
+
+
+class ItemWithSecret(Item):
+    secret: str
+
+
+class ItemCompact(BaseModel):
+    id: int
+
+
+ITEM = {"id": 1, "status": "active", "created_at": "2026-01-01T10:00:00"}
+
+
+def make_client() -> TestClient:
+    router = APIRouter(route_class=SchemaRoute)
+
+    @router.post("/items", response_model=Item, status_code=201)
+    async def create_item() -> Item:
+        return Item.model_validate(ITEM)
+
+    @router.get("/items/secret", response_model=Item)
+    async def get_item_with_secret():
+        # a subclass goes through the response_model validation, extra fields are filtered out
+        return ItemWithSecret.model_validate({**ITEM, "secret": "x"})
+
+    @router.get("/items/{item_id}", response_model=Item | ItemCompact)
+    async def get_item(item_id: int, compact: bool = False) -> Item | ItemCompact:
+        # model_construct skips the validation, the union route does not validate it either
+        if compact:
+            return ItemCompact.model_construct(id=item_id)
+        return Item.model_construct(id=item_id, status=Status.active, created_at=datetime(2026, 1, 1, 10))
+
+    @router.get("/items", response_model=list[Item])
+    async def list_items() -> list[Item]:
+        return [Item.model_validate(ITEM)]
+
+    app = FastAPI(default_response_class=SchemaJSONResponse)
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_schema_route_serializes_models_directly():
+    client = make_client()
+
+    created = client.post("/items")
+    assert created.status_code == 201
+    assert created.json() == ITEM
+
+    assert client.get("/items/secret").json() == ITEM
+    assert client.get("/items").json() == [ITEM]
+
+
+def test_schema_route_serializes_union_models_directly(monkeypatch):
+    client = make_client()
+    direct = []
+
+    class RecordingResponse(SchemaJSONResponse):
+        def render(self, content):
+            direct.append(type(content))
+            return super().render(content)
+
+    monkeypatch.setattr(responses, "SchemaJSONResponse", RecordingResponse)
+
+    assert client.get("/items/1").json() == ITEM
+    assert client.get("/items/1", params={"compact": True}).json() == {"id": 1}
+    # both models are answered as they are, without the response_model validation
+    assert direct == [Item, ItemCompact]
+    # both models stay in the OpenAPI schema
+    schema = client.app.openapi()["paths"]["/items/{item_id}"]["get"]["responses"]["200"]["content"]
+    assert len(schema["application/json"]["schema"]["anyOf"]) == 2
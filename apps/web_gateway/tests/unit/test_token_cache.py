@@ -0,0 +1,30 @@
+import time
+
+from web_gateway.auth.token_cache import TokenCache
+
+
+def test_token_cache_hit_and_lru_eviction():
+    cache = TokenCache(maxsize=2, ttl=60)
+    cache.put("a", {"user_id": 1})
+    cache.put("b", {"user_id": 2})
+    assert cache.get("a") == {"user_id": 1}
+
+    # "b" is the least recently used
+    cache.put("c", {"user_id": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"user_id": 1}
+    assert cache.get("c") == {"user_id": 3}
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_token_cache_never_outlives_token_expiry():
+    cache = TokenCache(ttl=60)
+    cache.put("expired", {"user_id": 1, "exp": time.time() - 1})
+    cache.put("ttl", {"user_id": 2})
+    cache.ttl = 0
+    cache.put("stale", {"user_id": 3})
+
+    assert cache.get("expired") is None
+    assert cache.get("ttl") == {"user_id": 2}
+    assert cache.get("stale") is None
+    assert len(cache) == 1
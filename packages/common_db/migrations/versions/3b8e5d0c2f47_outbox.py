@@ -0,0 +1,64 @@
+"""outbox
+
+Revision ID: 3b8e5d0c2f47
+Revises: 9a4c3e7f1b26
+Create Date: 2026-10-19 16:12:40.218903
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from common_db.config import db_settings
+
+schema: str = db_settings.db.db_schema
+
+# revision identifiers, used by Alembic.
+revision: str = "3b8e5d0c2f47"
+down_revision: Union[str, None] = "9a4c3e7f1b26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox",
+        sa.Column("topic", sa.String(length=255), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("event_type", sa.Integer(), nullable=True),
+        sa.Column("recipient_id", sa.BigInteger(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        schema=f"{schema}",
+    )
+    # the relay only scans unsent events, the index stays small as events are marked sent
+    op.create_index(
+        "ix_outbox_unsent",
+        "outbox",
+        ["id"],
+        unique=False,
+        schema=f"{schema}",
+        postgresql_where=sa.text("sent_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_unsent", table_name="outbox", schema=f"{schema}")
+    op.drop_table("outbox", schema=f"{schema}")
@@ -0,0 +1,147 @@
+"""user notifications keyset index and unread counter
+
+Revision ID: 5e1d7a2c8b94
+Revises: c4f3acb6a6e9
+Create Date: 2026-10-19 12:03:17.540129
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from common_db.config import db_settings
+
+schema: str = db_settings.db.db_schema
+
+# revision identifiers, used by Alembic.
+revision: str = "5e1d7a2c8b94"
+down_revision: Union[str, None] = "c4f3acb6a6e9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the composite index also serves plain user_id lookups
+    op.create_index(
+        "ix_user_notifications_user_id_created_at_id",
+        "user_notifications",
+        ["user_id", "created_at", "id"],
+        unique=False,
+        schema=f"{schema}",
+    )
+    op.drop_index(
+        op.f(f"ix_{schema}_user_notifications_user_id"),
+        table_name="user_notifications",
+        schema=f"{schema}",
+    )
+
+    op.add_column(
+        "users",
+        sa.Column("unread_notifications_count", sa.Integer(), server_default="0", nullable=False),
+        schema=f"{schema}",
+    )
+
+    # statement-level triggers: a bulk insert/update/delete touches every user row once
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {schema}.user_notifications_unread_insert_trigger() RETURNS trigger AS $$
+        BEGIN
+            UPDATE {schema}.users u
+            SET unread_notifications_count = u.unread_notifications_count + d.delta
+            FROM (
+                SELECT user_id, count(*) AS delta FROM new_rows WHERE NOT is_read GROUP BY user_id
+            ) d
+            WHERE u.id = d.user_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {schema}.user_notifications_unread_delete_trigger() RETURNS trigger AS $$
+        BEGIN
+            UPDATE {schema}.users u
+            SET unread_notifications_count = greatest(u.unread_notifications_count - d.delta, 0)
+            FROM (
+                SELECT user_id, count(*) AS delta FROM old_rows WHERE NOT is_read GROUP BY user_id
+            ) d
+            WHERE u.id = d.user_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {schema}.user_notifications_unread_update_trigger() RETURNS trigger AS $$
+        BEGIN
+            UPDATE {schema}.users u
+            SET unread_notifications_count = greatest(u.unread_notifications_count + d.delta, 0)
+            FROM (
+                SELECT user_id, sum(delta) AS delta
+                FROM (
+                    SELECT user_id, CASE WHEN is_read THEN 0 ELSE 1 END AS delta FROM new_rows
+                    UNION ALL
+                    SELECT user_id, CASE WHEN is_read THEN 0 ELSE -1 END AS delta FROM old_rows
+                ) changes
+                GROUP BY user_id
+                HAVING sum(delta) <> 0
+            ) d
+            WHERE u.id = d.user_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_user_notifications_unread_insert
+        AFTER INSERT ON {schema}.user_notifications
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {schema}.user_notifications_unread_insert_trigger();
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_user_notifications_unread_delete
+        AFTER DELETE ON {schema}.user_notifications
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {schema}.user_notifications_unread_delete_trigger();
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_user_notifications_unread_update
+        AFTER UPDATE ON {schema}.user_notifications
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {schema}.user_notifications_unread_update_trigger();
+    """)
+
+    # backfill the counter
+    op.execute(f"""
+        UPDATE {schema}.users u
+        SET unread_notifications_count = d.unread
+        FROM (
+            SELECT user_id, count(*) AS unread
+            FROM {schema}.user_notifications
+            WHERE NOT is_read
+            GROUP BY user_id
+        ) d
+        WHERE u.id = d.user_id
+    """)
+
+
+def downgrade() -> None:
+    op.execute(f"DROP TRIGGER IF EXISTS trg_user_notifications_unread_update ON {schema}.user_notifications")
+    op.execute(f"DROP TRIGGER IF EXISTS trg_user_notifications_unread_delete ON {schema}.user_notifications")
+    op.execute(f"DROP TRIGGER IF EXISTS trg_user_notifications_unread_insert ON {schema}.user_notifications")
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.user_notifications_unread_update_trigger()")
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.user_notifications_unread_delete_trigger()")
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.user_notifications_unread_insert_trigger()")
+
+    op.drop_column("users", "unread_notifications_count", schema=f"{schema}")
+
+    op.create_index(
+        op.f(f"ix_{schema}_user_notifications_user_id"),
+        "user_notifications",
+        ["user_id"],
+        unique=False,
+        schema=f"{schema}",
+    )
+    op.drop_index(
+        "ix_user_notifications_user_id_created_at_id",
+        table_name="user_notifications",
+        schema=f"{schema}",
+    )
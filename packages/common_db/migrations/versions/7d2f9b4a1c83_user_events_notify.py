@@ -0,0 +1,66 @@
+"""user events notify triggers
+
+Revision ID: 7d2f9b4a1c83
+Revises: 3b8e5d0c2f47
+Create Date: 2026-10-19 18:27:05.613472
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from common_db.config import db_settings
+from common_db.functions.user_events import (
+    create_user_events_sequence,
+    meetings_events_trigger,
+    user_events_channel,
+    user_notifications_events_trigger,
+)
+
+schema: str = db_settings.db.db_schema
+channel: str = user_events_channel(schema)
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2f9b4a1c83"
+down_revision: Union[str, None] = "3b8e5d0c2f47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (trigger, event, table, meeting id column of the table); transition tables
+# can only be declared by triggers with a single event
+MEETING_TRIGGERS = [
+    ("trg_meetings_events_update", "UPDATE", "meetings", "id"),
+    ("trg_meeting_responses_events_insert", "INSERT", "meeting_responses", "meeting_id"),
+    ("trg_meeting_responses_events_update", "UPDATE", "meeting_responses", "meeting_id"),
+]
+
+
+def upgrade() -> None:
+    op.execute(create_user_events_sequence.format(schema=schema))
+    op.execute(user_notifications_events_trigger.format(schema=schema, channel=channel))
+    op.execute(meetings_events_trigger.format(schema=schema, channel=channel))
+
+    # statement-level triggers: a bulk insert/update sends one event per (user, object)
+    op.execute(f"""
+        CREATE TRIGGER trg_user_notifications_events_insert
+        AFTER INSERT ON {schema}.user_notifications
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {schema}.user_notifications_events_trigger();
+    """)
+    for trigger, event, table, column in MEETING_TRIGGERS:
+        op.execute(f"""
+            CREATE TRIGGER {trigger}
+            AFTER {event} ON {schema}.{table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION {schema}.meetings_events_trigger('{column}');
+        """)
+
+
+def downgrade() -> None:
+    for trigger, _, table, _ in reversed(MEETING_TRIGGERS):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {schema}.{table}")
+    op.execute(f"DROP TRIGGER IF EXISTS trg_user_notifications_events_insert ON {schema}.user_notifications")
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.meetings_events_trigger()")
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.user_notifications_events_trigger()")
+    op.execute(f"DROP SEQUENCE IF EXISTS {schema}.user_events_id_seq")
@@ -0,0 +1,181 @@
+"""composite indexes and monthly partitions
+
+Revision ID: 9a4c3e7f1b26
+Revises: 5e1d7a2c8b94
+Create Date: 2026-10-19 14:41:05.772318
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from common_db.config import db_settings
+from common_db.functions.partitioning import create_monthly_partitions, drop_old_partitions
+
+schema: str = db_settings.db.db_schema
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4c3e7f1b26"
+down_revision: Union[str, None] = "5e1d7a2c8b94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# months of partitions created ahead, then kept ahead by scripts/db_maintenance.py
+PARTITIONS_AHEAD = "3 months"
+
+# (table, partition key, secondary indexes as (name, columns))
+PARTITIONED_TABLES = [
+    (
+        "linkedin_raw_data",
+        "parsed_date",
+        [
+            (f"ix_{schema}_linkedin_raw_data_parsed_date", ["parsed_date"]),
+            (f"ix_{schema}_linkedin_raw_data_target_linkedin_url", ["target_linkedin_url"]),
+        ],
+    ),
+    # bot logging events are written by telegram_bot, the table may be absent in a database
+    ("tg_bot_logging_events", "created_at", []),
+]
+
+
+def _table_exists(table: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table, schema=schema)
+
+
+def _is_partitioned(table: str) -> bool:
+    return op.get_bind().execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+    ), {"table": f"{schema}.{table}"}).scalar()
+
+
+def _move_sequence(table: str, source: str) -> None:
+    # keep the id sequence alive when the source table is dropped
+    op.execute(f"""
+        DO $$
+        DECLARE
+            v_sequence TEXT := pg_get_serial_sequence('{schema}.{source}', 'id');
+        BEGIN
+            IF v_sequence IS NOT NULL THEN
+                EXECUTE format('ALTER SEQUENCE %s OWNED BY {schema}.{table}.id', v_sequence);
+            END IF;
+        END;
+        $$;
+    """)
+
+
+def _partition_by_month(table: str, key: str, indexes: list[tuple[str, list[str]]]) -> None:
+    source = f"{table}_unpartitioned"
+    op.execute(f"ALTER TABLE {schema}.{table} RENAME TO {source}")
+    op.execute(f"ALTER TABLE {schema}.{source} RENAME CONSTRAINT {table}_pkey TO {source}_pkey")
+    for index_name, _ in indexes:
+        op.drop_index(index_name, table_name=source, schema=f"{schema}")
+
+    op.execute(f"""
+        CREATE TABLE {schema}.{table} (LIKE {schema}.{source} INCLUDING DEFAULTS)
+        PARTITION BY RANGE ({key})
+    """)
+    # the partition key must be a part of the primary key
+    op.execute(f"ALTER TABLE {schema}.{table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {key})")
+    op.execute(f"CREATE TABLE {schema}.{table}_default PARTITION OF {schema}.{table} DEFAULT")
+    op.execute(f"""
+        SELECT {schema}.create_monthly_partitions(
+            '{table}',
+            coalesce((SELECT min({key}) FROM {schema}.{source})::date, current_date),
+            (current_date + INTERVAL '{PARTITIONS_AHEAD}')::date
+        )
+    """)
+    op.execute(f"INSERT INTO {schema}.{table} SELECT * FROM {schema}.{source}")
+
+    _move_sequence(table, source)
+    op.execute(f"DROP TABLE {schema}.{source}")
+
+    for index_name, columns in indexes:
+        op.create_index(index_name, table, columns, unique=False, schema=f"{schema}")
+
+
+def _unpartition(table: str, indexes: list[tuple[str, list[str]]]) -> None:
+    source = f"{table}_partitioned"
+    op.execute(f"ALTER TABLE {schema}.{table} RENAME TO {source}")
+    op.execute(f"ALTER TABLE {schema}.{source} RENAME CONSTRAINT {table}_pkey TO {source}_pkey")
+    for index_name, _ in indexes:
+        op.drop_index(index_name, table_name=source, schema=f"{schema}")
+
+    op.execute(f"CREATE TABLE {schema}.{table} (LIKE {schema}.{source} INCLUDING DEFAULTS)")
+    op.execute(f"ALTER TABLE {schema}.{table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+    op.execute(f"INSERT INTO {schema}.{table} SELECT * FROM {schema}.{source}")
+
+    _move_sequence(table, source)
+    # dropping the parent drops all its partitions
+    op.execute(f"DROP TABLE {schema}.{source}")
+
+    for index_name, columns in indexes:
+        op.create_index(index_name, table, columns, unique=False, schema=f"{schema}")
+
+
+def upgrade() -> None:
+    # composite and covering indexes
+    op.create_index(
+        "ix_matching_results_user_id_form_id_created_at",
+        "matching_results",
+        ["user_id", "form_id", "created_at"],
+        unique=False,
+        schema=f"{schema}",
+    )
+    # matching_results is referenced by meetings.match_id, a foreign key can not target
+    # a partitioned table by id alone, so it gets a BRIN index and row-level retention instead
+    op.create_index(
+        "ix_matching_results_created_at_brin",
+        "matching_results",
+        ["created_at"],
+        unique=False,
+        schema=f"{schema}",
+        postgresql_using="brin",
+    )
+    op.create_index(
+        "ix_form_user_id_intent_created_at",
+        "forms",
+        ["user_id", "intent", "created_at"],
+        unique=False,
+        schema=f"{schema}",
+    )
+    op.create_index(
+        "ix_meeting_responses_user_id_covering",
+        "meeting_responses",
+        ["user_id"],
+        unique=False,
+        schema=f"{schema}",
+        postgresql_include=["meeting_id", "meeting_organizer_id", "meeting_match_id", "role", "response"],
+    )
+    op.create_index(
+        "ix_meeting_id_scheduled_time",
+        "meetings",
+        ["id", "scheduled_time"],
+        unique=False,
+        schema=f"{schema}",
+        postgresql_include=["status"],
+    )
+
+    # monthly partitions
+    op.execute(create_monthly_partitions.format(schema=schema))
+    op.execute(drop_old_partitions.format(schema=schema))
+    for table, key, indexes in PARTITIONED_TABLES:
+        if _table_exists(table) and not _is_partitioned(table):
+            _partition_by_month(table, key, indexes)
+
+
+def downgrade() -> None:
+    for table, _, indexes in reversed(PARTITIONED_TABLES):
+        if _table_exists(table) and _is_partitioned(table):
+            _unpartition(table, indexes)
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.drop_old_partitions(TEXT, TIMESTAMP)")
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.create_monthly_partitions(TEXT, DATE, DATE)")
+
+    op.drop_index("ix_meeting_id_scheduled_time", table_name="meetings", schema=f"{schema}")
+    op.drop_index("ix_meeting_responses_user_id_covering", table_name="meeting_responses", schema=f"{schema}")
+    op.drop_index("ix_form_user_id_intent_created_at", table_name="forms", schema=f"{schema}")
+    op.drop_index("ix_matching_results_created_at_brin", table_name="matching_results", schema=f"{schema}")
+    op.drop_index(
+        "ix_matching_results_user_id_form_id_created_at", table_name="matching_results", schema=f"{schema}"
+    )
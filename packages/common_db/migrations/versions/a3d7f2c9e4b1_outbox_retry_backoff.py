@@ -0,0 +1,55 @@
+"""outbox retry backoff and failed_at
+
+Revision ID: a3d7f2c9e4b1
+Revises: b8c4e1f6a2d5
+Create Date: 2026-10-20 11:14:05.271934
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from common_db.config import db_settings
+
+schema: str = db_settings.db.db_schema
+
+# revision identifiers, used by Alembic.
+revision: str = "a3d7f2c9e4b1"
+down_revision: Union[str, None] = "b8c4e1f6a2d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("outbox", sa.Column("next_attempt_at", sa.DateTime(), nullable=True), schema=f"{schema}")
+    op.add_column("outbox", sa.Column("failed_at", sa.DateTime(), nullable=True), schema=f"{schema}")
+    # the events that used up their attempts stay pending in the index otherwise
+    op.execute(f"""
+        UPDATE {schema}.outbox SET failed_at = updated_at
+        WHERE sent_at IS NULL AND attempts >= 10
+    """)
+    op.drop_index("ix_outbox_unsent", table_name="outbox", schema=f"{schema}")
+    op.create_index(
+        "ix_outbox_unsent",
+        "outbox",
+        ["id"],
+        unique=False,
+        schema=f"{schema}",
+        postgresql_where=sa.text("sent_at IS NULL AND failed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_unsent", table_name="outbox", schema=f"{schema}")
+    op.create_index(
+        "ix_outbox_unsent",
+        "outbox",
+        ["id"],
+        unique=False,
+        schema=f"{schema}",
+        postgresql_where=sa.text("sent_at IS NULL"),
+    )
+    op.drop_column("outbox", "failed_at", schema=f"{schema}")
+    op.drop_column("outbox", "next_attempt_at", schema=f"{schema}")
@@ -0,0 +1,57 @@
+"""scheduled notifications failed_at
+
+Revision ID: b8c4e1f6a2d5
+Revises: f5b1d3a7c962
+Create Date: 2026-10-19 23:37:52.418306
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from common_db.config import db_settings
+
+schema: str = db_settings.db.db_schema
+
+# revision identifiers, used by Alembic.
+revision: str = "b8c4e1f6a2d5"
+down_revision: Union[str, None] = "f5b1d3a7c962"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "scheduled_notifications",
+        sa.Column("failed_at", sa.DateTime(), nullable=True),
+        schema=f"{schema}",
+    )
+    # the notifications that used up their attempts stay pending in the index otherwise
+    op.execute(f"""
+        UPDATE {schema}.scheduled_notifications SET failed_at = updated_at
+        WHERE released_at IS NULL AND attempts >= 5
+    """)
+    op.drop_index("ix_scheduled_notifications_due", table_name="scheduled_notifications", schema=f"{schema}")
+    op.create_index(
+        "ix_scheduled_notifications_due",
+        "scheduled_notifications",
+        ["send_after"],
+        unique=False,
+        schema=f"{schema}",
+        postgresql_where=sa.text("released_at IS NULL AND failed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheduled_notifications_due", table_name="scheduled_notifications", schema=f"{schema}")
+    op.create_index(
+        "ix_scheduled_notifications_due",
+        "scheduled_notifications",
+        ["send_after"],
+        unique=False,
+        schema=f"{schema}",
+        postgresql_where=sa.text("released_at IS NULL"),
+    )
+    op.drop_column("scheduled_notifications", "failed_at", schema=f"{schema}")
@@ -0,0 +1,207 @@
+"""users full-text and trigram search
+
+Revision ID: c4f3acb6a6e9
+Revises: 74b2d98e66a7
+Create Date: 2026-10-19 10:12:41.118202
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from common_db.config import db_settings
+from common_db.functions.user import search_users, users_search_document
+
+schema: str = db_settings.db.db_schema
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f3acb6a6e9"
+down_revision: Union[str, None] = "74b2d98e66a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, column)
+TRIGRAM_INDEXES = [
+    ("ix_users_name_trgm", "users", "name"),
+    ("ix_users_surname_trgm", "users", "surname"),
+    ("ix_users_country_trgm", "users", "country"),
+    ("ix_users_city_trgm", "users", "city"),
+    ("ix_specialisations_label_trgm", "specialisations", "label"),
+    ("ix_skills_label_trgm", "skills", "label"),
+]
+
+# search_users before this revision, restored by downgrade()
+PREVIOUS_SEARCH_USERS = """
+CREATE OR REPLACE FUNCTION {schema}.search_users(
+    p_name VARCHAR DEFAULT NULL,
+    p_surname VARCHAR DEFAULT NULL,
+    p_location VARCHAR DEFAULT NULL,
+    p_expertise_area VARCHAR DEFAULT NULL,
+    p_specialisation VARCHAR DEFAULT NULL,
+    p_skills VARCHAR DEFAULT NULL,
+    p_limit INTEGER DEFAULT 30
+)
+RETURNS SETOF {schema}.users
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT *
+    FROM {schema}.users u
+    WHERE
+        (p_name IS NULL OR u.name ILIKE '%' || p_name || '%')
+        AND (p_surname IS NULL OR u.surname ILIKE '%' || p_surname || '%')
+        AND (p_location IS NULL OR u.location ILIKE '%' || p_location || '%')
+        AND (p_expertise_area IS NULL OR p_expertise_area = ANY(u.expertise_area))
+        AND (p_specialisation IS NULL OR p_specialisation = ANY(u.specialisation))
+        AND (p_skills IS NULL OR p_skills = ANY(u.skills))
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # search document column
+    op.add_column(
+        "users",
+        sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True),
+        schema=f"{schema}",
+    )
+
+    op.execute(users_search_document.format(schema=schema))
+
+    # users: own fields changed -> recompute the document of the row
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {schema}.users_search_vector_trigger() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {schema}.users_search_document(NEW.id, NEW.name, NEW.surname, NEW.country, NEW.city);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_users_search_vector
+        BEFORE INSERT OR UPDATE OF name, surname, country, city ON {schema}.users
+        FOR EACH ROW EXECUTE FUNCTION {schema}.users_search_vector_trigger();
+    """)
+
+    # users_specialisations / users_skills: user relations changed -> recompute the document of the user
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {schema}.users_search_vector_refresh_trigger() RETURNS trigger AS $$
+        DECLARE
+            v_user_id INTEGER := CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END;
+        BEGIN
+            UPDATE {schema}.users u
+            SET search_vector = {schema}.users_search_document(u.id, u.name, u.surname, u.country, u.city)
+            WHERE u.id = v_user_id;
+            IF TG_OP = 'UPDATE' AND OLD.user_id <> NEW.user_id THEN
+                UPDATE {schema}.users u
+                SET search_vector = {schema}.users_search_document(u.id, u.name, u.surname, u.country, u.city)
+                WHERE u.id = OLD.user_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in ("users_specialisations", "users_skills"):
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_search_vector
+            AFTER INSERT OR UPDATE OR DELETE ON {schema}.{table}
+            FOR EACH ROW EXECUTE FUNCTION {schema}.users_search_vector_refresh_trigger();
+        """)
+
+    # specialisations / skills: label changed -> recompute the documents of all their users
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {schema}.specialisations_search_vector_trigger() RETURNS trigger AS $$
+        BEGIN
+            UPDATE {schema}.users u
+            SET search_vector = {schema}.users_search_document(u.id, u.name, u.surname, u.country, u.city)
+            FROM {schema}.users_specialisations us
+            WHERE us.user_id = u.id AND us.specialisation_id = NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_specialisations_search_vector
+        AFTER UPDATE OF label, expertise_area ON {schema}.specialisations
+        FOR EACH ROW EXECUTE FUNCTION {schema}.specialisations_search_vector_trigger();
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {schema}.skills_search_vector_trigger() RETURNS trigger AS $$
+        BEGIN
+            UPDATE {schema}.users u
+            SET search_vector = {schema}.users_search_document(u.id, u.name, u.surname, u.country, u.city)
+            FROM {schema}.users_skills usk
+            WHERE usk.user_id = u.id AND usk.skill_id = NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_skills_search_vector
+        AFTER UPDATE OF label ON {schema}.skills
+        FOR EACH ROW EXECUTE FUNCTION {schema}.skills_search_vector_trigger();
+    """)
+
+    # backfill existing users
+    op.execute(f"""
+        UPDATE {schema}.users u
+        SET search_vector = {schema}.users_search_document(u.id, u.name, u.surname, u.country, u.city)
+    """)
+
+    op.create_index(
+        "ix_users_search_vector",
+        "users",
+        ["search_vector"],
+        unique=False,
+        schema=f"{schema}",
+        postgresql_using="gin",
+    )
+    for index_name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            index_name,
+            table,
+            [column],
+            unique=False,
+            schema=f"{schema}",
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+    # the old function referenced columns that do not exist anymore
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.search_users(VARCHAR, VARCHAR, VARCHAR, VARCHAR, VARCHAR, VARCHAR, INTEGER)")
+    op.execute(search_users.format(schema=schema))
+
+
+def downgrade() -> None:
+    op.execute(
+        f"DROP FUNCTION IF EXISTS {schema}.search_users("
+        f"VARCHAR, VARCHAR, VARCHAR, VARCHAR, VARCHAR, VARCHAR, VARCHAR, VARCHAR, REAL, INTEGER, INTEGER)"
+    )
+    # plpgsql bodies are not checked against the schema on creation, as before this revision
+    op.execute(PREVIOUS_SEARCH_USERS.format(schema=schema))
+
+    for index_name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(index_name, table_name=table, schema=f"{schema}")
+    op.drop_index("ix_users_search_vector", table_name="users", schema=f"{schema}")
+
+    op.execute(f"DROP TRIGGER IF EXISTS trg_skills_search_vector ON {schema}.skills")
+    op.execute(f"DROP TRIGGER IF EXISTS trg_specialisations_search_vector ON {schema}.specialisations")
+    op.execute(f"DROP TRIGGER IF EXISTS trg_users_skills_search_vector ON {schema}.users_skills")
+    op.execute(f"DROP TRIGGER IF EXISTS trg_users_specialisations_search_vector ON {schema}.users_specialisations")
+    op.execute(f"DROP TRIGGER IF EXISTS trg_users_search_vector ON {schema}.users")
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.skills_search_vector_trigger()")
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.specialisations_search_vector_trigger()")
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.users_search_vector_refresh_trigger()")
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.users_search_vector_trigger()")
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.users_search_document(INTEGER, VARCHAR, VARCHAR, VARCHAR, VARCHAR)")
+
+    op.drop_column("users", "search_vector", schema=f"{schema}")
+    # pg_trgm is left installed: other objects of the database may depend on it
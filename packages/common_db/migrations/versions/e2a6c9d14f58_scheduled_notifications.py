@@ -0,0 +1,65 @@
+"""scheduled notifications
+
+Revision ID: e2a6c9d14f58
+Revises: 7d2f9b4a1c83
+Create Date: 2026-10-19 21:04:31.582107
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from common_db.config import db_settings
+
+schema: str = db_settings.db.db_schema
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a6c9d14f58"
+down_revision: Union[str, None] = "7d2f9b4a1c83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduled_notifications",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("send_after", sa.DateTime(), nullable=False),
+        sa.Column("released_at", sa.DateTime(), nullable=True),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], [f"{schema}.users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        schema=f"{schema}",
+    )
+    # the scheduler only scans unreleased notifications, the index stays small as they are released
+    op.create_index(
+        "ix_scheduled_notifications_due",
+        "scheduled_notifications",
+        ["send_after"],
+        unique=False,
+        schema=f"{schema}",
+        postgresql_where=sa.text("released_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheduled_notifications_due", table_name="scheduled_notifications", schema=f"{schema}")
+    op.drop_table("scheduled_notifications", schema=f"{schema}")
@@ -0,0 +1,68 @@
+"""user notification routes
+
+Revision ID: f5b1d3a7c962
+Revises: e2a6c9d14f58
+Create Date: 2026-10-19 22:41:17.305624
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from common_db.config import db_settings
+from common_db.functions.notification_routes import (
+    NOTIFICATION_ROUTE_COLUMNS,
+    backfill_notification_routes,
+    notification_route_update_condition,
+    sync_notification_route_trigger,
+)
+
+schema: str = db_settings.db.db_schema
+
+# revision identifiers, used by Alembic.
+revision: str = "f5b1d3a7c962"
+down_revision: Union[str, None] = "e2a6c9d14f58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_notification_routes",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("telegram_id", sa.BIGINT(), nullable=True),
+        sa.Column("is_tg_notify", sa.Boolean(), nullable=False),
+        sa.Column("is_email_notify", sa.Boolean(), nullable=False),
+        sa.Column("is_push_notify", sa.Boolean(), nullable=False),
+        sa.Column("is_tg_bot_blocked", sa.Boolean(), nullable=False),
+        sa.Column("timezone", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], [f"{schema}.users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+        schema=f"{schema}",
+    )
+    op.execute(sync_notification_route_trigger.format(schema=schema))
+
+    # row-level: a user row is copied only when it is created or a routing column changes
+    op.execute(f"""
+        CREATE TRIGGER trg_users_notification_route_insert
+        AFTER INSERT ON {schema}.users
+        FOR EACH ROW EXECUTE FUNCTION {schema}.sync_notification_route_trigger();
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_users_notification_route_update
+        AFTER UPDATE OF {', '.join(NOTIFICATION_ROUTE_COLUMNS)} ON {schema}.users
+        FOR EACH ROW WHEN ({notification_route_update_condition})
+        EXECUTE FUNCTION {schema}.sync_notification_route_trigger();
+    """)
+    # the triggers exist before the backfill: users changed meanwhile are already up to date
+    op.execute(backfill_notification_routes.format(schema=schema))
+
+
+def downgrade() -> None:
+    op.execute(f"DROP TRIGGER IF EXISTS trg_users_notification_route_update ON {schema}.users")
+    op.execute(f"DROP TRIGGER IF EXISTS trg_users_notification_route_insert ON {schema}.users")
+    op.execute(f"DROP FUNCTION IF EXISTS {schema}.sync_notification_route_trigger()")
+    op.drop_table("user_notification_routes", schema=f"{schema}")
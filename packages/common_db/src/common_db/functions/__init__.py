@@ -1,7 +1,18 @@
-from .user import search_users
+from .user import search_users, users_search_document
 from .linkedin import validate_linkedin_username
+from .pagination import encode_cursor, decode_cursor
+from .partitioning import create_monthly_partitions, drop_old_partitions
+from .user_events import user_events_channel
+from .notification_routes import NOTIFICATION_ROUTE_COLUMNS
 
 __all__ = [
     'search_users',
-    'validate_linkedin_username'
+    'users_search_document',
+    'validate_linkedin_username',
+    'encode_cursor',
+    'decode_cursor',
+    'create_monthly_partitions',
+    'drop_old_partitions',
+    'user_events_channel',
+    'NOTIFICATION_ROUTE_COLUMNS'
 ]
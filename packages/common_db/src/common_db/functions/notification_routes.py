@@ -0,0 +1,39 @@
+# Denormalized routing data of the notifications: user_notification_routes keeps the columns
+# NotificationSender needs to choose the channels of a recipient, one narrow row per user.
+# The rows are written by triggers on users: on INSERT and on UPDATE of one of the routing columns
+# (profile changes, telegram bot blocking); deleted users are removed by ON DELETE CASCADE.
+
+NOTIFICATION_ROUTE_COLUMNS: tuple[str, ...] = (
+    'email',
+    'telegram_id',
+    'is_tg_notify',
+    'is_email_notify',
+    'is_push_notify',
+    'is_tg_bot_blocked',
+    'timezone',
+)
+
+_columns = ', '.join(NOTIFICATION_ROUTE_COLUMNS)
+
+sync_notification_route_trigger: str = f"""
+CREATE OR REPLACE FUNCTION {{schema}}.sync_notification_route_trigger() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO {{schema}}.user_notification_routes (user_id, {_columns})
+    VALUES (NEW.id, {', '.join(f'NEW.{column}' for column in NOTIFICATION_ROUTE_COLUMNS)})
+    ON CONFLICT (user_id) DO UPDATE SET
+        {', '.join(f'{column} = EXCLUDED.{column}' for column in NOTIFICATION_ROUTE_COLUMNS)};
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# the update trigger only fires when a routing column has actually changed
+notification_route_update_condition: str = (
+    f"(OLD.{_columns.replace(', ', ', OLD.')}) IS DISTINCT FROM (NEW.{_columns.replace(', ', ', NEW.')})"
+)
+
+backfill_notification_routes: str = f"""
+INSERT INTO {{schema}}.user_notification_routes (user_id, {_columns})
+SELECT id, {_columns} FROM {{schema}}.users
+ON CONFLICT (user_id) DO NOTHING;
+"""
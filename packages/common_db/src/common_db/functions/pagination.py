@@ -0,0 +1,74 @@
+"""
+Helpers for keyset (cursor) pagination.
+
+A cursor is an opaque url-safe string that stores the sort key of the last row of a page.
+The next page is selected with a `WHERE (sort key) > (cursor)` condition instead of OFFSET,
+so the cost of a page does not depend on how deep the client has scrolled.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Value of type {type(value).__name__} can not be stored in a cursor")
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Pack the sort key of the last row into an opaque cursor.
+
+    Args:
+        values: sort key values (int, float, str, datetime)
+
+    Returns:
+        str: url-safe cursor
+    """
+    raw = json.dumps(values, default=_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, *types: type) -> list[Any]:
+    """
+    Unpack a cursor created by encode_cursor.
+
+    Args:
+        cursor: cursor received from the client
+        types: expected type of every value of the sort key: int, float, str or datetime
+            (stored as an iso string, returned as datetime)
+
+    Returns:
+        list: sort key values of the expected types
+    Raise:
+        HTTPException 400 if the cursor is malformed or a value is not of the expected type
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return [_convert(value, expected) for value, expected in zip(values, types)]
+
+
+def _convert(value: Any, expected: type) -> Any:
+    if expected is datetime:
+        return decode_datetime(value)
+    # bool is an int in python, but not a sort key value; ints are valid floats in json
+    if isinstance(value, bool) or not isinstance(value, (int, float) if expected is float else expected):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return expected(value)
+
+
+def decode_datetime(value: Any) -> datetime:
+    """Convert a cursor value back to datetime"""
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
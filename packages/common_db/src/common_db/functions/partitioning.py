@@ -0,0 +1,58 @@
+# Monthly range partitioning helpers. Partitions are named {table}_pYYYYMM,
+# every partitioned table also has a {table}_default partition for out-of-range rows.
+
+# function for creating the monthly partitions of a table covering [p_from, p_to]
+create_monthly_partitions: str = """
+CREATE OR REPLACE FUNCTION {schema}.create_monthly_partitions(
+    p_table TEXT,
+    p_from DATE,
+    p_to DATE
+)
+RETURNS SETOF TEXT
+AS $$
+DECLARE
+    v_month DATE := date_trunc('month', p_from)::date;
+    v_partition TEXT;
+BEGIN
+    WHILE v_month <= p_to LOOP
+        v_partition := p_table || '_p' || to_char(v_month, 'YYYYMM');
+        IF to_regclass(format('{schema}.%I', v_partition)) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE {schema}.%I PARTITION OF {schema}.%I FOR VALUES FROM (%L) TO (%L)',
+                v_partition, p_table, v_month, (v_month + INTERVAL '1 month')::date
+            );
+            RETURN NEXT v_partition;
+        END IF;
+        v_month := (v_month + INTERVAL '1 month')::date;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# function for dropping the monthly partitions of a table that end before p_older_than (retention)
+drop_old_partitions: str = """
+CREATE OR REPLACE FUNCTION {schema}.drop_old_partitions(
+    p_table TEXT,
+    p_older_than TIMESTAMP
+)
+RETURNS SETOF TEXT
+AS $$
+DECLARE
+    v_partition TEXT;
+BEGIN
+    FOR v_partition IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = format('{schema}.%I', p_table)::regclass
+          AND c.relname ~ ('^' || p_table || '_p[0-9]{{6}}$')
+          AND to_date(right(c.relname, 6), 'YYYYMM') + INTERVAL '1 month' <= p_older_than
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE {schema}.%I DETACH PARTITION {schema}.%I', p_table, v_partition);
+        EXECUTE format('DROP TABLE {schema}.%I', v_partition);
+        RETURN NEXT v_partition;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+"""
@@ -1,28 +1,88 @@
-# function for searching for a user by a set of optional parameters
+# text search configuration used for users.search_vector (names are not language specific)
+SEARCH_CONFIG: str = 'simple'
+
+# tsvector document of a user: name/surname (A), specialisations and skills (B), location (C)
+users_search_document: str = """
+CREATE OR REPLACE FUNCTION {schema}.users_search_document(
+    p_user_id INTEGER,
+    p_name VARCHAR,
+    p_surname VARCHAR,
+    p_country VARCHAR,
+    p_city VARCHAR
+)
+RETURNS tsvector
+AS $$
+    SELECT
+        setweight(to_tsvector('simple', coalesce(p_name, '') || ' ' || coalesce(p_surname, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce((
+            SELECT string_agg(s.label || ' ' || coalesce(s.expertise_area::text, ''), ' ')
+            FROM {schema}.users_specialisations us
+            JOIN {schema}.specialisations s ON s.id = us.specialisation_id
+            WHERE us.user_id = p_user_id
+        ), '')), 'B')
+        || setweight(to_tsvector('simple', coalesce((
+            SELECT string_agg(sk.label, ' ')
+            FROM {schema}.users_skills usk
+            JOIN {schema}.skills sk ON sk.id = usk.skill_id
+            WHERE usk.user_id = p_user_id
+        ), '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(p_country, '') || ' ' || coalesce(p_city, '')), 'C');
+$$ LANGUAGE sql STABLE;
+"""
+
+# function for searching for a user by a set of optional parameters.
+# Field filters are served by the pg_trgm GIN indexes, the free-text query by the search_vector GIN index.
+# Results are ordered by (rank desc, id asc) and paginated by the key of the last returned row.
 search_users: str = """
 CREATE OR REPLACE FUNCTION {schema}.search_users(
+    p_query VARCHAR DEFAULT NULL,
     p_name VARCHAR DEFAULT NULL,
     p_surname VARCHAR DEFAULT NULL,
-    p_location VARCHAR DEFAULT NULL,
+    p_country VARCHAR DEFAULT NULL,
+    p_city VARCHAR DEFAULT NULL,
     p_expertise_area VARCHAR DEFAULT NULL,
     p_specialisation VARCHAR DEFAULT NULL,
-    p_skills VARCHAR DEFAULT NULL,
+    p_skill VARCHAR DEFAULT NULL,
+    p_after_rank REAL DEFAULT NULL,
+    p_after_id INTEGER DEFAULT NULL,
     p_limit INTEGER DEFAULT 30
 )
-RETURNS SETOF {schema}.users
+RETURNS TABLE (user_id INTEGER, rank REAL)
 AS $$
-BEGIN
-    RETURN QUERY
-    SELECT *
-    FROM {schema}.users u
-    WHERE
-        (p_name IS NULL OR u.name ILIKE '%' || p_name || '%')
-        AND (p_surname IS NULL OR u.surname ILIKE '%' || p_surname || '%')
-        AND (p_location IS NULL OR u.location ILIKE '%' || p_location || '%')
-        AND (p_expertise_area IS NULL OR p_expertise_area = ANY(u.expertise_area))
-        AND (p_specialisation IS NULL OR p_specialisation = ANY(u.specialisation))
-        AND (p_skills IS NULL OR p_skills = ANY(u.skills))
+    WITH ranked AS (
+        SELECT
+            u.id AS user_id,
+            CASE WHEN p_query IS NULL THEN 0::real
+                 ELSE ts_rank_cd(u.search_vector, websearch_to_tsquery('simple', p_query))
+            END AS rank
+        FROM {schema}.users u
+        WHERE
+            (p_query IS NULL OR u.search_vector @@ websearch_to_tsquery('simple', p_query))
+            AND (p_name IS NULL OR u.name ILIKE '%' || p_name || '%')
+            AND (p_surname IS NULL OR u.surname ILIKE '%' || p_surname || '%')
+            AND (p_country IS NULL OR u.country ILIKE '%' || p_country || '%')
+            AND (p_city IS NULL OR u.city ILIKE '%' || p_city || '%')
+            AND (p_expertise_area IS NULL AND p_specialisation IS NULL OR EXISTS (
+                SELECT 1
+                FROM {schema}.users_specialisations us
+                JOIN {schema}.specialisations s ON s.id = us.specialisation_id
+                WHERE us.user_id = u.id
+                  AND (p_expertise_area IS NULL OR s.expertise_area::text ILIKE '%' || p_expertise_area || '%')
+                  AND (p_specialisation IS NULL OR s.label ILIKE '%' || p_specialisation || '%')
+            ))
+            AND (p_skill IS NULL OR EXISTS (
+                SELECT 1
+                FROM {schema}.users_skills usk
+                JOIN {schema}.skills sk ON sk.id = usk.skill_id
+                WHERE usk.user_id = u.id AND sk.label ILIKE '%' || p_skill || '%'
+            ))
+    )
+    SELECT r.user_id, r.rank
+    FROM ranked r
+    WHERE p_after_id IS NULL
+       OR r.rank < p_after_rank
+       OR (r.rank = p_after_rank AND r.user_id > p_after_id)
+    ORDER BY r.rank DESC, r.user_id ASC
     LIMIT p_limit;
-END;
-$$ LANGUAGE plpgsql;
+$$ LANGUAGE sql STABLE;
 """
@@ -0,0 +1,60 @@
+# Change events of users for push delivery (web_gateway /events).
+# Statement-level triggers send one NOTIFY per (user, object) of a statement, the payload is
+# {"id": <user_events_id_seq>, "user_id": ..., "type": "notification" | "meeting", "object_id": ..., "op": ...}.
+# Event ids come from a sequence: they grow in commit order closely enough for Last-Event-ID replay
+# and are the same on every listening instance.
+
+
+def user_events_channel(schema: str) -> str:
+    """NOTIFY channel of the user events of a schema"""
+    return f"{schema}_user_events"
+
+
+create_user_events_sequence: str = """
+CREATE SEQUENCE IF NOT EXISTS {schema}.user_events_id_seq;
+"""
+
+# new notifications of users
+user_notifications_events_trigger: str = """
+CREATE OR REPLACE FUNCTION {schema}.user_notifications_events_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        '{channel}',
+        json_build_object(
+            'id', nextval('{schema}.user_events_id_seq'),
+            'user_id', n.user_id,
+            'type', 'notification',
+            'object_id', n.id,
+            'op', lower(TG_OP)
+        )::text
+    )
+    FROM new_rows n;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# changed meetings: every participant of the meeting gets one event per statement,
+# TG_ARGV[0] is the column with the meeting id in the transition table
+meetings_events_trigger: str = """
+CREATE OR REPLACE FUNCTION {schema}.meetings_events_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        '{channel}',
+        json_build_object(
+            'id', nextval('{schema}.user_events_id_seq'),
+            'user_id', p.user_id,
+            'type', 'meeting',
+            'object_id', p.meeting_id,
+            'op', lower(TG_OP)
+        )::text
+    )
+    FROM (
+        SELECT DISTINCT r.user_id, r.meeting_id
+        FROM {schema}.meeting_responses r
+        WHERE r.meeting_id IN (SELECT (to_jsonb(m) ->> TG_ARGV[0])::integer FROM new_rows m)
+    ) p;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
@@ -1,9 +1,15 @@
 from .user import UserManager
 from .limits import LimitsManager
 from .notifications import NotificationManager
+from .meetings import MeetingResponseManager
+from .outbox import OutboxManager
+from .scheduled_notifications import ScheduledNotificationManager
 
 __all__ = [
     'UserManager',
     'LimitsManager',
-    'NotificationManager'
+    'NotificationManager',
+    'MeetingResponseManager',
+    'OutboxManager',
+    'ScheduledNotificationManager'
 ]
@@ -24,6 +24,31 @@ class LimitsManager:
         limits.available_meeting_confirmations = user_profile.available_meetings_confirmations_count
         return limits
 
+    @classmethod
+    async def get_users_meetings_limits(
+        cls, session: AsyncSession, user_ids: list[int], limit_settings: MeetingsUserLimits
+    ) -> dict[int, MeetingsUserLimits]:
+        """
+        Recalculate and return meetings limits of several users with a constant number of queries.
+        The session is not committed.
+
+        Args:
+            session: database session
+            user_ids: user identifiers
+            limit_settings: meetings limits settings
+
+        Returns:
+            dict[int, MeetingsUserLimits]: user id -> limits
+
+        Raise:
+            HTTPException: 404 if a user profile is not found
+        """
+        limits = await UserManager.update_meetings_counters_bulk(session, user_ids, limit_settings)
+        missing_ids = [user_id for user_id in user_ids if user_id not in limits]
+        if missing_ids:
+            raise HTTPException(status_code=404, detail=f"User profiles not found: {missing_ids}")
+        return limits
+
     @classmethod
     async def validate_user_meetings_limits(cls, session: AsyncSession, user_id: int, limit_settings: MeetingsUserLimits) -> None:
         user_limits = await LimitsManager.get_user_meetings_limits(session, user_id, limit_settings)
@@ -43,11 +68,11 @@ class LimitsManager:
         limit_settings: MeetingsUserLimits
     ) -> list[int]:
         """Filter out users who have reached their meeting limits"""
-        filtered_users = []
-        for user_id in user_ids:
-            try:
-                await LimitsManager.validate_user_meetings_limits(session, user_id, limit_settings)
-                filtered_users.append(user_id)
-            except:
-                continue
-        return filtered_users
\ No newline at end of file
+        limits = await UserManager.update_meetings_counters_bulk(session, user_ids, limit_settings)
+        await session.commit()
+        return [
+            user_id for user_id in user_ids
+            if user_id in limits
+            and limits[user_id].available_meeting_confirmations > 0
+            and limits[user_id].available_meeting_pendings > 0
+        ]
@@ -0,0 +1,59 @@
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..db_abstract import db_manager
+from ..models import ORMMeeting, ORMMeetingResponse
+from ..schemas.meetings import MeetingResponseCreate
+
+
+class MeetingResponseManager:
+    """
+    Manager for interacting with the meeting responses table
+    """
+
+    @classmethod
+    async def create_meeting_responses(
+            cls,
+            meeting: ORMMeeting,
+            responses: list[MeetingResponseCreate],
+            session: AsyncSession = db_manager.get_session()
+    ) -> list[ORMMeetingResponse]:
+        """
+        Create the responses of a meeting with a multi-row INSERT.
+
+        The meeting must be flushed. The session is not committed: the responses are written
+        in the transaction of the meeting, the caller commits once for the whole fan-out.
+
+        Args:
+            meeting: meeting the responses belong to
+            responses: responses data for creation
+            session: database session
+
+        Returns:
+            list[ORMMeetingResponse]: created responses, in the order of the input;
+                they are also set as meeting.user_responses
+        """
+        rows = [
+            {
+                "user_id": response.user_id,
+                "meeting_id": meeting.id,
+                "meeting_organizer_id": meeting.organizer_id,
+                "meeting_match_id": meeting.match_id,
+                "role": response.role,
+                "response": response.response,
+                "description": response.description,
+            }
+            for response in responses
+        ]
+        if not rows:
+            set_committed_value(meeting, 'user_responses', [])
+            return []
+
+        result = await session.scalars(
+            insert(ORMMeetingResponse).returning(ORMMeetingResponse, sort_by_parameter_order=True),
+            rows
+        )
+        user_responses = list(result.all())
+        set_committed_value(meeting, 'user_responses', user_responses)
+        return user_responses
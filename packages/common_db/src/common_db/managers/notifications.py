@@ -1,14 +1,30 @@
+from datetime import datetime
+
 from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, insert, update, delete, literal, true, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .user import UserManager
 from ..db_abstract import db_manager
 from ..enums.notifications import ENotificationType
+from ..functions.pagination import encode_cursor, decode_cursor
 from ..models.notifications import ORMUserNotifications
-from ..schemas.notifications import DTOGeneralNotification, DTOUserNotificationRead
+from ..profiling import profiled
+from ..models.users import ORMUserProfile
+from ..schemas.notifications import DTOGeneralNotification, DTOUserNotificationRead, DTOUserNotificationPage
+
+# columns of DTOUserNotificationRead, the listing does not load ORM entities
+_NOTIFICATION_COLUMNS = (
+    ORMUserNotifications.id,
+    ORMUserNotifications.notification_type,
+    ORMUserNotifications.user_id,
+    ORMUserNotifications.text,
+    ORMUserNotifications.params,
+    ORMUserNotifications.is_read,
+    ORMUserNotifications.created_at,
+    ORMUserNotifications.updated_at,
+)
 
 
 class NotificationManager:
@@ -46,28 +62,76 @@ class NotificationManager:
         )
 
     @classmethod
+    @profiled
+    async def create_notifications(
+            cls,
+            notifications: list[DTOGeneralNotification],
+            session: AsyncSession = db_manager.get_session()
+    ) -> list[int]:
+        """
+        Create a batch of notifications with a multi-row INSERT and a single commit.
+
+        Args:
+            session: database session
+            notifications: notifications data for creation
+
+        Returns:
+            list[int]: ids of the created notifications, in the order of the input
+        """
+        if not notifications:
+            return []
+
+        rows = [
+            {
+                "notification_type": notification.notification_type,
+                "user_id": notification.user_id,
+                "text": notification.text,
+                "params": notification.params.model_dump(mode='json') if notification.params is not None else None,
+            }
+            for notification in notifications
+        ]
+        # executemany with RETURNING is sent as batched INSERT ... VALUES (...), (...) RETURNING id
+        result = await session.scalars(
+            insert(ORMUserNotifications).returning(ORMUserNotifications.id, sort_by_parameter_order=True),
+            rows
+        )
+        notification_ids = list(result.all())
+        await session.commit()
+        return notification_ids
+
+    @classmethod
+    @profiled
     async def get_user_notifications(
             cls,
             user_id: int,
             is_read: bool = None,
             notification_type: ENotificationType = None,
+            cursor: str | None = None,
+            limit: int = 30,
             session: AsyncSession = db_manager.get_session()
-    ) -> list[DTOUserNotificationRead]:
+    ) -> DTOUserNotificationPage:
         """
-        Get user notifications.
+        Get a page of user notifications, from newest to oldest.
+
+        The page is selected by the (created_at, id) key of the last row of the previous page,
+        so it is served by the ix_user_notifications_user_id_created_at_id index at any depth.
+        The user existence check and the unread counter are taken from the same query.
 
         Args:
             session: database session
             user_id: user identifier
             is_read: optional filter by read status
             notification_type: optional filter by notification type
+            cursor: next_cursor of the previous page
+            limit: page size
 
         Returns:
-            list[DTOUserNotificationRead]: list of user notifications
+            DTOUserNotificationPage: notifications of the page, the cursor of the next page and the unread count
+        Raise:
+            HTTPException 404 if the user is not found
+            HTTPException 400 if the cursor is malformed
         """
-        await UserManager.check_user(session=session, user_id=user_id)
-
-        query = select(ORMUserNotifications).where(ORMUserNotifications.user_id == user_id)
+        query = select(*_NOTIFICATION_COLUMNS).where(ORMUserNotifications.user_id == ORMUserProfile.id)
 
         if is_read is not None:
             query = query.where(ORMUserNotifications.is_read == is_read)
@@ -75,13 +139,71 @@ class NotificationManager:
         if notification_type is not None:
             query = query.where(ORMUserNotifications.notification_type == notification_type)
 
-        # Sort from newest to oldest
-        query = query.order_by(ORMUserNotifications.created_at.desc())
+        if cursor is not None:
+            after_created_at, after_id = decode_cursor(cursor, datetime, int)
+            query = query.where(
+                tuple_(ORMUserNotifications.created_at, ORMUserNotifications.id)
+                < tuple_(literal(after_created_at), literal(after_id))
+            )
+
+        # Sort from newest to oldest, one extra row tells whether there is a next page
+        page = (
+            query
+            .order_by(ORMUserNotifications.created_at.desc(), ORMUserNotifications.id.desc())
+            .limit(limit + 1)
+            .lateral('page')
+        )
+
+        result = await session.execute(
+            select(ORMUserProfile.unread_notifications_count, page)
+            .select_from(ORMUserProfile)
+            .outerjoin(page, true())
+            .where(ORMUserProfile.id == user_id)
+        )
+        rows = result.all()
+        if not rows:
+            raise HTTPException(status_code=404, detail="Not found")
+
+        notifications = [
+            DTOUserNotificationRead.model_validate(row._mapping)
+            for row in rows if row.id is not None
+        ]
+        next_cursor = None
+        if len(notifications) > limit:
+            notifications = notifications[:limit]
+            next_cursor = encode_cursor(notifications[-1].created_at, notifications[-1].id)
+
+        return DTOUserNotificationPage(
+            notifications=notifications,
+            next_cursor=next_cursor,
+            unread_count=rows[0].unread_notifications_count
+        )
+
+    @classmethod
+    async def get_unread_count(
+            cls,
+            user_id: int,
+            session: AsyncSession = db_manager.get_session()
+    ) -> int:
+        """
+        Get the number of unread user notifications from the counter maintained by DB triggers.
 
-        result = await session.execute(query)
-        notifications = result.scalars().all()
+        Args:
+            session: database session
+            user_id: user identifier
 
-        return [DTOUserNotificationRead.model_validate(notification) for notification in notifications]
+        Returns:
+            int: number of unread notifications
+        Raise:
+            HTTPException 404 if the user is not found
+        """
+        result = await session.execute(
+            select(ORMUserProfile.unread_notifications_count).where(ORMUserProfile.id == user_id)
+        )
+        unread_count = result.scalar_one_or_none()
+        if unread_count is None:
+            raise HTTPException(status_code=404, detail="Not found")
+        return unread_count
 
     @classmethod
     async def mark_notification_as_read(
@@ -103,28 +225,65 @@ class NotificationManager:
         Raise:
             HTTPException 404 if not found
         """
-        await UserManager.check_user(session=session, user_id=user_id)
-
         result = await session.execute(
-            select(ORMUserNotifications).where(ORMUserNotifications.id == notification_id)
+            update(ORMUserNotifications)
+            .where(ORMUserNotifications.id == notification_id, ORMUserNotifications.user_id == user_id)
+            .values(is_read=True)
+            .returning(ORMUserNotifications.id)
         )
-        notification = result.scalar_one_or_none()
 
-        if not notification:
+        if result.scalar_one_or_none() is None:
             raise HTTPException(status_code=404, detail="Not found")
 
-        await session.execute(
+        await session.commit()
+
+        return JSONResponse(
+            content={
+                "status": "success",
+                "message": "Notification marked as read"
+            },
+            status_code=status.HTTP_200_OK
+        )
+
+    @classmethod
+    @profiled
+    async def mark_notifications_as_read(
+            cls,
+            user_id: int,
+            notification_ids: list[int],
+            session: AsyncSession = db_manager.get_session()
+    ) -> JSONResponse:
+        """
+        Mark a set of user notifications as read with a single statement.
+        Ids of other users' notifications and of already read ones are skipped.
+
+        Args:
+            session: database session
+            user_id: user identifier
+            notification_ids: notification identifiers
+
+        Returns:
+            JSONResponse: response with status and ids of the updated notifications
+        """
+        result = await session.execute(
             update(ORMUserNotifications)
-            .where(ORMUserNotifications.id == notification_id)
+            .where(
+                ORMUserNotifications.user_id == user_id,
+                ORMUserNotifications.id.in_(set(notification_ids)),
+                ORMUserNotifications.is_read.is_(False)
+            )
             .values(is_read=True)
+            .returning(ORMUserNotifications.id)
         )
+        updated_ids = list(result.scalars().all())
 
         await session.commit()
 
         return JSONResponse(
             content={
                 "status": "success",
-                "message": "Notification marked as read"
+                "message": "Notifications marked as read",
+                "notification_ids": updated_ids
             },
             status_code=status.HTTP_200_OK
         )
@@ -145,11 +304,9 @@ class NotificationManager:
         Returns:
             JSONResponse: response with status
         """
-        await UserManager.check_user(session=session, user_id=user_id)
-
         await session.execute(
             update(ORMUserNotifications)
-            .where(ORMUserNotifications.user_id == user_id, ORMUserNotifications.is_read == False)
+            .where(ORMUserNotifications.user_id == user_id, ORMUserNotifications.is_read.is_(False))
             .values(is_read=True)
         )
 
@@ -183,25 +340,58 @@ class NotificationManager:
         Raise:
             HTTPException 404 if not found
         """
-        await UserManager.check_user(session=session, user_id=user_id)
-
         result = await session.execute(
-            select(ORMUserNotifications).where(ORMUserNotifications.id == notification_id)
+            delete(ORMUserNotifications)
+            .where(ORMUserNotifications.id == notification_id, ORMUserNotifications.user_id == user_id)
+            .returning(ORMUserNotifications.id)
         )
 
-        if not result.scalar_one_or_none():
+        if result.scalar_one_or_none() is None:
             raise HTTPException(status_code=404, detail="Not found")
 
-        await session.execute(
-            delete(ORMUserNotifications).where(ORMUserNotifications.id == notification_id)
+        await session.commit()
+
+        return JSONResponse(
+            content={
+                "status": "success",
+                "message": "Notification deleted successfully"
+            },
+            status_code=status.HTTP_200_OK
+        )
+
+    @classmethod
+    async def delete_notifications(
+            cls,
+            user_id: int,
+            notification_ids: list[int],
+            session: AsyncSession = db_manager.get_session()
+    ) -> JSONResponse:
+        """
+        Delete a set of user notifications with a single statement.
+        Ids of other users' notifications are skipped.
+
+        Args:
+            session: database session
+            user_id: user identifier
+            notification_ids: notification identifiers to delete
+
+        Returns:
+            JSONResponse: response with status and ids of the deleted notifications
+        """
+        result = await session.execute(
+            delete(ORMUserNotifications)
+            .where(ORMUserNotifications.user_id == user_id, ORMUserNotifications.id.in_(set(notification_ids)))
+            .returning(ORMUserNotifications.id)
         )
+        deleted_ids = list(result.scalars().all())
 
         await session.commit()
 
         return JSONResponse(
             content={
                 "status": "success",
-                "message": "Notification deleted successfully"
+                "message": "Notifications deleted successfully",
+                "notification_ids": deleted_ids
             },
             status_code=status.HTTP_200_OK
         )
@@ -0,0 +1,187 @@
+from datetime import datetime
+
+from sqlalchemy import Float, bindparam, case, insert, or_, select, update, delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db_abstract import db_manager
+from ..models.outbox import ORMOutboxEvent
+from ..schemas.outbox import DTOOutboxEventCreate, DTOOutboxEventRead
+
+
+class OutboxManager:
+    """
+    Manager for the transactional outbox.
+
+    Producers add events in the transaction of their change and commit them together,
+    so an event exists if and only if the change is committed. Relays claim unsent events with
+    FOR UPDATE SKIP LOCKED: any number of relays can run side by side without publishing
+    the same event twice, each claimed batch stays locked until the relay's transaction ends.
+    A failed event is retried with an exponential backoff, after the last attempt it is marked
+    failed and not claimed anymore.
+    """
+
+    @classmethod
+    async def add_events(
+            cls,
+            events: list[DTOOutboxEventCreate],
+            session: AsyncSession = db_manager.get_session()
+    ) -> None:
+        """
+        Add events to the outbox. The session is not committed: the events are written
+        in the transaction of the change they describe.
+
+        Args:
+            events: events to publish
+            session: database session
+        """
+        if not events:
+            return
+        await session.execute(insert(ORMOutboxEvent), [event.model_dump() for event in events])
+
+    @classmethod
+    async def claim_batch(
+            cls,
+            limit: int = 500,
+            session: AsyncSession = db_manager.get_session()
+    ) -> list[DTOOutboxEventRead]:
+        """
+        Lock a batch of pending events, in the order they were written.
+        Events locked by other relays, failed events and events waiting out their backoff are skipped.
+
+        Args:
+            limit: batch size
+            session: database session
+
+        Returns:
+            list[DTOOutboxEventRead]: claimed events
+        """
+        result = await session.execute(
+            select(ORMOutboxEvent)
+            .where(
+                ORMOutboxEvent.sent_at.is_(None),
+                ORMOutboxEvent.failed_at.is_(None),
+                or_(
+                    ORMOutboxEvent.next_attempt_at.is_(None),
+                    ORMOutboxEvent.next_attempt_at <= text("TIMEZONE('utc', now())"),
+                ),
+            )
+            .order_by(ORMOutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return [DTOOutboxEventRead.model_validate(event) for event in result.scalars().all()]
+
+    @classmethod
+    async def mark_sent(
+            cls,
+            event_ids: list[int],
+            session: AsyncSession = db_manager.get_session()
+    ) -> None:
+        """
+        Mark events as published. The session is not committed.
+
+        Args:
+            event_ids: identifiers of the published events
+            session: database session
+        """
+        if not event_ids:
+            return
+        await session.execute(
+            update(ORMOutboxEvent)
+            .where(ORMOutboxEvent.id.in_(event_ids))
+            .values(sent_at=text("TIMEZONE('utc', now())"), attempts=ORMOutboxEvent.attempts + 1)
+        )
+
+    @classmethod
+    async def mark_failed(
+            cls,
+            event_ids: list[int],
+            error: str,
+            max_attempts: int = 10,
+            retry_backoff: float = 1,
+            max_retry_backoff: float = 300,
+            session: AsyncSession = db_manager.get_session()
+    ) -> int:
+        """
+        Count a failed publish attempt of events and postpone them:
+        the n-th failed attempt sets next_attempt_at to retry_backoff * 2 ** (n - 1) seconds from now.
+        After max_attempts the events are marked failed. The session is not committed.
+
+        Args:
+            event_ids: identifiers of the events
+            error: error description
+            max_attempts: attempts before an event is marked failed
+            retry_backoff: delay after the first failed attempt, seconds
+            max_retry_backoff: the longest delay, seconds
+            session: database session
+
+        Returns:
+            int: number of events marked failed by this attempt
+        """
+        if not event_ids:
+            return 0
+        result = await session.execute(
+            update(ORMOutboxEvent)
+            .where(ORMOutboxEvent.id.in_(event_ids))
+            .values(
+                attempts=ORMOutboxEvent.attempts + 1,
+                last_error=error[:1000],
+                # attempts is the value before the update here
+                next_attempt_at=text(
+                    "TIMEZONE('utc', now()) + make_interval("
+                    "secs => LEAST(:retry_backoff * power(2, attempts), :max_retry_backoff))"
+                ).bindparams(
+                    bindparam('retry_backoff', retry_backoff, type_=Float),
+                    bindparam('max_retry_backoff', max_retry_backoff, type_=Float),
+                ),
+                failed_at=case(
+                    (ORMOutboxEvent.attempts + 1 >= max_attempts, text("TIMEZONE('utc', now())")), else_=None
+                ),
+            )
+            .returning(ORMOutboxEvent.failed_at)
+        )
+        return sum(failed_at is not None for failed_at in result.scalars().all())
+
+    @classmethod
+    async def delete_sent(
+            cls,
+            sent_before: datetime,
+            session: AsyncSession = db_manager.get_session()
+    ) -> int:
+        """
+        Delete events published before the date (retention).
+
+        Args:
+            sent_before: retention boundary
+            session: database session
+
+        Returns:
+            int: number of deleted events
+        """
+        result = await session.execute(
+            delete(ORMOutboxEvent).where(ORMOutboxEvent.sent_at < sent_before)
+        )
+        await session.commit()
+        return result.rowcount
+
+    @classmethod
+    async def delete_failed(
+            cls,
+            failed_before: datetime,
+            session: AsyncSession = db_manager.get_session()
+    ) -> int:
+        """
+        Delete events marked failed before the date (retention).
+
+        Args:
+            failed_before: retention boundary
+            session: database session
+
+        Returns:
+            int: number of deleted events
+        """
+        result = await session.execute(
+            delete(ORMOutboxEvent).where(ORMOutboxEvent.failed_at < failed_before)
+        )
+        await session.commit()
+        return result.rowcount
@@ -0,0 +1,193 @@
+from datetime import datetime
+
+from sqlalchemy import Float, bindparam, case, insert, select, update, delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db_abstract import db_manager
+from ..models.scheduled_notifications import ORMScheduledNotification
+from ..schemas.scheduled_notifications import DTOScheduledNotificationCreate, DTOScheduledNotificationRead
+
+
+class ScheduledNotificationManager:
+    """
+    Manager for the notifications deferred to the allowed sending window of their recipients.
+
+    The table is a delayed-delivery queue ordered by send_after. Schedulers lease the due
+    notifications with FOR UPDATE SKIP LOCKED: any number of schedulers can run side by side
+    without releasing the same notification twice. A failed notification is retried with
+    an exponential backoff, after the last attempt it is marked failed and not claimed anymore.
+    """
+
+    @classmethod
+    async def schedule(
+            cls,
+            notifications: list[DTOScheduledNotificationCreate],
+            session: AsyncSession = db_manager.get_session()
+    ) -> None:
+        """
+        Defer notifications. The session is not committed: the notifications are written
+        in the transaction that saves them into the user's feed.
+
+        Args:
+            notifications: notifications with their release time
+            session: database session
+        """
+        if not notifications:
+            return
+        await session.execute(
+            insert(ORMScheduledNotification),
+            [notification.model_dump() for notification in notifications]
+        )
+
+    @classmethod
+    async def claim_due(
+            cls,
+            limit: int = 200,
+            lease: float = 300,
+            session: AsyncSession = db_manager.get_session()
+    ) -> list[DTOScheduledNotificationRead]:
+        """
+        Lease a batch of due notifications, the earliest first: their send_after is moved lease seconds
+        ahead, so once the session is committed the other schedulers skip them and the notifications
+        are sent without holding the row locks. Notifications neither released nor failed within
+        the lease (e.g. the scheduler crashed) are claimed again. Notifications locked by other
+        schedulers and failed notifications are skipped.
+
+        Args:
+            limit: batch size
+            lease: seconds the claimed notifications are hidden from the other schedulers
+            session: database session
+
+        Returns:
+            list[DTOScheduledNotificationRead]: claimed notifications in the order of their identifiers
+        """
+        due = (
+            select(ORMScheduledNotification.id)
+            .where(
+                ORMScheduledNotification.released_at.is_(None),
+                ORMScheduledNotification.failed_at.is_(None),
+                ORMScheduledNotification.send_after <= text("TIMEZONE('utc', now())"),
+            )
+            .order_by(ORMScheduledNotification.send_after)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(
+            update(ORMScheduledNotification)
+            .where(ORMScheduledNotification.id.in_(due.scalar_subquery()))
+            .values(send_after=text("TIMEZONE('utc', now()) + make_interval(secs => :lease)").bindparams(
+                bindparam('lease', lease, type_=Float)
+            ))
+            .returning(ORMScheduledNotification)
+        )
+        rows = sorted(result.scalars().all(), key=lambda row: row.id)
+        return [DTOScheduledNotificationRead.model_validate(row) for row in rows]
+
+    @classmethod
+    async def mark_released(
+            cls,
+            notification_ids: list[int],
+            session: AsyncSession = db_manager.get_session()
+    ) -> None:
+        """
+        Mark notifications as sent to their channels. The session is not committed.
+
+        Args:
+            notification_ids: identifiers of the released notifications
+            session: database session
+        """
+        if not notification_ids:
+            return
+        await session.execute(
+            update(ORMScheduledNotification)
+            .where(ORMScheduledNotification.id.in_(notification_ids))
+            .values(released_at=text("TIMEZONE('utc', now())"), attempts=ORMScheduledNotification.attempts + 1)
+        )
+
+    @classmethod
+    async def mark_failed(
+            cls,
+            notification_ids: list[int],
+            error: str,
+            max_attempts: int = 5,
+            retry_backoff: float = 60,
+            max_retry_backoff: float = 3600,
+            session: AsyncSession = db_manager.get_session()
+    ) -> None:
+        """
+        Count a failed release attempt of notifications and postpone them:
+        the n-th failed attempt moves send_after by retry_backoff * 2 ** (n - 1) seconds.
+        After max_attempts the notifications are marked failed. The session is not committed.
+
+        Args:
+            notification_ids: identifiers of the notifications
+            error: error description
+            max_attempts: attempts before a notification is marked failed
+            retry_backoff: delay after the first failed attempt, seconds
+            max_retry_backoff: the longest delay, seconds
+            session: database session
+        """
+        if not notification_ids:
+            return
+        now = text("TIMEZONE('utc', now())")
+        await session.execute(
+            update(ORMScheduledNotification)
+            .where(ORMScheduledNotification.id.in_(notification_ids))
+            .values(
+                attempts=ORMScheduledNotification.attempts + 1,
+                last_error=error[:1000],
+                # attempts is the value before the update here
+                send_after=text(
+                    "TIMEZONE('utc', now()) + make_interval("
+                    "secs => LEAST(:retry_backoff * power(2, attempts), :max_retry_backoff))"
+                ).bindparams(
+                    bindparam('retry_backoff', retry_backoff, type_=Float),
+                    bindparam('max_retry_backoff', max_retry_backoff, type_=Float),
+                ),
+                failed_at=case((ORMScheduledNotification.attempts + 1 >= max_attempts, now), else_=None),
+            )
+        )
+
+    @classmethod
+    async def delete_released(
+            cls,
+            released_before: datetime,
+            session: AsyncSession = db_manager.get_session()
+    ) -> int:
+        """
+        Delete notifications released before the date (retention).
+
+        Args:
+            released_before: retention boundary
+            session: database session
+
+        Returns:
+            int: number of deleted notifications
+        """
+        result = await session.execute(
+            delete(ORMScheduledNotification).where(ORMScheduledNotification.released_at < released_before)
+        )
+        await session.commit()
+        return result.rowcount
+
+    @classmethod
+    async def delete_failed(
+            cls,
+            failed_before: datetime,
+            session: AsyncSession = db_manager.get_session()
+    ) -> int:
+        """
+        Delete notifications marked failed before the date (retention).
+
+        Args:
+            failed_before: retention boundary
+            session: database session
+
+        Returns:
+            int: number of deleted notifications
+        """
+        result = await session.execute(
+            delete(ORMScheduledNotification).where(ORMScheduledNotification.failed_at < failed_before)
+        )
+        await session.commit()
+        return result.rowcount
@@ -2,12 +2,17 @@ from datetime import datetime
 from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
 
-from sqlalchemy import select, update, and_
+from sqlalchemy import select, update, and_, or_, func, cast, literal, String, Float, Integer, values, column, any_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload
+from pydantic import ValidationError
 
 from ..db_abstract import db_manager
 from ..enums import EMeetingResponseStatus
+from ..functions.pagination import encode_cursor, decode_cursor
+from ..functions.user import SEARCH_CONFIG
+from ..profiling import profiled
 from ..models import (
     ORMUserProfile,
     ORMSpecialisation,
@@ -20,25 +25,55 @@ from ..models import (
     ORMReferralCode
 )
 from ..models.linkedin import ORMLinkedInProfile
+from ..models.notification_routes import ORMUserNotificationRoute
 from ..schemas import (
     DTOUserProfile,
     DTOUserProfileUpdate,
     DTOUserProfileRead,
+    DTONotifiedUserProfile,
+    DTONotificationRoute,
     DTOSpecialisationRead,
     DTOInterestRead,
     DTOSkillRead,
     DTORequestsCommunityRead,
     DTOSearchUser,
+    DTOSearchUserPage,
     SUserProfileRead,
     MeetingsUserLimits,
 )
 
 
+def _contains(value: str) -> str:
+    """ILIKE pattern for substring search with escaped wildcards"""
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
 class UserManager:
     """
     Manager for interacting with the user table
     """
 
+    @staticmethod
+    def _profile_load_options() -> tuple:
+        """Eager load options required to build DTOUserProfileRead"""
+        return (
+            selectinload(ORMUserProfile.interests),
+            selectinload(ORMUserProfile.industries),
+            selectinload(ORMUserProfile.skills),
+            selectinload(ORMUserProfile.requests_to_community),
+            selectinload(ORMUserProfile.meeting_responses),
+            selectinload(ORMUserProfile.user_specialisations)
+            .joinedload(ORMUserSpecialisation.specialisation),
+            joinedload(ORMUserProfile.referrer),
+            selectinload(ORMUserProfile.referred),
+            # for linkedin
+            selectinload(ORMUserProfile.linkedin_profile)
+            .joinedload(ORMLinkedInProfile.education),
+            selectinload(ORMUserProfile.linkedin_profile)
+            .joinedload(ORMLinkedInProfile.work_experience)
+        )
+
     @classmethod
     async def check_user(
             cls,
@@ -68,6 +103,7 @@ class UserManager:
         )
 
     @classmethod
+    @profiled
     async def get_user_by_id(
             cls,
             user_id: int,
@@ -87,22 +123,7 @@ class UserManager:
         """
         query = (
             select(ORMUserProfile)
-            .options(
-                selectinload(ORMUserProfile.interests),
-                selectinload(ORMUserProfile.industries),
-                selectinload(ORMUserProfile.skills),
-                selectinload(ORMUserProfile.requests_to_community),
-                selectinload(ORMUserProfile.meeting_responses),
-                selectinload(ORMUserProfile.user_specialisations)
-                .joinedload(ORMUserSpecialisation.specialisation),
-                joinedload(ORMUserProfile.referrer),
-                selectinload(ORMUserProfile.referred),
-                # for linkedin
-                selectinload(ORMUserProfile.linkedin_profile)
-                .joinedload(ORMLinkedInProfile.education),
-                selectinload(ORMUserProfile.linkedin_profile)
-                .joinedload(ORMLinkedInProfile.work_experience)
-            )
+            .options(*cls._profile_load_options())
             .where(ORMUserProfile.id == user_id)
         )
 
@@ -112,6 +133,63 @@ class UserManager:
             raise HTTPException(status_code=404, detail="Not found")
         return DTOUserProfileRead.model_validate(user)
 
+    @classmethod
+    @profiled
+    async def get_notified_users(
+            cls,
+            user_ids: set[int],
+            session: AsyncSession = db_manager.get_session()
+    ) -> dict[int, DTONotifiedUserProfile]:
+        """
+        Get the recipients of notifications with one query of the columns of DTONotifiedUserProfile,
+        without the relationships loaded by get_user_by_id.
+
+        Args:
+            session: database session
+            user_ids: user identifiers
+
+        Returns:
+            dict[int, DTONotifiedUserProfile]: user id -> recipient, missing users and users
+            whose data does not pass the schema are left out
+        """
+        if not user_ids:
+            return {}
+        columns = [getattr(ORMUserProfile, name) for name in DTONotifiedUserProfile.model_fields]
+        result = await session.execute(select(*columns).where(ORMUserProfile.id.in_(user_ids)))
+        users = {}
+        for row in result.mappings():
+            try:
+                users[row['id']] = DTONotifiedUserProfile.model_validate(row)
+            except ValidationError:
+                continue
+        return users
+
+    @classmethod
+    @profiled
+    async def get_notification_routes(
+            cls,
+            user_ids: set[int],
+            session: AsyncSession = db_manager.get_session()
+    ) -> dict[int, DTONotificationRoute]:
+        """
+        Get the channels of the recipients of notifications from user_notification_routes
+        with one primary key lookup, the ids are passed as one array parameter.
+
+        Args:
+            session: database session
+            user_ids: user identifiers
+
+        Returns:
+            dict[int, DTONotificationRoute]: user id -> channels, missing users are left out
+        """
+        if not user_ids:
+            return {}
+        columns = [getattr(ORMUserNotificationRoute, name) for name in DTONotificationRoute.model_fields]
+        result = await session.execute(
+            select(*columns).where(ORMUserNotificationRoute.user_id == any_(cast(list(user_ids), ARRAY(Integer))))
+        )
+        return {row['user_id']: DTONotificationRoute.model_validate(row) for row in result.mappings()}
+
     @classmethod
     async def create_user(
             cls,
@@ -194,22 +272,7 @@ class UserManager:
         """
         query = (
             select(ORMUserProfile)
-            .options(
-                selectinload(ORMUserProfile.interests),
-                selectinload(ORMUserProfile.industries),
-                selectinload(ORMUserProfile.skills),
-                selectinload(ORMUserProfile.requests_to_community),
-                selectinload(ORMUserProfile.meeting_responses),
-                selectinload(ORMUserProfile.user_specialisations)
-                .joinedload(ORMUserSpecialisation.specialisation),
-                joinedload(ORMUserProfile.referrer),
-                selectinload(ORMUserProfile.referred),
-                # for linkedin
-                selectinload(ORMUserProfile.linkedin_profile)
-                .joinedload(ORMLinkedInProfile.education),
-                selectinload(ORMUserProfile.linkedin_profile)
-                .joinedload(ORMLinkedInProfile.work_experience)
-            )
+            .options(*cls._profile_load_options())
             .where(ORMUserProfile.telegram_id == user_tg_id)
         )
 
@@ -372,81 +435,110 @@ class UserManager:
         return [DTORequestsCommunityRead.model_validate(request).label for request in requests]
 
     @classmethod
+    @profiled
     async def search_users(
             cls,
             user_id: int,
             search_params: DTOSearchUser,
             session: AsyncSession = db_manager.get_session()
-    ) -> list[DTOUserProfileRead]:
+    ) -> DTOSearchUserPage:
         """
             Search for users by the specified parameters.
 
+            Field filters (ILIKE '%term%') are served by pg_trgm GIN indexes, the free-text query
+            by the users.search_vector GIN index. Relations are filtered with EXISTS, so there is
+            no join fan-out. Results are ordered by (rank desc, id asc) and paginated by cursor.
+
             Args:
                 user_id: user ID of the verified user
                 search_params: search parameters (DTOSearchUser)
                 session: database session
 
             Returns:
-                list[DTOUserProfileRead]: the list of found users
+                DTOSearchUserPage: the page of found users and the cursor of the next page
             """
 
         await cls.check_user(session=session, user_id=user_id)
 
-        query = (
-            select(ORMUserProfile)
-            .options(
-                selectinload(ORMUserProfile.specialisations),
-                selectinload(ORMUserProfile.skills)
-            )
-        )
+        limit = search_params.limit or 30
 
         # Creating a list of conditions
         conditions = []
 
         if search_params.name:
-            conditions.append(ORMUserProfile.name.ilike(f"%{search_params.name}%"))
+            conditions.append(ORMUserProfile.name.ilike(_contains(search_params.name), escape='\\'))
 
         if search_params.surname:
-            conditions.append(ORMUserProfile.surname.ilike(f"%{search_params.surname}%"))
+            conditions.append(ORMUserProfile.surname.ilike(_contains(search_params.surname), escape='\\'))
 
         if search_params.country:
-            conditions.append(ORMUserProfile.country.ilike(f"%{search_params.country}%"))
+            conditions.append(ORMUserProfile.country.ilike(_contains(search_params.country), escape='\\'))
 
         if search_params.city:
-            conditions.append(ORMUserProfile.city.ilike(f"%{search_params.city}%"))
-
-        # To search by expertise_area or specialisation, need to join with the specialisation table.
-        if search_params.expertise_area or search_params.specialisation:
-            query = query.join(
-                ORMUserProfile.specialisations
-            )
-
-            # To search by expertise_area
-            if search_params.expertise_area:
-                conditions.append(ORMSpecialisation.expertise_area.ilike(f"%{search_params.expertise_area}%"))
-
-            # To search by specialization
-            if search_params.specialisation:
-                conditions.append(ORMSpecialisation.label.ilike(f"%{search_params.specialisation}%"))
+            conditions.append(ORMUserProfile.city.ilike(_contains(search_params.city), escape='\\'))
+
+        # To search by expertise_area or specialisation - EXISTS over the specialisation table
+        specialisation_conditions = []
+        if search_params.expertise_area:
+            specialisation_conditions.append(
+                cast(ORMSpecialisation.expertise_area, String).ilike(_contains(search_params.expertise_area),
+                                                                     escape='\\'))
+        if search_params.specialisation:
+            specialisation_conditions.append(
+                ORMSpecialisation.label.ilike(_contains(search_params.specialisation), escape='\\'))
+        if specialisation_conditions:
+            conditions.append(ORMUserProfile.specialisations.any(and_(*specialisation_conditions)))
 
         # To search by skills
         if search_params.skill:
-            query = query.join(
-                ORMUserProfile.skills
-            )
-            conditions.append(ORMSkill.label.ilike(f"%{search_params.skill}%"))
-
-        # Adding all the conditions to the request using and_
+            conditions.append(
+                ORMUserProfile.skills.any(ORMSkill.label.ilike(_contains(search_params.skill), escape='\\')))
+
+        # Free-text query ranked by the weighted search document
+        if search_params.query:
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, search_params.query)
+            rank = func.ts_rank_cd(ORMUserProfile.search_vector, ts_query)
+            conditions.append(ORMUserProfile.search_vector.op('@@')(ts_query))
+        else:
+            rank = literal(0.0, type_=Float)
+
+        # Keyset pagination by (rank desc, id asc)
+        if search_params.cursor:
+            after_rank, after_id = decode_cursor(search_params.cursor, float, int)
+            conditions.append(or_(
+                rank < after_rank,
+                and_(rank == after_rank, ORMUserProfile.id > after_id)
+            ) if search_params.query else ORMUserProfile.id > after_id)
+
+        query = select(ORMUserProfile.id, rank.label('rank'))
         if conditions:
             query = query.where(and_(*conditions))
-
-        # Adding a limit
-        query = query.limit(search_params.limit)
-
-        # Executing the request
-        result = await session.execute(query)
-        users = result.scalars().unique().all()
-        return [DTOUserProfileRead.model_validate(user) for user in users]
+        if search_params.query:
+            query = query.order_by(rank.desc(), ORMUserProfile.id)
+        else:
+            query = query.order_by(ORMUserProfile.id)
+        # One extra row tells whether there is a next page
+        query = query.limit(limit + 1)
+
+        # The page is selected on narrow rows, profiles are loaded only for the page
+        page = (await session.execute(query)).all()
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(float(page[-1].rank), page[-1].id)
+        if not page:
+            return DTOSearchUserPage(users=[], next_cursor=None)
+
+        result = await session.execute(
+            select(ORMUserProfile)
+            .options(*cls._profile_load_options())
+            .where(ORMUserProfile.id.in_([row.id for row in page]))
+        )
+        users = {user.id: user for user in result.scalars().all()}
+        return DTOSearchUserPage(
+            users=[DTOUserProfileRead.model_validate(users[row.id]) for row in page if row.id in users],
+            next_cursor=next_cursor
+        )
 
     @classmethod
     async def update_meetings_counters(
@@ -502,6 +594,113 @@ class UserManager:
         await session.commit()
         return DTOUserProfileRead.model_validate(profile_to_write).to_old_schema()
 
+    @classmethod
+    async def count_users_meetings(
+            cls,
+            session: AsyncSession,
+            user_ids: list[int]
+    ) -> dict[int, tuple[int, int]]:
+        """
+        Count upcoming meetings of users with one grouped query,
+        with the same rules as update_meetings_counters.
+
+        Args:
+            session: database session
+            user_ids: user identifiers
+
+        Returns:
+            dict[int, tuple[int, int]]: user id -> (pended meetings, meetings confirmed by all participants),
+            users without upcoming meetings are absent
+        """
+        if not user_ids:
+            return {}
+        upcoming = (
+            select(ORMMeetingResponse.user_id, ORMMeetingResponse.meeting_id, ORMMeetingResponse.response)
+            .join(ORMMeeting, ORMMeeting.id == ORMMeetingResponse.meeting_id)
+            .where(ORMMeetingResponse.user_id.in_(user_ids), ORMMeeting.scheduled_time >= func.now())
+            .cte("upcoming")
+        )
+        meeting_stats = (
+            select(
+                ORMMeetingResponse.meeting_id,
+                func.count().label("responses"),
+                func.bool_and(ORMMeetingResponse.response == EMeetingResponseStatus.confirmed).label("all_confirmed"),
+            )
+            .where(ORMMeetingResponse.meeting_id.in_(select(upcoming.c.meeting_id)))
+            .group_by(ORMMeetingResponse.meeting_id)
+            .cte("meeting_stats")
+        )
+        result = await session.execute(
+            select(
+                upcoming.c.user_id,
+                func.count().filter(upcoming.c.response != EMeetingResponseStatus.declined),
+                # meetings with only 1 user are not counted as confirmed
+                func.count().filter(and_(meeting_stats.c.responses > 1, meeting_stats.c.all_confirmed)),
+            )
+            .join(meeting_stats, meeting_stats.c.meeting_id == upcoming.c.meeting_id)
+            .group_by(upcoming.c.user_id)
+        )
+        return {user_id: (pended, confirmed) for user_id, pended, confirmed in result.all()}
+
+    @classmethod
+    @profiled
+    async def update_meetings_counters_bulk(
+            cls,
+            session: AsyncSession,
+            user_ids: list[int],
+            limit_settings: MeetingsUserLimits
+    ) -> dict[int, MeetingsUserLimits]:
+        """
+        Recalculate the available meetings counters of users: one grouped count and
+        one UPDATE ... FROM (VALUES ...) for any number of users. The session is not committed.
+
+        Args:
+            session: database session
+            user_ids: user identifiers
+            limit_settings: meetings limits settings
+
+        Returns:
+            dict[int, MeetingsUserLimits]: limits of the updated users, missing users are absent
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return {}
+        counts = await cls.count_users_meetings(session, user_ids)
+        confirmation_limit = limit_settings.max_user_confirmed_meetings_count
+        pending_limit = limit_settings.max_user_pended_meetings_count
+
+        limits: dict[int, MeetingsUserLimits] = {}
+        for user_id in user_ids:
+            pended_count, confirmed_count = counts.get(user_id, (0, 0))
+            limits[user_id] = MeetingsUserLimits(
+                meetings_pendings_limit=pending_limit,
+                meetings_confirmations_limit=confirmation_limit,
+                available_meeting_pendings=max(0, pending_limit - pended_count),
+                available_meeting_confirmations=max(0, confirmation_limit - confirmed_count),
+            )
+
+        counters = values(
+            column("id", Integer),
+            column("pendings", Integer),
+            column("confirmations", Integer),
+            name="counters",
+        ).data([
+            (user_id, user_limits.available_meeting_pendings, user_limits.available_meeting_confirmations)
+            for user_id, user_limits in limits.items()
+        ])
+        result = await session.execute(
+            update(ORMUserProfile)
+            .where(ORMUserProfile.id == counters.c.id)
+            .values(
+                available_meetings_pendings_count=counters.c.pendings,
+                available_meetings_confirmations_count=counters.c.confirmations,
+            )
+            .returning(ORMUserProfile.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated_ids = set(result.scalars().all())
+        return {user_id: user_limits for user_id, user_limits in limits.items() if user_id in updated_ids}
+
     @classmethod
     async def get_user_id_by_referral_code(
             cls,
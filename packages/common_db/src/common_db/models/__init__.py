@@ -22,6 +22,9 @@ from .meetings import ORMMeeting, ORMMeetingResponse
 from .notifications import ORMUserNotifications
 from .feedback import ORMMeetingFeedback
 from .forms import ORMForm
+from .outbox import ORMOutboxEvent
+from .scheduled_notifications import ORMScheduledNotification
+from .notification_routes import ORMUserNotificationRoute
 
 # Make sure all models are imported before configuring
 from sqlalchemy.orm import configure_mappers
@@ -53,5 +56,8 @@ __all__ = [
     "ORMLinkedInRawData",
     "ORMUserNotifications",
     "ORMCommunityCompany",
-    "ORMCommunityCompanyService"
+    "ORMCommunityCompanyService",
+    "ORMOutboxEvent",
+    "ORMScheduledNotification",
+    "ORMUserNotificationRoute"
 ]
@@ -16,6 +16,8 @@ class ORMForm(ObjectTable):
     __tablename__ = 'forms'
     __table_args__ = (
         Index('ix_form_intent', 'intent'),
+        # latest form of a user by intent (FormsManager.get_user_form)
+        Index('ix_form_user_id_intent_created_at', 'user_id', 'intent', 'created_at'),
         PrimaryKeyConstraint('user_id', 'id'),
         {'schema': schema},
     )
@@ -11,6 +11,12 @@ from common_db.config import schema
 class ORMLinkedInRawData(Base):
     """Модель для хранения сырых данных профиля LinkedIn"""
     __tablename__ = "linkedin_raw_data"
+    # monthly partitions by parsed_date, see functions.partitioning
+    __table_args__ = {
+        "schema": f"{schema}",
+        "extend_existing": True,
+        "postgresql_partition_by": "RANGE (parsed_date)",
+    }
     
     # URL профиля, который парсили
     target_linkedin_url: Mapped[str] = mapped_column(
@@ -27,6 +33,7 @@ class ORMLinkedInRawData(Base):
     # Дата и время парсинга
     parsed_date: Mapped[datetime] = mapped_column(
         DateTime,
+        primary_key=True,  # partition key must be a part of the primary key
         index=True,  # Для быстрого поиска по дате
         doc="Profile parsing date"
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, JSON, ForeignKey, ARRAY
+from sqlalchemy import String, Integer, JSON, ForeignKey, ARRAY, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from .base import ObjectTable, schema
 
@@ -9,7 +9,13 @@ class ORMMatchingResult(ObjectTable):
     """
 
     __tablename__ = "matching_results"
-    __table_args__ = {"schema": schema}
+    __table_args__ = (
+        # latest result of a user's form (FormsManager.send_match)
+        Index("ix_matching_results_user_id_form_id_created_at", "user_id", "form_id", "created_at"),
+        # append-only by time: a tiny BRIN index serves retention and time range scans
+        Index("ix_matching_results_created_at_brin", "created_at", postgresql_using="brin"),
+        {"schema": schema},
+    )
 
     model_settings_preset: Mapped[str] = mapped_column(String(50), nullable=False)
     match_users_count: Mapped[int] = mapped_column(Integer, nullable=False)
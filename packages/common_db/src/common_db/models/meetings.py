@@ -25,6 +25,8 @@ class ORMMeeting(ObjectTable):
         Index('ix_meeting_id', 'id'),
         Index('ix_meeting_status', 'status'),
         Index('ix_meeting_time', 'scheduled_time'),
+        # join from meeting_responses filtered by scheduled_time without heap lookups
+        Index('ix_meeting_id_scheduled_time', 'id', 'scheduled_time', postgresql_include=['status']),
         PrimaryKeyConstraint('id', 'organizer_id', 'match_id'),
         {'schema': schema},
     )
@@ -74,6 +76,9 @@ class ORMMeetingResponse(ObjectTable):
             ondelete="CASCADE",
             name='fk_meeting_response_meeting'
         ),
+        # user's responses with the meeting key and status without heap lookups (index-only scans)
+        Index('ix_meeting_responses_user_id_covering', 'user_id',
+              postgresql_include=['meeting_id', 'meeting_organizer_id', 'meeting_match_id', 'role', 'response']),
         {'schema': schema}
     )
 
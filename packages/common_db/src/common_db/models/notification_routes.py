@@ -0,0 +1,27 @@
+from sqlalchemy import BIGINT, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from common_db.config import schema
+from common_db.models.base import Base
+
+
+class ORMUserNotificationRoute(Base):
+    """
+    Routing data of the notifications of a user: the columns of users that choose the channels.
+
+    A narrow copy written by triggers on users (functions.notification_routes), it is not written
+    by the application. Resolving the channels of thousands of recipients reads a few pages of this
+    table instead of the wide user rows.
+    """
+
+    __tablename__ = 'user_notification_routes'
+    __table_args__ = {'schema': schema}
+
+    user_id: Mapped[int] = mapped_column(ForeignKey(f'{schema}.users.id', ondelete='CASCADE'), primary_key=True)
+    email: Mapped[str] = mapped_column(String, nullable=False)
+    telegram_id: Mapped[int | None] = mapped_column(BIGINT)
+    is_tg_notify: Mapped[bool] = mapped_column(default=False)
+    is_email_notify: Mapped[bool] = mapped_column(default=False)
+    is_push_notify: Mapped[bool] = mapped_column(default=False)
+    is_tg_bot_blocked: Mapped[bool] = mapped_column(default=False)
+    timezone: Mapped[str | None]
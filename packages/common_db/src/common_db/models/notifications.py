@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, JSON
+from sqlalchemy import ForeignKey, Index, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from common_db.config import schema
@@ -15,10 +15,19 @@ class ORMUserNotifications(ObjectTable):
     __tablename__ = 'user_notifications'
 
     notification_type: Mapped[ENotificationType] = mapped_column(NotificationTypePGEnum)
-    user_id: Mapped[int] = mapped_column(ForeignKey(column=f'{schema}.users.id'), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey(column=f'{schema}.users.id'))
     text: Mapped[str]
     params: Mapped[dict[str, str] | None] = mapped_column(JSON, nullable=True)
     is_read: Mapped[bool] = mapped_column(default=False)
 
     user: Mapped['ORMUserProfile'] = relationship(back_populates='notifications')
 
+    __table_args__ = (
+        # keyset pagination of the user's feed by (created_at desc, id desc), also serves user_id lookups
+        Index('ix_user_notifications_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        {
+            'schema': f"{schema}",
+            'extend_existing': True
+        }
+    )
+
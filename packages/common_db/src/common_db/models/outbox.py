@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Index, Integer, LargeBinary, String, Text, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from common_db.config import schema
+from common_db.models.base import ObjectTable
+
+
+class ORMOutboxEvent(ObjectTable):
+    """
+    Transactional outbox: events written in the same transaction as the change they describe
+    and published by a relay afterwards (see managers.outbox.OutboxManager).
+    """
+
+    __tablename__ = 'outbox'
+    __table_args__ = (
+        # the relay only scans pending events, sent and failed ones leave the index
+        Index('ix_outbox_unsent', 'id', postgresql_where=text('sent_at IS NULL AND failed_at IS NULL')),
+        {'schema': schema},
+    )
+
+    topic: Mapped[str] = mapped_column(String(255), nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)  # serialized event
+    event_type: Mapped[int | None] = mapped_column(Integer)
+    recipient_id: Mapped[int | None] = mapped_column(BigInteger)
+    sent_at: Mapped[datetime | None]
+    next_attempt_at: Mapped[datetime | None]  # set after a failed attempt, the event is not claimed before
+    failed_at: Mapped[datetime | None]  # set when the last attempt failed, left for manual handling
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')
+    last_error: Mapped[str | None] = mapped_column(Text)
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index, Integer, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from common_db.config import schema
+from common_db.models.base import ObjectTable
+
+
+class ORMScheduledNotification(ObjectTable):
+    """
+    Notifications deferred to the allowed sending window of the recipient (quiet hours)
+    and released by the scheduler of the notifications app (see managers.ScheduledNotificationManager).
+    """
+
+    __tablename__ = 'scheduled_notifications'
+    __table_args__ = (
+        # the scheduler claims the due pending notifications in the order of send_after,
+        # released and failed ones leave the index
+        Index('ix_scheduled_notifications_due', 'send_after',
+              postgresql_where=text('released_at IS NULL AND failed_at IS NULL')),
+        {'schema': schema},
+    )
+
+    user_id: Mapped[int] = mapped_column(ForeignKey(f'{schema}.users.id', ondelete='CASCADE'))
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)  # DTOGeneralNotification in the json mode
+    send_after: Mapped[datetime]
+    released_at: Mapped[datetime | None]
+    failed_at: Mapped[datetime | None]  # set when the last attempt failed, left for manual handling
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')
+    last_error: Mapped[str | None] = mapped_column(Text)
@@ -1,5 +1,6 @@
 from datetime import datetime
 from sqlalchemy import String, ARRAY, BIGINT, Index, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from common_db.enums.users import (
     ExpertiseAreaPGEnum,
@@ -161,6 +162,9 @@ class ORMUserProfile(ObjectTable):
     available_meetings_pendings_count: Mapped[int] = mapped_column(Integer(), nullable=False, default=0)
     available_meetings_confirmations_count: Mapped[int] = mapped_column(Integer(), nullable=False, default=0)
 
+    # maintained by DB triggers on user_notifications, read-only for the application
+    unread_notifications_count: Mapped[int] = mapped_column(Integer(), nullable=False, default=0, server_default='0')
+
     # Add this to the existing relationships in ORMUserProfile
     linkedin_profile: Mapped["ORMLinkedInProfile"] = relationship(
         "ORMLinkedInProfile",
@@ -170,8 +174,17 @@ class ORMUserProfile(ObjectTable):
     )
     profile_type: Mapped[EProfileType] = mapped_column(ProfileTypePGEnum, default=EProfileType.New)
 
+    # full-text search document, maintained by DB triggers (see functions.user.users_search_document)
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, nullable=True, deferred=True)
+
     __table_args__ = (
         Index('ix_users_telegram_id', 'telegram_id'),
+        # search indexes: tsvector for free-text query, trigrams for ILIKE '%term%' filters
+        Index('ix_users_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_users_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('ix_users_surname_trgm', 'surname', postgresql_using='gin', postgresql_ops={'surname': 'gin_trgm_ops'}),
+        Index('ix_users_country_trgm', 'country', postgresql_using='gin', postgresql_ops={'country': 'gin_trgm_ops'}),
+        Index('ix_users_city_trgm', 'city', postgresql_using='gin', postgresql_ops={'city': 'gin_trgm_ops'}),
         # GIN индексы для массивов строк - ебумба
         Index('ix_users_recommender_companies', 'recommender_companies', postgresql_using='gin'),
         Index('ix_users_vacancy_pages', 'vacancy_pages', postgresql_using='gin'),
@@ -190,6 +203,14 @@ class ORMSpecialisation(PropertyTable):
     """
 
     __tablename__ = 'specialisations'
+    __table_args__ = (
+        Index('ix_specialisations_label_trgm', 'label', postgresql_using='gin',
+              postgresql_ops={'label': 'gin_trgm_ops'}),
+        {
+            'schema': f"{schema}",
+            'extend_existing': True
+        }
+    )
 
     expertise_area: Mapped[EExpertiseArea | None] = mapped_column(ExpertiseAreaPGEnum)
 
@@ -283,6 +304,13 @@ class ORMSkill(PropertyTable):
     """
 
     __tablename__ = 'skills'
+    __table_args__ = (
+        Index('ix_skills_label_trgm', 'label', postgresql_using='gin', postgresql_ops={'label': 'gin_trgm_ops'}),
+        {
+            'schema': f"{schema}",
+            'extend_existing': True
+        }
+    )
 
     skill_area: Mapped[ESkillsArea | None] = mapped_column(SkillsAreaPGEnum)
     users: Mapped[list["ORMUserProfile"]] = relationship(
@@ -0,0 +1,180 @@
+"""
+Query profiler for SQLAlchemy engines.
+
+Engine events record every executed statement into the QueryStats objects that are active
+in the current context (a request, a manager call, a test). Stats are kept in a ContextVar,
+so concurrent requests do not mix, and SQLAlchemy's greenlet bridge keeps the context of
+the awaiting task. Nothing is recorded outside of a profile_queries() block.
+
+Usage:
+    install_profiler()  # all engines, or install_profiler(db_manager.engine)
+
+    with profile_queries('UserManager.search_users') as stats:
+        await UserManager.search_users(...)
+    print(stats.statements, stats.total_time, stats.slowest)
+
+    app.add_middleware(ServerTimingMiddleware)  # Server-Timing header per request
+"""
+import functools
+import logging
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# attribute of the execution context that stores the start time of the statement
+_START_ATTR = '_common_db_query_start'
+
+_active_stats: ContextVar[tuple['QueryStats', ...]] = ContextVar('common_db_active_query_stats', default=())
+
+
+@dataclass
+class QueryStats:
+    """
+    Statistics of the statements executed in a profiling scope
+
+    Attributes:
+        name: name of the scope (request path, manager method)
+        statements: number of executed statements
+        total_time: total execution time of the statements, seconds
+        slowest: the slowest statements as (duration, statement), from the slowest
+        max_slowest: how many slowest statements to keep
+    """
+    name: str = ''
+    statements: int = 0
+    total_time: float = 0.0
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+    max_slowest: int = 5
+
+    def record(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.total_time += duration
+        if len(self.slowest) < self.max_slowest or duration > self.slowest[-1][0]:
+            self.slowest.append((duration, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[self.max_slowest:]
+
+    def summary(self) -> str:
+        lines = [f"{self.name or 'queries'}: {self.statements} statements, {self.total_time * 1000:.1f} ms"]
+        lines += [f"  {duration * 1000:8.1f} ms  {' '.join(statement.split())[:300]}"
+                  for duration, statement in self.slowest]
+        return '\n'.join(lines)
+
+
+# listeners may be attached both to an engine and to all engines, a statement is recorded once
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _active_stats.get() and context is not None and getattr(context, _START_ATTR, None) is None:
+        setattr(context, _START_ATTR, time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, _START_ATTR, None)
+    if started is None:
+        return
+    setattr(context, _START_ATTR, None)
+    duration = time.perf_counter() - started
+    for stats in _active_stats.get():
+        stats.record(statement, duration)
+
+
+def install_profiler(engine: Engine | AsyncEngine | None = None) -> None:
+    """
+    Attach the profiler to an engine. Idempotent.
+
+    Args:
+        engine: engine to profile, all engines of the process if None
+    """
+    target = engine.sync_engine if isinstance(engine, AsyncEngine) else (engine or Engine)
+    if not event.contains(target, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(target, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(target, 'after_cursor_execute', _after_cursor_execute)
+
+
+@contextmanager
+def profile_queries(name: str = '', max_slowest: int = 5) -> Iterator[QueryStats]:
+    """
+    Record the statements executed inside the block. Scopes can be nested,
+    a statement is recorded in every active scope.
+
+    Args:
+        name: name of the scope
+        max_slowest: how many slowest statements to keep
+
+    Returns:
+        QueryStats: statistics, filled while the block runs
+    """
+    stats = QueryStats(name=name, max_slowest=max_slowest)
+    token = _active_stats.set(_active_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+
+def profiled(func: Callable | None = None, *, log_level: int = logging.DEBUG) -> Callable:
+    """
+    Decorator for async functions (manager methods): logs the statements executed by the call.
+    Put it under @classmethod. The calls are only profiled while the logger of this module
+    is enabled for log_level, e.g. logging.getLogger('common_db.profiling').setLevel(logging.DEBUG),
+    and the profiler is installed (see install_profiler).
+    """
+    def decorator(f: Callable) -> Callable:
+        @functools.wraps(f)
+        async def wrapper(*args, **kwargs):
+            if not logger.isEnabledFor(log_level):
+                return await f(*args, **kwargs)
+            with profile_queries(f.__qualname__) as stats:
+                try:
+                    return await f(*args, **kwargs)
+                finally:
+                    logger.log(log_level, stats.summary())
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware that profiles the statements of every request and reports them
+    in the Server-Timing response header:
+
+        Server-Timing: db;dur=12.4;desc="7 queries", app;dur=35.0
+
+    Requests with more than slow_statements_count statements are logged with their slowest statements.
+    Not intended for production: it exposes timings to the clients.
+    """
+
+    def __init__(self, app, engine: Engine | AsyncEngine | None = None, slow_statements_count: int = 20):
+        self.app = app
+        self.slow_statements_count = slow_statements_count
+        install_profiler(engine)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        with profile_queries(f"{scope['method']} {scope['path']}") as stats:
+            async def send_with_timing(message):
+                if message['type'] == 'http.response.start':
+                    app_time = (time.perf_counter() - started) * 1000
+                    value = (f'db;dur={stats.total_time * 1000:.1f};desc="{stats.statements} queries", '
+                             f'app;dur={app_time:.1f}')
+                    message['headers'] = list(message.get('headers', [])) + [
+                        (b'server-timing', value.encode('latin-1'))
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                if stats.statements > self.slow_statements_count:
+                    logger.warning(stats.summary())
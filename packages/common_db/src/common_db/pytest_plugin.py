@@ -0,0 +1,153 @@
+"""
+Pytest plugin with query budget assertions, a compiling session and a PostgreSQL engine,
+registered through the pytest11 entry point.
+
+    async def test_search_users(query_budget):
+        with query_budget(max_statements=2):
+            await UserManager.search_users(...)
+
+    async def test_search_query(compiling_session):
+        await UserManager.search_users(params, session=compiling_session)
+        assert 'ts_rank_cd' in compiling_session.statements[0]
+
+    async def test_triggers(postgres_engine):
+        async with postgres_engine.connect() as conn:
+            ...
+"""
+import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from .profiling import QueryStats, install_profiler, profile_queries
+
+
+@pytest.fixture
+def query_budget() -> Callable:
+    """
+    Returns a context manager that fails the test if the block executes more statements
+    (or spends more time in the database) than allowed.
+    """
+    install_profiler()
+
+    @contextmanager
+    def budget(max_statements: int | None = None, max_time: float | None = None, name: str = 'query budget'):
+        with profile_queries(name, max_slowest=10) as stats:
+            yield stats
+        _check_budget(stats, max_statements, max_time)
+
+    return budget
+
+
+class CompiledResult:
+    """Result of CompilingSession.execute(): the queued rows"""
+
+    def __init__(self, rows: list[Any], rowcount: int | None = None):
+        self.rows = rows
+        self.rowcount = len(rows) if rowcount is None else rowcount
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def all(self) -> list[Any]:
+        return list(self.rows)
+
+    def first(self) -> Any:
+        return self.rows[0] if self.rows else None
+
+    def one(self) -> Any:
+        if len(self.rows) != 1:
+            raise AssertionError(f'Expected one row, {len(self.rows)} queued')
+        return self.rows[0]
+
+    def one_or_none(self) -> Any:
+        return self.first()
+
+    def scalar(self) -> Any:
+        row = self.first()
+        return row[0] if isinstance(row, tuple) else row
+
+    def scalars(self) -> 'CompiledResult':
+        return CompiledResult([row[0] if isinstance(row, tuple) else row for row in self.rows], self.rowcount)
+
+    def scalar_one_or_none(self) -> Any:
+        return self.scalars().first()
+
+
+class CompilingSession:
+    """
+    AsyncSession stand-in for the tests of manager queries without a database.
+
+    Every executed statement is compiled for PostgreSQL with the asyncpg dialect, so joins,
+    correlation and the dialect constructs fail the test as they would fail the request.
+    The statements are kept as SQL strings; execute() returns the queued results in order
+    (lists of rows, or CompiledResult for a rowcount), an empty result when none is queued.
+    """
+
+    def __init__(self):
+        self.statements: list[str] = []
+        self.results: list[list[Any] | CompiledResult] = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None, **kwargs) -> CompiledResult:
+        self.statements.append(str(statement.compile(dialect=asyncpg_dialect())))
+        result = self.results.pop(0) if self.results else []
+        return result if isinstance(result, CompiledResult) else CompiledResult(result)
+
+    async def scalar(self, statement, params=None, **kwargs) -> Any:
+        return (await self.execute(statement, params)).scalar()
+
+    async def scalars(self, statement, params=None, **kwargs) -> CompiledResult:
+        return (await self.execute(statement, params)).scalars()
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def flush(self) -> None:
+        pass
+
+    async def rollback(self) -> None:
+        pass
+
+
+@pytest.fixture
+def compiling_session() -> CompilingSession:
+    """Session that compiles the executed statements for PostgreSQL, see CompilingSession"""
+    return CompilingSession()
+
+
+@pytest.fixture
+def postgres_engine() -> Iterator[AsyncEngine]:
+    """
+    Engine of the database of the common_db settings (config/db.json), migrated to head
+    (alembic upgrade head). Connections are not pooled: every test can run in its own event loop.
+    The test is skipped when the settings are missing or the database is not reachable.
+    """
+    try:
+        from .config import db_settings
+
+        engine = create_async_engine(db_settings.db.database_url_asyncpg.get_secret_value(), poolclass=NullPool)
+        asyncio.run(_ping(engine))
+    except Exception as e:
+        pytest.skip(f'PostgreSQL is not available: {e}')
+    yield engine
+
+
+async def _ping(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text('SELECT 1'))
+
+
+def _check_budget(stats: QueryStats, max_statements: int | None, max_time: float | None) -> None:
+    if max_statements is not None and stats.statements > max_statements:
+        pytest.fail(f'Executed {stats.statements} statements, budget is {max_statements}\n{stats.summary()}',
+                    pytrace=False)
+    if max_time is not None and stats.total_time > max_time:
+        pytest.fail(f'Spent {stats.total_time * 1000:.1f} ms in the database, budget is {max_time * 1000:.1f} ms\n'
+                    f'{stats.summary()}', pytrace=False)
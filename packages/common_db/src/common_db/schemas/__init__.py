@@ -14,6 +14,7 @@ from .users import (
     DTOSkillRead,
     DTORequestsCommunityRead,
     DTOSearchUser,
+    DTOSearchUserPage,
     DTOAllProperties)
 from .linkedin import LinkedInProfileRead
 from .meetings import (
@@ -22,10 +23,14 @@ from .meetings import (
     MeetingRequestCreate,
     MeetingRequestUpdate,
     MeetingResponse,
+    MeetingResponseCreate,
     MeetingRequestRead,
     MeetingFilter,
     MeetingList,
     MeetingsUserLimits,
+    MeetingResponseCounts,
+    MeetingCompactRead,
+    MeetingCompactList,
 )
 from .notification_params import (
     type_params,
@@ -35,15 +40,19 @@ from .notification_params import (
 from .notifications import (
     DTOGeneralNotification,
     DTONotifiedUserProfile,
+    DTONotificationRoute,
     DTOUserNotification,
-    DTOUserNotificationRead
-
+    DTOUserNotificationRead,
+    DTOUserNotificationPage,
+    DTONotificationIds
 )
 from .forms import (
     FormBase,
     FormCreate,
     FormRead,
 )
+from .outbox import DTOOutboxEventCreate, DTOOutboxEventRead
+from .scheduled_notifications import DTOScheduledNotificationCreate, DTOScheduledNotificationRead
 from .communities_companies_domains import (
     DTOCommunityCompanyRead,
     DTOCommunityCompanyServiceRead
@@ -57,10 +66,14 @@ __all__ = [
     "MeetingRequestCreate",
     "MeetingRequestUpdate",
     "MeetingResponse",
+    "MeetingResponseCreate",
     "MeetingRequestRead",
     "MeetingFilter",
     "MeetingList",
     "MeetingsUserLimits",
+    "MeetingResponseCounts",
+    "MeetingCompactRead",
+    "MeetingCompactList",
     "SUserProfileRead",
     "DTOUserProfile",
     "DTOUserProfileUpdate",
@@ -75,6 +88,7 @@ __all__ = [
     "DTOSkillRead",
     "DTORequestsCommunityRead",
     "DTOSearchUser",
+    "DTOSearchUserPage",
     "DTOAllProperties",
     "LinkedInProfileRead",
     "FormBase",
@@ -87,8 +101,15 @@ __all__ = [
     "DTOMeetingInvitationParams",
     "DTOGeneralNotification",
     "DTONotifiedUserProfile",
+    "DTONotificationRoute",
     "DTOUserNotification",
     "DTOUserNotificationRead",
+    "DTOUserNotificationPage",
+    "DTONotificationIds",
     "DTOCommunityCompanyRead",
-    "DTOCommunityCompanyServiceRead"
+    "DTOCommunityCompanyServiceRead",
+    "DTOOutboxEventCreate",
+    "DTOOutboxEventRead",
+    "DTOScheduledNotificationCreate",
+    "DTOScheduledNotificationRead"
 ]
@@ -14,6 +14,9 @@ class BaseSchema(BaseModel):
     def model_dump(self, *args, **kwargs) -> dict:
         """Override model_dump to handle enum serialization"""
         data = super().model_dump(*args, **kwargs)
+        # the json mode serializes enums to their values already
+        if kwargs.get('mode') == 'json':
+            return data
         return {k: convert_enum_value(v) for k, v in data.items()}
 
 
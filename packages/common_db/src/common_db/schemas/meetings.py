@@ -21,6 +21,13 @@ class MeetingRead(TimestampedSchema):
     user_responses: list[MeetingResponseRead]
 
 
+class MeetingResponseCreate(BaseSchema):
+    user_id: int
+    role: EMeetingUserRole
+    response: EMeetingResponseStatus = EMeetingResponseStatus.no_answer
+    description: str | None = None
+
+
 class MeetingRequestCreate(BaseSchema):
     match_id: int | None = None
     attendees_id: list[int]
@@ -87,6 +94,29 @@ class MeetingFilter(BaseSchema):
 
 class MeetingList(BaseSchema):
     meetings: list[MeetingRequestRead]
+    next_cursor: str | None = None
+
+
+class MeetingResponseCounts(BaseSchema):
+    """Number of meeting participants by response"""
+    no_answer: int = 0
+    confirmed: int = 0
+    declined: int = 0
+
+
+class MeetingCompactRead(TimestampedSchema):
+    """Meeting without the participants' responses, only their counts by status"""
+    match_id: int | None = None
+    description: str | None = None
+    location: EMeetingLocation
+    scheduled_time: datetime
+    status: EMeetingStatus
+    response_counts: MeetingResponseCounts
+
+
+class MeetingCompactList(BaseSchema):
+    meetings: list[MeetingCompactRead]
+    next_cursor: str | None = None
 
 
 class MeetingsUserLimits(BaseSchema):
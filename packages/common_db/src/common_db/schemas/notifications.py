@@ -6,7 +6,7 @@ from pydantic_extra_types.timezone_name import TimeZoneName
 from typing import Any
 from typing_extensions import Self
 
-from .base import TimestampedSchema
+from .base import BaseSchema, TimestampedSchema
 from .notification_params import type_params, DTOEmptyParams
 from ..enums.notifications import ENotificationType
 
@@ -50,6 +50,11 @@ class DTOGeneralNotification(BaseModel):
         notification_type = data.get('notification_type')
         if not notification_type:
             return data
+        # a decoded message has the value of the type, the keys of type_params are the enum members
+        try:
+            notification_type = ENotificationType(notification_type)
+        except ValueError:
+            return data
 
         # Get schema for this notification type
         params_schema: type[BaseModel] | None = type_params.get(notification_type)
@@ -114,6 +119,23 @@ class DTONotifiedUserProfile(BaseModel):
     is_push_notify: bool | None = Field(default=None, exclude=True)
 
 
+class DTONotificationRoute(BaseModel):
+    """The channels of a recipient of notifications (user_notification_routes)"""
+    user_id: int
+    email: str
+    telegram_id: int | None = None
+    is_tg_notify: bool = False
+    is_email_notify: bool = False
+    is_push_notify: bool = False
+    is_tg_bot_blocked: bool = False
+    timezone: str | None = None
+
+    @property
+    def has_channels(self) -> bool:
+        """Whether any channel would deliver a notification to the user"""
+        return (self.is_tg_notify and not self.is_tg_bot_blocked) or self.is_email_notify or self.is_push_notify
+
+
 class DTOUserNotification(DTOGeneralNotification):
     """The schema of the prepared notification"""
     user: DTONotifiedUserProfile
@@ -137,5 +159,24 @@ class DTOUserNotificationRead(TimestampedSchema):
     notification_type: ENotificationType
     user_id: int
     text: str
-    params: list[str] | None = None
+    params: dict[str, Any] | None = None
     is_read: bool
+
+
+class DTOUserNotificationPage(BaseSchema):
+    """
+    Page of user notifications
+
+    Attributes:
+        notifications: notifications of the page, from newest to oldest
+        next_cursor: cursor of the next page, None when there are no more notifications
+        unread_count: total number of unread notifications of the user
+    """
+    notifications: list[DTOUserNotificationRead]
+    next_cursor: str | None = None
+    unread_count: int = 0
+
+
+class DTONotificationIds(BaseModel):
+    """Set of notification ids for bulk operations"""
+    notification_ids: list[int] = Field(min_length=1, max_length=1000)
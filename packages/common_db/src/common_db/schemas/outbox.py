@@ -0,0 +1,26 @@
+from .base import BaseSchema, TimestampedSchema
+
+
+class DTOOutboxEventCreate(BaseSchema):
+    """
+    Event to be written into the outbox
+
+    Attributes:
+        topic: topic the relay publishes the event to
+        payload: serialized event
+        event_type: event type, for monitoring and filtering
+        recipient_id: user the event is addressed to, if any
+    """
+    topic: str
+    payload: bytes
+    event_type: int | None = None
+    recipient_id: int | None = None
+
+
+class DTOOutboxEventRead(TimestampedSchema):
+    """Event claimed from the outbox by the relay"""
+    topic: str
+    payload: bytes
+    event_type: int | None = None
+    recipient_id: int | None = None
+    attempts: int = 0
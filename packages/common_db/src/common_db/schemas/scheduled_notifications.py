@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Any
+
+from .base import BaseSchema, TimestampedSchema
+
+
+class DTOScheduledNotificationCreate(BaseSchema):
+    """
+    Notification deferred to the allowed sending window of the recipient
+
+    Attributes:
+        user_id: recipient of the notification
+        payload: DTOGeneralNotification dumped in the json mode
+        send_after: UTC time the notification is released at
+    """
+    user_id: int
+    payload: dict[str, Any]
+    send_after: datetime
+
+
+class DTOScheduledNotificationRead(TimestampedSchema):
+    """Deferred notification claimed by the scheduler"""
+    user_id: int
+    payload: dict[str, Any]
+    send_after: datetime
+    attempts: int = 0
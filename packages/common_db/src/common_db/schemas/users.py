@@ -233,6 +233,7 @@ class DTOUserProfileRead(DTOUserProfileUpdate):
 
 
 class DTOSearchUser(BaseSchema):
+    query: str | None = None  # free-text query over name, specialisations, skills and location
     name: str | None = None
     surname: str | None = None
     country: str | None = None
@@ -241,6 +242,12 @@ class DTOSearchUser(BaseSchema):
     specialisation: str | None = None
     skill: str | None = None
     limit: int | None = 30
+    cursor: str | None = None  # next_cursor of the previous page
+
+
+class DTOSearchUserPage(BaseSchema):
+    users: list[DTOUserProfileRead]
+    next_cursor: str | None = None  # None when there are no more results
 
 
 class DTOAllProperties(BaseSchema):
@@ -0,0 +1,95 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+
+from common_db.config import schema
+from common_db.enums.notifications import ENotificationType
+from common_db.functions.pagination import decode_cursor, encode_cursor
+from common_db.managers import NotificationManager
+
+
+class Row(SimpleNamespace):
+    """Row of the listing query: attributes and _mapping"""
+
+    @property
+    def _mapping(self) -> dict:
+        return vars(self)
+
+
+def make_row(notification_id: int, created_at: datetime) -> Row:
+    return Row(
+        unread_notifications_count=5,
+        id=notification_id,
+        notification_type=ENotificationType.user_test,
+        user_id=1,
+        text="text",
+        params=None,
+        is_read=False,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cursor", [
+    encode_cursor("yesterday", 42),
+    encode_cursor("2025-03-01T12:30:15", "42"),
+    encode_cursor(1740832215, 42),
+])
+async def test_user_notifications_reject_malformed_cursor(cursor):
+    session = AsyncMock()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await NotificationManager.get_user_notifications(user_id=1, cursor=cursor, session=session)
+
+    assert exc_info.value.status_code == 400
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_user_notifications_page_query(compiling_session):
+    now = datetime(2026, 3, 1, 12)
+    compiling_session.results.append([make_row(3, now), make_row(2, now - timedelta(hours=1)), make_row(1, now)])
+
+    page = await NotificationManager.get_user_notifications(
+        user_id=1, is_read=False, cursor=encode_cursor(now, 10), limit=2, session=compiling_session
+    )
+
+    assert [notification.id for notification in page.notifications] == [3, 2]
+    assert page.unread_count == 5
+    assert decode_cursor(page.next_cursor, datetime, int) == [now - timedelta(hours=1), 2]
+    [statement] = compiling_session.statements
+    # the unread counter and the page in one statement, the page projects the columns of the DTO only
+    assert statement.startswith(f"SELECT {schema}.users.unread_notifications_count, page.id, ")
+    assert "LEFT OUTER JOIN LATERAL (SELECT" in statement and ") AS page ON true" in statement
+    assert f"({schema}.user_notifications.created_at, {schema}.user_notifications.id) < ($" in statement
+
+
+@pytest.mark.asyncio
+async def test_user_notifications_of_a_user_without_notifications(compiling_session):
+    compiling_session.results.append([make_row(None, None)])
+
+    page = await NotificationManager.get_user_notifications(user_id=1, session=compiling_session)
+
+    assert page.notifications == [] and page.next_cursor is None and page.unread_count == 5
+
+
+@pytest.mark.asyncio
+async def test_bulk_mark_read_and_delete_are_single_statements(compiling_session):
+    compiling_session.results += [[(1,), (3,)], [(2,)]]
+
+    marked = await NotificationManager.mark_notifications_as_read(1, [1, 1, 3, 4], session=compiling_session)
+    deleted = await NotificationManager.delete_notifications(1, [2, 5], session=compiling_session)
+
+    assert json.loads(marked.body)["notification_ids"] == [1, 3]
+    assert json.loads(deleted.body)["notification_ids"] == [2]
+    mark_read, delete = compiling_session.statements
+    assert f"UPDATE {schema}.user_notifications SET is_read=$1::BOOLEAN" in mark_read
+    assert f"{schema}.user_notifications.is_read IS false" in mark_read
+    assert f"DELETE FROM {schema}.user_notifications WHERE" in delete
+    assert all(f"RETURNING {schema}.user_notifications.id" in statement for statement in (mark_read, delete))
+    assert compiling_session.commits == 2
@@ -0,0 +1,71 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert, select, update
+
+from common_db.schemas import DTONotificationRoute
+
+MIGRATION = Path(__file__).parents[2] / 'migrations' / 'versions' / 'f5b1d3a7c962_user_notification_routes.py'
+
+
+@pytest.mark.parametrize('channels, has_channels', [
+    ({}, False),
+    ({'is_email_notify': True}, True),
+    ({'is_push_notify': True}, True),
+    ({'is_tg_notify': True}, True),
+    ({'is_tg_notify': True, 'is_tg_bot_blocked': True}, False),
+    ({'is_tg_notify': True, 'is_tg_bot_blocked': True, 'is_email_notify': True}, True),
+])
+def test_route_has_channels(channels, has_channels):
+    assert DTONotificationRoute(user_id=1, email='user@example.com', **channels).has_channels is has_channels
+
+
+def run_migration(connection, step_name: str) -> None:
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    spec = importlib.util.spec_from_file_location('user_notification_routes', MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with Operations.context(MigrationContext.configure(connection)):
+        getattr(migration, step_name)()
+
+
+@pytest.mark.asyncio
+async def test_routes_follow_the_users(postgres_engine):
+    from common_db.models import ORMUserProfile
+    from common_db.models.notification_routes import ORMUserNotificationRoute
+
+    async def route_of(user_id: int):
+        return (await conn.execute(
+            select(ORMUserNotificationRoute).where(ORMUserNotificationRoute.user_id == user_id)
+        )).one_or_none()
+
+    async with postgres_engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            # the migration is run again in the transaction of the test, DDL is transactional in PostgreSQL
+            await conn.run_sync(run_migration, 'downgrade')
+            await conn.run_sync(run_migration, 'upgrade')
+
+            user_id = await conn.scalar(
+                insert(ORMUserProfile)
+                .values(name='Route', surname='Test', email='route-test@example.com', timezone='Europe/Moscow')
+                .returning(ORMUserProfile.id)
+            )
+            route = await route_of(user_id)
+            assert (route.email, route.timezone, route.is_tg_notify) == ('route-test@example.com', 'Europe/Moscow', False)
+
+            await conn.execute(
+                update(ORMUserProfile).where(ORMUserProfile.id == user_id)
+                .values(is_tg_notify=True, telegram_id=42, is_tg_bot_blocked=True)
+            )
+            route = await route_of(user_id)
+            assert (route.is_tg_notify, route.telegram_id, route.is_tg_bot_blocked) == (True, 42, True)
+
+            # a change of the other columns leaves the route as it is
+            await conn.execute(update(ORMUserProfile).where(ORMUserProfile.id == user_id).values(about='About'))
+            assert await route_of(user_id) == route
+        finally:
+            await transaction.rollback()
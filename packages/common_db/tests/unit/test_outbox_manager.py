@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import pytest
+
+from common_db.config import schema
+from common_db.managers import OutboxManager
+from common_db.pytest_plugin import CompiledResult
+
+
+@pytest.mark.asyncio
+async def test_claim_batch_skips_failed_and_backed_off_events(compiling_session):
+    assert await OutboxManager.claim_batch(limit=100, session=compiling_session) == []
+
+    [statement] = compiling_session.statements
+    outbox = f"{schema}.outbox"
+    assert f"{outbox}.sent_at IS NULL AND {outbox}.failed_at IS NULL" in statement
+    assert f"({outbox}.next_attempt_at IS NULL OR {outbox}.next_attempt_at <= TIMEZONE('utc', now()))" in statement
+    assert "FOR UPDATE SKIP LOCKED" in statement
+
+
+@pytest.mark.asyncio
+async def test_mark_failed_backs_off_and_counts_the_events_marked_failed(compiling_session):
+    now = datetime(2026, 1, 1)
+    compiling_session.results.append([(now,), (None,), (now,)])
+
+    dead = await OutboxManager.mark_failed(
+        [1, 2, 3], "x" * 2000, max_attempts=5, retry_backoff=2, max_retry_backoff=60, session=compiling_session
+    )
+
+    assert dead == 2
+    [statement] = compiling_session.statements
+    outbox = f"{schema}.outbox"
+    assert "make_interval(secs => LEAST($1::FLOAT * power(2, attempts), $2::FLOAT))" in statement
+    assert f"failed_at=CASE WHEN ({outbox}.attempts + $3::INTEGER >= $4::INTEGER)" in statement
+    assert f"RETURNING {outbox}.failed_at" in statement
+    # nothing to update, nothing executed
+    assert await OutboxManager.mark_failed([], "error", session=compiling_session) == 0
+    assert len(compiling_session.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_failed_commits(compiling_session):
+    compiling_session.results.append(CompiledResult([], rowcount=4))
+
+    assert await OutboxManager.delete_failed(datetime(2026, 1, 1), session=compiling_session) == 4
+    assert f"WHERE {schema}.outbox.failed_at < $1::TIMESTAMP WITHOUT TIME ZONE" in compiling_session.statements[0]
+    assert compiling_session.commits == 1
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from common_db.functions.pagination import encode_cursor, decode_cursor, decode_datetime
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(created_at, 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, datetime, int) == [created_at, 42]
+    assert decode_cursor(encode_cursor(1, 42), float, int) == [1.0, 42]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    encode_cursor(1),
+    encode_cursor(1, 2, 3),
+    # well-formed json with values of other types
+    encode_cursor(1, 2),
+    encode_cursor("2025-03-01T12:30:15", "42"),
+    encode_cursor("2025-03-01T12:30:15", True),
+    encode_cursor("2025-03-01T12:30:15", [42]),
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, datetime, int)
+    assert exc_info.value.status_code == 400
+
+
+def test_invalid_cursor_datetime():
+    with pytest.raises(HTTPException):
+        decode_datetime(12)
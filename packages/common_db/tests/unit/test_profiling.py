@@ -0,0 +1,62 @@
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from common_db.profiling import install_profiler, profile_queries, profiled
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    install_profiler(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_profile_queries_counts_statements(engine):
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+        with profile_queries('outer') as outer:
+            conn.execute(text('SELECT 2'))
+            with profile_queries('inner') as inner:
+                conn.execute(text('SELECT 3'))
+
+    assert outer.statements == 2
+    assert inner.statements == 1
+    assert [statement for _, statement in inner.slowest] == ['SELECT 3']
+    assert outer.total_time >= inner.total_time
+
+
+def test_query_budget(engine, query_budget):
+    with engine.connect() as conn:
+        with query_budget(max_statements=2) as stats:
+            conn.execute(text('SELECT 1'))
+            conn.execute(text('SELECT 2'))
+    assert stats.statements == 2
+
+
+def test_query_budget_exceeded(engine, query_budget):
+    with engine.connect() as conn:
+        with pytest.raises(pytest.fail.Exception, match='budget is 1'):
+            with query_budget(max_statements=1):
+                conn.execute(text('SELECT 1'))
+                conn.execute(text('SELECT 2'))
+
+
+@pytest.mark.asyncio
+async def test_profiled_logs_statements_when_enabled(engine, caplog):
+    @profiled
+    async def load():
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            conn.execute(text('SELECT 2'))
+
+    await load()
+    assert not caplog.records
+
+    caplog.set_level(logging.DEBUG, logger='common_db.profiling')
+    await load()
+    assert caplog.records[-1].getMessage().startswith(
+        'test_profiled_logs_statements_when_enabled.<locals>.load: 2 statements'
+    )
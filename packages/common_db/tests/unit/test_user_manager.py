@@ -0,0 +1,101 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from common_db.config import schema
+from common_db.functions.pagination import decode_cursor
+from common_db.managers import LimitsManager, UserManager
+from common_db.schemas.meetings import MeetingsUserLimits
+from common_db.schemas.users import DTOSearchUser, DTOSearchUserPage
+
+LIMIT_SETTINGS = SimpleNamespace(max_user_confirmed_meetings_count=3, max_user_pended_meetings_count=5)
+
+
+@pytest.mark.asyncio
+async def test_users_meetings_are_counted_with_one_grouped_query(compiling_session):
+    compiling_session.results.append([(1, 2, 1), (2, 7, 0)])
+
+    assert await UserManager.count_users_meetings(compiling_session, [1, 2, 3]) == {1: (2, 1), 2: (7, 0)}
+
+    [statement] = compiling_session.statements
+    assert statement.startswith("WITH upcoming AS")
+    assert "meeting_stats AS" in statement and "GROUP BY upcoming.user_id" in statement
+    assert await UserManager.count_users_meetings(compiling_session, []) == {}
+    assert len(compiling_session.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_meetings_counters_are_updated_from_values(compiling_session):
+    # counts of users 1 and 2, user 3 has no upcoming meetings; user 4 does not exist
+    compiling_session.results += [[(1, 2, 1), (2, 7, 0)], [(1,), (2,), (3,)]]
+
+    limits = await UserManager.update_meetings_counters_bulk(compiling_session, [1, 2, 3, 1, 4], LIMIT_SETTINGS)
+
+    assert limits == {
+        1: MeetingsUserLimits(
+            meetings_pendings_limit=5, meetings_confirmations_limit=3,
+            available_meeting_pendings=3, available_meeting_confirmations=2,
+        ),
+        2: MeetingsUserLimits(
+            meetings_pendings_limit=5, meetings_confirmations_limit=3,
+            available_meeting_pendings=0, available_meeting_confirmations=3,
+        ),
+        3: MeetingsUserLimits(
+            meetings_pendings_limit=5, meetings_confirmations_limit=3,
+            available_meeting_pendings=5, available_meeting_confirmations=3,
+        ),
+    }
+    _, update = compiling_session.statements
+    assert update.startswith(
+        f"UPDATE {schema}.users SET available_meetings_pendings_count=counters.pendings, "
+        "available_meetings_confirmations_count=counters.confirmations"
+    )
+    assert "FROM (VALUES ($" in update and f"WHERE {schema}.users.id = counters.id" in update
+    assert compiling_session.commits == 0
+
+
+@pytest.mark.asyncio
+async def test_users_meetings_limits_of_a_missing_user(compiling_session):
+    compiling_session.results += [[], [(1,)]]
+
+    with pytest.raises(HTTPException) as exc_info:
+        await LimitsManager.get_users_meetings_limits(compiling_session, [1, 4], LIMIT_SETTINGS)
+
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_search_users_pages_by_rank_and_id(compiling_session):
+    users = f"{schema}.users"
+    # check_user, the page of (id, rank) with one extra row, the profiles of the page
+    compiling_session.results += [
+        [(1,)],
+        [SimpleNamespace(id=5, rank=0.5), SimpleNamespace(id=7, rank=0.25), SimpleNamespace(id=9, rank=0.25)],
+        [],
+    ]
+
+    page = await UserManager.search_users(
+        1, DTOSearchUser(query="python", specialisation="back%end", skill="sql", limit=2), session=compiling_session
+    )
+
+    assert isinstance(page, DTOSearchUserPage)
+    assert decode_cursor(page.next_cursor, float, int) == [0.25, 7]
+    _, search, profiles = compiling_session.statements
+    # relations are filtered with EXISTS, the page is selected on (id, rank) rows
+    assert search.startswith(f"SELECT {users}.id, ts_rank_cd({users}.search_vector, websearch_to_tsquery(")
+    assert search.count("EXISTS (SELECT 1") == 2 and " JOIN " not in search
+    assert "specialisations.label ILIKE $3::VARCHAR ESCAPE '\\'" in search
+    assert f"{users}.search_vector @@ websearch_to_tsquery(" in search
+    assert f"DESC, {users}.id \n LIMIT $5::INTEGER" in search
+    assert f"WHERE {users}.id IN (" in profiles
+
+    # the next page continues after the (rank, id) of the cursor
+    compiling_session.results += [[(1,)], []]
+    next_page = await UserManager.search_users(
+        1, DTOSearchUser(query="python", cursor=page.next_cursor, limit=2), session=compiling_session
+    )
+
+    assert next_page == DTOSearchUserPage(users=[], next_cursor=None)
+    keyset = compiling_session.statements[-1]
+    assert "< $3::FLOAT OR ts_rank_cd(" in keyset and f"= $4::FLOAT AND {users}.id > $5::INTEGER" in keyset
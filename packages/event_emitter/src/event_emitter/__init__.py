@@ -1,5 +1,6 @@
 from .pubsub_event_emitter import PubsubEventEmitter
+from .batching_pubsub_event_emitter import BatchingPubsubEventEmitter, EmitterMetrics
 from .emitter_interface import IProtoEmitter
 from .emitter_factory import EmitterFactory
 
-__all__ = ["IProtoEmitter", "EmitterFactory"]
+__all__ = ["IProtoEmitter", "EmitterFactory", "BatchingPubsubEventEmitter", "EmitterMetrics"]
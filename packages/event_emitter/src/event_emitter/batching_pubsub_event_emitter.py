@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from google.cloud import pubsub_v1
+from google.protobuf.message import Message
+
+from .emitter_interface import IProtoEmitter
+
+
+@dataclass
+class EmitterMetrics:
+    """
+    Counters of a batching emitter
+
+    Attributes:
+        enqueued: events accepted by emit()
+        published: events acknowledged by Pub/Sub
+        failed: events whose publish failed
+        dropped: events rejected because the buffer was full or the emitter was stopped
+        batches: flushed batches
+        total_latency: sum of enqueue-to-ack latencies of published events, seconds
+        max_latency: the longest enqueue-to-ack latency, seconds
+    """
+    enqueued: int = 0
+    published: int = 0
+    failed: int = 0
+    dropped: int = 0
+    batches: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.published if self.published else 0.0
+
+
+class BatchingPubsubEventEmitter(IProtoEmitter):
+    """
+    Non-blocking Pub/Sub emitter for async applications.
+
+    emit() only puts the event into a bounded in-process buffer, a background task takes
+    the events in batches (up to max_batch_size, or whatever arrived within max_latency)
+    and publishes them with the client-side batching of the Pub/Sub publisher, awaiting
+    the acks without blocking the event loop. When the buffer is full the event is dropped
+    and counted in metrics.dropped: a slow Pub/Sub never stalls request handlers.
+
+    start() must be called on the running loop (application startup), stop() flushes
+    the buffer (application shutdown). Events emitted before start() wait in the buffer.
+    """
+
+    def __init__(
+        self,
+        topic: str = None,
+        max_queue_size: int = 10_000,
+        max_batch_size: int = 100,
+        max_latency: float = 0.05,
+        publisher: pubsub_v1.PublisherClient | None = None,
+    ):
+        self.topic = topic
+
+        if not self.topic:
+            raise RuntimeError("A topic must be specified when using PubSub")
+
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.publisher = publisher or pubsub_v1.PublisherClient(
+            batch_settings=pubsub_v1.types.BatchSettings(
+                max_messages=max_batch_size,
+                max_latency=max_latency,
+            )
+        )
+        self.metrics = EmitterMetrics()
+
+        # (event data, enqueue time)
+        self._queue: asyncio.Queue[tuple[bytes, float]] = asyncio.Queue(maxsize=max_queue_size)
+        self._worker: asyncio.Task | None = None
+        # the batch the worker is gathering: taken from the buffer, not published yet
+        self._pending: list[tuple[bytes, float]] = []
+        self._inflight: asyncio.Future | None = None
+        self._stopped = False
+
+    def emit(self, event: Message):
+        if self._stopped:
+            self._drop("emitter is stopped")
+            return
+        try:
+            self._queue.put_nowait((event.SerializeToString(), time.monotonic()))
+        except asyncio.QueueFull:
+            self._drop("buffer is full")
+            return
+        self.metrics.enqueued += 1
+
+    async def start(self):
+        if self._worker is None or self._worker.done():
+            self._stopped = False
+            self._worker = asyncio.create_task(self._run(), name=f"emitter:{self.topic}")
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop accepting events and publish everything that is buffered"""
+        self._stopped = True
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except asyncio.TimeoutError:
+            logging.error("Emitter %s: %d events were not flushed on shutdown",
+                          self.topic, len(self._pending) + self._queue.qsize())
+        logging.info("Emitter %s stopped: %s", self.topic, self.metrics)
+
+    async def publish_many(self, events: list[Message]) -> list[BaseException | None]:
+        """
+        Publish events bypassing the buffer and wait for the acks.
+        Used by callers that need the delivery result, e.g. the outbox relay.
+        """
+        enqueued_at = time.monotonic()
+        batch = [(event.SerializeToString(), enqueued_at) for event in events]
+        results = await self._publish(batch)
+        return [result if isinstance(result, BaseException) else None for result in results]
+
+    async def flush(self):
+        """Publish all buffered events"""
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait() for _ in range(min(self.max_batch_size, self._queue.qsize()))]
+            await self._publish(batch)
+
+    async def _drain(self):
+        if self._inflight is not None and not self._inflight.done():
+            await self._inflight
+        # the worker was cancelled while gathering a batch
+        if self._pending:
+            batch, self._pending = self._pending, []
+            await self._publish(batch)
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            # gathered on the instance: stop() publishes it when the worker is cancelled meanwhile
+            self._pending.append(await self._queue.get())
+            deadline = time.monotonic() + self.max_latency
+            while len(self._pending) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    self._pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            batch, self._pending = self._pending, []
+            # the publish is shielded: a batch taken from the buffer is awaited by stop(), not lost
+            self._inflight = asyncio.ensure_future(self._publish(batch))
+            await asyncio.shield(self._inflight)
+
+    async def _publish(self, batch: list[tuple[bytes, float]]) -> list[str | BaseException]:
+        results = await asyncio.gather(*(self._publish_one(data) for data, _ in batch), return_exceptions=True)
+        now = time.monotonic()
+        self.metrics.batches += 1
+        for (_, enqueued_at), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                self.metrics.failed += 1
+                logging.error("Emitter %s: publish failed: %s", self.topic, result)
+                continue
+            latency = now - enqueued_at
+            self.metrics.published += 1
+            self.metrics.total_latency += latency
+            self.metrics.max_latency = max(self.metrics.max_latency, latency)
+        return results
+
+    async def _publish_one(self, data: bytes) -> str:
+        # publish() only schedules the message into the client batch, the returned future resolves on ack
+        return await asyncio.wrap_future(self.publisher.publish(self.topic, data=data))
+
+    def _drop(self, reason: str):
+        self.metrics.dropped += 1
+        # the first drop and then every 100th, not to flood the log when Pub/Sub is down
+        if self.metrics.dropped % 100 == 1:
+            logging.warning("Emitter %s: event dropped (%s), %d dropped in total",
+                            self.topic, reason, self.metrics.dropped)
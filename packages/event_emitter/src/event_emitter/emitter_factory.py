@@ -1,15 +1,24 @@
 from .emitter_interface import IProtoEmitter
 from .pubsub_event_emitter import PubsubEventEmitter
+from .batching_pubsub_event_emitter import BatchingPubsubEventEmitter
 from .log_event_emitter import LogEventEmitter
 
 
 class EmitterFactory:
     @staticmethod
-    def create_event_emitter(target: str, topic: str = None) -> IProtoEmitter:
+    def create_event_emitter(target: str, topic: str = None, **options) -> IProtoEmitter:
+        """
+        Args:
+            target: 'log', 'pubsub' (blocking publish) or 'pubsub_batching' (non-blocking, for async apps)
+            topic: Pub/Sub topic
+            options: BatchingPubsubEventEmitter options (max_queue_size, max_batch_size, max_latency)
+        """
         if target == "log":
             return LogEventEmitter()
-        if target == "pubsub":
+        if target in ("pubsub", "pubsub_batching"):
             if not topic:
                 raise ValueError("topic cannot be None")
+            if target == "pubsub_batching":
+                return BatchingPubsubEventEmitter(topic=topic, **options)
             return PubsubEventEmitter(topic=topic)
-        raise ValueError("target must be 'log' or 'pubsub'")
+        raise ValueError("target must be 'log', 'pubsub' or 'pubsub_batching'")
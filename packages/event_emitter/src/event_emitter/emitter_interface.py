@@ -6,3 +6,30 @@ class IProtoEmitter:
     @abstractmethod
     def emit(self, event: Message):
         pass
+
+    async def start(self):
+        """Start background work of the emitter, called on application startup"""
+        pass
+
+    async def stop(self):
+        """Flush buffered events and release resources, called on application shutdown"""
+        pass
+
+    async def publish_many(self, events: list[Message]) -> list[BaseException | None]:
+        """
+        Publish events and wait until every one of them is delivered
+
+        Args:
+            events: events to publish
+
+        Returns:
+            list[BaseException | None]: the publish error of every event, None when it was delivered
+        """
+        results = []
+        for event in events:
+            try:
+                self.emit(event)
+                results.append(None)
+            except Exception as e:
+                results.append(e)
+        return results
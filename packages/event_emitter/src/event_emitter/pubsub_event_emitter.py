@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from google.cloud import pubsub_v1
@@ -21,6 +22,14 @@ class PubsubEventEmitter(IProtoEmitter):
         ).result()
         logging.info("Publish result: %s", res)
 
+    async def publish_many(self, events: list[Message]) -> list[BaseException | None]:
+        futures = [
+            asyncio.wrap_future(self.publisher.publish(self.topic, data=event.SerializeToString()))
+            for event in events
+        ]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return [result if isinstance(result, BaseException) else None for result in results]
+
     @staticmethod
     def _log_event(event_data: str):
         logging.info(event_data)
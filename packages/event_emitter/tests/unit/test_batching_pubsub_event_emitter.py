@@ -0,0 +1,101 @@
+import asyncio
+from concurrent.futures import Future
+
+from alumni_hub.platform import events_pb2
+
+from event_emitter.batching_pubsub_event_emitter import BatchingPubsubEventEmitter
+
+
+class FakePublisher:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.published: list[bytes] = []
+
+    def publish(self, topic: str, data: bytes) -> Future:
+        future = Future()
+        if self.fail:
+            future.set_exception(RuntimeError("publish failed"))
+        else:
+            self.published.append(data)
+            future.set_result(str(len(self.published)))
+        return future
+
+
+def make_event(initiator_id: int) -> events_pb2.Event:
+    return events_pb2.Event(initiator_id=initiator_id)
+
+
+def test_batching_emitter_publishes_in_batches():
+    publisher = FakePublisher()
+    emitter = BatchingPubsubEventEmitter(topic="topic", max_batch_size=10, max_latency=0.01, publisher=publisher)
+
+    async def scenario():
+        await emitter.start()
+        for i in range(25):
+            emitter.emit(make_event(i))
+        await asyncio.sleep(0.1)
+        await emitter.stop()
+
+    asyncio.run(scenario())
+
+    assert [events_pb2.Event.FromString(data).initiator_id for data in publisher.published] == list(range(25))
+    assert emitter.metrics.published == 25
+    assert emitter.metrics.batches == 3
+
+
+def test_batching_emitter_drops_when_full_and_flushes_on_stop():
+    publisher = FakePublisher()
+    emitter = BatchingPubsubEventEmitter(topic="topic", max_queue_size=5, publisher=publisher)
+
+    async def scenario():
+        # not started: events wait in the buffer until stop() flushes it
+        for i in range(8):
+            emitter.emit(make_event(i))
+        await emitter.stop()
+        emitter.emit(make_event(100))
+
+    asyncio.run(scenario())
+
+    assert len(publisher.published) == 5
+    assert emitter.metrics.enqueued == 5
+    assert emitter.metrics.dropped == 4
+
+
+def test_batching_emitter_flushes_the_gathered_batch_on_stop():
+    publisher = FakePublisher()
+    emitter = BatchingPubsubEventEmitter(topic="topic", max_latency=0.5, publisher=publisher)
+
+    async def scenario():
+        await emitter.start()
+        for i in range(3):
+            emitter.emit(make_event(i))
+        # stopped within max_latency: the worker holds the events, the buffer is empty
+        await asyncio.sleep(0.05)
+        await emitter.stop()
+
+    asyncio.run(scenario())
+
+    assert [events_pb2.Event.FromString(data).initiator_id for data in publisher.published] == [0, 1, 2]
+    assert (emitter.metrics.published, emitter.metrics.dropped) == (3, 0)
+
+
+def test_batching_emitter_counts_failures():
+    emitter = BatchingPubsubEventEmitter(topic="topic", publisher=FakePublisher(fail=True))
+
+    async def scenario():
+        emitter.emit(make_event(1))
+        await emitter.stop()
+
+    asyncio.run(scenario())
+
+    assert emitter.metrics.failed == 1
+    assert emitter.metrics.published == 0
+
+
+def test_batching_emitter_publish_many_reports_failures():
+    emitter = BatchingPubsubEventEmitter(topic="topic", publisher=FakePublisher(fail=True))
+
+    results = asyncio.run(emitter.publish_many([make_event(1), make_event(2)]))
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert emitter.metrics.failed == 2
@@ -1,5 +1,14 @@
+from .broker import PublishResult
+from .codecs import Codec, JsonCodec, MsgpackCodec, ProtobufCodec, decode, get_codec
 from .factory import BrokerFactory, BrokerType
 __all__ = [
     'BrokerFactory',
-    'BrokerType'
+    'BrokerType',
+    'Codec',
+    'JsonCodec',
+    'MsgpackCodec',
+    'ProtobufCodec',
+    'PublishResult',
+    'decode',
+    'get_codec',
 ]
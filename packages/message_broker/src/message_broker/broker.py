@@ -1,6 +1,9 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from pydantic import BaseModel
-from typing import Callable, TypeVar, Generic, Union, Awaitable
+from typing import Callable, TypeVar, Generic, Union, Awaitable, Sequence
 
 
 T = TypeVar('T')
@@ -8,6 +11,72 @@ SchemaType = TypeVar('SchemaType', bound=BaseModel)
 MessageHandler = Union[Callable[[T], None], Callable[[T], Awaitable[None]]]
 
 
+@dataclass
+class SubscriptionMetrics:
+    """
+    Counters of a subscription
+
+    Attributes:
+        received: messages passed to the subscription
+        acked: messages handled successfully
+        retried: failed messages left for a redelivery
+        dead_lettered: messages given up after max_attempts
+        in_flight: callbacks running now
+        handler_time: total seconds spent in callbacks
+        started_at: time.monotonic() of the subscription start
+    """
+    received: int = 0
+    acked: int = 0
+    retried: int = 0
+    dead_lettered: int = 0
+    in_flight: int = 0
+    handler_time: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def throughput(self) -> float:
+        """Acked messages per second since the start"""
+        elapsed = time.monotonic() - self.started_at
+        return self.acked / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def avg_handler_time(self) -> float:
+        handled = self.acked + self.retried + self.dead_lettered
+        return self.handler_time / handled if handled else 0.0
+
+
+@dataclass
+class PublishResult:
+    """
+    Outcome of publish_many(), aligned with the published messages
+
+    Attributes:
+        message_ids: message id of every message, None for the failed ones
+        errors: index of a failed message -> its error
+    """
+    message_ids: list[str | None]
+    errors: dict[int, Exception] = field(default_factory=dict)
+
+    @property
+    def published(self) -> int:
+        return len(self.message_ids) - len(self.errors)
+
+    def record(self, index: int, outcome: str | BaseException):
+        """Record the message id or the error of a message"""
+        if isinstance(outcome, BaseException):
+            self.errors[index] = outcome
+        else:
+            self.message_ids[index] = outcome
+
+    @classmethod
+    def from_outcomes(cls, outcomes: Sequence[str | BaseException]) -> 'PublishResult':
+        """Build the result of asyncio.gather(..., return_exceptions=True) over the publishes"""
+        result = cls(message_ids=[None] * len(outcomes))
+        for index, outcome in enumerate(outcomes):
+            result.record(index, outcome)
+        return result
+
+
 class MessageBroker(ABC, Generic[T]):
     """
     Message Broker is an abstract interface for working with message brokers.
@@ -21,12 +90,26 @@ class MessageBroker(ABC, Generic[T]):
     await broker.publish("my-topic", message)
     """
     @abstractmethod
-    async def publish(self, topic: str, message: SchemaType) -> None:
+    async def publish(self, topic: str, message: SchemaType, ordering_key: str | None = None) -> None:
         """
-        Publishing a SchemaType (son of pydantic.BaseModel) message to the specified topic
+        Publishing a SchemaType (son of pydantic.BaseModel) message to the specified topic.
+        Messages with the same ordering_key are delivered in the publish order
+        by the backends that support ordering, the others ignore the key
         """
         pass
 
+    async def publish_many(
+            self, topic: str, messages: Sequence[SchemaType], ordering_key: str | None = None
+    ) -> PublishResult:
+        """
+        Publishing several messages to the topic concurrently, a failed message does not stop the others.
+        The backends override it to batch the messages into a few requests
+        """
+        outcomes = await asyncio.gather(
+            *(self.publish(topic, message, ordering_key) for message in messages), return_exceptions=True
+        )
+        return PublishResult.from_outcomes(outcomes)
+
     @abstractmethod
     async def subscribe(self, sub_topic: str, callback: MessageHandler[T]) -> None:
         """
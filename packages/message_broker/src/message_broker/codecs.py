@@ -0,0 +1,131 @@
+from abc import ABC, abstractmethod
+from typing import Any, Mapping
+
+from google.protobuf import json_format
+from google.protobuf.message import Message as ProtoMessage
+from pydantic import BaseModel
+
+from .broker import SchemaType
+
+# message attribute (Pub/Sub, in-memory) or header (NATS) naming the codec of the payload
+CODEC_ATTRIBUTE = "codec"
+
+
+class Codec(ABC):
+    """
+    Serialization of pydantic messages to the payload bytes.
+
+    The brokers record the name of the codec in the message attributes,
+    decode() picks the codec of a received message by it.
+    """
+    name: str
+
+    @abstractmethod
+    def encode(self, message: BaseModel) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, data: bytes, schema: type[SchemaType]) -> SchemaType:
+        pass
+
+
+class JsonCodec(Codec):
+    """UTF-8 JSON, the format of the messages published without a codec attribute"""
+    name = "json"
+
+    def encode(self, message: BaseModel) -> bytes:
+        # serialize_as_any: fields declared as BaseModel (e.g. params of notifications) keep the fields of the subclass
+        return message.model_dump_json(serialize_as_any=True).encode('utf-8')
+
+    def decode(self, data: bytes, schema: type[SchemaType]) -> SchemaType:
+        return schema.model_validate_json(data)
+
+
+class MsgpackCodec(Codec):
+    """MessagePack of the JSON-compatible dump, requires the msgpack extra of message-broker"""
+    name = "msgpack"
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise ImportError("MsgpackCodec requires msgpack: pip install 'message-broker[msgpack]'") from e
+        self._msgpack = msgpack
+
+    def encode(self, message: BaseModel) -> bytes:
+        return self._msgpack.packb(message.model_dump(mode='json', serialize_as_any=True))
+
+    def decode(self, data: bytes, schema: type[SchemaType]) -> SchemaType:
+        return schema.model_validate(self._msgpack.unpackb(data))
+
+
+class ProtobufCodec(Codec):
+    """
+    Protocol Buffers, a schema is sent as the proto message registered for it.
+
+    The fields are copied by name through the JSON mapping of protobuf, so the proto message
+    mirrors the fields of the schema; fields missing in the proto message are not sent.
+    Both the publisher and the consumer register the schema:
+        ProtobufCodec.register(DTOGeneralNotification, notifications_pb2.Notification)
+    """
+    name = "protobuf"
+    # schema -> proto message class, subclasses of a registered schema use its proto message
+    _proto_types: dict[type[BaseModel], type[ProtoMessage]] = {}
+
+    @classmethod
+    def register(cls, schema: type[BaseModel], proto_type: type[ProtoMessage]):
+        cls._proto_types[schema] = proto_type
+
+    @classmethod
+    def proto_type(cls, schema: type[BaseModel]) -> type[ProtoMessage]:
+        """The proto message registered for the schema or its closest base class
+        Raises:
+            ValueError: no proto message is registered for the schema
+        """
+        for base in schema.__mro__:
+            if base in cls._proto_types:
+                return cls._proto_types[base]
+        raise ValueError(f"No proto message registered for {schema.__name__}")
+
+    def encode(self, message: BaseModel) -> bytes:
+        proto = json_format.ParseDict(
+            message.model_dump(mode='json', exclude_none=True, serialize_as_any=True),
+            self.proto_type(type(message))(),
+            ignore_unknown_fields=True,
+        )
+        return proto.SerializeToString()
+
+    def decode(self, data: bytes, schema: type[SchemaType]) -> SchemaType:
+        proto = self.proto_type(schema).FromString(data)
+        return schema.model_validate(json_format.MessageToDict(proto, preserving_proto_field_name=True))
+
+
+_codecs: dict[str, Codec] = {JsonCodec.name: JsonCodec(), ProtobufCodec.name: ProtobufCodec()}
+
+
+def get_codec(name: str) -> Codec:
+    """Codec by its name (the codec attribute of a message)
+    Raises:
+        ValueError: unknown codec
+    """
+    if name not in _codecs:
+        if name != MsgpackCodec.name:
+            raise ValueError(f"Unknown codec: {name}")
+        # created on the first use, msgpack is an optional dependency
+        _codecs[name] = MsgpackCodec()
+    return _codecs[name]
+
+
+def decode(message: Any, schema: type[SchemaType]) -> SchemaType:
+    """Decode a message received from any broker by the codec recorded in it
+
+    Args:
+        message: received message, with the codec in attributes (Pub/Sub, in-memory) or headers (NATS),
+            messages without it are JSON
+        schema: pydantic model of the message
+    Returns:
+        decoded message
+    """
+    attributes: Mapping[str, str] | None = getattr(message, 'attributes', None) or getattr(message, 'headers', None)
+    name = (attributes or {}).get(CODEC_ATTRIBUTE, JsonCodec.name)
+    return get_codec(name).decode(message.data, schema)
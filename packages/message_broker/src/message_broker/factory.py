@@ -2,29 +2,50 @@ from typing import Optional
 from enum import Enum
 
 from .broker import MessageBroker
-from .google_pubsub import GooglePubSubBroker
+from .codecs import Codec
+from .google_pubsub import GooglePubSubBroker, SubscriberSettings
+from .in_memory import InMemoryBroker
 from .nats import NatsBroker
 
 
 class BrokerType(Enum):
     GOOGLE_PUBSUB = "google_pubsub"
     NATS = "nats"
+    IN_MEMORY = "in_memory"
 
 
-def _create_google_pubsub_broker(project_id: Optional[str] = None, credentials: Optional[any] = None) -> GooglePubSubBroker:
+def _create_google_pubsub_broker(
+        project_id: Optional[str] = None,
+        credentials: Optional[any] = None,
+        enable_message_ordering: bool = False,
+        subscriber_settings: Optional[SubscriberSettings] = None,
+        codec: Optional[Codec] = None,
+        batch_settings: Optional[any] = None,
+) -> GooglePubSubBroker:
     if project_id is None or credentials is None:
         raise ValueError("project_id and credentials required for Google PubSub")
-    return GooglePubSubBroker(project_id=project_id, credentials=credentials)
+    return GooglePubSubBroker(
+        project_id=project_id,
+        credentials=credentials,
+        enable_message_ordering=enable_message_ordering,
+        subscriber_settings=subscriber_settings,
+        codec=codec,
+        batch_settings=batch_settings,
+    )
 
 
 def _create_nats_broker(**kwargs) -> NatsBroker:
-    return NatsBroker()
+    return NatsBroker(**kwargs)
+
+
+def _create_in_memory_broker(**kwargs) -> InMemoryBroker:
+    return InMemoryBroker(**kwargs)
 
 
 class BrokerFactory:
     """
     BrokerFactory creates message broker instances based on the specified type.
-    Supports Google PubSub and NATS (in future) implementations.
+    Supports Google PubSub, NATS JetStream and in-memory (tests and load tests) implementations.
 
     Example:
         broker = BrokerFactory.create_broker(
@@ -36,6 +57,7 @@ class BrokerFactory:
     _BROKER_CREATORS = {
         BrokerType.GOOGLE_PUBSUB: _create_google_pubsub_broker,
         BrokerType.NATS: _create_nats_broker,
+        BrokerType.IN_MEMORY: _create_in_memory_broker,
     }
 
     @classmethod
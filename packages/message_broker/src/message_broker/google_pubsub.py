@@ -1,87 +1,279 @@
 import asyncio
+import logging
+import time
+from dataclasses import dataclass
 
 from google.cloud import pubsub_v1
+from google.protobuf import duration_pb2
 from google.cloud.pubsub_v1.subscriber.message import Message
 
-from typing import Union, Callable, Awaitable
+from typing import Union, Callable, Awaitable, Sequence
 
-from .broker import MessageBroker, SchemaType
+from .broker import MessageBroker, PublishResult, SchemaType, SubscriptionMetrics
+from .codecs import CODEC_ATTRIBUTE, Codec, JsonCodec
+
+
+@dataclass
+class SubscriberSettings:
+    """
+    Flow control and retries of a subscription
+
+    The retries are done by Pub/Sub: subscribe() sets the retry policy (and the dead letter policy
+    when dead_letter_topic is set) of the subscription from these settings, failed messages are nacked.
+
+    Attributes:
+        max_messages: messages leased by the client at a time
+        max_bytes: bytes of the leased messages
+        max_concurrency: callbacks running at a time
+        max_attempts: deliveries of a failing message before it is dead-lettered (5 - 100),
+            None - retried forever. Pub/Sub counts the deliveries only with a dead letter policy,
+            without dead_letter_topic the messages are dropped after max_attempts if the subscription
+            has a dead letter policy of its own and retried forever otherwise
+        retry_backoff: minimum_backoff of the retry policy, seconds before a redelivery (0 - 600),
+            Pub/Sub grows the delay exponentially up to max_retry_backoff
+        max_retry_backoff: maximum_backoff of the retry policy, at most 600
+        dead_letter_topic: Pub/Sub forwards the messages there after max_attempts deliveries,
+            its service account needs the publisher role on the topic and the subscriber role
+            on the subscription
+        configure_subscription: set the policies of the subscription in subscribe(),
+            False - they are managed elsewhere (e.g. terraform)
+    """
+    max_messages: int = 1000
+    max_bytes: int = 100 * 1024 * 1024
+    max_concurrency: int = 64
+    max_attempts: int | None = 5
+    retry_backoff: int = 10
+    max_retry_backoff: int = 600
+    dead_letter_topic: str | None = None
+    configure_subscription: bool = True
 
 
 class GooglePubSubBroker(MessageBroker[Message]):
     """Implements message broker interface using Google Cloud Pub/Sub"""
 
-    def __init__(self, project_id: str, credentials: any):
+    def __init__(
+            self,
+            project_id: str,
+            credentials: any,
+            enable_message_ordering: bool = False,
+            subscriber_settings: SubscriberSettings | None = None,
+            codec: Codec | None = None,
+            batch_settings: pubsub_v1.types.BatchSettings | None = None,
+    ):
         """Initialize Pub/Sub client with project ID and credentials
         Args:
             project_id: Google Cloud project ID
             credentials: Google Cloud credentials
+            enable_message_ordering: publish messages with ordering keys,
+                the subscription must have message ordering enabled too
+            subscriber_settings: flow control and retries of subscriptions
+            codec: serialization of the published messages, JSON by default
+            batch_settings: batching of the publishes by the client, see publish_many()
         """
         self.project_id = project_id
-        self.publisher = pubsub_v1.PublisherClient(credentials=credentials)
+        self.publisher = pubsub_v1.PublisherClient(
+            credentials=credentials,
+            batch_settings=batch_settings or pubsub_v1.types.BatchSettings(),
+            publisher_options=pubsub_v1.types.PublisherOptions(enable_message_ordering=enable_message_ordering),
+        )
+        self.enable_message_ordering = enable_message_ordering
+        self.subscriber_settings = subscriber_settings or SubscriberSettings()
+        self.codec = codec or JsonCodec()
+        # subscription name -> counters
+        self.metrics: dict[str, SubscriptionMetrics] = {}
         self.subscriber = pubsub_v1.SubscriberClient(credentials=credentials)
 
-    async def publish(self, topic: str, message: SchemaType) -> str:
+    async def publish(self, topic: str, message: SchemaType, ordering_key: str | None = None) -> str:
         """Publish message to specified topic
         Args:
             topic: name of the message_broker topic to publish
             message: pydantic model message to publish (based on BaseModel)
+            ordering_key: messages with the same key are delivered in order,
+                ignored unless the broker was created with enable_message_ordering
         Returns:
             Pub/Sub message ID, type str
         """
         topic_path = self.publisher.topic_path(self.project_id, topic)
-        message_data = message.model_dump_json().encode('utf-8')
+        message_data = self.codec.encode(message)
+        ordering_key = ordering_key if ordering_key and self.enable_message_ordering else ""
 
         try:
-            return await asyncio.wrap_future(self.publisher.publish(topic_path, message_data))
+            return await asyncio.wrap_future(
+                self.publisher.publish(
+                    topic_path, message_data, ordering_key=ordering_key, **{CODEC_ATTRIBUTE: self.codec.name}
+                )
+            )
         except Exception as e:
+            if ordering_key:
+                # the client pauses an ordering key after a failed publish, the next messages would fail too
+                self.publisher.resume_publish(topic_path, ordering_key)
             raise Exception(f"Publish error: {str(e)}")
 
+    async def publish_many(
+            self, topic: str, messages: Sequence[SchemaType], ordering_key: str | None = None
+    ) -> PublishResult:
+        """Publish messages to specified topic in batches
+        All messages are handed to the client at once, it sends them in requests of up to
+        batch_settings.max_messages / max_bytes messages, the acks are awaited together.
+        Args:
+            topic: name of the message_broker topic to publish
+            messages: pydantic model messages to publish (based on BaseModel)
+            ordering_key: key of all the messages, see publish()
+        Returns:
+            Pub/Sub message IDs and the errors of the failed messages
+        """
+        topic_path = self.publisher.topic_path(self.project_id, topic)
+        ordering_key = ordering_key if ordering_key and self.enable_message_ordering else ""
+        result = PublishResult(message_ids=[None] * len(messages))
+        pending: dict[int, asyncio.Future] = {}
+        for index, message in enumerate(messages):
+            try:
+                pending[index] = asyncio.wrap_future(self.publisher.publish(
+                    topic_path, self.codec.encode(message), ordering_key=ordering_key,
+                    **{CODEC_ATTRIBUTE: self.codec.name}
+                ))
+            except Exception as e:
+                result.record(index, e)
+
+        outcomes = await asyncio.gather(*pending.values(), return_exceptions=True)
+        for index, outcome in zip(pending, outcomes):
+            result.record(index, outcome)
+        if result.errors and ordering_key:
+            self.publisher.resume_publish(topic_path, ordering_key)
+        return result
+
     async def subscribe(
             self,
             sub_topic: str,
-            callback: Union[Callable[[Message], None], Callable[[Message], Awaitable[None]]]
+            callback: Union[Callable[[Message], None], Callable[[Message], Awaitable[None]]],
+            settings: SubscriberSettings | None = None,
     ) -> None:
-        """Subscribe to messages from specified subscription.
+        """Consume messages of a subscription until cancelled.
+
+        The client leases at most settings.max_messages / settings.max_bytes messages,
+        the callbacks run on the event loop, at most settings.max_concurrency at a time.
+        A message is acked when the callback returns. When it raises, the message is nacked and
+        Pub/Sub redelivers it after the exponential backoff of the retry policy of the subscription,
+        after settings.max_attempts deliveries it is forwarded to settings.dead_letter_topic.
 
                 Args:
                     sub_topic: Name of the subscription to listen to
                     callback: Function to process received messages. Can be either synchronous or asynchronous.
-                             For synchronous: Callable[[Message], None]
+                             For synchronous: Callable[[Message], None], runs in a thread
                              For asynchronous: Callable[[Message], Awaitable[None]]
+                    settings: flow control and retries, the settings of the broker by default
                 """
+        settings = settings or self.subscriber_settings
         subscription_path = self.subscriber.subscription_path(
             self.project_id, sub_topic
         )
+        if settings.configure_subscription:
+            await self._configure_subscription(subscription_path, settings)
+        metrics = self.metrics[sub_topic] = SubscriptionMetrics()
+        semaphore = asyncio.Semaphore(settings.max_concurrency)
+        tasks: set[asyncio.Task] = set()
 
         # Saving the main loop
         main_loop = asyncio.get_running_loop()
 
-        def sync_wrapper(message: Message) -> None:
-            """Synchronous message processing wrapper"""
+        def start_task(message: Message):
+            task = main_loop.create_task(self._handle(message, callback, settings, semaphore, metrics))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        def on_message(message: Message) -> None:
+            """Called in a thread of the client: hands the message over to the loop without waiting"""
+            main_loop.call_soon_threadsafe(start_task, message)
+
+        streaming_pull = self.subscriber.subscribe(
+            subscription_path,
+            callback=on_message,
+            flow_control=pubsub_v1.types.FlowControl(
+                max_messages=settings.max_messages,
+                max_bytes=settings.max_bytes,
+            ),
+        )
+        try:
+            await asyncio.wrap_future(streaming_pull)
+        except asyncio.CancelledError:
+            streaming_pull.cancel()
+            raise
+        except Exception as e:
+            logging.error("Subscription %s error: %s", sub_topic, e)
+            raise
+        finally:
+            # messages of unfinished handlers are redelivered by Pub/Sub
+            for task in tasks:
+                task.cancel()
+            logging.info("Subscription %s stopped: %s", sub_topic, metrics)
+
+    async def _handle(
+            self,
+            message: Message,
+            callback: Union[Callable[[Message], None], Callable[[Message], Awaitable[None]]],
+            settings: SubscriberSettings,
+            semaphore: asyncio.Semaphore,
+            metrics: SubscriptionMetrics,
+    ):
+        metrics.received += 1
+        async with semaphore:
+            metrics.in_flight += 1
+            started = time.monotonic()
             try:
                 if asyncio.iscoroutinefunction(callback):
-                    # We run the coroutine in the main loop
-                    future = asyncio.run_coroutine_threadsafe(
-                        callback(message),
-                        main_loop
-                    )
-                    # Waiting for the result
-                    future.result(timeout=30)
+                    await callback(message)
                 else:
-                    callback(message)
+                    await asyncio.to_thread(callback, message)
             except Exception as e:
-                print(f"Error in the message handler: {str(e)}")
-                message.nack()
+                await self._retry(message, settings, metrics, e)
+                return
+            finally:
+                metrics.in_flight -= 1
+                metrics.handler_time += time.monotonic() - started
+        message.ack()
+        metrics.acked += 1
 
-        # Launching a subscription without blocking
-        future = asyncio.wrap_future(self.subscriber.subscribe(subscription_path, callback=sync_wrapper))
+    async def _configure_subscription(self, subscription_path: str, settings: SubscriberSettings):
+        """Set the retry policy and the dead letter policy of the subscription from the settings"""
+        subscription = pubsub_v1.types.Subscription(
+            name=subscription_path,
+            retry_policy=pubsub_v1.types.RetryPolicy(
+                minimum_backoff=duration_pb2.Duration(seconds=min(settings.retry_backoff, 600)),
+                maximum_backoff=duration_pb2.Duration(seconds=min(settings.max_retry_backoff, 600)),
+            ),
+        )
+        paths = ["retry_policy"]
+        if settings.dead_letter_topic:
+            subscription.dead_letter_policy = pubsub_v1.types.DeadLetterPolicy(
+                dead_letter_topic=self.publisher.topic_path(self.project_id, settings.dead_letter_topic),
+                # None - the longest retries Pub/Sub allows
+                max_delivery_attempts=min(max(settings.max_attempts or 100, 5), 100),
+            )
+            paths.append("dead_letter_policy")
+        try:
+            await asyncio.to_thread(
+                self.subscriber.update_subscription,
+                request={"subscription": subscription, "update_mask": {"paths": paths}},
+            )
+        except Exception as e:
+            # e.g. no pubsub.subscriptions.update permission, the current policies stay
+            logging.warning("Subscription %s: policies not updated: %s", subscription_path, e)
 
-        def on_error(future):
-            try:
-                future.result()
-            except Exception as e:
-                print(f"Subscription error: {str(e)}")
+    async def _retry(self, message: Message, settings: SubscriberSettings, metrics: SubscriptionMetrics, error: Exception):
+        # delivery_attempt is counted by Pub/Sub, only for subscriptions with a dead letter policy
+        attempt = message.delivery_attempt
+        logging.error("Message %s: handler failed (attempt %s): %s", message.message_id, attempt or "?", error)
+
+        if settings.max_attempts is not None and attempt is not None and attempt >= settings.max_attempts:
+            if settings.dead_letter_topic:
+                # the nacked message is forwarded to the dead letter topic by Pub/Sub
+                message.nack()
+            else:
+                logging.warning("Message %s: dropped after %d attempts", message.message_id, attempt)
+                message.ack()
+            metrics.dead_lettered += 1
+            return
 
-        future.add_done_callback(on_error)
-        await future
+        # redelivered after the backoff of the retry policy of the subscription
+        message.nack()
+        metrics.retried += 1
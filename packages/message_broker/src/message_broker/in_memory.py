@@ -0,0 +1,226 @@
+import asyncio
+import itertools
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from .broker import MessageBroker, MessageHandler, PublishResult, SchemaType, SubscriptionMetrics
+from .codecs import CODEC_ATTRIBUTE, Codec, JsonCodec
+
+
+@dataclass
+class InMemoryMessage:
+    """
+    A delivered message, with the fields of a Pub/Sub message the handlers use
+
+    Attributes:
+        data: encoded message
+        attributes: message attributes
+        message_id: id assigned on publish
+        publish_time: time.monotonic() of the publish, for end-to-end latency
+        delivery_attempt: 1 for the first delivery
+    """
+    data: bytes
+    attributes: dict[str, str]
+    message_id: str
+    publish_time: float
+    delivery_attempt: int = 1
+    acked: bool | None = field(default=None, repr=False)
+
+    def ack(self):
+        if self.acked is None:
+            self.acked = True
+
+    def nack(self):
+        if self.acked is None:
+            self.acked = False
+
+
+class InMemoryBroker(MessageBroker[InMemoryMessage]):
+    """
+    Implements message broker interface in process, for tests, load tests and local benchmarks.
+
+    A topic fans out to its subscriptions, each subscription is a queue of its own.
+    Delivery follows the at-least-once model of Pub/Sub: a message is acked when the callback
+    returns, redelivered after redelivery_delay when the callback raises or nacks it,
+    up to max_attempts deliveries, then it goes to dead_letters. duplicate_rate of the acked
+    messages are delivered once more, as a real broker occasionally does.
+    publish_latency and delivery_latency add the network time of a real broker.
+
+    Example:
+        broker = BrokerFactory.create_broker(BrokerType.IN_MEMORY, subscriptions={"my-topic-sub": "my-topic"})
+        asyncio.create_task(broker.subscribe("my-topic-sub", message_handler))
+        await broker.publish("my-topic", message)
+    """
+
+    def __init__(
+            self,
+            subscriptions: dict[str, str] | None = None,
+            publish_latency: float = 0.0,
+            delivery_latency: float = 0.0,
+            max_concurrency: int = 64,
+            max_attempts: int | None = 5,
+            redelivery_delay: float = 0.1,
+            duplicate_rate: float = 0.0,
+            codec: Codec | None = None,
+    ):
+        """
+        Args:
+            subscriptions: subscription name -> topic, more can be added with create_subscription()
+            publish_latency: seconds of a publish
+            delivery_latency: seconds from the publish to the delivery
+            max_concurrency: callbacks running at a time per subscription
+            max_attempts: deliveries of a failing message, None - retried forever
+            redelivery_delay: seconds before a failed message is delivered again
+            duplicate_rate: share of the acked messages delivered twice
+            codec: serialization of the published messages, JSON by default
+        """
+        self.publish_latency = publish_latency
+        self.delivery_latency = delivery_latency
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.redelivery_delay = redelivery_delay
+        self.duplicate_rate = duplicate_rate
+        self.codec = codec or JsonCodec()
+        # subscription name -> counters
+        self.metrics: dict[str, SubscriptionMetrics] = {}
+        # subscription name -> messages given up after max_attempts
+        self.dead_letters: dict[str, list[InMemoryMessage]] = {}
+
+        self._topics: dict[str, list[str]] = {}
+        self._queues: dict[str, asyncio.Queue[InMemoryMessage]] = {}
+        self._ids = itertools.count(1)
+        for sub_topic, topic in (subscriptions or {}).items():
+            self.create_subscription(sub_topic, topic)
+
+    def create_subscription(self, sub_topic: str, topic: str):
+        """Attach a subscription to a topic, it receives the messages published after that"""
+        if sub_topic in self._queues:
+            return
+        self._queues[sub_topic] = asyncio.Queue()
+        self._topics.setdefault(topic, []).append(sub_topic)
+
+    async def publish(self, topic: str, message: SchemaType, ordering_key: str | None = None) -> str:
+        """Publish message to the subscriptions of the topic
+        Args:
+            topic: topic name, a topic without subscriptions drops the message
+            message: pydantic model message to publish (based on BaseModel)
+            ordering_key: ignored, a subscription queue keeps the publish order
+        Returns:
+            message id, type str
+        """
+        if self.publish_latency:
+            await asyncio.sleep(self.publish_latency)
+        return self._publish(topic, message, ordering_key)
+
+    async def publish_many(
+            self, topic: str, messages: Sequence[SchemaType], ordering_key: str | None = None
+    ) -> PublishResult:
+        """Publish messages to the subscriptions of the topic as one request
+        Args:
+            topic: topic name, a topic without subscriptions drops the messages
+            messages: pydantic model messages to publish (based on BaseModel)
+            ordering_key: ignored, a subscription queue keeps the publish order
+        Returns:
+            message ids and the errors of the failed messages
+        """
+        # a batch costs a single publish_latency, as a batched request of a real broker
+        if self.publish_latency:
+            await asyncio.sleep(self.publish_latency)
+        result = PublishResult(message_ids=[None] * len(messages))
+        for index, message in enumerate(messages):
+            try:
+                result.record(index, self._publish(topic, message, ordering_key))
+            except Exception as e:
+                result.record(index, e)
+        return result
+
+    def _publish(self, topic: str, message: SchemaType, ordering_key: str | None) -> str:
+        data = self.codec.encode(message)
+        message_id = str(next(self._ids))
+        attributes = {CODEC_ATTRIBUTE: self.codec.name}
+        if ordering_key:
+            attributes["ordering_key"] = ordering_key
+        publish_time = time.monotonic()
+        for sub_topic in self._topics.get(topic, ()):
+            self._deliver(sub_topic, InMemoryMessage(
+                data=data, attributes=attributes, message_id=message_id, publish_time=publish_time
+            ), self.delivery_latency)
+        return message_id
+
+    async def subscribe(self, sub_topic: str, callback: MessageHandler[InMemoryMessage]) -> None:
+        """Consume messages of a subscription until cancelled
+
+        Args:
+            sub_topic: subscription name, see create_subscription()
+            callback: function to process received messages, synchronous or asynchronous
+        """
+        if sub_topic not in self._queues:
+            raise ValueError(f"Unknown subscription: {sub_topic}")
+        queue = self._queues[sub_topic]
+        metrics = self.metrics[sub_topic] = SubscriptionMetrics()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: set[asyncio.Task] = set()
+        try:
+            while True:
+                message = await queue.get()
+                await semaphore.acquire()
+                task = asyncio.create_task(self._handle(sub_topic, message, callback, metrics))
+                task.add_done_callback(lambda t: semaphore.release())
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _handle(
+            self,
+            sub_topic: str,
+            message: InMemoryMessage,
+            callback: MessageHandler[InMemoryMessage],
+            metrics: SubscriptionMetrics,
+    ):
+        metrics.received += 1
+        metrics.in_flight += 1
+        started = time.monotonic()
+        try:
+            result = callback(message)
+            if asyncio.iscoroutine(result):
+                await result
+            failed = message.acked is False
+        except Exception as e:
+            logging.error("Subscription %s: handler failed on message %s: %s", sub_topic, message.message_id, e)
+            failed = True
+        finally:
+            metrics.in_flight -= 1
+            metrics.handler_time += time.monotonic() - started
+
+        if not failed:
+            metrics.acked += 1
+            if self.duplicate_rate and random.random() < self.duplicate_rate:
+                self._redeliver(sub_topic, message, 0.0)
+            return
+        if self.max_attempts is not None and message.delivery_attempt >= self.max_attempts:
+            metrics.dead_lettered += 1
+            self.dead_letters.setdefault(sub_topic, []).append(message)
+            return
+        metrics.retried += 1
+        self._redeliver(sub_topic, message, self.redelivery_delay)
+
+    def _redeliver(self, sub_topic: str, message: InMemoryMessage, delay: float):
+        self._deliver(sub_topic, InMemoryMessage(
+            data=message.data,
+            attributes=message.attributes,
+            message_id=message.message_id,
+            publish_time=message.publish_time,
+            delivery_attempt=message.delivery_attempt + 1,
+        ), delay)
+
+    def _deliver(self, sub_topic: str, message: InMemoryMessage, delay: float):
+        queue = self._queues[sub_topic]
+        if delay:
+            asyncio.get_running_loop().call_later(delay, queue.put_nowait, message)
+        else:
+            queue.put_nowait(message)
@@ -1,16 +1,215 @@
-from typing import Callable, TypeVar
+import asyncio
+import logging
+from typing import Sequence
 
-from .broker import MessageBroker
+import nats
+from nats.aio.client import Client
+from nats.aio.msg import Msg
+from nats.errors import ConnectionClosedError, ConnectionDrainingError, MsgAlreadyAckdError, TimeoutError as NatsTimeoutError
+from nats.js import JetStreamContext, api
+from nats.js.errors import NotFoundError
 
-NatsMessageType = TypeVar('NatsMessageType')
+from .broker import MessageBroker, MessageHandler, PublishResult, SchemaType
+from .codecs import CODEC_ATTRIBUTE, Codec, JsonCodec
 
 
-class NatsBroker(MessageBroker[NatsMessageType]):
-    def __init__(self):
-        pass
+class NatsBroker(MessageBroker[Msg]):
+    """
+    Implements message broker interface using NATS JetStream.
 
-    async def publish(self, topic: str, message: NatsMessageType) -> None:
-        pass
+    A topic is the subject "<stream>.<topic>" of the stream, subscriptions are durable
+    pull consumers of the stream.
+    publish() waits for the JetStream ack, the acks are awaited asynchronously:
+    concurrent publishes share the connection without a round trip each.
+    subscribe() fetches messages in batches and runs at most max_in_flight callbacks
+    concurrently. A message is acked when its callback returns, and nacked with a growing
+    delay when it raises; after max_deliver attempts JetStream stops redelivering it.
+    """
 
-    async def subscribe(self, topic: str, callback: Callable[[NatsMessageType], None]) -> None:
-        pass
+    def __init__(
+            self,
+            servers: str | list[str] = "nats://localhost:4222",
+            stream: str = "community",
+            max_in_flight: int = 64,
+            fetch_batch: int = 32,
+            fetch_timeout: float = 5.0,
+            ack_wait: float = 30.0,
+            max_deliver: int = 5,
+            publish_max_pending: int = 4000,
+            codec: Codec | None = None,
+    ):
+        """Initialize JetStream broker settings, the connection is opened on the first use
+        Args:
+            servers: NATS server urls
+            stream: JetStream stream of the topics, created if it does not exist
+            max_in_flight: callbacks running concurrently per subscription
+            fetch_batch: messages fetched per request
+            fetch_timeout: seconds a fetch waits for messages
+            ack_wait: seconds before an unacked message is redelivered
+            max_deliver: delivery attempts of a message
+            publish_max_pending: publishes waiting for the ack, further publishes wait
+            codec: serialization of the published messages, JSON by default
+        """
+        self.servers = servers
+        self.stream = stream
+        self.max_in_flight = max_in_flight
+        self.fetch_batch = fetch_batch
+        self.fetch_timeout = fetch_timeout
+        self.ack_wait = ack_wait
+        self.max_deliver = max_deliver
+        self.publish_max_pending = publish_max_pending
+        self.codec = codec or JsonCodec()
+        self._nc: Client | None = None
+        self._js: JetStreamContext | None = None
+        self._connect_lock = asyncio.Lock()
+
+    async def jetstream(self) -> JetStreamContext:
+        """Connect and create the stream if needed"""
+        async with self._connect_lock:
+            if self._js is None:
+                self._nc = await nats.connect(self.servers)
+                js = self._nc.jetstream(publish_async_max_pending=self.publish_max_pending)
+                try:
+                    await js.stream_info(self.stream)
+                except NotFoundError:
+                    await js.add_stream(name=self.stream, subjects=[f"{self.stream}.>"])
+                self._js = js
+        return self._js
+
+    async def publish(self, topic: str, message: SchemaType, ordering_key: str | None = None) -> str:
+        """Publish message to specified subject
+        Args:
+            topic: topic of the stream
+            message: pydantic model message to publish (based on BaseModel)
+            ordering_key: ignored, a stream keeps the publish order of all its messages
+        Returns:
+            stream sequence of the message, type str
+        """
+        js = await self.jetstream()
+        # waits only when publish_max_pending acks are outstanding
+        ack_future = await js.publish_async(
+            self.subject(topic),
+            self.codec.encode(message),
+            stream=self.stream,
+            headers={CODEC_ATTRIBUTE: self.codec.name},
+        )
+        ack: api.PubAck = await ack_future
+        return str(ack.seq)
+
+    async def publish_many(
+            self, topic: str, messages: Sequence[SchemaType], ordering_key: str | None = None
+    ) -> PublishResult:
+        """Publish messages to specified subject without waiting for the acks one by one
+        The messages are written to the connection back to back, the acks are awaited together;
+        a publish waits only while publish_max_pending acks are outstanding.
+        Args:
+            topic: topic of the stream
+            messages: pydantic model messages to publish (based on BaseModel)
+            ordering_key: ignored, see publish()
+        Returns:
+            stream sequences of the messages and the errors of the failed ones
+        """
+        js = await self.jetstream()
+        result = PublishResult(message_ids=[None] * len(messages))
+        pending: dict[int, asyncio.Future] = {}
+        for index, message in enumerate(messages):
+            try:
+                pending[index] = await js.publish_async(
+                    self.subject(topic),
+                    self.codec.encode(message),
+                    stream=self.stream,
+                    headers={CODEC_ATTRIBUTE: self.codec.name},
+                )
+            except Exception as e:
+                result.record(index, e)
+
+        acks = await asyncio.gather(*pending.values(), return_exceptions=True)
+        for index, ack in zip(pending, acks):
+            result.record(index, ack if isinstance(ack, BaseException) else str(ack.seq))
+        return result
+
+    async def subscribe(self, sub_topic: str, callback: MessageHandler[Msg], subject: str | None = None) -> None:
+        """Consume messages of a durable consumer until cancelled.
+
+        Args:
+            sub_topic: name of the durable consumer, created if it does not exist
+            callback: function to process received messages, synchronous or asynchronous;
+                the message is acked when it returns and nacked when it raises
+            subject: topic of a created consumer, all topics of the stream by default
+        """
+        js = await self.jetstream()
+        subscription = await js.pull_subscribe(
+            self.subject(subject or ">"),
+            durable=sub_topic,
+            stream=self.stream,
+            config=api.ConsumerConfig(
+                ack_policy=api.AckPolicy.EXPLICIT,
+                ack_wait=self.ack_wait,
+                max_deliver=self.max_deliver,
+                max_ack_pending=self.max_in_flight,
+            ),
+        )
+
+        slots = asyncio.Semaphore(self.max_in_flight)
+        tasks: set[asyncio.Task] = set()
+        in_flight = 0
+
+        async def handle(message: Msg):
+            nonlocal in_flight
+            try:
+                await self._handle(message, callback)
+            finally:
+                in_flight -= 1
+                slots.release()
+
+        try:
+            while True:
+                # a fetch never takes more messages than there are free slots
+                await slots.acquire()
+                slots.release()
+                batch = min(self.fetch_batch, self.max_in_flight - in_flight)
+                try:
+                    messages = await subscription.fetch(batch, timeout=self.fetch_timeout)
+                except NatsTimeoutError:
+                    continue
+                for message in messages:
+                    await slots.acquire()
+                    in_flight += 1
+                    task = asyncio.create_task(handle(message))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        finally:
+            # unfinished messages are redelivered after ack_wait
+            for task in tasks:
+                task.cancel()
+            try:
+                await subscription.unsubscribe()
+            except (ConnectionClosedError, ConnectionDrainingError):
+                pass
+
+    def subject(self, topic: str) -> str:
+        return f"{self.stream}.{topic}"
+
+    async def _handle(self, message: Msg, callback: MessageHandler[Msg]):
+        try:
+            result = callback(message)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            attempt = message.metadata.num_delivered
+            logging.error("NATS %s: handler failed (attempt %d): %s", message.subject, attempt, e)
+            try:
+                await message.nak(delay=min(2 ** attempt, 60))
+            except MsgAlreadyAckdError:
+                pass
+            return
+        try:
+            await message.ack()
+        except MsgAlreadyAckdError:
+            # the callback acked the message itself
+            pass
+
+    async def close(self):
+        if self._nc is not None:
+            await self._nc.drain()
+            self._nc = self._js = None
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from google.protobuf.struct_pb2 import Struct
+from pydantic import BaseModel
+
+from message_broker import BrokerFactory, BrokerType, JsonCodec, ProtobufCodec, decode, get_codec
+
+
+class Params(BaseModel):
+    meeting_id: int
+
+
+class Notification(BaseModel):
+    text: str
+    count: int
+    params: BaseModel | None = None
+
+
+@pytest.mark.parametrize("name", ["json", "msgpack", "protobuf"])
+async def test_codec_recorded_in_attributes(name):
+    if name == "msgpack":
+        pytest.importorskip("msgpack")
+    # the fields of Struct are the keys of the dump, its numbers are decoded as floats
+    ProtobufCodec.register(Notification, Struct)
+    broker = BrokerFactory.create_broker(
+        BrokerType.IN_MEMORY, subscriptions={"test-sub": "test-topic"}, codec=get_codec(name)
+    )
+    received = []
+    consumer = asyncio.create_task(broker.subscribe("test-sub", received.append))
+    await broker.publish("test-topic", Notification(text="test-data", count=3))
+    await asyncio.sleep(0.01)
+    consumer.cancel()
+
+    assert received[0].attributes["codec"] == name
+    assert decode(received[0], Notification) == Notification(text="test-data", count=3)
+
+
+def test_json_codec_keeps_fields_of_subclasses():
+    data = JsonCodec().encode(Notification(text="test-data", count=1, params=Params(meeting_id=7)))
+
+    assert b'"meeting_id":7' in data
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec("xml")
@@ -1,6 +1,8 @@
+import asyncio
+
 from pydantic import BaseModel
 
-from message_broker.google_pubsub import GooglePubSubBroker
+from message_broker.google_pubsub import GooglePubSubBroker, SubscriberSettings, SubscriptionMetrics
 
 
 class Message(BaseModel):
@@ -13,3 +15,66 @@ async def test_google_pubsub(google_pubsub_config, google_pubsub_emulator):
         credentials=None,
     )
     await broker.publish("test-topic", Message(data="test-data"))
+
+
+class FakeMessage:
+    def __init__(self, message_id: str, delivery_attempt: int | None = None):
+        self.message_id = message_id
+        self.delivery_attempt = delivery_attempt
+        self.data = b"{}"
+        self.attributes = {}
+        self.acked = False
+        self.nacked = False
+
+    def ack(self):
+        self.acked = True
+
+    def nack(self):
+        self.nacked = True
+
+
+async def test_google_pubsub_subscriber_acks_retries_and_limits_concurrency(google_pubsub_config):
+    broker = GooglePubSubBroker(project_id=google_pubsub_config.project, credentials=None)
+    settings = SubscriberSettings(max_concurrency=2, max_attempts=3, retry_backoff=10)
+    metrics = SubscriptionMetrics()
+    semaphore = asyncio.Semaphore(settings.max_concurrency)
+    running = max_running = 0
+
+    async def handler(message):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if message.message_id.startswith("fail"):
+            raise RuntimeError("handler failed")
+
+    messages = [FakeMessage(str(i)) for i in range(6)] + [
+        FakeMessage("fail-1", delivery_attempt=2),
+        FakeMessage("fail-2", delivery_attempt=3),
+    ]
+    await asyncio.gather(*(broker._handle(m, handler, settings, semaphore, metrics) for m in messages))
+
+    assert max_running == 2
+    assert all(m.acked for m in messages[:6])
+    # nacked, redelivered by Pub/Sub after the backoff of the retry policy
+    assert messages[6].nacked and not messages[6].acked
+    # the last attempt: dropped without a dead letter topic
+    assert messages[7].acked and not messages[7].nacked
+    assert (metrics.acked, metrics.retried, metrics.dead_lettered) == (6, 1, 1)
+
+
+async def test_google_pubsub_subscriber_leaves_dead_lettering_to_pubsub(google_pubsub_config):
+    broker = GooglePubSubBroker(project_id=google_pubsub_config.project, credentials=None)
+    settings = SubscriberSettings(max_attempts=5, dead_letter_topic="dead-letters")
+    metrics = SubscriptionMetrics()
+
+    async def handler(message):
+        raise RuntimeError("handler failed")
+
+    messages = [FakeMessage("no-policy"), FakeMessage("last", delivery_attempt=5)]
+    await asyncio.gather(*(broker._handle(m, handler, settings, asyncio.Semaphore(2), metrics) for m in messages))
+
+    # without a delivery count the message is retried, the last attempt is forwarded by Pub/Sub
+    assert all(m.nacked and not m.acked for m in messages)
+    assert (metrics.retried, metrics.dead_lettered) == (1, 1)
@@ -0,0 +1,70 @@
+import asyncio
+
+from pydantic import BaseModel, field_serializer
+
+from message_broker import BrokerFactory, BrokerType
+
+
+class Message(BaseModel):
+    data: str
+
+
+async def test_in_memory():
+    broker = BrokerFactory.create_broker(BrokerType.IN_MEMORY, subscriptions={"test-sub": "test-topic"})
+    received = []
+    consumer = asyncio.create_task(broker.subscribe("test-sub", lambda m: received.append(m.data)))
+    await broker.publish("test-topic", Message(data="test-data"))
+    await asyncio.sleep(0.01)
+    consumer.cancel()
+
+    assert [Message.model_validate_json(data).data for data in received] == ["test-data"]
+
+
+async def test_in_memory_fans_out_and_redelivers_failed_messages():
+    broker = BrokerFactory.create_broker(
+        BrokerType.IN_MEMORY,
+        subscriptions={"first-sub": "test-topic", "second-sub": "test-topic"},
+        max_attempts=3,
+        redelivery_delay=0.01,
+    )
+    attempts = []
+
+    async def failing(message):
+        attempts.append(message.delivery_attempt)
+        raise RuntimeError("handler failed")
+
+    consumers = [
+        asyncio.create_task(broker.subscribe("first-sub", failing)),
+        asyncio.create_task(broker.subscribe("second-sub", lambda m: None)),
+    ]
+    await broker.publish("test-topic", Message(data="test-data"))
+    await asyncio.sleep(0.1)
+    for consumer in consumers:
+        consumer.cancel()
+
+    assert attempts == [1, 2, 3]
+    assert len(broker.dead_letters["first-sub"]) == 1
+    assert broker.metrics["second-sub"].acked == 1
+
+
+class FailingMessage(Message):
+    @field_serializer("data")
+    def fail_on_empty(self, data: str) -> str:
+        if not data:
+            raise ValueError("empty data")
+        return data
+
+
+async def test_in_memory_publish_many_reports_failed_messages():
+    broker = BrokerFactory.create_broker(BrokerType.IN_MEMORY, subscriptions={"test-sub": "test-topic"})
+    received = []
+    consumer = asyncio.create_task(broker.subscribe("test-sub", lambda m: received.append(m.data)))
+    result = await broker.publish_many(
+        "test-topic", [FailingMessage(data="a"), FailingMessage(data=""), FailingMessage(data="b")]
+    )
+    await asyncio.sleep(0.01)
+    consumer.cancel()
+
+    assert result.published == 2
+    assert result.message_ids[1] is None and list(result.errors) == [1]
+    assert [Message.model_validate_json(data).data for data in received] == ["a", "b"]
@@ -0,0 +1,47 @@
+import asyncio
+
+from pydantic import BaseModel
+
+from message_broker.nats import NatsBroker
+
+
+class Message(BaseModel):
+    data: str
+
+
+async def test_nats(nats_config, nats_server):
+    broker = NatsBroker(servers=nats_config.url, stream="test")
+    try:
+        await broker.publish("test-topic", Message(data="test-data"))
+        result = await broker.publish_many("test-topic", [Message(data=str(i)) for i in range(100)])
+    finally:
+        await broker.close()
+
+    assert result.published == 100
+    assert len(set(result.message_ids)) == 100
+
+
+async def test_nats_redelivers_failed_messages(nats_config, nats_server):
+    broker = NatsBroker(servers=nats_config.url, stream="test", max_in_flight=4, fetch_timeout=0.5)
+    received: list[tuple[str, int]] = []
+    done = asyncio.Event()
+
+    async def handler(message):
+        data = Message.model_validate_json(message.data).data
+        received.append((data, message.metadata.num_delivered))
+        if data == "fail" and message.metadata.num_delivered == 1:
+            raise RuntimeError("handler failed")
+        if len(received) == 4:
+            done.set()
+
+    try:
+        for data in ["a", "fail", "b"]:
+            await broker.publish("test-topic", Message(data=data))
+        consumer = asyncio.create_task(broker.subscribe("test-sub", handler, subject="test-topic"))
+        await asyncio.wait_for(done.wait(), timeout=10)
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+    finally:
+        await broker.close()
+
+    assert sorted(received) == [("a", 1), ("b", 1), ("fail", 1), ("fail", 2)]
@@ -0,0 +1,10 @@
+import dataclasses
+
+
+@dataclasses.dataclass
+class NatsConfig:
+    port: int
+
+    @property
+    def url(self) -> str:
+        return f"nats://localhost:{self.port}"
@@ -0,0 +1,49 @@
+import shutil
+import socket
+import subprocess
+import time
+
+import pytest
+
+from message_broker_pytest.nats_conf import NatsConfig
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addini(
+        "nats_port",
+        "Port of the local nats-server started by the nats_server fixture",
+        default="4222",
+    )
+
+
+@pytest.fixture
+def nats_config(request):
+    return NatsConfig(port=int(request.config.getini("nats_port")))
+
+
+@pytest.fixture
+def nats_server(nats_config, tmp_path) -> None:
+    """nats-server with JetStream in a temporary store directory, the test is skipped without the binary"""
+    binary = shutil.which("nats-server")
+    if binary is None:
+        pytest.skip("nats-server is not installed")
+    process = subprocess.Popen(
+        [binary, "-js", "-p", str(nats_config.port), "-sd", str(tmp_path)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("localhost", nats_config.port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                process.kill()
+                pytest.fail("nats-server did not start")
+            time.sleep(0.05)
+
+    yield
+
+    process.terminate()
+    process.wait()
@@ -0,0 +1,67 @@
+"""
+Payload codecs of message_broker on the notification DTOs.
+
+For DTOGeneralNotification (as published to the notifications topic) and DTOUserNotification
+(as published to the telegram topic) reports per codec: payload bytes, encode and decode time
+per message (decode includes the pydantic validation the consumers do) and whether the decoded
+message equals the original one.
+
+Usage (from apps/notifications with the venv activated; msgpack is the msgpack extra of message-broker):
+    python ../../scripts/benchmark_codecs.py
+    python ../../scripts/benchmark_codecs.py --number 100000
+"""
+import argparse
+import timeit
+from datetime import datetime, UTC
+
+from alumni_hub.platform.notifications_pb2 import Notification
+from common_db.enums.notifications import ENotificationType
+from common_db.schemas import DTOGeneralNotification, DTONotifiedUserProfile, DTOUserNotification
+from common_db.schemas.notification_params import DTOMeetingInvitationParams
+from message_broker import JsonCodec, MsgpackCodec, ProtobufCodec
+
+
+def messages() -> dict[str, DTOGeneralNotification]:
+    general = DTOGeneralNotification(
+        notification_type=ENotificationType.meeting_invitation,
+        user_id=1024,
+        params=DTOMeetingInvitationParams(inviter_id=512, invited_id=1024, meeting_id=77),
+        timestamp=datetime(2025, 3, 1, 12, 30, tzinfo=UTC),
+    )
+    user = DTOUserNotification(
+        **general.model_dump(exclude_none=True, serialize_as_any=True),
+        user=DTONotifiedUserProfile(
+            id=1024, name="Ivan", surname="Petrov", email="ivan.petrov@example.com",
+            linkedin_link="https://www.linkedin.com/in/ivan-petrov", telegram_name="ivan_petrov",
+            telegram_id=123456789,
+        ),
+    )
+    return {"DTOGeneralNotification": general, "DTOUserNotification": user}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20_000, help="encodes and decodes per measurement")
+    args = parser.parse_args()
+
+    ProtobufCodec.register(DTOGeneralNotification, Notification)
+    codecs = [JsonCodec(), ProtobufCodec()]
+    try:
+        codecs.append(MsgpackCodec())
+    except ImportError as e:
+        print(f"msgpack skipped: {e}")
+
+    for schema_name, message in messages().items():
+        schema = type(message)
+        print(f"{schema_name}:")
+        print(f"  {'codec':<10}{'bytes':>7}{'encode us':>12}{'decode us':>12}  round trip")
+        for codec in codecs:
+            data = codec.encode(message)
+            encode = timeit.timeit(lambda: codec.encode(message), number=args.number) / args.number
+            decode = timeit.timeit(lambda: codec.decode(data, schema), number=args.number) / args.number
+            same = codec.decode(data, schema) == message
+            print(f"  {codec.name:<10}{len(data):>7}{encode * 1e6:>12.2f}{decode * 1e6:>12.2f}  {'ok' if same else 'differs'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Plan comparison for the composite/covering indexes and partitioning of migration 9a4c3e7f1b26.
+
+Every query is explained with the new indexes, then once more inside a transaction where the
+indexes are dropped, and the transaction is rolled back. DROP INDEX takes an exclusive lock
+on the table: run it against a staging database only.
+
+Usage (from packages/common_db with the venv activated and migrations applied):
+    python ../../scripts/benchmark_indexes.py --seed
+    python ../../scripts/benchmark_indexes.py
+    python ../../scripts/benchmark_indexes.py --cleanup
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from common_db.config import schema
+from common_db.db_abstract import db_manager
+
+BENCH_EMAIL_DOMAIN = "bench.local"
+
+# (title, query, indexes of the migration used by the query)
+QUERIES = [
+    (
+        "FormsManager.send_match: latest matching result of a form",
+        f"""SELECT * FROM {schema}.matching_results
+            WHERE user_id = :user_id AND form_id = :form_id
+            ORDER BY created_at DESC LIMIT 1""",
+        ["ix_matching_results_user_id_form_id_created_at"],
+    ),
+    (
+        "FormsManager.get_user_form: latest form by intent",
+        f"""SELECT * FROM {schema}.forms
+            WHERE user_id = :user_id AND intent = 'connects'
+            ORDER BY created_at DESC LIMIT 1""",
+        ["ix_form_user_id_intent_created_at"],
+    ),
+    (
+        "Upcoming meeting responses of a user",
+        f"""SELECT mr.meeting_id, mr.role, mr.response, m.status
+            FROM {schema}.meeting_responses mr
+            JOIN {schema}.meetings m ON m.id = mr.meeting_id
+            WHERE mr.user_id = :user_id AND m.scheduled_time >= now()""",
+        ["ix_meeting_responses_user_id_covering", "ix_meeting_id_scheduled_time"],
+    ),
+    (
+        "Matching results retention scan",
+        f"""SELECT count(*) FROM {schema}.matching_results
+            WHERE created_at < now() - INTERVAL '180 days'""",
+        ["ix_matching_results_created_at_brin"],
+    ),
+    (
+        "linkedin_raw_data: last week (partition pruning)",
+        f"""SELECT count(*) FROM {schema}.linkedin_raw_data
+            WHERE parsed_date >= now() - INTERVAL '7 days'""",
+        [],
+    ),
+]
+
+
+async def seed(users_count: int) -> None:
+    async with db_manager.session() as session:
+        await session.execute(text(f"""
+            INSERT INTO {schema}.users (name, surname, email)
+            SELECT 'Bench', 'User' || g, 'index' || g || '@{BENCH_EMAIL_DOMAIN}'
+            FROM generate_series(1, :users_count) AS g
+        """), {"users_count": users_count})
+        bench_users = f"SELECT id FROM {schema}.users WHERE email LIKE 'index%%@{BENCH_EMAIL_DOMAIN}'"
+        # 50 forms per user over the last year
+        await session.execute(text(f"""
+            INSERT INTO {schema}.forms (user_id, intent, content, created_at, updated_at)
+            SELECT u.id, (ARRAY['connects', 'mock_interview', 'mentoring_mentor'])[1 + g % 3]::{schema}.form_intent_type_enum,
+                   '{{}}'::json, now() - g * INTERVAL '7 days', now() - g * INTERVAL '7 days'
+            FROM ({bench_users}) u, generate_series(1, 50) AS g
+        """))
+        # 20 matching results per form, spread over two years
+        await session.execute(text(f"""
+            INSERT INTO {schema}.matching_results
+                (model_settings_preset, match_users_count, user_id, form_id, matching_result, created_at, updated_at)
+            SELECT 'bench', 5, f.user_id, f.id, ARRAY[1, 2, 3],
+                   now() - (g * 36) * INTERVAL '1 day', now() - (g * 36) * INTERVAL '1 day'
+            FROM {schema}.forms f, generate_series(1, 20) AS g
+            WHERE f.user_id IN ({bench_users})
+        """))
+        # a meeting per user for every tenth matching result, organizer + attendee
+        await session.execute(text(f"""
+            INSERT INTO {schema}.meetings (organizer_id, match_id, scheduled_time, location, status)
+            SELECT mr.user_id, mr.id, now() + (mr.id % 60 - 30) * INTERVAL '1 day', 'online', 'no_answer'
+            FROM {schema}.matching_results mr
+            WHERE mr.user_id IN ({bench_users}) AND mr.id % 10 = 0
+        """))
+        await session.execute(text(f"""
+            INSERT INTO {schema}.meeting_responses
+                (user_id, meeting_id, meeting_organizer_id, meeting_match_id, role, response)
+            SELECT m.organizer_id, m.id, m.organizer_id, m.match_id, 'organizer', 'confirmed'
+            FROM {schema}.meetings m WHERE m.organizer_id IN ({bench_users})
+            UNION ALL
+            SELECT m.organizer_id + 1, m.id, m.organizer_id, m.match_id, 'attendee', 'no_answer'
+            FROM {schema}.meetings m
+            WHERE m.organizer_id IN ({bench_users}) AND m.organizer_id + 1 IN ({bench_users})
+        """))
+        await session.execute(text(f"""
+            INSERT INTO {schema}.linkedin_raw_data (target_linkedin_url, raw_data, parsed_date)
+            SELECT 'https://www.linkedin.com/in/bench-' || g, '{{}}'::jsonb, now() - (g % 700) * INTERVAL '1 day'
+            FROM generate_series(1, :rows) AS g
+        """), {"rows": users_count * 100})
+        for table in ("forms", "matching_results", "meetings", "meeting_responses", "linkedin_raw_data"):
+            await session.execute(text(f"ANALYZE {schema}.{table}"))
+    print(f"Seeded {users_count} users")
+
+
+async def cleanup() -> None:
+    async with db_manager.session() as session:
+        bench_users = f"SELECT id FROM {schema}.users WHERE email LIKE 'index%%@{BENCH_EMAIL_DOMAIN}'"
+        await session.execute(text(f"DELETE FROM {schema}.meetings WHERE organizer_id IN ({bench_users})"))
+        await session.execute(text(f"DELETE FROM {schema}.matching_results WHERE user_id IN ({bench_users})"))
+        await session.execute(text(f"DELETE FROM {schema}.forms WHERE user_id IN ({bench_users})"))
+        await session.execute(text(f"DELETE FROM {schema}.users WHERE id IN ({bench_users})"))
+        await session.execute(text(
+            f"DELETE FROM {schema}.linkedin_raw_data WHERE target_linkedin_url LIKE 'https://www.linkedin.com/in/bench-%%'"
+        ))
+    print("Benchmark data removed")
+
+
+async def explain(session, query: str, params: dict) -> str:
+    result = await session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) {query}"), params)
+    return "\n".join("    " + row[0] for row in result)
+
+
+async def run() -> None:
+    async with db_manager.session() as session:
+        row = (await session.execute(text(
+            f"SELECT user_id, form_id FROM {schema}.matching_results ORDER BY id DESC LIMIT 1"
+        ))).first()
+    if row is None:
+        print("matching_results is empty, run with --seed first")
+        return
+    params = {"user_id": row.user_id, "form_id": row.form_id}
+
+    for title, query, indexes in QUERIES:
+        bound = {name: value for name, value in params.items() if f":{name}" in query}
+        print(f"\n=== {title}")
+        async with db_manager.session_maker() as session:
+            print("  with indexes:")
+            print(await explain(session, query, bound))
+        if not indexes:
+            continue
+        async with db_manager.session_maker() as session:
+            # DDL is transactional in Postgres, the indexes come back with the rollback
+            for index_name in indexes:
+                await session.execute(text(f"DROP INDEX {schema}.{index_name}"))
+            print("  without " + ", ".join(indexes) + ":")
+            print(await explain(session, query, bound))
+            await session.rollback()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="insert synthetic data before the run")
+    parser.add_argument("--users", type=int, default=1000, help="number of users to seed")
+    parser.add_argument("--cleanup", action="store_true", help="remove the seeded data and exit")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        asyncio.run(cleanup())
+        return
+    if args.seed:
+        asyncio.run(seed(args.users))
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
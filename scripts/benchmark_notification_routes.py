@@ -0,0 +1,138 @@
+"""
+Routing cost of notifications: resolving the channels of 10k recipients from the compact
+user_notification_routes table against loading their profiles from users.
+
+Seeds N synthetic users (50k by default; wide rows: avatars, about, company arrays; about a third
+with telegram notifications on, a fifth with email) and, for a random sample of recipients, times:
+    ORM profiles      - ORMUserProfile entities, as loaded per user before batching
+    profile columns   - UserManager.get_notified_users (the DTONotifiedUserProfile columns of users)
+    routes            - UserManager.get_notification_routes
+    routes + profiles - the path of NotificationSender: the routes, then the profile columns of
+                        the recipients that have a channel
+and prints the median per batch with the buffers read by the users and the routes lookups.
+
+Usage (from packages/common_db with the venv activated and migrations applied):
+    python ../../scripts/benchmark_notification_routes.py --seed --users 50000
+    python ../../scripts/benchmark_notification_routes.py --recipients 10000 --runs 20
+    python ../../scripts/benchmark_notification_routes.py --cleanup
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import select, text
+
+from common_db.config import schema
+from common_db.db_abstract import db_manager
+from common_db.managers import UserManager
+from common_db.models import ORMUserProfile
+
+BENCH_EMAIL_DOMAIN = "bench.local"
+
+
+async def seed(users_count: int) -> None:
+    """Insert synthetic users, the triggers of user_notification_routes copy their routing columns"""
+    async with db_manager.session() as session:
+        await session.execute(text(f"""
+            INSERT INTO {schema}.users (name, surname, email, about, avatars, timezone, telegram_id,
+                                        is_tg_notify, is_email_notify, is_push_notify, is_tg_bot_blocked,
+                                        communities_companies_domains, recommender_companies, vacancy_pages)
+            SELECT 'Bench', 'Route' || g, 'route' || g || '@{BENCH_EMAIL_DOMAIN}',
+                   repeat(md5(g::text), 9),
+                   ARRAY['https://storage.example.com/avatars/' || md5(g::text) || '.webp'],
+                   (ARRAY['Europe/Moscow', 'Europe/Berlin', 'Asia/Almaty', NULL])[1 + g % 4],
+                   1000000 + g, g % 3 = 0, g % 5 = 0, false, g % 50 = 0,
+                   ARRAY['example.com', 'example.org'], ARRAY['Yandex', 'Ozon'],
+                   ARRAY['https://careers.example.com/' || g]
+            FROM generate_series(1, :users_count) AS g
+        """), {"users_count": users_count})
+        await session.execute(text(f"ANALYZE {schema}.users"))
+        await session.execute(text(f"ANALYZE {schema}.user_notification_routes"))
+    print(f"Seeded {users_count} users")
+
+
+async def cleanup() -> None:
+    async with db_manager.session() as session:
+        await session.execute(text(f"DELETE FROM {schema}.users WHERE email LIKE 'route%%@{BENCH_EMAIL_DOMAIN}'"))
+    print("Benchmark data removed")
+
+
+async def orm_profiles(user_ids: set[int], session) -> int:
+    result = await session.scalars(select(ORMUserProfile).where(ORMUserProfile.id.in_(user_ids)))
+    return len(result.all())
+
+
+async def profile_columns(user_ids: set[int], session) -> int:
+    return len(await UserManager.get_notified_users(user_ids, session=session))
+
+
+async def routes(user_ids: set[int], session) -> int:
+    return len(await UserManager.get_notification_routes(user_ids, session=session))
+
+
+async def routes_and_profiles(user_ids: set[int], session) -> int:
+    user_routes = await UserManager.get_notification_routes(user_ids, session=session)
+    routed = {user_id for user_id, route in user_routes.items() if route.has_channels}
+    return len(await UserManager.get_notified_users(routed, session=session))
+
+
+async def buffers(session, query: str, user_ids: list[int]) -> str:
+    result = await session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"), {"ids": user_ids})
+    raw = result.scalar()
+    # the json of the plan comes as text without a json codec of the driver
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    return f"shared hit {plan['Shared Hit Blocks']}, read {plan['Shared Read Blocks']}"
+
+
+async def run(recipients: int, runs: int) -> None:
+    async with db_manager.session() as session:
+        user_ids = list((await session.scalars(text(
+            f"SELECT id FROM {schema}.users WHERE email LIKE 'route%%@{BENCH_EMAIL_DOMAIN}'"
+        ))).all())
+    if len(user_ids) < recipients:
+        print(f"{len(user_ids)} benchmark users, run with --seed --users {recipients} at least")
+        return
+
+    print(f"{recipients} recipients, median of {runs} runs:")
+    for title, lookup in (("ORM profiles", orm_profiles), ("profile columns", profile_columns),
+                          ("routes", routes), ("routes + profiles", routes_and_profiles)):
+        timings = []
+        for _ in range(runs):
+            sample = set(random.sample(user_ids, recipients))
+            async with db_manager.session_maker() as session:
+                started = time.perf_counter()
+                found = await lookup(sample, session)
+                timings.append(time.perf_counter() - started)
+        print(f"  {title:<18} {statistics.median(timings) * 1000:8.1f} ms  ({found} rows)")
+
+    sample = random.sample(user_ids, recipients)
+    async with db_manager.session_maker() as session:
+        print("buffers of one lookup:")
+        print("  users  ", await buffers(
+            session, f"SELECT * FROM {schema}.users WHERE id = ANY(:ids)", sample))
+        print("  routes ", await buffers(
+            session, f"SELECT * FROM {schema}.user_notification_routes WHERE user_id = ANY(:ids)", sample))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="insert synthetic users before the run")
+    parser.add_argument("--users", type=int, default=50_000, help="number of users to seed")
+    parser.add_argument("--recipients", type=int, default=10_000, help="recipients per lookup")
+    parser.add_argument("--runs", type=int, default=20, help="lookups per variant")
+    parser.add_argument("--cleanup", action="store_true", help="remove the seeded data and exit")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        asyncio.run(cleanup())
+        return
+    if args.seed:
+        asyncio.run(seed(args.users))
+    asyncio.run(run(args.recipients, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Throughput of the outbox relay (apps/web_gateway/src/web_gateway/outbox_relay.py).
+
+Seeds N unsent events into the outbox and drains them with K concurrent relays,
+each in its own transaction stream, publishing into an in-memory emitter with an
+optional simulated publish latency. Reports events/sec and checks that every event
+was published exactly once, which shows that FOR UPDATE SKIP LOCKED splits the
+backlog between the relays.
+
+Usage (from apps/web_gateway with the venv activated and migrations applied):
+    python ../../scripts/benchmark_outbox.py --events 50000 --relays 1 2 4 8
+    python ../../scripts/benchmark_outbox.py --publish-latency 0.02
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from google.protobuf.message import Message
+from sqlalchemy import text
+
+from alumni_hub.platform import events_pb2
+from common_db.config import schema
+from common_db.db_abstract import db_manager
+from event_emitter import IProtoEmitter
+from web_gateway.outbox_relay import OutboxRelay
+
+BENCH_TOPIC = "outbox-benchmark"
+
+
+class CountingEmitter(IProtoEmitter):
+    def __init__(self, publish_latency: float):
+        self.publish_latency = publish_latency
+        self.published: Counter[int] = Counter()
+
+    def emit(self, event: Message):
+        self.published[event.meeting_invitation.meeting_id] += 1
+
+    async def publish_many(self, events: list[Message]) -> list[BaseException | None]:
+        # a batch is acknowledged as a whole, like the batches of the Pub/Sub client
+        await asyncio.sleep(self.publish_latency)
+        for event in events:
+            self.emit(event)
+        return [None] * len(events)
+
+
+async def seed(events_count: int) -> None:
+    payloads = [
+        {
+            "topic": BENCH_TOPIC,
+            "payload": events_pb2.Event(
+                event_type=events_pb2.eMeetingInvitation,
+                initiator_id=1,
+                recipient_id=2,
+                meeting_invitation=events_pb2.MeetingInvitationEvent(meeting_id=i),
+            ).SerializeToString(),
+        }
+        for i in range(events_count)
+    ]
+    async with db_manager.session() as session:
+        await session.execute(text(f"DELETE FROM {schema}.outbox WHERE topic = :topic"), {"topic": BENCH_TOPIC})
+        await session.execute(
+            text(f"INSERT INTO {schema}.outbox (topic, payload) VALUES (:topic, :payload)"), payloads
+        )
+
+
+async def drain(relays: list[OutboxRelay]) -> None:
+    async def drain_one(relay: OutboxRelay):
+        while await relay.run_once():
+            pass
+
+    await asyncio.gather(*(drain_one(relay) for relay in relays))
+
+
+async def run(events_count: int, relays_counts: list[int], batch_size: int, publish_latency: float) -> None:
+    print(f"{'relays':>6} {'events':>8} {'seconds':>8} {'events/s':>10} {'duplicates':>10}")
+    for relays_count in relays_counts:
+        await seed(events_count)
+        emitter = CountingEmitter(publish_latency)
+        relays = [OutboxRelay(get_emitter=lambda _: emitter, batch_size=batch_size) for _ in range(relays_count)]
+
+        started = time.perf_counter()
+        await drain(relays)
+        elapsed = time.perf_counter() - started
+
+        published = sum(emitter.published.values())
+        duplicates = published - len(emitter.published)
+        assert len(emitter.published) == events_count, "not every event was published"
+        print(f"{relays_count:>6} {published:>8} {elapsed:>8.2f} {published / elapsed:>10.0f} {duplicates:>10}")
+
+    async with db_manager.session() as session:
+        await session.execute(text(f"DELETE FROM {schema}.outbox WHERE topic = :topic"), {"topic": BENCH_TOPIC})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20_000, help="events seeded per run")
+    parser.add_argument("--relays", type=int, nargs="+", default=[1, 2, 4], help="concurrent relays per run")
+    parser.add_argument("--batch-size", type=int, default=500, help="events claimed per transaction")
+    parser.add_argument("--publish-latency", type=float, default=0.0, help="simulated publish time of a batch, s")
+    args = parser.parse_args()
+    asyncio.run(run(args.events, args.relays, args.batch_size, args.publish_latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Serialization throughput of web_gateway responses.
+
+Compares, for a user profile, a page of meetings and a page of notifications:
+- fastapi: the default FastAPI path for a route with response_model - model_dump with the
+  enum post-pass, validation of the dump against response_model, jsonable serialization,
+  json.dumps;
+- schema: the SchemaRoute path of web_gateway.responses - pydantic-core to_json of the model.
+
+Usage (from apps/web_gateway with the venv activated):
+    python ../../scripts/benchmark_serialization.py
+    python ../../scripts/benchmark_serialization.py --number 5000
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from common_db.schemas import DTOUserProfileRead, MeetingList, DTOUserNotificationRead
+from web_gateway.responses import dumps
+
+NOW = datetime(2026, 1, 1, 12, 0)
+TIMESTAMPS = {"created_at": NOW, "updated_at": NOW}
+
+
+def make_profile(user_id: int) -> dict:
+    return {
+        "id": user_id,
+        "name": "Name",
+        "surname": f"Surname{user_id}",
+        "email": f"user{user_id}@example.com",
+        "avatars": ["https://storage.googleapis.com/bucket/hash/webp.webp"],
+        "about": "About " * 30,
+        "telegram_name": f"user{user_id}",
+        "telegram_id": 100000 + user_id,
+        "city": "Belgrade",
+        "who_to_date_with": "anyone",
+        "who_sees_profile": "anyone",
+        "who_sees_current_job": "nobody",
+        "who_sees_contacts": "anyone",
+        "who_sees_calendar": "nobody",
+        "profile_type": "new",
+        "meeting_responses": [
+            {"id": i, **TIMESTAMPS, "user_id": user_id, "meeting_id": i, "role": "attendee", "response": "confirmed"}
+            for i in range(10)
+        ],
+        "specialisations": [
+            {
+                "user_id": user_id,
+                "specialisation_id": i,
+                "grade": "senior",
+                "specialisation": {"id": i, "label": f"Specialisation {i}", "expertise_area": "development"},
+            }
+            for i in range(5)
+        ],
+        "interests": [{"id": i, "label": f"Interest {i}", "interest_area": "interest1"} for i in range(10)],
+        "industry": [{"label": "industry1"}, {"label": "industry2"}],
+        "skills": [{"id": i, "label": f"Skill {i}", "skill_area": "skill1"} for i in range(20)],
+        "requests_to_community": [{"id": 1, "label": "Friends", "requests_area": "friendship"}],
+        "communities_companies_domains": ["example.com"],
+    }
+
+
+def make_meetings(count: int) -> dict:
+    return {
+        "meetings": [
+            {
+                "id": i,
+                **TIMESTAMPS,
+                "location": "online",
+                "scheduled_time": NOW + timedelta(days=i),
+                "status": "no_answer",
+                "description": "Coffee",
+                "user_responses": [
+                    {"id": j, **TIMESTAMPS, "user_id": j, "role": "attendee", "response": "no_answer"}
+                    for j in range(3)
+                ],
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def make_notifications(count: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            **TIMESTAMPS,
+            "notification_type": "meeting_invitation",
+            "user_id": 1,
+            "text": "You are invited to a meeting",
+            "params": {"inviter_id": 2, "invited_id": 1, "meeting_id": i},
+            "is_read": False,
+        }
+        for i in range(count)
+    ]
+
+
+def fastapi_path(adapter: TypeAdapter, value) -> bytes:
+    # what serialize_response does for a route with response_model
+    content = [item.model_dump(by_alias=True) for item in value] if isinstance(value, list) \
+        else value.model_dump(by_alias=True)
+    validated = adapter.validate_python(content)
+    return json.dumps(
+        jsonable_encoder(adapter.dump_python(validated, mode="json", by_alias=True)),
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=2000, help="serializations per payload and path")
+    args = parser.parse_args()
+
+    payloads = [
+        ("DTOUserProfileRead", DTOUserProfileRead, make_profile(1)),
+        ("MeetingList (50 meetings)", MeetingList, make_meetings(50)),
+        ("list[DTOUserNotificationRead] (30)", list[DTOUserNotificationRead], make_notifications(30)),
+    ]
+    print(f"{'payload':<38} {'bytes':>7} {'fastapi/s':>10} {'schema/s':>10} {'speedup':>8}")
+    for title, model, data in payloads:
+        adapter = TypeAdapter(model)
+        value = adapter.validate_python(data)
+        assert json.loads(fastapi_path(adapter, value)) == json.loads(dumps(value))
+
+        fastapi_time = timeit.timeit(lambda: fastapi_path(adapter, value), number=args.number)
+        schema_time = timeit.timeit(lambda: dumps(value), number=args.number)
+        print(f"{title:<38} {len(dumps(value)):>7} {args.number / fastapi_time:>10.0f} "
+              f"{args.number / schema_time:>10.0f} {fastapi_time / schema_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
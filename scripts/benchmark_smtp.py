@@ -0,0 +1,111 @@
+"""
+Throughput of the SMTP connection pool of the notifications app against a local SMTP server.
+
+Starts an aiosmtpd server (implicit TLS with a self-signed certificate made by openssl, AUTH LOGIN/PLAIN
+accepting any password) and sends the same messages twice:
+    per-message - a session per message (connect, TLS handshake, login, send, quit), as before the pool
+    pooled      - the sessions are kept open and reused, max_messages_per_connection messages each
+and reports emails per second and the sessions opened.
+
+Usage (from apps/notifications with the venv activated; aiosmtpd is a dev dependency):
+    python ../../scripts/benchmark_smtp.py
+    python ../../scripts/benchmark_smtp.py --messages 5000 --pool-size 8 --no-tls
+"""
+import argparse
+import asyncio
+import ssl
+import subprocess
+import tempfile
+import logging
+import time
+from email.mime.text import MIMEText
+from pathlib import Path
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+from notifications.smtp_mailing.pool import SmtpConnectionPool
+
+USERNAME = "sender@example.com"
+
+# aiosmtpd logs a warning on every login about its own deprecated attribute
+logging.getLogger("mail.log").setLevel(logging.ERROR)
+
+
+class CountingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def authenticator(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=True)
+
+
+def server_ssl_context(directory: Path) -> ssl.SSLContext:
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=localhost",
+         "-keyout", str(key), "-out", str(cert)],
+        check=True, capture_output=True,
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def message(index: int) -> MIMEText:
+    body = MIMEText(f"Notification {index}: you have been invited to a meeting.", "plain")
+    body["From"] = USERNAME
+    body["To"] = f"user{index}@example.com"
+    body["Subject"] = "Meeting invitation"
+    return body
+
+
+async def run(pool: SmtpConnectionPool, messages: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(pool.send(message(index)) for index in range(messages)))
+    elapsed = time.perf_counter() - start
+    await pool.close()
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000, help="emails per run")
+    parser.add_argument("--pool-size", type=int, default=4, help="sessions open at a time")
+    parser.add_argument("--max-messages-per-connection", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8465)
+    parser.add_argument("--no-tls", action="store_true", help="plain SMTP, no TLS handshakes")
+    args = parser.parse_args()
+
+    handler = CountingHandler()
+    with tempfile.TemporaryDirectory() as directory:
+        ssl_context = None if args.no_tls else server_ssl_context(Path(directory))
+        controller = Controller(
+            handler, hostname="127.0.0.1", port=args.port, ssl_context=ssl_context,
+            authenticator=authenticator, auth_require_tls=False,
+        )
+        controller.start()
+        try:
+            modes = {"per-message": 1, "pooled": args.max_messages_per_connection}
+            for mode, max_messages in modes.items():
+                pool = SmtpConnectionPool(
+                    hostname="127.0.0.1", port=args.port, username=USERNAME, password="secret",
+                    use_tls=not args.no_tls, validate_certs=False, size=args.pool_size,
+                    max_messages_per_connection=max_messages,
+                )
+                elapsed = await run(pool, args.messages)
+                print(f"{mode:<12} {args.messages / elapsed:>9.0f} emails/s  "
+                      f"sessions opened: {pool.metrics.connects:>5}  sent: {pool.metrics.sent}  "
+                      f"failed: {pool.metrics.failed}")
+        finally:
+            controller.stop()
+    print(f"received by the server: {handler.received}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+Connections and fan-out of the web_gateway event hub (Server-Sent Events).
+
+Opens --connections subscriptions, each read by a task like the /events stream,
+and reports:
+- memory per connection: the subscription, its queue and the reading task (tracemalloc);
+- fan-out: events per second published into the hub to random users and the time until
+  all of them were read by the connections.
+
+Usage (from apps/web_gateway with the venv activated):
+    python ../../scripts/benchmark_sse_hub.py
+    python ../../scripts/benchmark_sse_hub.py --connections 50000 --users 20000 --events 200000
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+
+from web_gateway.events.hub import EventHub, Subscription, UserEvent
+
+
+async def read(subscription: Subscription, received: list[int]):
+    while not subscription.overflowed:
+        await subscription.queue.get()
+        received[0] += 1
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=5_000, help="connections are spread over the users")
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+
+    hub = EventHub(max_connections=args.connections)
+    received = [0]
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    subscriptions = [hub.subscribe(i % args.users) for i in range(args.connections)]
+    readers = [asyncio.create_task(read(subscription, received)) for subscription in subscriptions]
+    await asyncio.sleep(0)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"connections:           {args.connections}")
+    print(f"memory per connection: {(after - before) / args.connections:.0f} bytes")
+
+    events = [
+        UserEvent.create(id=i, user_id=random.randrange(args.users), type="notification",
+                         data={"type": "notification", "id": i, "op": "insert"})
+        for i in range(args.events)
+    ]
+    start = time.perf_counter()
+    for i, event in enumerate(events):
+        hub.publish(event)
+        # lets the readers run, as the notify callbacks of the listener do
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+    published = time.perf_counter()
+    while received[0] < hub.metrics.delivered:
+        await asyncio.sleep(0.001)
+    done = time.perf_counter()
+
+    print(f"events:                {args.events}, frames delivered: {hub.metrics.delivered}")
+    print(f"publish:               {args.events / (published - start):.0f} events/s")
+    print(f"publish and read:      {hub.metrics.delivered / (done - start):.0f} frames/s")
+    print(f"overflowed:            {hub.metrics.overflowed}")
+
+    for reader in readers:
+        reader.cancel()
+    await asyncio.gather(*readers, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
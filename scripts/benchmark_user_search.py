@@ -0,0 +1,184 @@
+"""
+Benchmark of the user search on a seeded database.
+
+Seeds N synthetic users (100k by default) with specialisations and skills, then compares
+the legacy search (joins + ILIKE + bare LIMIT) with UserManager.search_users
+(trigram/tsvector indexes + EXISTS + keyset pagination) and prints latency percentiles
+and query plans.
+
+Usage (from packages/common_db with the venv activated and migrations applied):
+    python ../../scripts/benchmark_user_search.py --seed --users 100000
+    python ../../scripts/benchmark_user_search.py --runs 50
+    python ../../scripts/benchmark_user_search.py --cleanup
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import select, text, and_
+
+from common_db.config import schema
+from common_db.db_abstract import db_manager
+from common_db.managers import UserManager
+from common_db.models import ORMUserProfile, ORMSpecialisation, ORMSkill
+from common_db.schemas import DTOSearchUser
+
+BENCH_EMAIL_DOMAIN = "bench.local"
+
+SEARCHES = [
+    DTOSearchUser(name="ale"),
+    DTOSearchUser(surname="ova", city="mosc"),
+    DTOSearchUser(specialisation="backend"),
+    DTOSearchUser(skill="python", country="RU"),
+    DTOSearchUser(query="alexey backend"),
+]
+
+
+async def seed(users_count: int) -> None:
+    """Insert synthetic users with generate_series (fast, single round trips)"""
+    async with db_manager.session() as session:
+        await session.execute(text(f"""
+            INSERT INTO {schema}.specialisations (label, description, is_custom)
+            SELECT 'bench_' || s, NULL, false
+            FROM unnest(ARRAY['backend', 'frontend', 'data_science', 'devops', 'product_management',
+                              'design', 'qa', 'mobile', 'ml_engineering', 'analytics']) AS s
+        """))
+        await session.execute(text(f"""
+            INSERT INTO {schema}.skills (label, description, is_custom)
+            SELECT 'bench_' || s, NULL, false
+            FROM unnest(ARRAY['python', 'go', 'java', 'kotlin', 'swift', 'sql', 'react', 'k8s',
+                              'terraform', 'spark', 'figma', 'rust']) AS s
+        """))
+        await session.execute(text(f"""
+            INSERT INTO {schema}.users (name, surname, email, country, city)
+            SELECT
+                (ARRAY['Alexey', 'Maria', 'Ivan', 'Olga', 'Dmitry', 'Anna', 'Sergey', 'Elena'])[1 + g % 8]
+                    || substr(md5(g::text), 1, 4),
+                (ARRAY['Ivanov', 'Petrova', 'Smirnov', 'Kuznetsova', 'Popov', 'Sokolova'])[1 + g % 6]
+                    || substr(md5(g::text), 5, 3),
+                'user' || g || '@{BENCH_EMAIL_DOMAIN}',
+                (ARRAY['RU', 'RS', 'GE', 'AM', 'DE', 'NL'])[1 + g % 6],
+                (ARRAY['Moscow', 'Belgrade', 'Tbilisi', 'Yerevan', 'Berlin', 'Amsterdam'])[1 + (g / 7) % 6]
+            FROM generate_series(1, :users_count) AS g
+        """), {"users_count": users_count})
+        await session.execute(text(f"""
+            INSERT INTO {schema}.users_specialisations (user_id, specialisation_id)
+            SELECT u.id, s.id
+            FROM {schema}.users u
+            JOIN LATERAL (
+                SELECT id FROM {schema}.specialisations
+                WHERE label LIKE 'bench_%%' ORDER BY md5(u.id::text || id::text) LIMIT 2
+            ) s ON true
+            WHERE u.email LIKE '%%@{BENCH_EMAIL_DOMAIN}'
+        """))
+        await session.execute(text(f"""
+            INSERT INTO {schema}.users_skills (user_id, skill_id)
+            SELECT u.id, s.id
+            FROM {schema}.users u
+            JOIN LATERAL (
+                SELECT id FROM {schema}.skills
+                WHERE label LIKE 'bench_%%' ORDER BY md5(u.id::text || id::text) LIMIT 3
+            ) s ON true
+            WHERE u.email LIKE '%%@{BENCH_EMAIL_DOMAIN}'
+        """))
+        await session.execute(text(f"ANALYZE {schema}.users"))
+        await session.execute(text(f"ANALYZE {schema}.users_specialisations"))
+        await session.execute(text(f"ANALYZE {schema}.users_skills"))
+    print(f"Seeded {users_count} users")
+
+
+async def cleanup() -> None:
+    async with db_manager.session() as session:
+        bench_users = f"SELECT id FROM {schema}.users WHERE email LIKE '%%@{BENCH_EMAIL_DOMAIN}'"
+        await session.execute(text(f"DELETE FROM {schema}.users_specialisations WHERE user_id IN ({bench_users})"))
+        await session.execute(text(f"DELETE FROM {schema}.users_skills WHERE user_id IN ({bench_users})"))
+        await session.execute(text(f"DELETE FROM {schema}.users WHERE email LIKE '%%@{BENCH_EMAIL_DOMAIN}'"))
+        await session.execute(text(f"DELETE FROM {schema}.specialisations WHERE label LIKE 'bench_%%'"))
+        await session.execute(text(f"DELETE FROM {schema}.skills WHERE label LIKE 'bench_%%'"))
+    print("Benchmark data removed")
+
+
+def legacy_query(params: DTOSearchUser):
+    """The search as it was implemented before: joins with fan-out, ILIKE and a bare LIMIT"""
+    query = select(ORMUserProfile.id)
+    conditions = []
+    if params.name:
+        conditions.append(ORMUserProfile.name.ilike(f"%{params.name}%"))
+    if params.surname:
+        conditions.append(ORMUserProfile.surname.ilike(f"%{params.surname}%"))
+    if params.country:
+        conditions.append(ORMUserProfile.country.ilike(f"%{params.country}%"))
+    if params.city:
+        conditions.append(ORMUserProfile.city.ilike(f"%{params.city}%"))
+    if params.specialisation:
+        query = query.join(ORMUserProfile.specialisations)
+        conditions.append(ORMSpecialisation.label.ilike(f"%{params.specialisation}%"))
+    if params.skill:
+        query = query.join(ORMUserProfile.skills)
+        conditions.append(ORMSkill.label.ilike(f"%{params.skill}%"))
+    if params.query:
+        # the legacy search had no free-text mode, emulate it with ILIKE over every word
+        for word in params.query.split():
+            conditions.append(ORMUserProfile.name.ilike(f"%{word}%"))
+    if conditions:
+        query = query.where(and_(*conditions))
+    return query.limit(params.limit)
+
+
+def percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+    return f"p50={p50 * 1000:8.2f}ms  p95={p95 * 1000:8.2f}ms"
+
+
+async def explain(session, query) -> str:
+    compiled = query.compile(dialect=session.bind.dialect, compile_kwargs={"literal_binds": True})
+    result = await session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}"))
+    return "\n".join(row[0] for row in result)
+
+
+async def run(runs: int, show_plans: bool) -> None:
+    async with db_manager.session() as session:
+        user_id = (await session.execute(select(ORMUserProfile.id).limit(1))).scalar_one()
+
+        for params in SEARCHES:
+            legacy, current = [], []
+            for _ in range(runs):
+                started = time.perf_counter()
+                (await session.execute(legacy_query(params))).all()
+                legacy.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                page = await UserManager.search_users(user_id=user_id, search_params=params, session=session)
+                current.append(time.perf_counter() - started)
+
+            label = params.model_dump_json(exclude_none=True, exclude={"limit"})
+            print(f"\n{label}")
+            print(f"  legacy:  {percentiles(legacy)}")
+            print(f"  indexed: {percentiles(current)}  (page of {len(page.users)}, "
+                  f"next_cursor={'yes' if page.next_cursor else 'no'})")
+            if show_plans:
+                print("  legacy plan:\n" + await explain(session, legacy_query(params)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="insert synthetic users before the run")
+    parser.add_argument("--users", type=int, default=100_000, help="number of users to seed")
+    parser.add_argument("--runs", type=int, default=20, help="runs per search")
+    parser.add_argument("--plans", action="store_true", help="print EXPLAIN ANALYZE of the legacy queries")
+    parser.add_argument("--cleanup", action="store_true", help="remove the seeded users and exit")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        asyncio.run(cleanup())
+        return
+    if args.seed:
+        asyncio.run(seed(args.users))
+    asyncio.run(run(args.runs, args.plans))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Partition maintenance and retention job. Run it daily (cron / Cloud Scheduler), it is idempotent.
+
+- creates the monthly partitions of the partitioned tables for the next months;
+- drops the partitions older than the retention period of the table;
+- deletes old matching_results (the table is not partitioned, it is referenced by meetings)
+  in small batches, results referenced by meetings are kept;
+- deletes the outbox events published more than OUTBOX_RETENTION_DAYS ago
+  and the failed ones (all attempts used) after OUTBOX_FAILED_RETENTION_DAYS;
+- deletes the deferred notifications released more than SCHEDULED_NOTIFICATIONS_RETENTION_DAYS ago
+  and the failed ones (all attempts used) after SCHEDULED_NOTIFICATIONS_FAILED_RETENTION_DAYS.
+
+Usage (from packages/common_db with the venv activated):
+    python ../../scripts/db_maintenance.py
+    python ../../scripts/db_maintenance.py --dry-run
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from common_db.config import schema
+from common_db.db_abstract import db_manager
+from common_db.managers import OutboxManager, ScheduledNotificationManager
+
+# table -> retention in days, None keeps all the partitions
+PARTITION_RETENTION_DAYS: dict[str, int | None] = {
+    "linkedin_raw_data": 365,
+    "tg_bot_logging_events": 90,
+}
+MONTHS_AHEAD = 3
+MATCHING_RESULTS_RETENTION_DAYS = 180
+DELETE_BATCH_SIZE = 5000
+OUTBOX_RETENTION_DAYS = 7
+# failed events are kept longer for manual handling
+OUTBOX_FAILED_RETENTION_DAYS = 30
+SCHEDULED_NOTIFICATIONS_RETENTION_DAYS = 7
+# failed notifications are kept longer for manual handling
+SCHEDULED_NOTIFICATIONS_FAILED_RETENTION_DAYS = 30
+
+
+async def is_partitioned(session, table: str) -> bool:
+    result = await session.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": f"{schema}.{table}"}
+    )
+    return result.scalar()
+
+
+async def maintain_partitions(dry_run: bool) -> None:
+    now = datetime.utcnow()
+    async with db_manager.session() as session:
+        for table, retention_days in PARTITION_RETENTION_DAYS.items():
+            if not await is_partitioned(session, table):
+                print(f"{table}: not partitioned, skipped")
+                continue
+
+            if dry_run:
+                # the months create_monthly_partitions() would create, nothing is created
+                result = await session.execute(
+                    text(f"""
+                        SELECT :table || '_p' || to_char(month, 'YYYYMM') AS partition
+                        FROM generate_series(date_trunc('month', current_date),
+                                             current_date + make_interval(months => :months),
+                                             interval '1 month') AS month
+                        WHERE to_regclass('{schema}.' || :table || '_p' || to_char(month, 'YYYYMM')) IS NULL
+                    """),
+                    {"table": table, "months": MONTHS_AHEAD}
+                )
+                for (partition,) in result:
+                    print(f"{table}: would create {partition}")
+            else:
+                result = await session.execute(
+                    text(f"SELECT {schema}.create_monthly_partitions(:table, current_date, "
+                         f"(current_date + make_interval(months => :months))::date)"),
+                    {"table": table, "months": MONTHS_AHEAD}
+                )
+                for (partition,) in result:
+                    print(f"{table}: created {partition}")
+
+            if retention_days is None:
+                continue
+            older_than = now - timedelta(days=retention_days)
+            if dry_run:
+                print(f"{table}: would drop partitions ending before {older_than:%Y-%m-%d}")
+                continue
+            result = await session.execute(
+                text(f"SELECT {schema}.drop_old_partitions(:table, :older_than)"),
+                {"table": table, "older_than": older_than}
+            )
+            for (partition,) in result:
+                print(f"{table}: dropped {partition}")
+
+
+async def purge_matching_results(dry_run: bool) -> None:
+    older_than = datetime.utcnow() - timedelta(days=MATCHING_RESULTS_RETENTION_DAYS)
+    candidates = f"""
+        SELECT mr.id
+        FROM {schema}.matching_results mr
+        WHERE mr.created_at < :older_than
+          AND NOT EXISTS (SELECT 1 FROM {schema}.meetings m WHERE m.match_id = mr.id)
+    """
+    if dry_run:
+        async with db_manager.session() as session:
+            result = await session.execute(text(f"SELECT count(*) FROM ({candidates}) c"),
+                                           {"older_than": older_than})
+            print(f"matching_results: would delete {result.scalar()} rows")
+        return
+
+    total = 0
+    while True:
+        # a transaction per batch keeps locks and WAL bursts short
+        async with db_manager.session() as session:
+            result = await session.execute(
+                text(f"DELETE FROM {schema}.matching_results WHERE id IN ({candidates} LIMIT :batch_size)"),
+                {"older_than": older_than, "batch_size": DELETE_BATCH_SIZE}
+            )
+        total += result.rowcount
+        if result.rowcount < DELETE_BATCH_SIZE:
+            break
+    print(f"matching_results: deleted {total} rows older than {older_than:%Y-%m-%d}")
+
+
+async def purge_outbox(dry_run: bool) -> None:
+    sent_before = datetime.utcnow() - timedelta(days=OUTBOX_RETENTION_DAYS)
+    failed_before = datetime.utcnow() - timedelta(days=OUTBOX_FAILED_RETENTION_DAYS)
+    if dry_run:
+        async with db_manager.session() as session:
+            result = await session.execute(
+                text(f"""
+                    SELECT count(*) FILTER (WHERE sent_at < :sent_before),
+                           count(*) FILTER (WHERE failed_at < :failed_before)
+                    FROM {schema}.outbox
+                """),
+                {"sent_before": sent_before, "failed_before": failed_before}
+            )
+            sent, failed = result.one()
+            print(f"outbox: would delete {sent} sent and {failed} failed events")
+        return
+    async with db_manager.session() as session:
+        deleted = await OutboxManager.delete_sent(sent_before, session=session)
+        failed = await OutboxManager.delete_failed(failed_before, session=session)
+    print(f"outbox: deleted {deleted} events sent before {sent_before:%Y-%m-%d}, "
+          f"{failed} failed before {failed_before:%Y-%m-%d}")
+
+
+async def purge_scheduled_notifications(dry_run: bool) -> None:
+    released_before = datetime.utcnow() - timedelta(days=SCHEDULED_NOTIFICATIONS_RETENTION_DAYS)
+    failed_before = datetime.utcnow() - timedelta(days=SCHEDULED_NOTIFICATIONS_FAILED_RETENTION_DAYS)
+    if dry_run:
+        async with db_manager.session() as session:
+            result = await session.execute(
+                text(f"""
+                    SELECT count(*) FILTER (WHERE released_at < :released_before),
+                           count(*) FILTER (WHERE failed_at < :failed_before)
+                    FROM {schema}.scheduled_notifications
+                """),
+                {"released_before": released_before, "failed_before": failed_before}
+            )
+            released, failed = result.one()
+            print(f"scheduled_notifications: would delete {released} released and {failed} failed notifications")
+        return
+    async with db_manager.session() as session:
+        deleted = await ScheduledNotificationManager.delete_released(released_before, session=session)
+        failed = await ScheduledNotificationManager.delete_failed(failed_before, session=session)
+    print(f"scheduled_notifications: deleted {deleted} notifications released before {released_before:%Y-%m-%d}, "
+          f"{failed} failed before {failed_before:%Y-%m-%d}")
+
+
+async def main(dry_run: bool) -> None:
+    await maintain_partitions(dry_run)
+    await purge_matching_results(dry_run)
+    await purge_outbox(dry_run)
+    await purge_scheduled_notifications(dry_run)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be dropped and deleted")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run))
@@ -0,0 +1,227 @@
+"""
+Offline load test of the notification pipeline on the in-memory message broker.
+
+Publishes DTOGeneralNotification messages at --rate per second for --duration seconds
+into the notifications topic and runs the real message handlers:
+- notifications: message_handler of the notifications app - batches the messages, reads
+  the users, publishes the notifications to the telegram topic and saves them; the database
+  is replaced by --io-latency sleeps (one per batch);
+- telegram: message_handler of telegram_bot - the Telegram API call (tools.safe_msg_send)
+  is replaced by an --io-latency sleep.
+Reports per stage: handled, retried and dead-lettered messages, throughput and the
+latency percentiles from the publish to the end of the handler, redeliveries included.
+
+Usage (from apps/notifications with the venv activated, telegram_bot is imported from ../telegram_bot):
+    python ../../scripts/load_generator.py
+    python ../../scripts/load_generator.py --rate 2000 --duration 20 --io-latency 0.02 --concurrency 128
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import sys
+import time
+import types
+
+TOPIC = "notifications"
+SUBSCRIPTION = "notifications-sub"
+TG_TOPIC = "notifications-tg"
+TG_SUBSCRIPTION = "notifications-tg-sub"
+
+
+def configure_environment():
+    # settings of the notifications app, the broker is in-memory: no credentials are read
+    defaults = {
+        "PS_BROKER_TYPE": "in_memory",
+        "PS_CREDENTIALS_PATH": "-",
+        "PS_PROJECT_ID": "load-test",
+        "PS_NOTIFICATION_TOPIC": TOPIC,
+        "PS_NOTIFICATION_SUB_NAME": SUBSCRIPTION,
+        "PS_NOTIFICATION_TG_TOPIC": TG_TOPIC,
+        "PS_NOTIFICATION_TG_SUB_NAME": TG_SUBSCRIPTION,
+        "EMAIL_SERV_PASS": "-",
+        "EMAIL_SERV_SENDER": "load-test@example.com",
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+
+
+def simulated_route(user_id: int):
+    from common_db.schemas import DTONotificationRoute
+
+    user = simulated_user(user_id)
+    return DTONotificationRoute(user_id=user_id, **{name: getattr(user, name)
+                                                    for name in DTONotificationRoute.model_fields if name != 'user_id'})
+
+
+def simulated_user(user_id: int):
+    from common_db.schemas import DTONotifiedUserProfile
+
+    return DTONotifiedUserProfile(
+        id=user_id,
+        name="Load",
+        surname="Test",
+        email=f"user{user_id}@example.com",
+        telegram_id=100_000 + user_id,
+        is_tg_bot_blocked=False,
+        is_tg_notify=True,
+        is_email_notify=False,
+        is_push_notify=False,
+    )
+
+
+def patch_notifications(io_latency: float, db_pool: int):
+    """Replace the database calls of the notifications handler with sleeps, one per batch,
+    on at most db_pool connections at a time"""
+    from notifications.logic import outgoing_message
+
+    connections = asyncio.Semaphore(db_pool)
+
+    class DatabaseManager:
+        @staticmethod
+        @contextlib.asynccontextmanager
+        async def session():
+            yield None
+
+    class UserManager:
+        @staticmethod
+        async def get_notification_routes(user_ids: set[int], session=None) -> dict:
+            async with connections:
+                await asyncio.sleep(io_latency)
+            return {user_id: simulated_route(user_id) for user_id in user_ids}
+
+        @staticmethod
+        async def get_notified_users(user_ids: set[int], session=None) -> dict:
+            async with connections:
+                await asyncio.sleep(io_latency)
+            return {user_id: simulated_user(user_id) for user_id in user_ids}
+
+    class NotificationManager:
+        @staticmethod
+        async def create_notifications(notifications, session=None) -> None:
+            async with connections:
+                await asyncio.sleep(io_latency)
+
+    outgoing_message.db_manager = DatabaseManager
+    outgoing_message.UserManager = UserManager
+    outgoing_message.NotificationManager = NotificationManager
+
+
+def import_telegram_handler(io_latency: float):
+    """Import the handler of telegram_bot with the Telegram API call replaced by a sleep"""
+    sys.path.insert(0, os.path.abspath("../telegram_bot"))
+    safe_msg_send = types.ModuleType("src.tools.safe_msg_send")
+
+    async def send(telegram_id: int, text: str, *args, **kwargs):
+        await asyncio.sleep(io_latency)
+        return None
+
+    safe_msg_send.send = send
+    # registered before the import: the real module connects the bot on import
+    sys.modules["src.tools.safe_msg_send"] = safe_msg_send
+    from src.message_broker.incoming_message import message_handler
+    return message_handler
+
+
+def timed(handler, latencies: list[float]):
+    async def wrapper(message):
+        await handler(message)
+        latencies.append(time.monotonic() - message.publish_time)
+    return wrapper
+
+
+def percentile(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def report(name: str, metrics, latencies: list[float], dead_letters: int, duration: float):
+    ms = [latency * 1000 for latency in latencies]
+    print(f"{name}:")
+    print(f"  handled {metrics.acked}, retried {metrics.retried}, dead-lettered {dead_letters}, "
+          f"{metrics.acked / duration:.0f} msg/s")
+    if ms:
+        print(f"  latency ms: p50 {percentile(ms, 50):.1f}  p90 {percentile(ms, 90):.1f}  "
+              f"p99 {percentile(ms, 99):.1f}  max {max(ms):.1f}")
+
+
+async def generate(broker, rate: float, duration: float, users: int) -> int:
+    """Publish at a fixed rate by an absolute schedule: a slow publish does not lower the rate"""
+    from common_db.enums.notifications import ENotificationType
+    from common_db.schemas import DTOGeneralNotification
+
+    interval = 1 / rate
+    start = time.monotonic()
+    sent = 0
+    while (now := time.monotonic()) - start < duration:
+        due = int((now - start) / interval) + 1
+        while sent < due:
+            await broker.publish(TOPIC, DTOGeneralNotification(
+                notification_type=ENotificationType.user_test, user_id=sent % users + 1
+            ))
+            sent += 1
+        await asyncio.sleep(max(0.0, start + sent * interval - time.monotonic()))
+    return sent
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=500, help="published messages per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds")
+    parser.add_argument("--users", type=int, default=1000, help="distinct recipients")
+    parser.add_argument("--io-latency", type=float, default=0.005, help="seconds of a simulated DB or API call")
+    parser.add_argument("--db-pool", type=int, default=15, help="database connections (pool_size + max_overflow)")
+    parser.add_argument("--broker-latency", type=float, default=0.002, help="seconds from a publish to the delivery")
+    parser.add_argument("--concurrency", type=int, default=64, help="handlers running at a time per subscription")
+    parser.add_argument("--drain-timeout", type=float, default=30, help="seconds to wait for the handlers at the end")
+    args = parser.parse_args()
+
+    configure_environment()
+    from notifications.loader import broker
+    from notifications.logic.incoming_message import batch_consumer, message_handler
+
+    broker.delivery_latency = args.broker_latency
+    broker.max_concurrency = args.concurrency
+    broker.create_subscription(SUBSCRIPTION, TOPIC)
+    broker.create_subscription(TG_SUBSCRIPTION, TG_TOPIC)
+    patch_notifications(args.io_latency, args.db_pool)
+    telegram_handler = import_telegram_handler(args.io_latency)
+
+    latencies: dict[str, list[float]] = {SUBSCRIPTION: [], TG_SUBSCRIPTION: []}
+    consumers = [
+        asyncio.create_task(broker.subscribe(SUBSCRIPTION, timed(message_handler, latencies[SUBSCRIPTION]))),
+        asyncio.create_task(broker.subscribe(TG_SUBSCRIPTION, timed(telegram_handler, latencies[TG_SUBSCRIPTION]))),
+    ]
+
+    start = time.monotonic()
+    sent = await generate(broker, args.rate, args.duration, args.users)
+    published = time.monotonic() - start
+    deadline = time.monotonic() + args.drain_timeout
+
+    def settled(subscription: str, expected: int) -> bool:
+        metrics = broker.metrics[subscription]
+        return metrics.acked + len(broker.dead_letters.get(subscription, [])) >= expected
+
+    while time.monotonic() < deadline and not (
+            settled(SUBSCRIPTION, sent) and settled(TG_SUBSCRIPTION, broker.metrics[SUBSCRIPTION].acked)
+    ):
+        await asyncio.sleep(0.05)
+    elapsed = time.monotonic() - start
+
+    for consumer in consumers:
+        consumer.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+
+    print(f"published {sent} messages in {published:.1f}s ({sent / published:.0f} msg/s)")
+    print(f"notification batches: {batch_consumer.metrics.batches}, "
+          f"avg {batch_consumer.metrics.submitted / max(batch_consumer.metrics.batches, 1):.1f}, "
+          f"max {batch_consumer.metrics.max_batch}")
+    for name, subscription in [("notifications", SUBSCRIPTION), ("telegram", TG_SUBSCRIPTION)]:
+        report(name, broker.metrics[subscription], latencies[subscription],
+               len(broker.dead_letters.get(subscription, [])), elapsed)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())